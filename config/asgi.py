@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Los streams SSE (/api/almacenes/<id>/eventos/) solo se sirven por aquí,
+p. ej. `uvicorn config.asgi:application`.
 """
 
 import os
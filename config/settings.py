@@ -83,6 +83,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# "catalogos" guarda los catálogos de referencia (ver inventory.catalogos).
+# Es un caché en archivos para que lo compartan todos los workers sin
+# depender de un servicio externo. "reportes" guarda los meses cerrados del
+# análisis de compras (ver inventory.services.compras).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalogos': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'catalogos',
+        'TIMEOUT': 60 * 60 * 24,
+    },
+    'reportes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'reportes',
+        'TIMEOUT': 60 * 60 * 24 * 7,
+    },
+}
+
+# Durante los tests los cachés anteriores son LocMemCache (ver config.test_runner)
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -119,6 +147,77 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos (importaciones que esperan su turno en la cola)
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'inventory.pagination.InventarioCursorPagination',
+    'PAGE_SIZE': 50,
+    # JSON con orjson (misma salida que el de DRF; si orjson no está
+    # instalado se usa el de DRF). Ver inventory.renderers.
+    'DEFAULT_RENDERER_CLASSES': [
+        'inventory.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'inventory.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Trabajos en segundo plano (ver inventory.services.trabajos)
+# En desarrollo se ejecutan en el momento, sin levantar `run_worker`.
+
+INVENTARIO_TRABAJOS = {
+    'SINCRONICO': DEBUG,
+    'MAX_INTENTOS': 3,
+    'RETARDO_REINTENTO': 30,
+    'TIEMPO_MAXIMO': 15 * 60,
+}
+
+# Concurrencia de los servicios de stock (ver inventory.services.inventory)
+# 'optimista' evita bloquear filas mientras corre el servicio; conviene en
+# almacenes con muchas lecturas y pocos conflictos.
+
+INVENTARIO_CONCURRENCIA = {
+    'MODO': 'pesimista',
+    'REINTENTOS': 5,
+}
+
+# Caché de lecturas de stock por proceso (ver inventory.cache_stock)
+
+INVENTARIO_CACHE_STOCK = {
+    'MAX_ENTRADAS': 10000,
+    'TTL': 30,
+}
+
+# Eventos de stock en vivo por SSE (ver inventory.eventos_stock)
+# MAX_COLA: eventos pendientes por conexión; PING: segundos entre keep-alives.
+# INTERVALO_SONDEO / MARGEN_SONDEO: lectura de los cambios hechos por otros
+# procesos (run_worker, otros workers); 0 desactiva el sondeo.
+
+INVENTARIO_EVENTOS_STOCK = {
+    'MAX_COLA': 1000,
+    'PING': 15,
+    'INTERVALO_SONDEO': 2,
+    'MARGEN_SONDEO': 10,
+}
+
+# Feed de cambios para clientes (ver inventory.services.sincronizacion)
+# MARGEN: segundos que se vuelven a enviar por si una transacción confirma tarde.
+# MAX_LOTE_VENTAS: ventas offline por subida de un terminal.
+
+INVENTARIO_SINCRONIZACION = {
+    'LIMITE': 1000,
+    'MARGEN': 5,
+    'RETENCION_DIAS': 30,
+    'MAX_LOTE_VENTAS': 5000,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,29 @@
+"""
+Runner de `manage.py test`: los cachés de settings.CACHES pasan a
+LocMemCache (uno por alias) durante la corrida, para que los tests no lean
+ni borren los cachés en archivo del proyecto (BASE_DIR/.cache).
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches_locales = override_settings(
+            CACHES={
+                alias: {
+                    **config,
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": f"tests-{alias}",
+                }
+                for alias, config in settings.CACHES.items()
+            }
+        )
+        self._caches_locales.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches_locales.disable()
+        super().teardown_test_environment(**kwargs)
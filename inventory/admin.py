@@ -15,7 +15,12 @@ from .models import (
     CategoriaPlato,
     Plato,
     EntradaCompra,
+    ConsumoReceta,
+    PrecioInsumo,
+    Trabajo,
 )
+from .services.trabajos import encolar
+
 admin.site.site_header = "Administración de Inventario BM"
 admin.site.site_title = "Inventario BM"
 
@@ -194,6 +199,14 @@ class MovimientoInventarioAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(ConsumoReceta)
+class ConsumoRecetaAdmin(admin.ModelAdmin):
+    list_display = ("plato", "almacen", "cantidad_platos", "fecha_movimiento", "usuario")
+    list_filter = ("almacen", "fecha_movimiento")
+    search_fields = ("plato__nombre", "referencia", "evento_id")
+    autocomplete_fields = ("plato", "almacen", "usuario")
+    readonly_fields = ("evento_id", "created_at", "updated_at")
+
 @admin.register(CategoriaPlato)
 class CategoriaPlatoAdmin(admin.ModelAdmin):
     list_display = ("nombre", )
@@ -229,7 +242,39 @@ class EntradaCompraAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         # Primero guardamos la compra en la BD
         super().save_model(request, obj, form, change)
-        # Luego, si aún no está procesada, generamos la entrada de inventario
+        # Luego, si aún no está procesada, encolamos la entrada de inventario
         if not obj.procesada:
-            obj.procesar(usuario=request.user)
+            encolar(
+                "procesar_entrada_compra",
+                {"entrada_id": obj.pk, "usuario_id": request.user.pk},
+                clave_idempotencia=f"entrada-compra-{obj.pk}",
+                usuario=request.user,
+            )
+
+
+@admin.register(PrecioInsumo)
+class PrecioInsumoAdmin(admin.ModelAdmin):
+    list_display = ("insumo", "proveedor", "fecha", "costo_unitario", "cantidad")
+    list_filter = ("proveedor", "fecha")
+    search_fields = ("insumo__nombre", "proveedor__nombre")
+    date_hierarchy = "fecha"
+    raw_id_fields = ("movimiento",)
+    autocomplete_fields = ("insumo", "proveedor")
+
+
+@admin.register(Trabajo)
+class TrabajoAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "tipo",
+        "estado",
+        "progreso",
+        "intentos",
+        "usuario",
+        "created_at",
+        "finalizado_en",
+    )
+    list_filter = ("estado", "tipo")
+    search_fields = ("tipo", "clave_idempotencia", "mensaje", "error")
+    readonly_fields = ("created_at", "updated_at", "iniciado_en", "finalizado_en")
 
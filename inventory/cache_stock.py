@@ -0,0 +1,173 @@
+"""
+Caché en memoria del proceso para lecturas de stock (cantidad y costo por
+insumo+almacén).
+
+Las pantallas de caja y cocina consultan la disponibilidad de los mismos
+insumos una y otra vez. Las lecturas pasan por aquí:
+
+    (insumo_id, almacen_id) -> EstadoStock(cantidad, costo_promedio, version)
+
+- Se llena bajo demanda (un SELECT por lote de claves que faltan); la
+  ausencia de fila también se guarda (cantidad 0).
+- Los servicios registrar_* invalidan exactamente las claves que tocaron,
+  ahora y otra vez con transaction.on_commit (ver
+  inventory.services.inventory._modificar_stocks); los guardados directos
+  del modelo se invalidan por señal.
+- Cada invalidación sube una generación y la anota en las claves que
+  tocó; una lectura de la BD que empezó antes no guarda lo que leyó
+  (podría ser el valor viejo) y la siguiente vuelve a consultar.
+- Es un LRU acotado a MAX_ENTRADAS. Como cada worker tiene su propia copia
+  y no ve las escrituras de los demás, las entradas expiran a los TTL
+  segundos.
+
+Configuración: settings.INVENTARIO_CACHE_STOCK (MAX_ENTRADAS, TTL).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from inventory.models import StockInsumo
+
+
+CONFIGURACION_CACHE_STOCK = {
+    "MAX_ENTRADAS": 10_000,
+    "TTL": 30,
+}
+
+Clave = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class EstadoStock:
+    cantidad: Decimal
+    costo_promedio: Decimal
+    version: int = 0
+
+
+SIN_STOCK = EstadoStock(cantidad=Decimal("0"), costo_promedio=Decimal("0"))
+
+
+def configuracion_cache_stock() -> dict:
+    return {**CONFIGURACION_CACHE_STOCK, **getattr(settings, "INVENTARIO_CACHE_STOCK", {})}
+
+
+class CacheStock:
+    def __init__(self):
+        self._entradas: OrderedDict[Clave, tuple[float, EstadoStock]] = OrderedDict()
+        self._lock = threading.Lock()
+        # clave -> generación de su última invalidación (las más recientes,
+        # acotadas a MAX_ENTRADAS); las que se descartan suben _olvidada
+        self._generacion = 0
+        self._invalidadas: OrderedDict[Clave, int] = OrderedDict()
+        self._olvidada = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener_varios(self, claves: Iterable[Clave]) -> dict[Clave, EstadoStock]:
+        config = configuracion_cache_stock()
+        ahora = time.monotonic()
+        resultado: dict[Clave, EstadoStock] = {}
+        faltantes: set[Clave] = set()
+
+        with self._lock:
+            for clave in claves:
+                entrada = self._entradas.get(clave)
+                if entrada is not None and ahora - entrada[0] < config["TTL"]:
+                    self._entradas.move_to_end(clave)
+                    resultado[clave] = entrada[1]
+                    self.aciertos += 1
+                else:
+                    faltantes.add(clave)
+            self.fallos += len(faltantes)
+            generacion = self._generacion
+
+        if faltantes:
+            leidos = self._leer(faltantes)
+            with self._lock:
+                vigente = generacion >= self._olvidada
+                for clave in faltantes:
+                    estado = leidos.get(clave, SIN_STOCK)
+                    resultado[clave] = estado
+                    if not vigente or self._invalidadas.get(clave, 0) > generacion:
+                        continue
+                    self._entradas[clave] = (ahora, estado)
+                    self._entradas.move_to_end(clave)
+                while len(self._entradas) > config["MAX_ENTRADAS"]:
+                    self._entradas.popitem(last=False)
+
+        return resultado
+
+    def obtener(self, insumo_id: int, almacen_id: int) -> EstadoStock:
+        clave = (insumo_id, almacen_id)
+        return self.obtener_varios([clave])[clave]
+
+    @staticmethod
+    def _leer(claves: set[Clave]) -> dict[Clave, EstadoStock]:
+        insumos = {insumo_id for insumo_id, _ in claves}
+        almacenes = {almacen_id for _, almacen_id in claves}
+        filas = StockInsumo.objects.filter(
+            insumo_id__in=insumos, almacen_id__in=almacenes
+        ).values_list("insumo_id", "almacen_id", "cantidad_actual", "costo_promedio", "version")
+        return {
+            (insumo_id, almacen_id): EstadoStock(cantidad, costo, version)
+            for insumo_id, almacen_id, cantidad, costo, version in filas
+            if (insumo_id, almacen_id) in claves
+        }
+
+    def invalidar(self, claves: Iterable[Clave]) -> None:
+        config = configuracion_cache_stock()
+        with self._lock:
+            self._generacion += 1
+            for clave in claves:
+                self._invalidadas[clave] = self._generacion
+                self._invalidadas.move_to_end(clave)
+                if self._entradas.pop(clave, None) is not None:
+                    self.invalidaciones += 1
+            while len(self._invalidadas) > config["MAX_ENTRADAS"]:
+                _, self._olvidada = self._invalidadas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._generacion += 1
+            self._invalidadas.clear()
+            self._olvidada = self._generacion
+            self.aciertos = self.fallos = self.invalidaciones = 0
+
+    def estadisticas(self) -> dict:
+        config = configuracion_cache_stock()
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": config["MAX_ENTRADAS"],
+                "ttl": config["TTL"],
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+            }
+
+
+cache_stock = CacheStock()
+
+
+def invalidar_stocks_al_confirmar(claves: Iterable[Clave]) -> None:
+    """
+    Invalida ahora (para que nadie relea el valor viejo dentro de esta
+    transacción) y otra vez al confirmar (por si otro hilo lo cacheó
+    antes del commit).
+    """
+    claves = set(claves)
+    if not claves:
+        return
+    cache_stock.invalidar(claves)
+    transaction.on_commit(lambda: cache_stock.invalidar(claves))
@@ -0,0 +1,156 @@
+"""
+Caché compartida de catálogos de referencia (unidades, categorías,
+proveedores, almacenes).
+
+Los catálogos cambian muy poco pero se leen en cada render de formulario y
+en cada serializer anidado. Se guardan completos en el caché "catalogos"
+(FileBasedCache: compartido entre workers de gunicorn sin servicios
+externos) bajo una clave versionada:
+
+    catalogo:<app.Modelo>:version   -> entero
+    catalogo:<app.Modelo>:v<N>      -> {pk: instancia} en el orden del modelo
+
+Las señales post_save/post_delete (ver inventory.signals) incrementan la
+versión, con lo que las entradas anteriores quedan huérfanas y expiran solas.
+Mientras la transacción que modificó un catálogo no se confirma, esa
+conexión lo lee de la BD sin tocar el caché: lo que guardara bajo la versión
+nueva serían filas que un rollback deja sin existir.
+"""
+
+from django.core.cache import caches
+from django.db import transaction
+
+from inventory.models import (
+    UnidadMedida,
+    CategoriaInsumo,
+    CategoriaPlato,
+    Proveedor,
+    Almacen,
+)
+
+CATALOGOS = (UnidadMedida, CategoriaInsumo, CategoriaPlato, Proveedor, Almacen)
+
+ALIAS_CACHE = "catalogos"
+
+
+def _cache():
+    return caches[ALIAS_CACHE]
+
+
+def es_catalogo(modelo) -> bool:
+    return modelo in CATALOGOS
+
+
+def _clave_version(modelo) -> str:
+    return f"catalogo:{modelo._meta.label}:version"
+
+
+def _version(modelo) -> int:
+    cache = _cache()
+    clave = _clave_version(modelo)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, 1, timeout=None)
+        version = cache.get(clave, 1)
+    return version
+
+
+def invalidar_catalogo(modelo) -> None:
+    """Incrementa la versión del catálogo (las claves viejas dejan de leerse)."""
+    cache = _cache()
+    clave = _clave_version(modelo)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, 2, timeout=None)
+
+
+def invalidar_catalogo_al_confirmar(modelo) -> None:
+    """
+    Invalida ahora (lecturas dentro de la misma transacción) y otra vez al
+    confirmar, para que ningún worker deje cacheado el estado previo al commit.
+    """
+    def invalidar():
+        invalidar.pendiente = False
+        invalidar_catalogo(modelo)
+
+    invalidar.catalogo = modelo
+    invalidar.pendiente = True
+    invalidar_catalogo(modelo)
+    transaction.on_commit(invalidar)
+
+
+def _modificado_sin_confirmar(modelo) -> bool:
+    """
+    True si esta conexión modificó el catálogo en una transacción todavía
+    abierta: su invalidación sigue pendiente en on_commit (un rollback, del
+    todo o de un savepoint, la descarta).
+    """
+    conexion = transaction.get_connection()
+    return conexion.in_atomic_block and any(
+        getattr(funcion, "catalogo", None) is modelo and funcion.pendiente
+        for _, funcion, _ in conexion.run_on_commit
+    )
+
+
+def obtener_catalogo(modelo, memo: dict | None = None) -> dict:
+    """
+    Devuelve {pk: instancia} con todas las filas del catálogo, en el orden
+    por defecto del modelo. Solo consulta la BD si la versión no está en caché.
+
+    `memo` es un dict del llamador (p. ej. uno por request o por
+    serialización): el catálogo se lee y deserializa del caché una sola vez
+    y las llamadas siguientes con el mismo memo lo reutilizan.
+    """
+    if memo is not None and modelo in memo:
+        return memo[modelo]
+    if _modificado_sin_confirmar(modelo):
+        datos = {obj.pk: obj for obj in modelo.objects.all()}
+        if memo is not None:
+            memo[modelo] = datos
+        return datos
+    cache = _cache()
+    clave = f"catalogo:{modelo._meta.label}:v{_version(modelo)}"
+    datos = cache.get(clave)
+    if datos is None:
+        datos = {obj.pk: obj for obj in modelo.objects.all()}
+        cache.set(clave, datos)
+    if memo is not None:
+        memo[modelo] = datos
+    return datos
+
+
+def obtener_del_catalogo(modelo, pk, memo: dict | None = None):
+    """Instancia del catálogo por pk, o None si no existe."""
+    if pk is None:
+        return None
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return obtener_catalogo(modelo, memo).get(pk)
+
+
+def catalogo_por_nombre(modelo) -> dict:
+    """{nombre en minúsculas: instancia}, para resolver referencias por nombre."""
+    return {obj.nombre.strip().lower(): obj for obj in obtener_catalogo(modelo).values()}
+
+
+def modelo_de_ruta(modelo, ruta: str):
+    """Modelo destino de una ruta de relación estilo ORM ("insumo__unidad")."""
+    for parte in ruta.split("__"):
+        modelo = modelo._meta.get_field(parte).related_model
+    return modelo
+
+
+def resolver_relacion(instancia, nombre: str, memo: dict | None = None):
+    """
+    getattr(instancia, nombre) para una FK, pero si apunta a un catálogo y
+    no vino cargada (select_related) se resuelve desde el caché por su *_id
+    en lugar de hacer una consulta. Ver `memo` en obtener_catalogo.
+    """
+    campo = instancia._meta.get_field(nombre)
+    modelo = campo.related_model
+    if es_catalogo(modelo) and not campo.is_cached(instancia):
+        return obtener_del_catalogo(modelo, getattr(instancia, campo.attname), memo)
+    return getattr(instancia, nombre)
@@ -0,0 +1,313 @@
+"""
+Difusión en el proceso de los cambios de stock para las pantallas de
+cocina (Server-Sent Events, ver views.AlmacenViewSet.eventos).
+
+Cada conexión SSE se suscribe al hub por almacén y espera en una cola
+asyncio; no consulta la BD salvo para la foto inicial al conectarse. Los
+eventos los publican:
+
+- la señal post_save de StockInsumo (API, admin y servicios en modo
+  pesimista, que guardan con .save()),
+- _SesionStock.confirmar en modo optimista (UPDATE directo, sin señal),
+
+siempre con transaction.on_commit: un rollback no se anuncia. Si nadie
+escucha el almacén no se arma ningún evento.
+
+El hub es por proceso, y las compras y los conteos se aplican en
+`manage.py run_worker` (otro proceso), igual que las escrituras de otros
+workers. Para esas, mientras haya suscripciones el proceso que sirve el
+stream corre una única tarea de sondeo: cada INTERVALO_SONDEO segundos lee
+los StockInsumo de los almacenes escuchados con updated_at en los últimos
+MARGEN_SONDEO segundos (índice updated_at, id) y los publica. El hub
+descarta los eventos `stock` cuya versión ya publicó, así que lo que llega
+por las dos vías (o en dos sondeos) se anuncia una sola vez; MARGEN_SONDEO
+cubre transacciones que confirman tarde y relojes desfasados.
+
+Eventos:
+    stock   {"insumo", "almacen", "cantidad_actual", "costo_promedio",
+             "version", "nivel_alerta"}
+    alerta  {"insumo", "almacen", "nivel_alerta", "anterior"} cuando cambia
+            el nivel de alerta respecto del último publicado.
+
+Configuración: settings.INVENTARIO_EVENTOS_STOCK (MAX_COLA, PING,
+INTERVALO_SONDEO, MARGEN_SONDEO; INTERVALO_SONDEO=0 desactiva el sondeo).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from inventory.models import StockInsumo
+
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACION_EVENTOS_STOCK = {
+    # Eventos pendientes por conexión; un cliente más lento se desconecta.
+    "MAX_COLA": 1000,
+    # Segundos sin eventos antes de mandar un comentario de keep-alive.
+    "PING": 15,
+    # Segundos entre lecturas de los cambios hechos por otros procesos.
+    "INTERVALO_SONDEO": 2,
+    # Cada sondeo vuelve a leer los cambios de estos últimos segundos.
+    "MARGEN_SONDEO": 10,
+}
+
+
+def configuracion_eventos_stock() -> dict:
+    return {
+        **CONFIGURACION_EVENTOS_STOCK,
+        **getattr(settings, "INVENTARIO_EVENTOS_STOCK", {}),
+    }
+
+
+@dataclass(frozen=True)
+class EventoStock:
+    tipo: str
+    almacen_id: int
+    datos: dict
+
+
+@dataclass(eq=False)
+class Suscripcion:
+    almacen_id: int
+    loop: asyncio.AbstractEventLoop
+    cola: asyncio.Queue
+    desbordada: bool = field(default=False)
+
+    async def siguiente(self, timeout: float) -> EventoStock | None:
+        """Próximo evento, o None si pasaron `timeout` segundos sin eventos."""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _encolar(self, evento: EventoStock) -> None:
+        # corre en el loop de la suscripción
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class HubEventosStock:
+    def __init__(self):
+        self._suscripciones: dict[int, set[Suscripcion]] = defaultdict(set)
+        self._niveles: dict[tuple[int, int], str] = {}
+        self._versiones: dict[tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+        self._ultimo_sondeo = None
+        self._tarea_sondeo: asyncio.Task | None = None
+        self.publicados = 0
+
+    def suscribir(self, almacen_id: int) -> Suscripcion:
+        """Debe llamarse desde el loop que va a leer la suscripción."""
+        suscripcion = Suscripcion(
+            almacen_id=almacen_id,
+            loop=asyncio.get_running_loop(),
+            cola=asyncio.Queue(maxsize=configuracion_eventos_stock()["MAX_COLA"]),
+        )
+        with self._lock:
+            self._suscripciones[almacen_id].add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            suscripciones = self._suscripciones.get(suscripcion.almacen_id)
+            if suscripciones is not None:
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._suscripciones[suscripcion.almacen_id]
+
+    def escuchando(self, almacen_id: int) -> bool:
+        return almacen_id in self._suscripciones
+
+    def publicar(self, eventos: Iterable[EventoStock]) -> None:
+        """
+        Entrega los eventos a las suscripciones de su almacén, agregando un
+        evento `alerta` cuando un stock cambia de nivel. Seguro entre hilos.
+        """
+        for evento in self._con_alertas(eventos):
+            with self._lock:
+                destinos = list(self._suscripciones.get(evento.almacen_id, ()))
+            for suscripcion in destinos:
+                try:
+                    suscripcion.loop.call_soon_threadsafe(suscripcion._encolar, evento)
+                except RuntimeError:  # loop cerrado: la conexión ya terminó
+                    self.cancelar(suscripcion)
+            self.publicados += 1
+
+    def _con_alertas(self, eventos: Iterable[EventoStock]):
+        for evento in eventos:
+            if evento.tipo != "stock":
+                yield evento
+                continue
+            datos = evento.datos
+            clave = (datos["insumo"], datos["almacen"])
+            with self._lock:
+                # ya publicada (por on_commit o por un sondeo anterior)
+                if datos["version"] <= self._versiones.get(clave, -1):
+                    continue
+                self._versiones[clave] = datos["version"]
+            yield evento
+            nivel = datos["nivel_alerta"]
+            with self._lock:
+                anterior = self._niveles.get(clave)
+                self._niveles[clave] = nivel
+            if nivel != anterior and not (anterior is None and nivel == "ok"):
+                yield EventoStock(
+                    "alerta",
+                    evento.almacen_id,
+                    {
+                        "insumo": datos["insumo"],
+                        "almacen": datos["almacen"],
+                        "nivel_alerta": nivel,
+                        "anterior": anterior,
+                    },
+                )
+
+    def sondear(self) -> int:
+        """
+        Publica los stocks de los almacenes escuchados que cambiaron desde el
+        sondeo anterior (menos MARGEN_SONDEO), incluidos los escritos por
+        otros procesos. Retorna cuántas filas leyó.
+        """
+        with self._lock:
+            almacenes = list(self._suscripciones)
+        if not almacenes:
+            return 0
+        ahora = timezone.now()
+        desde = (self._ultimo_sondeo or ahora) - timedelta(
+            seconds=configuracion_eventos_stock()["MARGEN_SONDEO"]
+        )
+        stocks = list(
+            StockInsumo.objects.filter(almacen_id__in=almacenes, updated_at__gte=desde)
+            .select_related("insumo")
+            .order_by("updated_at", "id")
+        )
+        self._ultimo_sondeo = ahora
+        self.publicar(evento_stock(stock) for stock in stocks)
+        return len(stocks)
+
+    def iniciar_sondeo(self) -> None:
+        """
+        Arranca la tarea de sondeo en el loop actual si no está corriendo
+        (una por proceso; termina sola cuando no quedan suscripciones).
+        """
+        if not configuracion_eventos_stock()["INTERVALO_SONDEO"]:
+            return
+        loop = asyncio.get_running_loop()
+        tarea = self._tarea_sondeo
+        if tarea is None or tarea.done() or tarea.get_loop() is not loop:
+            self._tarea_sondeo = loop.create_task(self._bucle_sondeo())
+
+    async def _bucle_sondeo(self) -> None:
+        while True:
+            await asyncio.sleep(configuracion_eventos_stock()["INTERVALO_SONDEO"])
+            if not self._suscripciones:
+                self._ultimo_sondeo = None
+                return
+            try:
+                await sync_to_async(self._sondear_con_conexion)()
+            except Exception:
+                logger.exception("Error al sondear los cambios de stock")
+
+    def _sondear_con_conexion(self) -> int:
+        close_old_connections()
+        return self.sondear()
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._suscripciones.clear()
+            self._niveles.clear()
+            self._versiones.clear()
+            self._ultimo_sondeo = None
+            self._tarea_sondeo = None
+            self.publicados = 0
+
+
+hub_eventos_stock = HubEventosStock()
+
+
+def _decimal(stock: StockInsumo, campo: str) -> str:
+    # mismo formato que el serializer (decimales fijos del campo)
+    lugares = StockInsumo._meta.get_field(campo).decimal_places
+    return str(Decimal(getattr(stock, campo) or 0).quantize(Decimal(1).scaleb(-lugares)))
+
+
+def evento_stock(stock: StockInsumo) -> EventoStock:
+    return EventoStock(
+        "stock",
+        stock.almacen_id,
+        {
+            "insumo": stock.insumo_id,
+            "almacen": stock.almacen_id,
+            "cantidad_actual": _decimal(stock, "cantidad_actual"),
+            "costo_promedio": _decimal(stock, "costo_promedio"),
+            "version": stock.version,
+            "nivel_alerta": stock.nivel_alerta,
+        },
+    )
+
+
+def publicar_stocks_al_confirmar(stocks: Iterable[StockInsumo]) -> None:
+    """
+    Arma los eventos con los valores actuales de `stocks` y los publica
+    cuando confirme la transacción. Solo los almacenes con alguien
+    escuchando.
+    """
+    stocks = [stock for stock in stocks if hub_eventos_stock.escuchando(stock.almacen_id)]
+    if not stocks:
+        return
+    # Los valores se toman ahora: el objeto puede seguir cambiando en la transacción.
+    eventos = [evento_stock(stock) for stock in stocks]
+    transaction.on_commit(lambda: hub_eventos_stock.publicar(eventos))
+
+
+def formatear_sse(tipo: str, datos) -> str:
+    return f"event: {tipo}\ndata: {json.dumps(datos, separators=(',', ':'))}\n\n"
+
+
+def _foto_almacen(almacen_id: int) -> list[dict]:
+    stocks = StockInsumo.objects.filter(almacen_id=almacen_id).select_related("insumo").order_by("id")
+    return [evento_stock(stock).datos for stock in stocks]
+
+
+async def flujo_eventos_stock(almacen_id: int):
+    """
+    Cuerpo de la respuesta SSE: primero un evento `foto` con todos los
+    stocks del almacén y después los eventos publicados en el hub. La
+    suscripción se abre antes de leer la foto, así que un cambio entre
+    ambas llega igual (el cliente descarta versiones viejas).
+
+    Si el cliente no lee a tiempo y su cola se llena, se manda
+    `reconectar` y se cierra el stream.
+    """
+    config = configuracion_eventos_stock()
+    suscripcion = hub_eventos_stock.suscribir(almacen_id)
+    hub_eventos_stock.iniciar_sondeo()
+    try:
+        yield f"retry: {config['PING'] * 1000}\n\n"
+        yield formatear_sse("foto", await sync_to_async(_foto_almacen)(almacen_id))
+        while True:
+            evento = await suscripcion.siguiente(config["PING"])
+            if suscripcion.desbordada:
+                yield formatear_sse("reconectar", {"motivo": "cola llena"})
+                return
+            if evento is None:
+                yield ": ping\n\n"
+            else:
+                yield formatear_sse(evento.tipo, evento.datos)
+    finally:
+        hub_eventos_stock.cancelar(suscripcion)
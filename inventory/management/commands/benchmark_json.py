@@ -0,0 +1,118 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from inventory.models import Almacen, Insumo, StockInsumo, UnidadMedida
+from inventory.renderers import ORJSONRenderer, orjson
+from inventory.serializers import DecimalRapidoField, StockInsumoSerializer
+from inventory.utils import normalizar_texto
+
+
+def _sin_atajo(serializer):
+    """Desactiva el atajo de DecimalRapidoField en todos los campos (DRF puro)."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    for campo in serializer.fields.values():
+        if isinstance(campo, DecimalRapidoField):
+            campo._exponente_rapido = None
+        elif isinstance(campo, serializers.BaseSerializer):
+            _sin_atajo(campo)
+
+
+def _medir(funcion, repeticiones: int):
+    """Mejor tiempo (segundos) de `repeticiones` ejecuciones y el último resultado."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de serializar y renderizar un listado de stock "
+        "(StockInsumoSerializer completo) con DRF estándar y con "
+        "DecimalRapidoField + ORJSONRenderer. Crea los datos dentro de una "
+        "transacción que se revierte al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=10_000)
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def handle(self, *args, **options):
+        filas = options["filas"]
+        repeticiones = max(options["repeticiones"], 1)
+
+        with transaction.atomic():
+            stocks = self._crear_datos(filas)
+            self._comparar(stocks, repeticiones)
+            transaction.set_rollback(True)
+
+    def _crear_datos(self, filas: int) -> list[StockInsumo]:
+        unidad = UnidadMedida.objects.create(
+            nombre="benchmark-json", abreviatura="bj", factor_base=Decimal("1")
+        )
+        almacen = Almacen.objects.create(nombre="benchmark-json")
+        insumos = Insumo.objects.bulk_create(
+            Insumo(
+                nombre=f"benchmark-json {i}",
+                nombre_normalizado=normalizar_texto(f"benchmark-json {i}"),
+                unidad=unidad,
+                stock_minimo=Decimal("5"),
+                costo_promedio=Decimal(i % 997) / 7,
+                factor_conversion=Decimal("1000"),
+            )
+            for i in range(filas)
+        )
+        StockInsumo.objects.bulk_create(
+            StockInsumo(
+                insumo=insumo,
+                almacen=almacen,
+                cantidad_actual=Decimal(i % 500) / 3,
+                costo_promedio=insumo.costo_promedio,
+            )
+            for i, insumo in enumerate(insumos)
+        )
+        # Releídos de la BD, con la precisión de cada columna.
+        return list(
+            StockInsumo.objects.filter(almacen=almacen).select_related("insumo", "almacen")
+        )
+
+    def _comparar(self, stocks: list[StockInsumo], repeticiones: int):
+        def serializar(rapido: bool):
+            serializer = StockInsumoSerializer(stocks, many=True)
+            if not rapido:
+                _sin_atajo(serializer)
+            return serializer.data
+
+        t_ser_drf, datos_drf = _medir(lambda: serializar(False), repeticiones)
+        t_ser_rapido, datos = _medir(lambda: serializar(True), repeticiones)
+
+        t_ren_drf, json_drf = _medir(lambda: JSONRenderer().render(datos_drf), repeticiones)
+        t_ren_rapido, json_rapido = _medir(lambda: ORJSONRenderer().render(datos), repeticiones)
+
+        self.stdout.write(
+            f"{len(stocks)} filas, mejor de {repeticiones} "
+            f"(orjson {'disponible' if orjson is not None else 'NO instalado'})"
+        )
+        self.stdout.write(f"{'etapa':<14}{'DRF (ms)':>12}{'rápido (ms)':>14}{'x':>8}")
+        for etapa, drf, rapido in [
+            ("serializar", t_ser_drf, t_ser_rapido),
+            ("renderizar", t_ren_drf, t_ren_rapido),
+            ("total", t_ser_drf + t_ren_drf, t_ser_rapido + t_ren_rapido),
+        ]:
+            self.stdout.write(
+                f"{etapa:<14}{drf * 1000:>12.1f}{rapido * 1000:>14.1f}{drf / rapido:>8.2f}"
+            )
+
+        if json_drf == json_rapido:
+            self.stdout.write(self.style.SUCCESS("Salida idéntica byte a byte."))
+        else:
+            self.stdout.write(self.style.ERROR("La salida difiere entre ambas implementaciones."))
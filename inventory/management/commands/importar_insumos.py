@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.services.importacion import (
+    TAMANO_LOTE,
+    ImportacionError,
+    importar_insumos_csv,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa/actualiza el catálogo de insumos desde un CSV "
+        "(upsert por nombre). Ver inventory.services.importacion."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del CSV (UTF-8, con encabezados).")
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANO_LOTE,
+            help=f"Filas por bulk_create (por defecto {TAMANO_LOTE}).",
+        )
+        parser.add_argument(
+            "--max-errores",
+            type=int,
+            default=50,
+            help="Cantidad máxima de errores por fila a mostrar.",
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        try:
+            with open(options["archivo"], encoding="utf-8-sig", newline="") as archivo:
+                resultado = importar_insumos_csv(archivo, tamano_lote=options["lote"])
+        except OSError as exc:
+            raise CommandError(f"No se pudo leer el archivo: {exc}")
+        except (ImportacionError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        for error in resultado.errores[: options["max_errores"]]:
+            self.stderr.write(
+                f"Fila {error.fila} ({error.nombre or 'sin nombre'}): "
+                + "; ".join(error.errores)
+            )
+        if resultado.con_errores > options["max_errores"]:
+            self.stderr.write(
+                f"... y {resultado.con_errores - options['max_errores']} filas más con errores."
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado.importadas} insumos importados de {resultado.procesadas} filas "
+                f"({resultado.con_errores} con errores) en {time.monotonic() - inicio:.1f}s."
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from inventory.services.precios import poblar_historial_precios
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga en el historial de precios (PrecioInsumo) las entradas por compra "
+        "registradas antes de que existiera. Se puede volver a correr sin duplicar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=1000,
+            help="Movimientos por bulk_create (por defecto 1000).",
+        )
+
+    def handle(self, *args, **options):
+        creados = poblar_historial_precios(tamano_lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"{creados} precios agregados al historial."))
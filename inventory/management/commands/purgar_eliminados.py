@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from inventory.services.sincronizacion import (
+    configuracion_sincronizacion,
+    purgar_registros_eliminados,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las lápidas del feed de cambios más viejas que "
+        "INVENTARIO_SINCRONIZACION['RETENCION_DIAS']. Pensado para cron diario."
+    )
+
+    def handle(self, *args, **options):
+        borrados = purgar_registros_eliminados()
+        dias = configuracion_sincronizacion()["RETENCION_DIAS"]
+        self.stdout.write(
+            self.style.SUCCESS(f"{borrados} registros eliminados de más de {dias} días purgados.")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.services.busqueda import INDICES_BUSQUEDA, indexar, indice_disponible
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los índices de búsqueda FTS5 (insumos, compras, platos). "
+        "Útil después de cargas que no disparan señales (bulk_create, update())."
+    )
+
+    def handle(self, *args, **options):
+        for modelo in INDICES_BUSQUEDA:
+            nombre = modelo._meta.verbose_name_plural
+            if not indice_disponible(modelo):
+                self.stdout.write(self.style.WARNING(f"{nombre}: índice no disponible."))
+                continue
+            with transaction.atomic():
+                total = indexar(modelo)
+            self.stdout.write(f"{nombre}: {total} filas indexadas.")
+        self.stdout.write(self.style.SUCCESS("Índices de búsqueda reconstruidos."))
@@ -0,0 +1,113 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from inventory.services.trabajos import (
+    ejecutar_trabajo,
+    procesar_pendientes,
+    recuperar_trabajos_colgados,
+    tomar_trabajo,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+ESPERA_MAXIMA = 60.0
+
+
+def _bucle(intervalo: float, detener) -> None:
+    """
+    Toma y ejecuta trabajos hasta que se pida detener el proceso.
+
+    Un error al consultar la cola (p. ej. "database is locked" en SQLite)
+    no termina el proceso: se registra y se vuelve a intentar con espera
+    exponencial (hasta ESPERA_MAXIMA); close_old_connections descarta al
+    inicio de la vuelta siguiente la conexión que quedó inutilizable.
+    """
+    fallos = 0
+    while not detener.is_set():
+        try:
+            close_old_connections()
+            recuperar_trabajos_colgados()
+            trabajo = tomar_trabajo()
+            if trabajo is not None:
+                logger.info("Ejecutando %s", trabajo)
+                ejecutar_trabajo(trabajo)
+        except Exception:
+            fallos += 1
+            espera = min(max(intervalo, 1.0) * 2 ** (fallos - 1), ESPERA_MAXIMA)
+            logger.exception("Error en el worker; reintento en %.0f s", espera)
+            detener.wait(espera)
+            continue
+        fallos = 0
+        if trabajo is None:
+            detener.wait(intervalo)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano encolados en la BD "
+        "(ver inventory.services.trabajos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--procesos",
+            type=int,
+            default=1,
+            help="Cantidad de procesos trabajadores (por defecto 1).",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Procesa los trabajos disponibles y termina (para cron).",
+        )
+
+    def handle(self, *args, **options):
+        if options["una_vez"]:
+            recuperar_trabajos_colgados()
+            procesados = procesar_pendientes()
+            self.stdout.write(self.style.SUCCESS(f"{procesados} trabajos procesados."))
+            return
+
+        procesos = max(1, options["procesos"])
+        detener = multiprocessing.Event()
+
+        def _terminar(*_):
+            detener.set()
+
+        signal.signal(signal.SIGTERM, _terminar)
+        signal.signal(signal.SIGINT, _terminar)
+
+        self.stdout.write(f"Worker iniciado con {procesos} proceso(s).")
+        if procesos == 1:
+            _bucle(options["intervalo"], detener)
+            return
+
+        # Cada proceso abre su propia conexión: no se heredan las del padre.
+        connections.close_all()
+        hijos = [
+            multiprocessing.Process(
+                target=_bucle, args=(options["intervalo"], detener), daemon=True
+            )
+            for _ in range(procesos)
+        ]
+        for hijo in hijos:
+            hijo.start()
+        while not detener.is_set() and any(hijo.is_alive() for hijo in hijos):
+            time.sleep(1)
+        detener.set()
+        for hijo in hijos:
+            hijo.join()
+        self.stdout.write("Worker detenido.")
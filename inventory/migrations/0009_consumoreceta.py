@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_entradacompra'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoReceta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cantidad_platos', models.DecimalField(decimal_places=3, help_text='Cantidad de porciones del plato consumidas.', max_digits=12)),
+                ('fecha_movimiento', models.DateTimeField(help_text='Fecha efectiva del consumo.')),
+                ('referencia', models.CharField(blank=True, max_length=100)),
+                ('almacen', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='consumos', to='inventory.almacen')),
+                ('plato', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='consumos', to='inventory.plato')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='consumos_receta', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Consumo de receta',
+                'verbose_name_plural': 'Consumos de receta',
+                'ordering': ['-fecha_movimiento', '-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='movimientoinventario',
+            name='consumo',
+            field=models.ForeignKey(blank=True, help_text='Consumo de receta que originó este movimiento (solo salidas por consumo).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos', to='inventory.consumoreceta'),
+        ),
+        migrations.AddIndex(
+            model_name='consumoreceta',
+            index=models.Index(fields=['plato', 'fecha_movimiento'], name='inventory_c_plato_i_306588_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:16
+
+from django.db import migrations, models
+
+from inventory.utils import normalizar_texto
+
+
+def normalizar_nombres(apps, schema_editor):
+    Insumo = apps.get_model("inventory", "Insumo")
+    insumos = list(Insumo.objects.only("id", "nombre"))
+    for insumo in insumos:
+        insumo.nombre_normalizado = normalizar_texto(insumo.nombre)
+    Insumo.objects.bulk_update(insumos, ["nombre_normalizado"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_consumoreceta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='insumo',
+            name='nombre_normalizado',
+            field=models.CharField(db_index=True, default='', editable=False, help_text='Nombre en minúsculas y sin tildes, para búsqueda por prefijo.', max_length=100),
+        ),
+        migrations.RunPython(normalizar_nombres, migrations.RunPython.noop),
+    ]
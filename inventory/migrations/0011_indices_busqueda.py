@@ -0,0 +1,63 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+
+# tabla -> SELECT (rowid, texto) para poblarla
+TABLAS = {
+    "inventory_insumo_busqueda": """
+        SELECT i.id,
+               i.nombre || ' ' || COALESCE(c.nombre, '') || ' ' || COALESCE(p.nombre, '')
+        FROM inventory_insumo i
+        LEFT JOIN inventory_categoriainsumo c ON c.id = i.categoria_id
+        LEFT JOIN inventory_proveedor p ON p.id = i.proveedor_principal_id
+    """,
+    "inventory_entradacompra_busqueda": """
+        SELECT e.id,
+               i.nombre || ' ' || p.nombre || ' ' || e.numero_documento || ' ' || e.referencia
+        FROM inventory_entradacompra e
+        JOIN inventory_insumo i ON i.id = e.insumo_id
+        JOIN inventory_proveedor p ON p.id = e.proveedor_id
+    """,
+    "inventory_plato_busqueda": """
+        SELECT id, nombre FROM inventory_plato
+    """,
+}
+
+
+def crear_indices(apps, schema_editor):
+    """
+    Tablas FTS5 para la búsqueda de texto (ver services.busqueda). Si la BD
+    no es SQLite o no tiene FTS5 no se crean y la búsqueda usa icontains.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tabla, poblar in TABLAS.items():
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {tabla} USING fts5(texto, tokenize = '{TOKENIZADOR}')"
+                )
+            except OperationalError:
+                return
+            cursor.execute(f"INSERT INTO {tabla}(rowid, texto) {poblar}")
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tabla in TABLAS:
+            cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_insumo_nombre_normalizado'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entradacompra',
+            index=models.Index(fields=['-fecha_documento', '-created_at', '-id'], name='entradacompra_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_trabajo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockinsumo',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Se incrementa en cada cambio (control de concurrencia optimista).'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_stockinsumo_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('eliminado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Registro eliminado',
+                'verbose_name_plural': 'Registros eliminados',
+                'ordering': ['eliminado_en', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='insumo',
+            index=models.Index(fields=['updated_at', 'id'], name='insumo_cambios_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plato',
+            index=models.Index(fields=['updated_at', 'id'], name='plato_cambios_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recetainsumo',
+            index=models.Index(fields=['updated_at', 'id'], name='recetainsumo_cambios_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockinsumo',
+            index=models.Index(fields=['updated_at', 'id'], name='stockinsumo_cambios_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroeliminado',
+            index=models.Index(fields=['eliminado_en', 'id'], name='eliminado_feed_idx'),
+        ),
+    ]
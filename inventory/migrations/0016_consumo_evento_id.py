@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_feed_cambios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consumoreceta',
+            name='evento_id',
+            field=models.CharField(blank=True, default='', help_text='Id generado por el terminal (ventas offline). Un mismo evento reenviado no se vuelve a aplicar.', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='consumoreceta',
+            constraint=models.UniqueConstraint(condition=models.Q(('evento_id', ''), _negated=True), fields=('evento_id',), name='consumo_evento_id_unico'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_consumo_evento_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecioInsumo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('costo_unitario', models.DecimalField(decimal_places=4, help_text='Costo por unidad de consumo del insumo.', max_digits=12)),
+                ('cantidad', models.DecimalField(decimal_places=3, help_text='Cantidad comprada (para promediar ponderado).', max_digits=14)),
+                ('insumo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='precios', to='inventory.insumo')),
+                ('movimiento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='precio', to='inventory.movimientoinventario')),
+                ('proveedor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='precios_insumo', to='inventory.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Precio de insumo',
+                'verbose_name_plural': 'Historial de precios de insumos',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['insumo', 'fecha'], name='precio_insumo_fecha_idx'), models.Index(fields=['insumo', 'proveedor', 'fecha'], name='precio_insumo_prov_fecha_idx')],
+            },
+        ),
+    ]
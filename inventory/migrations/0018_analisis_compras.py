@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_historial_precios'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entradacompra',
+            index=models.Index(fields=['fecha_documento', 'proveedor', 'insumo'], name='entradacompra_analisis_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entradacompra',
+            index=models.Index(fields=['fecha_documento', 'updated_at'], name='entradacompra_huella_idx'),
+        ),
+    ]
@@ -0,0 +1,130 @@
+"""
+Crea los ConsumoReceta de las ventas registradas antes de 0009, a partir
+de sus movimientos SALIDA_CONSUMO_RECETA (sin consumo asociado), para que
+la popularidad de la ingeniería de menú incluya el historial.
+
+Los movimientos de un mismo consumo comparten fecha, almacén, usuario y
+referencia base ("<referencia>-L<n>", motivo "<motivo> (L<n>)"). El plato
+sale de la referencia por defecto (CONSUMO-<plato_id>-<fecha>) o del
+motivo por defecto ("Consumo receta plato '<nombre>'"); la cantidad de
+platos, de dividir la salida de una línea por la cantidad de la receta
+actual. Los grupos sin plato o sin línea de receta reconocible se dejan
+como están.
+"""
+
+import re
+from decimal import Decimal
+
+from django.db import migrations
+
+
+SALIDA_CONSUMO_RECETA = "SALIDA_CONSUMO_RECETA"
+
+_LINEA_REFERENCIA = re.compile(r"^(?P<base>.*)-L(?P<linea>\d+)$")
+_LINEA_MOTIVO = re.compile(r"^(?P<base>.*) \(L\d+\)$")
+_REFERENCIA_POR_DEFECTO = re.compile(r"^CONSUMO-(?P<plato>\d+)-\d{4}-\d{2}-\d{2}$")
+_MOTIVO_POR_DEFECTO = re.compile(r"^Consumo receta plato '(?P<nombre>.*)'$")
+
+TAMANO_LOTE = 500
+
+
+def _grupos(movimientos):
+    """Agrupa los movimientos consecutivos que forman un mismo consumo."""
+    grupo, clave, lineas = [], None, set()
+    for mov in movimientos:
+        encontrado = _LINEA_REFERENCIA.match(mov.referencia or "")
+        base, linea = (encontrado["base"], encontrado["linea"]) if encontrado else (mov.referencia, None)
+        nueva = (mov.fecha_movimiento, mov.almacen_id, mov.usuario_id, base)
+        if grupo and (nueva != clave or linea is None or linea in lineas):
+            yield clave, grupo
+            grupo, lineas = [], set()
+        grupo.append(mov)
+        clave = nueva
+        if linea is not None:
+            lineas.add(linea)
+    if grupo:
+        yield clave, grupo
+
+
+def _plato_id(base, movimientos, platos_por_nombre):
+    encontrado = _REFERENCIA_POR_DEFECTO.match(base or "")
+    if encontrado:
+        return int(encontrado["plato"])
+    motivo = _LINEA_MOTIVO.match(movimientos[0].motivo or "")
+    encontrado = _MOTIVO_POR_DEFECTO.match(motivo["base"] if motivo else "")
+    if encontrado:
+        return platos_por_nombre.get(encontrado["nombre"])
+    return None
+
+
+def poblar_consumos(apps, schema_editor):
+    MovimientoInventario = apps.get_model("inventory", "MovimientoInventario")
+    ConsumoReceta = apps.get_model("inventory", "ConsumoReceta")
+    Plato = apps.get_model("inventory", "Plato")
+    RecetaInsumo = apps.get_model("inventory", "RecetaInsumo")
+
+    platos_por_nombre = dict(Plato.objects.values_list("nombre", "id"))
+    platos = set(platos_por_nombre.values())
+    receta = {
+        (plato_id, insumo_id): cantidad
+        for plato_id, insumo_id, cantidad in RecetaInsumo.objects.filter(
+            cantidad__gt=0
+        ).values_list("plato_id", "insumo_id", "cantidad")
+    }
+
+    movimientos = (
+        MovimientoInventario.objects.filter(tipo=SALIDA_CONSUMO_RECETA, consumo__isnull=True)
+        .order_by("fecha_movimiento", "almacen_id", "id")
+        .only("id", "insumo_id", "almacen_id", "usuario_id", "cantidad", "fecha_movimiento", "motivo", "referencia")
+    )
+
+    pendientes = []
+
+    def guardar():
+        creados = ConsumoReceta.objects.bulk_create([consumo for consumo, _ in pendientes])
+        for consumo, ids in zip(creados, (ids for _, ids in pendientes)):
+            MovimientoInventario.objects.filter(pk__in=ids).update(consumo=consumo)
+        pendientes.clear()
+
+    for (fecha, almacen_id, usuario_id, base), grupo in _grupos(list(movimientos)):
+        plato_id = _plato_id(base, grupo, platos_por_nombre)
+        if plato_id not in platos:
+            continue
+        cantidad_platos = next(
+            (
+                (-mov.cantidad / receta[plato_id, mov.insumo_id]).quantize(Decimal("0.001"))
+                for mov in grupo
+                if (plato_id, mov.insumo_id) in receta
+            ),
+            None,
+        )
+        if not cantidad_platos or cantidad_platos <= 0:
+            continue
+        pendientes.append(
+            (
+                ConsumoReceta(
+                    plato_id=plato_id,
+                    almacen_id=almacen_id,
+                    usuario_id=usuario_id,
+                    cantidad_platos=cantidad_platos,
+                    fecha_movimiento=fecha,
+                    referencia=(base or "")[:100],
+                ),
+                [mov.id for mov in grupo],
+            )
+        )
+        if len(pendientes) >= TAMANO_LOTE:
+            guardar()
+    if pendientes:
+        guardar()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0018_analisis_compras"),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar_consumos, migrations.RunPython.noop),
+    ]
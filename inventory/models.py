@@ -1,11 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from datetime import date
 from decimal import Decimal, InvalidOperation
 from django.utils import timezone
+from inventory.utils import normalizar_texto
 
 User = get_user_model()
 
@@ -74,6 +76,13 @@ class Insumo(TimeStampedModel):
     por almacén, no aquí.
     """
     nombre = models.CharField(max_length=100, unique=True)
+    nombre_normalizado = models.CharField(
+        max_length=100,
+        db_index=True,
+        editable=False,
+        default="",
+        help_text="Nombre en minúsculas y sin tildes, para búsqueda por prefijo.",
+    )
     unidad = models.ForeignKey(
         UnidadMedida,
         on_delete=models.PROTECT,
@@ -140,8 +149,19 @@ class Insumo(TimeStampedModel):
         if self.unidad_compra and not self.factor_conversion:
             raise ValidationError("Debe especificar factor_conversion cuando existe unidad_compra.")
 
+    def save(self, *args, **kwargs):
+        self.nombre_normalizado = normalizar_texto(self.nombre)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "nombre" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "nombre_normalizado"}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["nombre"]
+        indexes = [
+            # feed de cambios (services.sincronizacion)
+            models.Index(fields=["updated_at", "id"], name="insumo_cambios_idx"),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -220,15 +240,32 @@ class StockInsumo(TimeStampedModel):
             "en este almacén (puede diferir del costo promedio global del insumo)."
         ),
     )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Se incrementa en cada cambio (control de concurrencia optimista).",
+    )
 
     class Meta:
         verbose_name = "Stock de insumo"
         verbose_name_plural = "Stocks de insumos"
         unique_together = ("insumo", "almacen")
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="stockinsumo_cambios_idx"),
+        ]
 
     def __str__(self):
         return f"{self.insumo} @ {self.almacen}: {self.cantidad_actual}"
 
+    def save(self, *args, **kwargs):
+        # Cualquier cambio invalida la versión leída por un escritor optimista
+        if self.pk is not None:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+        super().save(*args, **kwargs)
+
     @property
     def valor_total(self):
         """
@@ -304,6 +341,9 @@ class Plato(TimeStampedModel):
     )
     class Meta:
         ordering = ["nombre"]
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="plato_cambios_idx"),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -379,6 +419,9 @@ class RecetaInsumo(TimeStampedModel):
         verbose_name_plural = "Ingredientes de receta"
         ordering = ["plato", "insumo"]
         unique_together = ("plato", "insumo")
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="recetainsumo_cambios_idx"),
+        ]
 
     def __str__(self):
         return f"{self.cantidad} {self.insumo.unidad.abreviatura} de {self.insumo} para {self.plato}"
@@ -475,6 +518,14 @@ class MovimientoInventario(TimeStampedModel):
         related_name="movimientos_inventario",
         help_text="Usuario que registró el movimiento.",
     )
+    consumo = models.ForeignKey(
+        "ConsumoReceta",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="movimientos",
+        help_text="Consumo de receta que originó este movimiento (solo salidas por consumo).",
+    )
 
     class Meta:
         verbose_name = "Movimiento de inventario"
@@ -494,6 +545,70 @@ class MovimientoInventario(TimeStampedModel):
             self.costo_total = (self.cantidad * self.costo_unitario).quantize(Decimal("0.0001"))
         super().save(*args, **kwargs)
 
+class ConsumoReceta(TimeStampedModel):
+    """
+    Registro de una venta/producción de un plato: cuántas porciones se
+    consumieron en un almacén. Cada consumo genera un MovimientoInventario
+    SALIDA_CONSUMO_RECETA por línea de receta (ver `movimientos`).
+
+    Es la fuente de popularidad para la ingeniería de menú.
+    """
+
+    plato = models.ForeignKey(
+        "Plato",
+        on_delete=models.PROTECT,
+        related_name="consumos",
+    )
+    almacen = models.ForeignKey(
+        Almacen,
+        on_delete=models.PROTECT,
+        related_name="consumos",
+    )
+    cantidad_platos = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        help_text="Cantidad de porciones del plato consumidas.",
+    )
+    fecha_movimiento = models.DateTimeField(
+        help_text="Fecha efectiva del consumo.",
+    )
+    referencia = models.CharField(max_length=100, blank=True)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="consumos_receta",
+    )
+    evento_id = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text=(
+            "Id generado por el terminal (ventas offline). Un mismo evento "
+            "reenviado no se vuelve a aplicar."
+        ),
+    )
+
+    class Meta:
+        verbose_name = "Consumo de receta"
+        verbose_name_plural = "Consumos de receta"
+        ordering = ["-fecha_movimiento", "-created_at"]
+        indexes = [
+            models.Index(fields=["plato", "fecha_movimiento"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["evento_id"],
+                condition=~models.Q(evento_id=""),
+                name="consumo_evento_id_unico",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.cantidad_platos} x {self.plato} @ {self.almacen}"
+
+
 class LoteInsumo(TimeStampedModel):
     """
     Lote de un insumo en un almacén, con fecha de vencimiento.
@@ -655,6 +770,23 @@ class EntradaCompra(TimeStampedModel):
         verbose_name = "Entrada de compra"
         verbose_name_plural = "Entradas de compra"
         ordering = ["-fecha_documento", "-created_at"]
+        indexes = [
+            # paginación por keyset del listado web (mismo orden)
+            models.Index(
+                fields=["-fecha_documento", "-created_at", "-id"],
+                name="entradacompra_keyset_idx",
+            ),
+            # análisis de compras: agrupado por mes, proveedor e insumo
+            models.Index(
+                fields=["fecha_documento", "proveedor", "insumo"],
+                name="entradacompra_analisis_idx",
+            ),
+            # huella de cada mes (documentos y último cambio)
+            models.Index(
+                fields=["fecha_documento", "updated_at"],
+                name="entradacompra_huella_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Compra {self.id} - {self.proveedor} - {self.insumo}"
@@ -663,12 +795,26 @@ class EntradaCompra(TimeStampedModel):
         """
         Genera la entrada de inventario (si aún no está procesada)
         usando el servicio registrar_entrada_compra.
+
+        Todo corre en una transacción con la fila de la entrada bloqueada
+        (select_for_update), así que dos ejecuciones del mismo trabajo (un
+        reintento, o uno recuperado como colgado) no la registran dos veces.
         """
+        with transaction.atomic():
+            procesada, movimiento_id = (
+                EntradaCompra.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("procesada", "movimiento_id")
+                .get()
+            )
+            if procesada:
+                self.procesada, self.movimiento_id = True, movimiento_id
+                return self.movimiento
+            return self._registrar_entrada(usuario, fecha_movimiento)
+
+    def _registrar_entrada(self, usuario, fecha_movimiento):
         from inventory.services.inventory import registrar_entrada_compra
 
-        if self.procesada:
-            return self.movimiento
-
         if fecha_movimiento is None:
             fecha_movimiento = timezone.now()
 
@@ -684,6 +830,7 @@ class EntradaCompra(TimeStampedModel):
             motivo=motivo,
             referencia=referencia,
             fecha_movimiento=fecha_movimiento,
+            proveedor=self.proveedor,
         )
 
         self.movimiento = mov
@@ -691,3 +838,169 @@ class EntradaCompra(TimeStampedModel):
         self.save(update_fields=["movimiento", "procesada", "updated_at"])
 
         return mov
+
+
+class PrecioInsumo(models.Model):
+    """
+    Historial de precios de compra: una fila por entrada de compra, con el
+    costo en unidad de consumo del insumo. La escribe
+    registrar_entrada_compra (los movimientos anteriores se cargan con
+    `manage.py poblar_historial_precios`) y se consulta por rango de fechas
+    sin recorrer MovimientoInventario.
+    """
+
+    insumo = models.ForeignKey(
+        Insumo,
+        on_delete=models.CASCADE,
+        related_name="precios",
+    )
+    proveedor = models.ForeignKey(
+        Proveedor,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="precios_insumo",
+    )
+    fecha = models.DateField()
+    costo_unitario = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        help_text="Costo por unidad de consumo del insumo.",
+    )
+    cantidad = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        help_text="Cantidad comprada (para promediar ponderado).",
+    )
+    movimiento = models.OneToOneField(
+        MovimientoInventario,
+        on_delete=models.CASCADE,
+        related_name="precio",
+    )
+
+    class Meta:
+        verbose_name = "Precio de insumo"
+        verbose_name_plural = "Historial de precios de insumos"
+        ordering = ["-fecha", "-id"]
+        indexes = [
+            models.Index(fields=["insumo", "fecha"], name="precio_insumo_fecha_idx"),
+            models.Index(
+                fields=["insumo", "proveedor", "fecha"], name="precio_insumo_prov_fecha_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.insumo} {self.fecha}: {self.costo_unitario}"
+
+
+class Trabajo(TimeStampedModel):
+    """
+    Trabajo en segundo plano (cola en BD, ver inventory.services.trabajos).
+
+    Lo toma `manage.py run_worker`; `progreso`/`mensaje` se actualizan
+    mientras corre y `resultado` queda con la salida de la tarea.
+    """
+
+    ESTADO_PENDIENTE = "pendiente"
+    ESTADO_EN_PROCESO = "en_proceso"
+    ESTADO_COMPLETADO = "completado"
+    ESTADO_FALLIDO = "fallido"
+
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, "Pendiente"),
+        (ESTADO_EN_PROCESO, "En proceso"),
+        (ESTADO_COMPLETADO, "Completado"),
+        (ESTADO_FALLIDO, "Fallido"),
+    ]
+
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=ESTADO_PENDIENTE,
+    )
+    clave_idempotencia = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Si se repite para el mismo tipo, se devuelve el trabajo existente.",
+    )
+
+    progreso = models.PositiveSmallIntegerField(default=0, help_text="0 a 100.")
+    mensaje = models.CharField(max_length=255, blank=True)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    disponible_desde = models.DateTimeField(
+        default=timezone.now,
+        help_text="No se ejecuta antes de esta fecha (reintentos con espera).",
+    )
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    finalizado_en = models.DateTimeField(null=True, blank=True)
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trabajos",
+    )
+
+    class Meta:
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["estado", "disponible_desde"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tipo", "clave_idempotencia"],
+                condition=~models.Q(clave_idempotencia=""),
+                name="trabajo_clave_idempotencia_unica",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.estado})"
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in (self.ESTADO_COMPLETADO, self.ESTADO_FALLIDO)
+
+    def reportar_progreso(self, progreso: int, mensaje: str = "") -> None:
+        """
+        Guarda el avance sin tocar el resto de la fila. También sirve de
+        latido: el worker da por colgado un trabajo sin actualizaciones.
+        """
+        self.progreso = max(0, min(100, int(progreso)))
+        self.mensaje = mensaje[:255]
+        self.updated_at = timezone.now()
+        Trabajo.objects.filter(pk=self.pk).update(
+            progreso=self.progreso, mensaje=self.mensaje, updated_at=self.updated_at
+        )
+
+
+class RegistroEliminado(models.Model):
+    """
+    Lápida de una fila borrada de un modelo sincronizable (ver
+    inventory.services.sincronizacion): el feed de cambios la informa a los
+    clientes para que borren su copia local. Se purgan pasada la retención.
+    """
+
+    modelo = models.CharField(max_length=50)
+    objeto_id = models.PositiveBigIntegerField()
+    eliminado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Registro eliminado"
+        verbose_name_plural = "Registros eliminados"
+        ordering = ["eliminado_en", "id"]
+        indexes = [
+            models.Index(fields=["eliminado_en", "id"], name="eliminado_feed_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} eliminado {self.eliminado_en:%Y-%m-%d %H:%M}"
@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InventarioCursorPagination(CursorPagination):
+    """
+    Paginación por cursor para todos los listados de la API.
+
+    A diferencia de la paginación por página/offset no ejecuta COUNT(*) ni
+    escanea filas descartadas, así que cada página cuesta lo mismo sin
+    importar su posición. El orden se toma de `cursor_ordering` en la vista
+    (el primer campo debe ser estable y casi único, ej: "nombre" o "id").
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "id"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None)
+        if ordering:
+            if isinstance(ordering, str):
+                return (ordering,)
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
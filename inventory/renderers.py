@@ -0,0 +1,129 @@
+"""
+Renderer y parser JSON basados en orjson.
+
+Producen la misma salida que rest_framework.renderers.JSONRenderer (los
+tipos que orjson no serializa solo, como Decimal, fechas con zona o lazy
+strings, pasan por el JSONEncoder de DRF), pero varias veces más rápido en
+listados grandes. orjson es opcional: si no está instalado, o si la
+configuración pide algo que orjson no soporta (indentación distinta de la
+compacta, UNICODE_JSON=False, COMPACT_JSON=False), se usa la
+implementación de DRF.
+
+Se activan en settings.REST_FRAMEWORK:
+
+    'DEFAULT_RENDERER_CLASSES': ['inventory.renderers.ORJSONRenderer', ...],
+    'DEFAULT_PARSER_CLASSES': ['inventory.renderers.ORJSONParser', ...],
+
+Ver también serializers.DecimalRapidoField y el comando benchmark_json.
+
+ColumnarRenderer es el formato compacto de los listados (ver
+views.ColumnarMixin): se negocia con
+Accept: application/vnd.inventario.columnar+json o ?format=columnar.
+
+EventStreamRenderer negocia text/event-stream para los streams SSE (ver
+inventory.eventos_stock).
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+_SEPARADORES_JS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")  # U+2028, U+2029
+
+
+class ORJSONRenderer(JSONRenderer):
+    # Las fechas pasan por el encoder de DRF (milisegundos y "Z").
+    fechas_por_encoder = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        opciones = orjson.OPT_NON_STR_KEYS
+        if self.fechas_por_encoder:
+            opciones |= orjson.OPT_PASSTHROUGH_DATETIME
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=opciones)
+        # Igual que DRF: JSON que también sea un subconjunto válido de JS.
+        if _SEPARADORES_JS[0] in ret or _SEPARADORES_JS[1] in ret:
+            ret = ret.replace(_SEPARADORES_JS[0], b"\\u2028").replace(
+                _SEPARADORES_JS[1], b"\\u2029"
+            )
+        return ret
+
+
+class EncoderColumnar(encoders.JSONEncoder):
+    """Decimal como string (igual que los serializers) y fechas en ISO 8601."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+class FilasJSONRenderer(ORJSONRenderer):
+    """
+    JSON para respuestas armadas con filas crudas de .values_list() (sin
+    serializer): los Decimal se escriben como string y las fechas en
+    ISO 8601 con microsegundos.
+    """
+
+    encoder_class = EncoderColumnar
+    fechas_por_encoder = False
+
+
+class ColumnarRenderer(FilasJSONRenderer):
+    """
+    {"columns": [...], "rows": [[...], ...]} en vez de una lista de objetos:
+    los nombres de campo van una sola vez.
+    """
+
+    media_type = "application/vnd.inventario.columnar+json"
+    format = "columnar"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Solo para negociar text/event-stream: el stream lo arma la vista como
+    StreamingHttpResponse. Los errores (403, 404, ...) salen como un único
+    evento `error`.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return f"event: error\ndata: {json.dumps(data, cls=encoders.JSONEncoder)}\n\n".encode()
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -1,5 +1,15 @@
+from decimal import Decimal
+
+from django.db import models
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from inventory.catalogos import resolver_relacion
 from inventory.services.inventory import ResultadoConteoInventario
+from inventory.services.busqueda import LIMITE_AUTOCOMPLETAR, LIMITE_AUTOCOMPLETAR_MAX
+from inventory.services import compras
+from inventory.services.menu import CLASIFICACIONES
+from inventory.services.precios import PERIODO_DIA, PERIODOS
+from inventory.services.sincronizacion import configuracion_sincronizacion
 
 from .models import (
     UnidadMedida,
@@ -9,11 +19,196 @@ from .models import (
     Almacen,
     StockInsumo,
     Plato,
+    CategoriaPlato,
     RecetaInsumo,
+    Trabajo,
 )
 
 
-class UnidadMedidaSerializer(serializers.ModelSerializer):
+def _parametro_lista(valor: str | None) -> set[str]:
+    if not valor:
+        return set()
+    return {parte.strip() for parte in valor.split(",") if parte.strip()}
+
+
+def seleccion_campos(request) -> tuple[set[str], set[str]] | None:
+    """
+    Lee ?fields= y ?expand= de una request de lectura.
+    Devuelve (campos, expandir) o None si el cliente no pidió una selección
+    (en ese caso se mantiene la representación completa de siempre).
+    """
+    if request is None or request.method not in ("GET", "HEAD", "OPTIONS"):
+        return None
+    params = getattr(request, "query_params", request.GET)
+    if "fields" not in params and "expand" not in params:
+        return None
+    return _parametro_lista(params.get("fields")), _parametro_lista(params.get("expand"))
+
+
+def _nivel(nombres: set[str], prefijo: str) -> set[str]:
+    """Primer segmento de los nombres con puntos que cuelgan de `prefijo`."""
+    return {
+        nombre[len(prefijo):].split(".")[0]
+        for nombre in nombres
+        if nombre.startswith(prefijo) and len(nombre) > len(prefijo)
+    }
+
+
+class DecimalRapidoField(serializers.DecimalField):
+    """
+    DecimalField con atajo para el caso común: un Decimal leído de la BD ya
+    viene con `decimal_places` decimales, así que str(valor) es exactamente
+    lo que devolvería DRF sin cuantizar ni formatear de nuevo.
+    Cualquier otro caso (float, otra precisión, localize, normalize_output,
+    coerce_to_string=False) pasa por la implementación de DRF.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        coerce_to_string = getattr(
+            self, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+        )
+        # Hasta 6 decimales str() nunca usa notación científica.
+        self._exponente_rapido = (
+            -self.decimal_places
+            if coerce_to_string
+            and not self.localize
+            and not self.normalize_output
+            and self.decimal_places is not None
+            and self.decimal_places <= 6
+            else None
+        )
+
+    def to_representation(self, value):
+        if (
+            type(value) is Decimal
+            and self._exponente_rapido is not None
+            and value.as_tuple().exponent == self._exponente_rapido
+        ):
+            return str(value)
+        return super().to_representation(value)
+
+
+class InventarioModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer base: los DecimalField del modelo usan DecimalRapidoField."""
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DecimalField: DecimalRapidoField,
+    }
+
+
+class CamposDinamicosMixin:
+    """
+    Campos dispersos y expansión opcional de objetos anidados.
+
+    - ?fields=id,cantidad_actual        → solo esos campos.
+    - ?expand=insumo_detalle            → incluye el objeto anidado.
+    - Notación con puntos para niveles anidados:
+      ?fields=id,insumo_detalle.nombre  o  ?expand=insumo_detalle.unidad_detalle
+
+    En cuanto se usa `fields` o `expand`, los anidados declarados en
+    Meta.expandibles ({campo: relación}) solo se incluyen si se piden.
+    Las vistas usan `relaciones_para` para hacer select_related únicamente
+    de lo que se va a serializar. Meta.dependencias ({campo: relación})
+    declara relaciones que necesitan los campos calculados no anidados.
+    """
+
+    def _ruta(self) -> str:
+        partes = []
+        nodo = self
+        while nodo.parent is not None:
+            if nodo.field_name:
+                partes.append(nodo.field_name)
+            nodo = nodo.parent
+        return ".".join(reversed(partes))
+
+    @classmethod
+    def _campos_del_nivel(cls, campos, expandir, prefijo, disponibles) -> set[str]:
+        expandibles = getattr(cls.Meta, "expandibles", {})
+        pedidos = _nivel(campos, prefijo)
+        # pedir un subcampo (insumo_detalle.nombre) también expande
+        expandidos = _nivel(expandir, prefijo) | (pedidos & set(expandibles))
+
+        conservar = set()
+        for nombre in disponibles:
+            if nombre in expandibles:
+                if nombre in expandidos:
+                    conservar.add(nombre)
+            elif not pedidos or nombre in pedidos:
+                conservar.add(nombre)
+        return conservar
+
+    def get_fields(self):
+        fields = super().get_fields()
+        seleccion = seleccion_campos(self.context.get("request"))
+        if seleccion is None:
+            return fields
+
+        campos, expandir = seleccion
+        ruta = self._ruta()
+        prefijo = f"{ruta}." if ruta else ""
+        conservar = self._campos_del_nivel(campos, expandir, prefijo, fields.keys())
+        return {nombre: campo for nombre, campo in fields.items() if nombre in conservar}
+
+    @classmethod
+    def relaciones_para(cls, request, prefijo: str = "", prefijo_relacion: str = "") -> list[str]:
+        """
+        Rutas para select_related según la selección de la request.
+        Sin selección se devuelven todas (representación completa).
+        """
+        expandibles = getattr(cls.Meta, "expandibles", {})
+        dependencias = getattr(cls.Meta, "dependencias", {})
+        seleccion = seleccion_campos(request)
+
+        disponibles = set(cls.Meta.fields) | set(expandibles)
+        if seleccion is None:
+            conservar = disponibles
+        else:
+            campos, expandir = seleccion
+            conservar = cls._campos_del_nivel(campos, expandir, prefijo, disponibles)
+
+        relaciones = [
+            f"{prefijo_relacion}{relacion}"
+            for nombre, relacion in dependencias.items()
+            if nombre in conservar
+        ]
+        for nombre, relacion in expandibles.items():
+            if nombre not in conservar:
+                continue
+            ruta_relacion = f"{prefijo_relacion}{relacion}"
+            relaciones.append(ruta_relacion)
+            hijo = cls._declared_fields.get(nombre)
+            if isinstance(hijo, CamposDinamicosMixin):
+                relaciones.extend(
+                    type(hijo).relaciones_para(
+                        request,
+                        prefijo=f"{prefijo}{nombre}.",
+                        prefijo_relacion=f"{ruta_relacion}__",
+                    )
+                )
+        return relaciones
+
+
+class CatalogoAnidadoMixin:
+    """
+    Para serializers de catálogos usados como anidados (source="unidad"):
+    el objeto se toma del caché de catálogos por su *_id, así que la vista
+    no necesita hacer select_related de la relación.
+
+    Cada catálogo se lee del caché una vez por serialización: queda
+    memorizado en el contexto del serializer raíz (compartido por todas
+    las filas de un listado).
+    """
+
+    def get_attribute(self, instance):
+        if len(self.source_attrs) == 1 and hasattr(instance, "_meta"):
+            memo = self.context.setdefault("_catalogos", {})
+            return resolver_relacion(instance, self.source_attrs[0], memo)
+        return super().get_attribute(instance)
+
+
+class UnidadMedidaSerializer(CatalogoAnidadoMixin, CamposDinamicosMixin, InventarioModelSerializer):
     class Meta:
         model = UnidadMedida
         fields = [
@@ -28,7 +223,7 @@ class UnidadMedidaSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class ProveedorSerializer(serializers.ModelSerializer):
+class ProveedorSerializer(CatalogoAnidadoMixin, CamposDinamicosMixin, InventarioModelSerializer):
     class Meta:
         model = Proveedor
         fields = [
@@ -43,7 +238,7 @@ class ProveedorSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-class CategoriaInsumoSerializer(serializers.ModelSerializer):
+class CategoriaInsumoSerializer(CatalogoAnidadoMixin, CamposDinamicosMixin, InventarioModelSerializer):
     class Meta:
         model = CategoriaInsumo
         fields = [
@@ -57,7 +252,7 @@ class CategoriaInsumoSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class InsumoSerializer(serializers.ModelSerializer):
+class InsumoSerializer(CamposDinamicosMixin, InventarioModelSerializer):
     unidad_detalle = UnidadMedidaSerializer(source="unidad", read_only=True)
     proveedor_principal_detalle = ProveedorSerializer(
         source="proveedor_principal",
@@ -95,6 +290,11 @@ class InsumoSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "costo_promedio", "created_at", "updated_at","costo_unitario_consumo"]
+        expandibles = {
+            "unidad_detalle": "unidad",
+            "proveedor_principal_detalle": "proveedor_principal",
+            "categoria_detalle": "categoria",
+        }
 
     def validate_stock_minimo(self, value):
         if value < 0:
@@ -112,7 +312,7 @@ class InsumoSerializer(serializers.ModelSerializer):
         allow_null=True,
     )
 
-    factor_conversion = serializers.DecimalField(
+    factor_conversion = DecimalRapidoField(
         max_digits=12,
         decimal_places=4,
         required=False,
@@ -143,7 +343,7 @@ class InsumoSerializer(serializers.ModelSerializer):
 
 
 
-class AlmacenSerializer(serializers.ModelSerializer):
+class AlmacenSerializer(CatalogoAnidadoMixin, CamposDinamicosMixin, InventarioModelSerializer):
     """
     De momento solo exponemos el ID del responsable.
     Más adelante podemos anidar el usuario si hace falta.
@@ -163,7 +363,7 @@ class AlmacenSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class StockInsumoSerializer(serializers.ModelSerializer):
+class StockInsumoSerializer(CamposDinamicosMixin, InventarioModelSerializer):
     """
     Maneja el stock de un insumo en un almacén.
     - `insumo` y `almacen` como IDs.
@@ -191,11 +391,22 @@ class StockInsumoSerializer(serializers.ModelSerializer):
             "bajo_minimo",
             "sobre_maximo",
             "nivel_alerta",
+            "version",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["id", "created_at", "updated_at", "valor_total",
-                            "bajo_minimo", "sobre_maximo", "nivel_alerta"]
+                            "bajo_minimo", "sobre_maximo", "nivel_alerta", "version"]
+        expandibles = {
+            "insumo_detalle": "insumo",
+            "almacen_detalle": "almacen",
+        }
+        # stock_minimo / stock_maximo vienen del insumo
+        dependencias = {
+            "bajo_minimo": "insumo",
+            "sobre_maximo": "insumo",
+            "nivel_alerta": "insumo",
+        }
 
     def get_valor_total(self, obj):
         return obj.valor_total
@@ -217,7 +428,46 @@ class StockInsumoSerializer(serializers.ModelSerializer):
         return value
 
 
-class PlatoSerializer(serializers.ModelSerializer):
+_EXPONENTES_INDICADORES = {
+    "food_cost_pct": Decimal("0.01"),
+    "margen_bruto_monto": Decimal("0.0001"),
+    "margen_bruto_pct": Decimal("0.01"),
+}
+
+
+def _indicador_plato(obj, anotacion: str, propiedad: str):
+    """
+    Devuelve un indicador del plato como string. Usa la anotación calculada
+    en BD (services.menu.anotar_indicadores_platos) si está disponible y
+    recurre a la propiedad del modelo solo para instancias no anotadas
+    (por ejemplo, la respuesta de un create/update).
+    """
+    if not hasattr(obj, anotacion):
+        valor = getattr(obj, propiedad)
+        return str(valor) if valor is not None else None
+
+    valor = getattr(obj, anotacion)
+    if valor is None:
+        return None
+    # Misma precisión que las propiedades del modelo
+    return str(Decimal(valor).quantize(_EXPONENTES_INDICADORES[anotacion]))
+
+
+class CategoriaPlatoSerializer(CatalogoAnidadoMixin, CamposDinamicosMixin, InventarioModelSerializer):
+    class Meta:
+        model = CategoriaPlato
+        fields = [
+            "id",
+            "nombre",
+            "descripcion",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+
+class PlatoSerializer(CamposDinamicosMixin, InventarioModelSerializer):
+    categoria_detalle = CategoriaPlatoSerializer(source="categoria", read_only=True)
     food_cost_porcentaje = serializers.SerializerMethodField()
     margen_bruto = serializers.SerializerMethodField()
     margen_bruto_porcentaje = serializers.SerializerMethodField()
@@ -230,6 +480,7 @@ class PlatoSerializer(serializers.ModelSerializer):
             "descripcion",
             "precio_venta",
             "categoria",
+            "categoria_detalle",
             "activo",
             "costo_receta",
             "food_cost_porcentaje",
@@ -237,8 +488,6 @@ class PlatoSerializer(serializers.ModelSerializer):
             "margen_bruto_porcentaje",
             "created_at",
             "updated_at",
-            "categoria",
-            "categoria_detalle",
         ]
         read_only_fields = [
             "id",
@@ -249,30 +498,39 @@ class PlatoSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        expandibles = {"categoria_detalle": "categoria"}
 
     def get_food_cost_porcentaje(self, obj):
-        return str(obj.food_cost_porcentaje) if obj.food_cost_porcentaje is not None else None
+        return _indicador_plato(obj, "food_cost_pct", "food_cost_porcentaje")
 
     def get_margen_bruto(self, obj):
-        return str(obj.margen_bruto) if obj.margen_bruto is not None else None
+        return _indicador_plato(obj, "margen_bruto_monto", "margen_bruto")
 
     def get_margen_bruto_porcentaje(self, obj):
-        return (
-            str(obj.margen_bruto_porcentaje)
-            if obj.margen_bruto_porcentaje is not None
-            else None
-        )
+        return _indicador_plato(obj, "margen_bruto_pct", "margen_bruto_porcentaje")
+
+
+class PlatoFiltrosSerializer(serializers.Serializer):
+    """
+    Filtros por umbral de rentabilidad para /api/platos/ (aplicados en SQL).
+    """
+    food_cost_porcentaje_min = DecimalRapidoField(max_digits=12, decimal_places=2, required=False)
+    food_cost_porcentaje_max = DecimalRapidoField(max_digits=12, decimal_places=2, required=False)
+    margen_bruto_min = DecimalRapidoField(max_digits=18, decimal_places=4, required=False)
+    margen_bruto_max = DecimalRapidoField(max_digits=18, decimal_places=4, required=False)
+    margen_bruto_porcentaje_min = DecimalRapidoField(max_digits=12, decimal_places=2, required=False)
+    margen_bruto_porcentaje_max = DecimalRapidoField(max_digits=12, decimal_places=2, required=False)
 
 class ConteoLineaInputSerializer(serializers.Serializer):
     insumo_id = serializers.IntegerField()
-    cantidad_contada = serializers.DecimalField(max_digits=14, decimal_places=3)
+    cantidad_contada = DecimalRapidoField(max_digits=14, decimal_places=3)
 
 class ResultadoConteoSerializer(serializers.Serializer):
     insumo_id = serializers.IntegerField()
     insumo_nombre = serializers.CharField()
-    cantidad_sistema = serializers.DecimalField(max_digits=14, decimal_places=3)
-    cantidad_contada = serializers.DecimalField(max_digits=14, decimal_places=3)
-    diferencia = serializers.DecimalField(max_digits=14, decimal_places=3)
+    cantidad_sistema = DecimalRapidoField(max_digits=14, decimal_places=3)
+    cantidad_contada = DecimalRapidoField(max_digits=14, decimal_places=3)
+    diferencia = DecimalRapidoField(max_digits=14, decimal_places=3)
     fuera_tolerancia = serializers.BooleanField()
 
     @classmethod
@@ -287,12 +545,73 @@ class ResultadoConteoSerializer(serializers.Serializer):
                 "fuera_tolerancia": res.fuera_tolerancia,
             }
         )
+class AutocompletarParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, default="")
+    limite = serializers.IntegerField(
+        required=False, default=LIMITE_AUTOCOMPLETAR,
+        min_value=1, max_value=LIMITE_AUTOCOMPLETAR_MAX,
+    )
+    solo_activos = serializers.BooleanField(required=False, default=True)
+
+
+class ImportacionInsumosRequestSerializer(serializers.Serializer):
+    archivo = serializers.FileField(help_text="CSV con encabezados (UTF-8).")
+
+
+class ErrorFilaSerializer(serializers.Serializer):
+    fila = serializers.IntegerField()
+    nombre = serializers.CharField(allow_blank=True)
+    errores = serializers.ListField(child=serializers.CharField())
+
+
+class ResultadoImportacionSerializer(serializers.Serializer):
+    procesadas = serializers.IntegerField()
+    importadas = serializers.IntegerField()
+    con_errores = serializers.IntegerField()
+    errores = ErrorFilaSerializer(many=True)
+
+
+class LineaRecetaImportSerializer(serializers.Serializer):
+    plato = serializers.CharField()
+    insumo = serializers.CharField()
+    cantidad = serializers.CharField()
+
+
+class ImportacionRecetasRequestSerializer(serializers.Serializer):
+    """
+    Recetas a importar: un CSV (`archivo`, columnas plato,insumo,cantidad)
+    o la lista `lineas` en JSON con las mismas claves.
+    """
+
+    archivo = serializers.FileField(required=False)
+    lineas = LineaRecetaImportSerializer(many=True, required=False)
+    eliminar_faltantes = serializers.BooleanField(required=False, default=True)
+    simular = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        if ("archivo" in attrs) == ("lineas" in attrs):
+            raise serializers.ValidationError("Enviar `archivo` o `lineas` (solo uno).")
+        return attrs
+
+
+class ResultadoImportacionRecetasSerializer(serializers.Serializer):
+    procesadas = serializers.IntegerField()
+    creadas = serializers.IntegerField()
+    actualizadas = serializers.IntegerField()
+    eliminadas = serializers.IntegerField()
+    sin_cambios = serializers.IntegerField()
+    platos_recosteados = serializers.IntegerField()
+    simulado = serializers.BooleanField()
+    con_errores = serializers.IntegerField()
+    errores = ErrorFilaSerializer(many=True)
+
+
 class ConteoInventarioRequestSerializer(serializers.Serializer):
     conteos = ConteoLineaInputSerializer(many=True)
-    tolerancia_unidades = serializers.DecimalField(
+    tolerancia_unidades = DecimalRapidoField(
         max_digits=14, decimal_places=3, required=False, allow_null=True
     )
-    tolerancia_porcentaje = serializers.DecimalField(
+    tolerancia_porcentaje = DecimalRapidoField(
         max_digits=5, decimal_places=4, required=False, allow_null=True,
         help_text="Ej: 0.02 = 2%."
     )
@@ -301,7 +620,7 @@ class ConteoInventarioRequestSerializer(serializers.Serializer):
     )
 
 
-class RecetaInsumoSerializer(serializers.ModelSerializer):
+class RecetaInsumoSerializer(CamposDinamicosMixin, InventarioModelSerializer):
     """
     - `plato` e `insumo` como IDs para escritura.
     - `plato_detalle` e `insumo_detalle` para lectura.
@@ -323,6 +642,10 @@ class RecetaInsumoSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
+        expandibles = {
+            "plato_detalle": "plato",
+            "insumo_detalle": "insumo",
+        }
 
     def validate_cantidad(self, value):
         if value <= 0:
@@ -352,7 +675,7 @@ class RecetaInsumoSerializer(serializers.ModelSerializer):
 
         return attrs
     
-class PlatoDetalleSerializer(serializers.ModelSerializer):
+class PlatoDetalleSerializer(InventarioModelSerializer):
     receta = RecetaInsumoSerializer(
         source="receta_insumos",
         many=True,
@@ -390,14 +713,386 @@ class PlatoDetalleSerializer(serializers.ModelSerializer):
         ]
 
     def get_food_cost_porcentaje(self, obj):
-        return str(obj.food_cost_porcentaje) if obj.food_cost_porcentaje is not None else None
+        return _indicador_plato(obj, "food_cost_pct", "food_cost_porcentaje")
 
     def get_margen_bruto(self, obj):
-        return str(obj.margen_bruto) if obj.margen_bruto is not None else None
+        return _indicador_plato(obj, "margen_bruto_monto", "margen_bruto")
 
     def get_margen_bruto_porcentaje(self, obj):
-        return (
-            str(obj.margen_bruto_porcentaje)
-            if obj.margen_bruto_porcentaje is not None
-            else None
-        )
+        return _indicador_plato(obj, "margen_bruto_pct", "margen_bruto_porcentaje")
+
+
+class IngenieriaMenuParamsSerializer(serializers.Serializer):
+    fecha_desde = serializers.DateField(required=False)
+    fecha_hasta = serializers.DateField(required=False)
+    almacen = serializers.PrimaryKeyRelatedField(
+        queryset=Almacen.objects.all(), required=False
+    )
+    categoria = serializers.IntegerField(required=False)
+    clasificacion = serializers.ChoiceField(choices=CLASIFICACIONES, required=False)
+    ordering = serializers.CharField(required=False)
+    solo_activos = serializers.BooleanField(required=False, default=True)
+
+
+class IngenieriaMenuPlatoSerializer(serializers.Serializer):
+    """
+    Fila de la matriz de ingeniería de menú. Lee solo anotaciones
+    calculadas en BD (ver services.menu.calcular_ingenieria_menu).
+    """
+
+    id = serializers.IntegerField()
+    nombre = serializers.CharField()
+    categoria = serializers.IntegerField(source="categoria_id", allow_null=True)
+    precio_venta = DecimalRapidoField(max_digits=12, decimal_places=2)
+    costo_receta = DecimalRapidoField(max_digits=12, decimal_places=4)
+    food_cost_porcentaje = DecimalRapidoField(
+        source="food_cost_pct", max_digits=12, decimal_places=2, allow_null=True
+    )
+    margen_bruto = DecimalRapidoField(
+        source="margen_bruto_monto", max_digits=18, decimal_places=4
+    )
+    margen_bruto_porcentaje = DecimalRapidoField(
+        source="margen_bruto_pct", max_digits=12, decimal_places=2, allow_null=True
+    )
+    popularidad = DecimalRapidoField(max_digits=14, decimal_places=3)
+    contribucion_total = DecimalRapidoField(max_digits=18, decimal_places=4)
+    clasificacion = serializers.CharField()
+
+
+class ExportacionParamsSerializer(serializers.Serializer):
+    formato = serializers.ChoiceField(choices=["csv", "jsonl"], required=False, default="csv")
+    fecha_desde = serializers.DateField(required=False)
+    fecha_hasta = serializers.DateField(required=False)
+    almacen = serializers.IntegerField(required=False, min_value=1)
+    insumo = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        desde, hasta = attrs.get("fecha_desde"), attrs.get("fecha_hasta")
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError(
+                {"fecha_hasta": "Debe ser posterior o igual a fecha_desde."}
+            )
+        return attrs
+
+
+class TrabajoSerializer(InventarioModelSerializer):
+    class Meta:
+        model = Trabajo
+        fields = [
+            "id",
+            "tipo",
+            "estado",
+            "progreso",
+            "mensaje",
+            "resultado",
+            "error",
+            "intentos",
+            "max_intentos",
+            "disponible_desde",
+            "iniciado_en",
+            "finalizado_en",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class RecosteoRequestSerializer(serializers.Serializer):
+    plato_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        help_text="Si se omite se recostean todos los platos.",
+    )
+
+
+MAX_INSUMOS_DISPONIBILIDAD = 500
+
+
+class DisponibilidadParamsSerializer(serializers.Serializer):
+    almacen = serializers.IntegerField(min_value=1)
+    insumos = serializers.CharField(
+        required=False,
+        help_text="IDs separados por coma (obligatorio al consultar stocks).",
+    )
+
+    def validate_insumos(self, valor):
+        try:
+            ids = sorted({int(parte) for parte in _parametro_lista(valor)})
+        except ValueError:
+            raise serializers.ValidationError("Debe ser una lista de IDs separados por coma.")
+        if len(ids) > MAX_INSUMOS_DISPONIBILIDAD:
+            raise serializers.ValidationError(
+                f"Máximo {MAX_INSUMOS_DISPONIBILIDAD} insumos por consulta."
+            )
+        return ids
+
+
+class PorcionesProduciblesParamsSerializer(serializers.Serializer):
+    almacenes = serializers.CharField(
+        required=False,
+        help_text="IDs de almacén separados por coma (por defecto, todos los activos).",
+    )
+    categoria = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_almacenes(self, valor):
+        try:
+            return sorted({int(parte) for parte in _parametro_lista(valor)})
+        except ValueError:
+            raise serializers.ValidationError("Debe ser una lista de IDs separados por coma.")
+
+
+class PlanProduccionLineaSerializer(serializers.Serializer):
+    plato = serializers.IntegerField(min_value=1)
+    cantidad = DecimalRapidoField(max_digits=12, decimal_places=3)
+    almacen = serializers.IntegerField(
+        min_value=1, required=False, help_text="Por defecto, el almacén del plan."
+    )
+
+    def validate_cantidad(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("La cantidad debe ser mayor a cero.")
+        return value
+
+
+class PlanProduccionRequestSerializer(serializers.Serializer):
+    almacen = serializers.IntegerField(min_value=1, required=False)
+    fecha = serializers.DateField(
+        required=False, help_text="Día de producción (por defecto, mañana)."
+    )
+    lineas = PlanProduccionLineaSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        por_defecto = attrs.get("almacen")
+        for linea in attrs["lineas"]:
+            linea.setdefault("almacen", por_defecto)
+            if linea["almacen"] is None:
+                raise serializers.ValidationError(
+                    {"almacen": "Indique el almacén del plan o de cada línea."}
+                )
+        return attrs
+
+
+class RequerimientoInsumoSerializer(serializers.Serializer):
+    insumo = serializers.IntegerField(source="insumo_id")
+    insumo_nombre = serializers.CharField(source="insumo")
+    almacen = serializers.IntegerField(source="almacen_id")
+    unidad = serializers.CharField()
+    requerido = DecimalRapidoField(max_digits=18, decimal_places=3)
+    stock = DecimalRapidoField(max_digits=14, decimal_places=3)
+    vencido = DecimalRapidoField(max_digits=14, decimal_places=3)
+    disponible = DecimalRapidoField(max_digits=14, decimal_places=3)
+    faltante = DecimalRapidoField(max_digits=18, decimal_places=3)
+    unidad_compra = serializers.CharField(allow_null=True)
+    factor_conversion = DecimalRapidoField(
+        max_digits=12, decimal_places=4, allow_null=True
+    )
+    faltante_compra = DecimalRapidoField(
+        max_digits=18, decimal_places=0, allow_null=True
+    )
+
+
+class ResultadoPlanProduccionSerializer(serializers.Serializer):
+    fecha = serializers.DateField()
+    requerimientos = RequerimientoInsumoSerializer(many=True)
+    faltantes = serializers.SerializerMethodField()
+    platos_sin_receta = serializers.ListField(child=serializers.IntegerField())
+
+    def get_faltantes(self, obj) -> int:
+        return len(obj.faltantes)
+
+
+class VariacionCostoSerializer(serializers.Serializer):
+    insumo = serializers.IntegerField(min_value=1)
+    costo_promedio = DecimalRapidoField(
+        max_digits=12, decimal_places=4, min_value=Decimal("0"), required=False
+    )
+    variacion_porcentaje = DecimalRapidoField(
+        max_digits=7,
+        decimal_places=2,
+        min_value=Decimal("-100"),
+        required=False,
+        help_text="Ej: 12 = +12%, -5 = −5% sobre el costo actual.",
+    )
+
+    def validate(self, attrs):
+        if ("costo_promedio" in attrs) == ("variacion_porcentaje" in attrs):
+            raise serializers.ValidationError(
+                "Indique costo_promedio o variacion_porcentaje (uno de los dos)."
+            )
+        return attrs
+
+
+class SimulacionCostosRequestSerializer(serializers.Serializer):
+    variaciones = VariacionCostoSerializer(many=True, allow_empty=False)
+    solo_afectados = serializers.BooleanField(required=False, default=True)
+    limite = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_variaciones(self, variaciones):
+        # cada variación se aplica sobre el costo actual: dos del mismo
+        # insumo se sumarían en silencio
+        vistos, repetidos = set(), []
+        for variacion in variaciones:
+            if variacion["insumo"] in vistos and variacion["insumo"] not in repetidos:
+                repetidos.append(variacion["insumo"])
+            vistos.add(variacion["insumo"])
+        if repetidos:
+            raise serializers.ValidationError(
+                f"Insumos repetidos: {', '.join(map(str, repetidos))}. "
+                "Indique una sola variación por insumo."
+            )
+        return variaciones
+
+
+class ImpactoPlatoSerializer(serializers.Serializer):
+    plato = serializers.IntegerField(source="plato_id")
+    nombre = serializers.CharField()
+    precio_venta = DecimalRapidoField(max_digits=12, decimal_places=2)
+    costo_actual = DecimalRapidoField(max_digits=18, decimal_places=4)
+    costo_simulado = DecimalRapidoField(max_digits=18, decimal_places=4)
+    diferencia = DecimalRapidoField(max_digits=18, decimal_places=4)
+    food_cost_actual = DecimalRapidoField(max_digits=12, decimal_places=2, allow_null=True)
+    food_cost_simulado = DecimalRapidoField(max_digits=12, decimal_places=2, allow_null=True)
+    margen_actual = DecimalRapidoField(max_digits=18, decimal_places=4)
+    margen_simulado = DecimalRapidoField(max_digits=18, decimal_places=4)
+
+
+class ResultadoSimulacionSerializer(serializers.Serializer):
+    platos_afectados = serializers.IntegerField()
+    diferencia_total = DecimalRapidoField(max_digits=18, decimal_places=4)
+    impactos = ImpactoPlatoSerializer(many=True)
+
+
+class HistorialPreciosParamsSerializer(serializers.Serializer):
+    periodo = serializers.ChoiceField(choices=PERIODOS, required=False, default=PERIODO_DIA)
+    fecha_desde = serializers.DateField(required=False)
+    fecha_hasta = serializers.DateField(required=False)
+    proveedor = serializers.IntegerField(required=False, min_value=1)
+    por_proveedor = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, attrs):
+        desde, hasta = attrs.get("fecha_desde"), attrs.get("fecha_hasta")
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError(
+                {"fecha_hasta": "Debe ser posterior o igual a fecha_desde."}
+            )
+        return attrs
+
+
+class PuntoPrecioSerializer(serializers.Serializer):
+    periodo = serializers.DateField()
+    proveedor = serializers.IntegerField(source="proveedor_id", allow_null=True, required=False)
+    proveedor_nombre = serializers.CharField(
+        source="proveedor__nombre", allow_null=True, required=False
+    )
+    compras = serializers.IntegerField()
+    cantidad_total = DecimalRapidoField(max_digits=18, decimal_places=3)
+    costo_promedio = DecimalRapidoField(max_digits=12, decimal_places=4, allow_null=True)
+    costo_minimo = DecimalRapidoField(max_digits=12, decimal_places=4)
+    costo_maximo = DecimalRapidoField(max_digits=12, decimal_places=4)
+
+
+class AnalisisComprasParamsSerializer(serializers.Serializer):
+    desde = serializers.DateField(
+        required=False,
+        input_formats=["%Y-%m", "iso-8601"],
+        help_text="Primer mes (AAAA-MM). Por defecto, 11 meses antes de `hasta`.",
+    )
+    hasta = serializers.DateField(
+        required=False,
+        input_formats=["%Y-%m", "iso-8601"],
+        help_text="Último mes, incluido (AAAA-MM). Por defecto, el mes en curso.",
+    )
+    agrupar = serializers.CharField(
+        required=False,
+        default=compras.AGRUPAR_PROVEEDOR,
+        help_text="Separados por coma: proveedor, insumo, periodo.",
+    )
+    periodo = serializers.ChoiceField(
+        choices=compras.PERIODOS, required=False, default=compras.PERIODO_MES
+    )
+    proveedor = serializers.IntegerField(required=False, min_value=1)
+    insumo = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_agrupar(self, value):
+        agrupar = tuple(dict.fromkeys(parte.strip() for parte in value.split(",") if parte.strip()))
+        invalidos = [parte for parte in agrupar if parte not in compras.AGRUPACIONES]
+        if invalidos:
+            raise serializers.ValidationError(
+                f"Valores no permitidos: {', '.join(invalidos)}. "
+                f"Use {', '.join(compras.AGRUPACIONES)}."
+            )
+        return agrupar
+
+    def validate(self, attrs):
+        desde, hasta = attrs.get("desde"), attrs.get("hasta")
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError({"hasta": "Debe ser posterior o igual a desde."})
+        return attrs
+
+
+class FilaAnalisisComprasSerializer(serializers.Serializer):
+    periodo = serializers.DateField(allow_null=True)
+    proveedor = serializers.IntegerField(source="proveedor_id", allow_null=True)
+    proveedor_nombre = serializers.CharField(allow_null=True)
+    insumo = serializers.IntegerField(source="insumo_id", allow_null=True)
+    insumo_nombre = serializers.CharField(allow_null=True)
+    compras = serializers.IntegerField()
+    cantidad_total = DecimalRapidoField(max_digits=18, decimal_places=3)
+    gasto_total = DecimalRapidoField(max_digits=20, decimal_places=4)
+    costo_promedio = DecimalRapidoField(max_digits=12, decimal_places=4, allow_null=True)
+    costo_minimo = DecimalRapidoField(max_digits=12, decimal_places=4)
+    costo_maximo = DecimalRapidoField(max_digits=12, decimal_places=4)
+    costo_actual = DecimalRapidoField(max_digits=12, decimal_places=4, allow_null=True)
+    variacion_porcentaje = DecimalRapidoField(max_digits=12, decimal_places=2, allow_null=True)
+
+
+class AnalisisComprasSerializer(serializers.Serializer):
+    desde = serializers.DateField()
+    hasta = serializers.DateField()
+    compras = serializers.IntegerField()
+    gasto_total = DecimalRapidoField(max_digits=20, decimal_places=4)
+    filas = FilaAnalisisComprasSerializer(many=True)
+
+
+class CambiosParamsSerializer(serializers.Serializer):
+    since = serializers.CharField(
+        required=False,
+        help_text="Cursor devuelto por la consulta anterior (vacío = sincronización completa).",
+    )
+    limite = serializers.IntegerField(
+        required=False, min_value=1, max_value=5000, help_text="Filas por fuente."
+    )
+
+
+class VentaOfflineSerializer(serializers.Serializer):
+    evento_id = serializers.CharField(
+        max_length=64, help_text="Id único generado por el terminal (p. ej. UUID)."
+    )
+    plato = serializers.IntegerField(min_value=1)
+    almacen = serializers.IntegerField(min_value=1)
+    cantidad_platos = DecimalRapidoField(max_digits=12, decimal_places=3)
+    fecha_movimiento = serializers.DateTimeField()
+    referencia = serializers.CharField(max_length=100, required=False, allow_blank=True, default="")
+
+    def validate_cantidad_platos(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("La cantidad debe ser mayor a cero.")
+        return value
+
+
+class SincronizacionVentasRequestSerializer(serializers.Serializer):
+    ventas = VentaOfflineSerializer(many=True, allow_empty=False)
+
+    def validate_ventas(self, value):
+        maximo = configuracion_sincronizacion()["MAX_LOTE_VENTAS"]
+        if len(value) > maximo:
+            raise serializers.ValidationError(f"A lo sumo {maximo} ventas por lote.")
+        return value
+
+
+class ResultadoVentaOfflineSerializer(serializers.Serializer):
+    evento_id = serializers.CharField()
+    estado = serializers.CharField()
+    consumo = serializers.IntegerField(source="consumo_id", allow_null=True)
+    error = serializers.CharField()
@@ -0,0 +1,234 @@
+# inventory/services/busqueda.py
+
+import re
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from inventory.catalogos import obtener_catalogo
+from inventory.models import (
+    CategoriaInsumo,
+    EntradaCompra,
+    Insumo,
+    Plato,
+    Proveedor,
+    UnidadMedida,
+)
+from inventory.utils import normalizar_texto
+
+
+LIMITE_AUTOCOMPLETAR = 20
+LIMITE_AUTOCOMPLETAR_MAX = 50
+
+# Mayor que cualquier carácter: [prefijo, prefijo + _FIN) es "empieza con".
+_FIN = "\U0010ffff"
+
+
+def autocompletar_insumos(
+    texto: str | None,
+    *,
+    limite: int = LIMITE_AUTOCOMPLETAR,
+    solo_activos: bool = True,
+) -> list[dict]:
+    """
+    Insumos cuyo nombre empieza con `texto` (sin distinguir mayúsculas ni
+    tildes), ordenados por nombre.
+
+    Se filtra por rango sobre `nombre_normalizado`
+    (>= prefijo AND < prefijo + U+10FFFF), que usa el índice de la columna;
+    un icontains/LIKE '%...%' recorrería la tabla completa. La abreviatura
+    de la unidad sale del caché de catálogos, sin JOIN.
+    """
+    limite = max(1, min(limite, LIMITE_AUTOCOMPLETAR_MAX))
+    prefijo = normalizar_texto(texto)
+
+    qs = Insumo.objects.all()
+    if prefijo:
+        qs = qs.filter(
+            nombre_normalizado__gte=prefijo,
+            nombre_normalizado__lt=prefijo + _FIN,
+        )
+    if solo_activos:
+        qs = qs.filter(activo=True)
+
+    unidades = obtener_catalogo(UnidadMedida)
+    resultados = []
+    for pk, nombre, unidad_id in qs.order_by("nombre_normalizado", "id").values_list(
+        "id", "nombre", "unidad_id"
+    )[:limite]:
+        unidad = unidades.get(unidad_id)
+        resultados.append(
+            {
+                "id": pk,
+                "nombre": nombre,
+                "unidad": unidad.abreviatura if unidad else "",
+            }
+        )
+    return resultados
+
+
+# ---------------------------------------------------------------------------
+# Índice de búsqueda de texto (SQLite FTS5)
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class IndiceBusqueda:
+    """
+    Tabla FTS5 (rowid = pk del modelo, una columna `texto`) con los campos
+    de texto que se buscan, incluidos los de relaciones.
+    """
+    tabla: str
+    campos: tuple[str, ...]
+
+
+INDICES_BUSQUEDA = {
+    Insumo: IndiceBusqueda(
+        tabla="inventory_insumo_busqueda",
+        campos=("nombre", "categoria__nombre", "proveedor_principal__nombre"),
+    ),
+    EntradaCompra: IndiceBusqueda(
+        tabla="inventory_entradacompra_busqueda",
+        campos=("insumo__nombre", "proveedor__nombre", "numero_documento", "referencia"),
+    ),
+    Plato: IndiceBusqueda(
+        tabla="inventory_plato_busqueda",
+        campos=("nombre",),
+    ),
+}
+
+# Modelo cuyo texto aparece en otros índices -> (modelo indexado, FK hacia él)
+DEPENDENCIAS_BUSQUEDA = {
+    Insumo: ((EntradaCompra, "insumo"),),
+    Proveedor: ((Insumo, "proveedor_principal"), (EntradaCompra, "proveedor")),
+    CategoriaInsumo: ((Insumo, "categoria"),),
+}
+
+_TAMANO_LOTE_INDICE = 1000
+_tablas_existentes: dict[str, bool] = {}
+
+
+def indice_disponible(modelo) -> bool:
+    """True si la BD es SQLite y la tabla FTS5 del modelo existe."""
+    indice = INDICES_BUSQUEDA.get(modelo)
+    if indice is None or connection.vendor != "sqlite":
+        return False
+    if indice.tabla not in _tablas_existentes:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [indice.tabla],
+            )
+            _tablas_existentes[indice.tabla] = cursor.fetchone() is not None
+    return _tablas_existentes[indice.tabla]
+
+
+def consulta_fts(texto: str | None) -> str:
+    """
+    Traduce lo que escribe el usuario a una consulta FTS5: cada palabra
+    como prefijo y todas obligatorias ("harina trigo" -> "harina"* "trigo"*).
+    Las tildes las resuelve el tokenizador (unicode61 remove_diacritics 2).
+    """
+    palabras = re.findall(r"\w+", normalizar_texto(texto))
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+
+def aplicar_busqueda(qs: QuerySet, texto: str | None) -> QuerySet:
+    """
+    Filtra `qs` por texto libre usando el índice FTS5 del modelo
+    (pk IN (SELECT rowid ... MATCH ...), una sola consulta). Si el índice no
+    está disponible (otra BD, SQLite sin FTS5) se usa el OR de icontains
+    sobre los mismos campos.
+    """
+    if not texto or not texto.strip():
+        return qs
+    indice = INDICES_BUSQUEDA[qs.model]
+
+    if not indice_disponible(qs.model):
+        return qs.filter(reduce(or_, (Q(**{f"{campo}__icontains": texto}) for campo in indice.campos)))
+
+    consulta = consulta_fts(texto)
+    if not consulta:
+        return qs
+    return qs.filter(
+        pk__in=RawSQL(
+            f"SELECT rowid FROM {indice.tabla} WHERE {indice.tabla} MATCH %s",
+            [consulta],
+        )
+    )
+
+
+def indexar(modelo, pks=None) -> int:
+    """
+    (Re)indexa las filas `pks` del modelo (todas si pks es None): borra sus
+    entradas y vuelve a insertar el texto actual. Las que ya no existen
+    quedan solo borradas. Retorna la cantidad de filas indexadas.
+    """
+    if not indice_disponible(modelo):
+        return 0
+    indice = INDICES_BUSQUEDA[modelo]
+
+    qs = modelo.objects.order_by()
+    with connection.cursor() as cursor:
+        if pks is None:
+            cursor.execute(f"DELETE FROM {indice.tabla}")
+        else:
+            pks = list(pks)
+            if not pks:
+                return 0
+            qs = qs.filter(pk__in=pks)
+            for i in range(0, len(pks), _TAMANO_LOTE_INDICE):
+                lote = pks[i:i + _TAMANO_LOTE_INDICE]
+                marcas = ", ".join(["%s"] * len(lote))
+                cursor.execute(f"DELETE FROM {indice.tabla} WHERE rowid IN ({marcas})", lote)
+
+        total = 0
+        filas = qs.values_list("pk", *indice.campos).iterator(chunk_size=_TAMANO_LOTE_INDICE)
+        lote = []
+        for pk, *textos in filas:
+            lote.append((pk, " ".join(t for t in textos if t)))
+            if len(lote) >= _TAMANO_LOTE_INDICE:
+                cursor.executemany(f"INSERT INTO {indice.tabla}(rowid, texto) VALUES (%s, %s)", lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            cursor.executemany(f"INSERT INTO {indice.tabla}(rowid, texto) VALUES (%s, %s)", lote)
+            total += len(lote)
+    return total
+
+
+def campos_busqueda(modelo) -> frozenset[str]:
+    """Campos propios de `modelo` cuyo valor entra en su índice (las FK por nombre)."""
+    indice = INDICES_BUSQUEDA.get(modelo)
+    if indice is None:
+        return frozenset()
+    return frozenset(campo.split("__")[0] for campo in indice.campos)
+
+
+def campos_dependientes_busqueda(modelo) -> frozenset[str]:
+    """Campos de `modelo` cuyo texto aparece en los índices de otros modelos."""
+    return frozenset(
+        campo.split("__")[1]
+        for dependiente, fk in DEPENDENCIAS_BUSQUEDA.get(modelo, ())
+        for campo in INDICES_BUSQUEDA[dependiente].campos
+        if campo.startswith(f"{fk}__")
+    )
+
+
+def texto_dependiente_busqueda(instancia) -> tuple:
+    """Valores actuales de campos_dependientes_busqueda (None si están diferidos)."""
+    return tuple(
+        instancia.__dict__.get(campo)
+        for campo in sorted(campos_dependientes_busqueda(type(instancia)))
+    )
+
+
+def dependientes_busqueda(instancia) -> list[tuple[type, list[int]]]:
+    """Filas de otros índices que incluyen texto de `instancia`."""
+    return [
+        (modelo, list(modelo.objects.filter(**{fk: instancia.pk}).values_list("pk", flat=True)))
+        for modelo, fk in DEPENDENCIAS_BUSQUEDA.get(type(instancia), ())
+    ]
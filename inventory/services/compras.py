@@ -0,0 +1,280 @@
+# inventory/services/compras.py
+"""
+Análisis de compras por proveedor: gasto, cantidad y costo unitario
+(promedio ponderado, mínimo y máximo) por proveedor, insumo y período, y
+la variación contra el costo promedio actual de cada insumo.
+
+Todo se calcula con agregados agrupados sobre EntradaCompra (índice
+fecha_documento, proveedor, insumo), una consulta por mes agrupada solo
+por lo que se pidió (proveedor, insumo o ambos) y con los filtros en SQL:
+
+- Los meses cerrados se guardan en el caché "reportes". La clave incluye
+  una huella del mes (cantidad de documentos y último updated_at), así que
+  un documento cargado, corregido o borrado con fecha de un mes cerrado
+  hace que ese mes se vuelva a calcular y el resto siga saliendo del caché.
+- El mes en curso (y cualquier mes futuro) se calcula siempre.
+
+Los meses se juntan por año o en un total en Python.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Sum
+from django.utils import timezone
+
+from inventory.catalogos import obtener_catalogo
+from inventory.models import EntradaCompra, Insumo, Proveedor
+
+
+ALIAS_CACHE = "reportes"
+
+AGRUPAR_PROVEEDOR = "proveedor"
+AGRUPAR_INSUMO = "insumo"
+AGRUPAR_PERIODO = "periodo"
+AGRUPACIONES = (AGRUPAR_PROVEEDOR, AGRUPAR_INSUMO, AGRUPAR_PERIODO)
+
+PERIODO_MES = "mes"
+PERIODO_ANIO = "anio"
+
+PERIODOS = [
+    (PERIODO_MES, "Mensual"),
+    (PERIODO_ANIO, "Anual"),
+]
+
+_CUATRO = Decimal("0.0001")
+_DOS = Decimal("0.01")
+
+
+@dataclass
+class AnalisisCompras:
+    desde: date
+    hasta: date
+    compras: int
+    gasto_total: Decimal
+    filas: list[dict]
+
+
+def inicio_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def mes_siguiente(mes: date) -> date:
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _cache():
+    return caches[ALIAS_CACHE]
+
+
+def _huellas(desde: date, hasta: date) -> dict[date, tuple]:
+    """
+    {mes: (documentos, último updated_at)} de los meses con compras.
+    Agrupa por día (solo lee el índice fecha_documento, updated_at) y junta
+    los días por mes en Python: en SQLite, TruncMonth llama a una función
+    Python por fila.
+    """
+    huellas: dict[date, tuple] = {}
+    for dia, documentos, ultimo in (
+        EntradaCompra.objects.filter(fecha_documento__gte=desde, fecha_documento__lt=hasta)
+        .order_by()
+        .values_list("fecha_documento")
+        .annotate(documentos=Count("id"), ultimo=Max("updated_at"))
+    ):
+        mes = inicio_mes(dia)
+        if mes in huellas:
+            anteriores, ultimo_mes = huellas[mes]
+            huellas[mes] = (anteriores + documentos, max(ultimo, ultimo_mes))
+        else:
+            huellas[mes] = (documentos, ultimo)
+    return huellas
+
+
+def _clave(mes: date, huella: tuple, vista: tuple) -> str:
+    documentos, ultimo = huella
+    return f"compras:{mes:%Y-%m}:{documentos}:{ultimo.timestamp()}:" + ":".join(map(str, vista))
+
+
+def _agregar_mes(mes: date, campos: tuple[str, ...], filtros: dict) -> list[tuple]:
+    """
+    [(proveedor_id, insumo_id, compras, cantidad, gasto, mínimo, máximo), ...]
+    del mes, agrupado por `campos` (los ids fuera de `campos` quedan en None).
+    """
+    qs = EntradaCompra.objects.filter(
+        fecha_documento__gte=mes, fecha_documento__lt=mes_siguiente(mes), **filtros
+    ).order_by()
+    agregados = {
+        "compras": Count("id"),
+        "cantidad_total": Sum("cantidad"),
+        "gasto": Sum(
+            ExpressionWrapper(
+                F("cantidad") * F("costo_unitario"),
+                output_field=DecimalField(max_digits=28, decimal_places=7),
+            )
+        ),
+        "minimo": Min("costo_unitario"),
+        "maximo": Max("costo_unitario"),
+    }
+    if not campos:
+        fila = qs.aggregate(**agregados)
+        return [(None, None, *fila.values())] if fila["compras"] else []
+    return [
+        (
+            fila.get("proveedor_id"),
+            fila.get("insumo_id"),
+            *(fila[nombre] for nombre in agregados),
+        )
+        for fila in qs.values(*campos).annotate(**agregados)
+    ]
+
+
+def compras_por_mes(
+    desde: date,
+    hasta: date,
+    *,
+    agrupar: tuple[str, ...] = (AGRUPAR_PROVEEDOR, AGRUPAR_INSUMO),
+    proveedor_id: int | None = None,
+    insumo_id: int | None = None,
+) -> dict[date, list[tuple]]:
+    """
+    Filas agregadas de cada mes con compras entre `desde` y `hasta`
+    (primeros días de mes, `hasta` excluido), agrupadas por proveedor y/o
+    insumo según `agrupar` y ya filtradas. Los meses cerrados salen del
+    caché mientras su huella no cambie; cada combinación de agrupación y
+    filtros tiene su propia entrada.
+    """
+    huellas = _huellas(desde, hasta)
+    if not huellas:
+        return {}
+
+    campos = tuple(
+        campo
+        for nombre, campo in ((AGRUPAR_PROVEEDOR, "proveedor_id"), (AGRUPAR_INSUMO, "insumo_id"))
+        if nombre in agrupar
+    )
+    filtros = {}
+    if proveedor_id:
+        filtros["proveedor_id"] = proveedor_id
+    if insumo_id:
+        filtros["insumo_id"] = insumo_id
+    vista = (*campos, proveedor_id or "", insumo_id or "")
+
+    abierto = inicio_mes(timezone.localdate())
+    claves = {mes: _clave(mes, huella, vista) for mes, huella in huellas.items() if mes < abierto}
+    guardados = _cache().get_many(claves.values())
+
+    por_mes = {mes: guardados[clave] for mes, clave in claves.items() if clave in guardados}
+    calculados = {
+        mes: _agregar_mes(mes, campos, filtros) for mes in sorted(set(huellas) - set(por_mes))
+    }
+    if calculados:
+        _cache().set_many(
+            {claves[mes]: filas for mes, filas in calculados.items() if mes in claves}
+        )
+        por_mes.update(calculados)
+    return por_mes
+
+
+def analizar_compras(
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    agrupar: tuple[str, ...] = (AGRUPAR_PROVEEDOR,),
+    periodo: str = PERIODO_MES,
+    proveedor_id: int | None = None,
+    insumo_id: int | None = None,
+) -> AnalisisCompras:
+    """
+    Gasto y costos de compra entre los meses de `desde` y `hasta` (ambos
+    incluidos; por defecto los últimos 12 meses con el actual), agrupados
+    por cualquier combinación de proveedor, insumo y período (mes o año).
+
+    Cada fila trae compras, cantidad_total, gasto_total, costo_promedio
+    (ponderado por cantidad), costo_minimo y costo_maximo. Cuando se agrupa
+    por insumo trae además costo_actual (Insumo.costo_promedio) y
+    variacion_porcentaje del costo de compra contra ese costo. Las filas
+    van por período, luego por mayor gasto y luego por nombre.
+    """
+    hasta = inicio_mes(hasta or timezone.localdate())
+    desde = inicio_mes(desde) if desde else mes_siguiente(hasta.replace(year=hasta.year - 1))
+
+    grupos: dict[tuple, list] = {}
+    por_mes = compras_por_mes(
+        desde,
+        mes_siguiente(hasta),
+        agrupar=agrupar,
+        proveedor_id=proveedor_id,
+        insumo_id=insumo_id,
+    )
+    for mes, filas in por_mes.items():
+        mes_grupo = mes if periodo == PERIODO_MES else mes.replace(month=1)
+        for prov, ins, compras, cantidad, gasto, minimo, maximo in filas:
+            clave = (mes_grupo if AGRUPAR_PERIODO in agrupar else None, prov, ins)
+            grupo = grupos.get(clave)
+            if grupo is None:
+                grupos[clave] = [compras, cantidad, gasto, minimo, maximo]
+            else:
+                grupo[0] += compras
+                grupo[1] += cantidad
+                grupo[2] += gasto
+                grupo[3] = min(grupo[3], minimo)
+                grupo[4] = max(grupo[4], maximo)
+
+    proveedores = obtener_catalogo(Proveedor)
+    insumos = {}
+    if AGRUPAR_INSUMO in agrupar:
+        insumos = {
+            pk: (nombre, costo)
+            for pk, nombre, costo in Insumo.objects.filter(
+                pk__in={ins for _, _, ins in grupos}
+            ).values_list("pk", "nombre", "costo_promedio")
+        }
+
+    resultado = []
+    compras_total = 0
+    gasto_total = Decimal("0")
+    for (mes, prov, ins), (compras, cantidad, gasto, minimo, maximo) in grupos.items():
+        compras_total += compras
+        gasto_total += gasto
+        costo_promedio = (gasto / cantidad).quantize(_CUATRO) if cantidad else None
+        fila = {
+            "periodo": mes,
+            "proveedor_id": prov,
+            "proveedor_nombre": proveedores[prov].nombre if prov in proveedores else None,
+            "insumo_id": ins,
+            "insumo_nombre": None,
+            "compras": compras,
+            "cantidad_total": cantidad,
+            "gasto_total": gasto.quantize(_CUATRO),
+            "costo_promedio": costo_promedio,
+            "costo_minimo": minimo,
+            "costo_maximo": maximo,
+            "costo_actual": None,
+            "variacion_porcentaje": None,
+        }
+        if ins in insumos:
+            fila["insumo_nombre"], costo_actual = insumos[ins]
+            fila["costo_actual"] = costo_actual
+            if costo_actual and costo_promedio is not None:
+                fila["variacion_porcentaje"] = (
+                    (costo_promedio - costo_actual) / costo_actual * 100
+                ).quantize(_DOS)
+        resultado.append(fila)
+    resultado.sort(
+        key=lambda fila: (
+            fila["periodo"] or desde,
+            -fila["gasto_total"],
+            fila["proveedor_nombre"] or "",
+            fila["insumo_nombre"] or "",
+        )
+    )
+
+    return AnalisisCompras(
+        desde=desde,
+        hasta=hasta,
+        compras=compras_total,
+        gasto_total=gasto_total.quantize(_CUATRO),
+        filas=resultado,
+    )
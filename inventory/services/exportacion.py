@@ -0,0 +1,159 @@
+# inventory/services/exportacion.py
+
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.utils import timezone
+
+from inventory.models import EntradaCompra, MovimientoInventario, StockInsumo
+
+
+TAMANO_BLOQUE = 2000
+
+
+@dataclass(frozen=True)
+class Exportacion:
+    """
+    Definición de una exportación: columnas (encabezado, lookup del ORM),
+    campo de fecha para los filtros desde/hasta y orden de salida.
+    """
+    modelo: type[Model]
+    columnas: tuple[tuple[str, str], ...]
+    orden: tuple[str, ...]
+    campo_fecha: str | None = None
+
+    @property
+    def encabezados(self) -> list[str]:
+        return [encabezado for encabezado, _ in self.columnas]
+
+
+EXPORTACIONES = {
+    "stocks": Exportacion(
+        modelo=StockInsumo,
+        columnas=(
+            ("id", "id"),
+            ("almacen_id", "almacen_id"),
+            ("almacen", "almacen__nombre"),
+            ("insumo_id", "insumo_id"),
+            ("insumo", "insumo__nombre"),
+            ("unidad", "insumo__unidad__abreviatura"),
+            ("cantidad_actual", "cantidad_actual"),
+            ("costo_promedio", "costo_promedio"),
+            ("updated_at", "updated_at"),
+        ),
+        orden=("almacen_id", "insumo_id"),
+    ),
+    "movimientos": Exportacion(
+        modelo=MovimientoInventario,
+        columnas=(
+            ("id", "id"),
+            ("fecha_movimiento", "fecha_movimiento"),
+            ("tipo", "tipo"),
+            ("almacen_id", "almacen_id"),
+            ("almacen", "almacen__nombre"),
+            ("insumo_id", "insumo_id"),
+            ("insumo", "insumo__nombre"),
+            ("cantidad", "cantidad"),
+            ("costo_unitario", "costo_unitario"),
+            ("costo_total", "costo_total"),
+            ("referencia", "referencia"),
+            ("motivo", "motivo"),
+            ("usuario", "usuario__username"),
+        ),
+        orden=("fecha_movimiento", "id"),
+        campo_fecha="fecha_movimiento",
+    ),
+    "compras": Exportacion(
+        modelo=EntradaCompra,
+        columnas=(
+            ("id", "id"),
+            ("fecha_documento", "fecha_documento"),
+            ("numero_documento", "numero_documento"),
+            ("proveedor", "proveedor__nombre"),
+            ("almacen_id", "almacen_id"),
+            ("almacen", "almacen__nombre"),
+            ("insumo_id", "insumo_id"),
+            ("insumo", "insumo__nombre"),
+            ("cantidad", "cantidad"),
+            ("costo_unitario", "costo_unitario"),
+            ("referencia", "referencia"),
+            ("procesada", "procesada"),
+        ),
+        orden=("fecha_documento", "id"),
+        campo_fecha="fecha_documento",
+    ),
+}
+
+
+def _inicio_del_dia(dia: date) -> datetime:
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def filas_exportacion(
+    nombre: str,
+    *,
+    fecha_desde: date | None = None,
+    fecha_hasta: date | None = None,
+    almacen_id: int | None = None,
+    insumo_id: int | None = None,
+    tamano_bloque: int = TAMANO_BLOQUE,
+) -> Iterator[tuple]:
+    """
+    Filas (tuplas, en el orden de EXPORTACIONES[nombre].columnas) de una
+    exportación, leídas con values_list().iterator(chunk_size): no se
+    instancian modelos ni se acumula el resultado en memoria.
+
+    Las fechas son inclusivas. En campos DateTime se filtra por rango
+    [inicio de fecha_desde, inicio del día siguiente a fecha_hasta) en la
+    zona horaria activa.
+    """
+    exportacion = EXPORTACIONES[nombre]
+    qs = exportacion.modelo.objects.all()
+
+    campo = exportacion.campo_fecha
+    if campo is not None:
+        es_datetime = exportacion.modelo._meta.get_field(campo).get_internal_type() == "DateTimeField"
+        if fecha_desde is not None:
+            desde = _inicio_del_dia(fecha_desde) if es_datetime else fecha_desde
+            qs = qs.filter(**{f"{campo}__gte": desde})
+        if fecha_hasta is not None:
+            if es_datetime:
+                qs = qs.filter(**{f"{campo}__lt": _inicio_del_dia(fecha_hasta + timedelta(days=1))})
+            else:
+                qs = qs.filter(**{f"{campo}__lte": fecha_hasta})
+    if almacen_id is not None:
+        qs = qs.filter(almacen_id=almacen_id)
+    if insumo_id is not None:
+        qs = qs.filter(insumo_id=insumo_id)
+
+    lookups = [lookup for _, lookup in exportacion.columnas]
+    return qs.order_by(*exportacion.orden).values_list(*lookups).iterator(
+        chunk_size=tamano_bloque
+    )
+
+
+class _Eco:
+    """Buffer que devuelve lo escrito (para usar csv.writer en streaming)."""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(encabezados: list[str], filas: Iterable[tuple]) -> Iterator[str]:
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(encabezados)
+    for fila in filas:
+        yield escritor.writerow(fila)
+
+
+def lineas_jsonl(encabezados: list[str], filas: Iterable[tuple]) -> Iterator[str]:
+    """Un objeto JSON por línea (decimales y fechas como texto)."""
+    for fila in filas:
+        yield json.dumps(
+            dict(zip(encabezados, fila)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + "\n"
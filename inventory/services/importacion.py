@@ -0,0 +1,260 @@
+# inventory/services/importacion.py
+
+import csv
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Iterable
+
+from django.db import transaction
+
+from inventory.catalogos import catalogo_por_nombre, obtener_catalogo
+from inventory.models import CategoriaInsumo, Insumo, Proveedor, UnidadMedida
+from inventory.services.busqueda import indexar
+from inventory.utils import normalizar_texto
+
+
+class ImportacionError(Exception):
+    """El archivo no se puede importar (encabezados faltantes, formato)."""
+    pass
+
+
+COLUMNAS_OBLIGATORIAS = ("nombre", "unidad")
+COLUMNAS_INSUMO = (
+    "nombre",
+    "unidad",
+    "unidad_compra",
+    "categoria",
+    "proveedor",
+    "activo",
+    "stock_minimo",
+    "stock_maximo",
+    "factor_conversion",
+)
+
+# Campos que se pisan cuando el insumo ya existe (el costo promedio no:
+# lo mantienen las entradas de compra).
+CAMPOS_ACTUALIZABLES = [
+    "nombre_normalizado",
+    "unidad",
+    "unidad_compra",
+    "categoria",
+    "proveedor_principal",
+    "activo",
+    "stock_minimo",
+    "stock_maximo",
+    "factor_conversion",
+    "updated_at",
+]
+
+TAMANO_LOTE = 1000
+
+_VERDADEROS = {"1", "si", "sí", "s", "true", "t", "x", "yes", "y"}
+_FALSOS = {"0", "no", "n", "false", "f"}
+
+
+@dataclass
+class ErrorFila:
+    fila: int
+    nombre: str
+    errores: list[str]
+
+
+@dataclass
+class ResultadoImportacion:
+    procesadas: int = 0
+    importadas: int = 0
+    errores: list[ErrorFila] = field(default_factory=list)
+
+    @property
+    def con_errores(self) -> int:
+        return len(self.errores)
+
+
+def _mapa_unidades() -> dict[str, UnidadMedida]:
+    """Unidades por nombre o abreviatura (en minúsculas)."""
+    mapa = {}
+    for unidad in obtener_catalogo(UnidadMedida).values():
+        mapa[unidad.abreviatura.strip().lower()] = unidad
+    mapa.update(catalogo_por_nombre(UnidadMedida))
+    return mapa
+
+
+def _decimal(valor: str, campo: str, errores: list[str], *, obligatorio=False):
+    """
+    Número no negativo para el campo `campo` de Insumo, redondeado a sus
+    decimales. Lo que no cabe en el campo (max_digits) se informa como
+    error de la fila en lugar de fallar al guardar el lote.
+    """
+    if not valor:
+        if obligatorio:
+            errores.append(f"{campo}: es obligatorio.")
+        return None
+    try:
+        numero = Decimal(valor.replace(",", "."))
+    except InvalidOperation:
+        numero = None
+    if numero is None or not numero.is_finite():
+        errores.append(f"{campo}: '{valor}' no es un número válido.")
+        return None
+    if numero < 0:
+        errores.append(f"{campo}: no puede ser negativo.")
+        return None
+
+    campo_modelo = Insumo._meta.get_field(campo)
+    enteros = campo_modelo.max_digits - campo_modelo.decimal_places
+    if not numero:
+        return Decimal("0")
+    if numero.adjusted() < enteros:
+        numero = numero.quantize(Decimal(1).scaleb(-campo_modelo.decimal_places))
+    if numero.adjusted() >= enteros:
+        errores.append(f"{campo}: admite como máximo {enteros} dígitos enteros.")
+        return None
+    return numero
+
+
+def _referencia(valor: str, mapa: dict, campo: str, errores: list[str]):
+    if not valor:
+        return None
+    obj = mapa.get(valor.lower())
+    if obj is None:
+        errores.append(f"{campo}: '{valor}' no existe.")
+    return obj
+
+
+def _insumo_desde_fila(fila: dict, mapas: dict, errores: list[str]) -> Insumo | None:
+    valores = {col: (fila.get(col) or "").strip() for col in COLUMNAS_INSUMO}
+
+    nombre = valores["nombre"]
+    if not nombre:
+        errores.append("nombre: es obligatorio.")
+    elif len(nombre) > Insumo._meta.get_field("nombre").max_length:
+        errores.append("nombre: supera el largo máximo.")
+
+    if not valores["unidad"]:
+        errores.append("unidad: es obligatoria.")
+    unidad = _referencia(valores["unidad"], mapas["unidades"], "unidad", errores)
+    unidad_compra = _referencia(
+        valores["unidad_compra"], mapas["unidades"], "unidad_compra", errores
+    )
+    categoria = _referencia(valores["categoria"], mapas["categorias"], "categoria", errores)
+    proveedor = _referencia(valores["proveedor"], mapas["proveedores"], "proveedor", errores)
+
+    activo = True
+    if valores["activo"]:
+        texto = valores["activo"].lower()
+        if texto in _VERDADEROS:
+            activo = True
+        elif texto in _FALSOS:
+            activo = False
+        else:
+            errores.append(f"activo: '{valores['activo']}' no es sí/no.")
+
+    stock_minimo = _decimal(valores["stock_minimo"], "stock_minimo", errores)
+    stock_maximo = _decimal(valores["stock_maximo"], "stock_maximo", errores)
+    factor = _decimal(valores["factor_conversion"], "factor_conversion", errores)
+
+    if stock_minimo is not None and stock_maximo is not None and stock_maximo < stock_minimo:
+        errores.append("stock_maximo: no puede ser menor que stock_minimo.")
+    if valores["unidad_compra"] and not factor:
+        errores.append("factor_conversion: es obligatorio si hay unidad_compra.")
+
+    if errores:
+        return None
+
+    return Insumo(
+        nombre=nombre,
+        nombre_normalizado=normalizar_texto(nombre),
+        unidad=unidad,
+        unidad_compra=unidad_compra,
+        categoria=categoria,
+        proveedor_principal=proveedor,
+        activo=activo,
+        stock_minimo=stock_minimo or Decimal("0"),
+        stock_maximo=stock_maximo,
+        factor_conversion=factor,
+    )
+
+
+def _guardar_lote(lote: dict[str, Insumo]) -> int:
+    if not lote:
+        return 0
+    with transaction.atomic():
+        Insumo.objects.bulk_create(
+            lote.values(),
+            update_conflicts=True,
+            unique_fields=["nombre"],
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+        # bulk_create no dispara señales: el índice de búsqueda se
+        # actualiza aquí
+        indexar(
+            Insumo,
+            Insumo.objects.filter(nombre__in=lote.keys()).values_list("pk", flat=True),
+        )
+    return len(lote)
+
+
+def importar_insumos_csv(
+    lineas: Iterable[str],
+    *,
+    tamano_lote: int = TAMANO_LOTE,
+    progreso: Callable[[ResultadoImportacion], None] | None = None,
+) -> ResultadoImportacion:
+    """
+    Importa/actualiza el catálogo de insumos desde un CSV (con encabezados).
+
+    Columnas: nombre, unidad (obligatorias), unidad_compra, categoria,
+    proveedor, activo, stock_minimo, stock_maximo, factor_conversion.
+
+    - El archivo se lee en streaming (csv.DictReader sobre `lineas`), sin
+      cargarlo completo en memoria.
+    - unidad/unidad_compra (nombre o abreviatura), categoria y proveedor se
+      resuelven por nombre, sin distinguir mayúsculas, contra mapas en
+      memoria armados desde el caché de catálogos.
+    - Upsert por `nombre` con bulk_create(update_conflicts=True) en lotes de
+      `tamano_lote`; si un nombre se repite en el archivo gana la última fila.
+    - Las filas inválidas no se importan y se informan con su número de
+      línea; el resto del archivo se importa igual.
+    - `progreso`, si se indica, se llama con el resultado parcial después
+      de guardar cada lote.
+    """
+    lector = csv.DictReader(lineas)
+    encabezados = {(col or "").strip().lower() for col in (lector.fieldnames or [])}
+    faltantes = [col for col in COLUMNAS_OBLIGATORIAS if col not in encabezados]
+    if faltantes:
+        raise ImportacionError(
+            f"Faltan columnas obligatorias: {', '.join(faltantes)}."
+        )
+    lector.fieldnames = [(col or "").strip().lower() for col in lector.fieldnames]
+
+    mapas = {
+        "unidades": _mapa_unidades(),
+        "categorias": catalogo_por_nombre(CategoriaInsumo),
+        "proveedores": catalogo_por_nombre(Proveedor),
+    }
+
+    resultado = ResultadoImportacion()
+    lote: dict[str, Insumo] = {}
+    for fila in lector:
+        resultado.procesadas += 1
+        errores: list[str] = []
+        insumo = _insumo_desde_fila(fila, mapas, errores)
+        if insumo is None:
+            resultado.errores.append(
+                ErrorFila(
+                    fila=lector.line_num,
+                    nombre=(fila.get("nombre") or "").strip(),
+                    errores=errores,
+                )
+            )
+            continue
+
+        lote[insumo.nombre] = insumo
+        if len(lote) >= tamano_lote:
+            resultado.importadas += _guardar_lote(lote)
+            lote = {}
+            if progreso is not None:
+                progreso(resultado)
+
+    resultado.importadas += _guardar_lote(lote)
+    return resultado
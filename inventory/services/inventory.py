@@ -1,13 +1,18 @@
 from decimal import Decimal
 
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from django.db.models import Q, F
-from datetime import date, timedelta
+from django.db.models.functions import Coalesce
+from datetime import date, datetime, timedelta
 from inventory.models import Plato, RecetaInsumo
 from dataclasses import dataclass
 
 
+from inventory.cache_stock import invalidar_stocks_al_confirmar
+from inventory.eventos_stock import publicar_stocks_al_confirmar
+from inventory.services.precios import fecha_local
 from inventory.models import (
     Insumo,
     Almacen,
@@ -16,6 +21,9 @@ from inventory.models import (
     LoteInsumo,
     Plato,
     RecetaInsumo,
+    ConsumoReceta,
+    PrecioInsumo,
+    Proveedor,
 )
 
 
@@ -24,6 +32,123 @@ class MovimientoInventarioError(Exception):
     pass
 
 
+class ConflictoConcurrenciaError(MovimientoInventarioError):
+    """
+    Modo optimista: el stock cambió en otra transacción en todos los
+    reintentos. Se puede volver a intentar la operación completa.
+    """
+    pass
+
+
+CONFIGURACION_CONCURRENCIA = {
+    # "pesimista": select_for_update sobre los stocks durante todo el servicio.
+    # "optimista": lectura sin bloqueo y UPDATE ... WHERE version=%s al final.
+    "MODO": "pesimista",
+    "REINTENTOS": 5,
+}
+
+
+def configuracion_concurrencia() -> dict:
+    return {**CONFIGURACION_CONCURRENCIA, **getattr(settings, "INVENTARIO_CONCURRENCIA", {})}
+
+
+class _VersionDesactualizada(Exception):
+    pass
+
+
+class _SesionStock:
+    """
+    Acceso a StockInsumo dentro de una operación de _modificar_stocks.
+
+    En modo pesimista las lecturas bloquean la fila y `guardar` escribe en
+    el momento. En modo optimista las lecturas no bloquean y las escrituras
+    se acumulan hasta `confirmar`, que las aplica como compare-and-swap
+    sobre `version`: la fila queda bloqueada recién desde ese UPDATE.
+    """
+
+    def __init__(self, optimista: bool):
+        self.optimista = optimista
+        self._pendientes: dict[int, tuple[StockInsumo, set[str]]] = {}
+        self.modificados: set[tuple[int, int]] = set()
+
+    def _qs(self):
+        if self.optimista:
+            return StockInsumo.objects.all()
+        return StockInsumo.objects.select_for_update()
+
+    def obtener(self, **filtros) -> StockInsumo | None:
+        try:
+            return self._qs().get(**filtros)
+        except StockInsumo.DoesNotExist:
+            return None
+
+    def obtener_o_crear(self, *, defaults: dict, **filtros) -> StockInsumo:
+        stock, _created = self._qs().get_or_create(defaults=defaults, **filtros)
+        return stock
+
+    def filtrar(self, **filtros) -> list[StockInsumo]:
+        return list(self._qs().filter(**filtros))
+
+    def guardar(self, stock: StockInsumo, campos: list[str]) -> None:
+        self.modificados.add((stock.insumo_id, stock.almacen_id))
+        if self.optimista:
+            self._pendientes.setdefault(stock.pk, (stock, set()))[1].update(campos)
+            return
+        stock.save(update_fields=[*campos, "updated_at"])
+
+    def confirmar(self) -> None:
+        ahora = timezone.now()
+        for stock, campos in self._pendientes.values():
+            actualizadas = StockInsumo.objects.filter(
+                pk=stock.pk, version=stock.version
+            ).update(
+                **{campo: getattr(stock, campo) for campo in campos},
+                version=F("version") + 1,
+                updated_at=ahora,
+            )
+            if not actualizadas:
+                raise _VersionDesactualizada
+            stock.version += 1
+            stock.updated_at = ahora
+        # el UPDATE directo no dispara post_save
+        publicar_stocks_al_confirmar(stock for stock, _campos in self._pendientes.values())
+        self._pendientes.clear()
+
+
+def _modificar_stocks(operacion):
+    """
+    Ejecuta `operacion(sesion)` (lee los stocks con la sesión, valida, crea
+    los movimientos y marca los stocks a guardar) y devuelve su resultado.
+
+    En modo optimista cada intento corre en un savepoint: si algún stock
+    cambió entretanto se descarta lo hecho y se reintenta con los valores
+    nuevos, hasta INVENTARIO_CONCURRENCIA["REINTENTOS"] veces.
+
+    Los stocks guardados se invalidan en inventory.cache_stock.
+    """
+    config = configuracion_concurrencia()
+    if config["MODO"] != "optimista":
+        sesion = _SesionStock(optimista=False)
+        resultado = operacion(sesion)
+        invalidar_stocks_al_confirmar(sesion.modificados)
+        return resultado
+
+    for _intento in range(config["REINTENTOS"]):
+        sesion = _SesionStock(optimista=True)
+        try:
+            with transaction.atomic():
+                resultado = operacion(sesion)
+                sesion.confirmar()
+        except _VersionDesactualizada:
+            continue
+        invalidar_stocks_al_confirmar(sesion.modificados)
+        return resultado
+
+    raise ConflictoConcurrenciaError(
+        "El stock fue modificado por otra operación; intente nuevamente."
+    )
+
+
 @transaction.atomic
 def registrar_entrada_compra(
     *,
@@ -37,6 +162,7 @@ def registrar_entrada_compra(
     fecha_movimiento=None,
     numero_lote: str | None = None,
     fecha_vencimiento: date | None = None,
+    proveedor: Proveedor | None = None,
 ) -> MovimientoInventario:
     """
     Registra una entrada de inventario por COMPRA con costo promedio ponderado.
@@ -45,6 +171,7 @@ def registrar_entrada_compra(
     - Recalcula el costo_promedio del StockInsumo.
     - Actualiza el costo_promedio del Insumo (a nivel global).
     - Crea un MovimientoInventario asociado.
+    - Agrega el precio al historial (PrecioInsumo), con el proveedor si se indica.
 
     Regla de costo promedio ponderado:
         nuevo_costo = (qty_ant * costo_ant + qty_nueva * costo_unitario) / (qty_ant + qty_nueva)
@@ -62,55 +189,67 @@ def registrar_entrada_compra(
     if fecha_movimiento is None:
         fecha_movimiento = timezone.now()
 
-    # Obtenemos (o creamos) el stock para este insumo+almacén
-    stock, _created = StockInsumo.objects.select_for_update().get_or_create(
-        insumo=insumo,
-        almacen=almacen,
-        defaults={
-            "cantidad_actual": Decimal("0"),
-            "costo_promedio": Decimal("0"),
-        },
-    )
+    def operacion(sesion: _SesionStock) -> MovimientoInventario:
+        # Obtenemos (o creamos) el stock para este insumo+almacén
+        stock = sesion.obtener_o_crear(
+            insumo=insumo,
+            almacen=almacen,
+            defaults={
+                "cantidad_actual": Decimal("0"),
+                "costo_promedio": Decimal("0"),
+            },
+        )
 
-    qty_ant = stock.cantidad_actual or Decimal("0")
-    costo_ant = stock.costo_promedio or Decimal("0")
+        qty_ant = stock.cantidad_actual or Decimal("0")
+        costo_ant = stock.costo_promedio or Decimal("0")
 
-    # Cálculo de nuevo stock
-    qty_nueva = qty_ant + cantidad
+        # Cálculo de nuevo stock
+        qty_nueva = qty_ant + cantidad
 
-    # Cálculo de nuevo costo promedio ponderado
-    if qty_ant <= 0:
-        # Si no había stock previo, el costo promedio pasa a ser el costo_unitario
-        nuevo_costo = costo_unitario
-    else:
-        valor_ant = qty_ant * costo_ant
-        valor_nuevo = cantidad * costo_unitario
-        nuevo_costo = (valor_ant + valor_nuevo) / qty_nueva
+        # Cálculo de nuevo costo promedio ponderado
+        if qty_ant <= 0:
+            # Si no había stock previo, el costo promedio pasa a ser el costo_unitario
+            nuevo_costo = costo_unitario
+        else:
+            valor_ant = qty_ant * costo_ant
+            valor_nuevo = cantidad * costo_unitario
+            nuevo_costo = (valor_ant + valor_nuevo) / qty_nueva
 
-    # Actualizamos el stock
-    stock.cantidad_actual = qty_nueva
-    stock.costo_promedio = nuevo_costo.quantize(Decimal("0.0001"))
-    stock.save()
+        # Actualizamos el stock
+        stock.cantidad_actual = qty_nueva
+        stock.costo_promedio = nuevo_costo.quantize(Decimal("0.0001"))
+        sesion.guardar(stock, ["cantidad_actual", "costo_promedio"])
 
-# Actualizamos el costo_promedio global del insumo
-    _actualizar_costo_promedio_insumo(insumo)
+        # Registramos el movimiento
+        movimiento = MovimientoInventario.objects.create(
+            insumo=insumo,
+            almacen=almacen,
+            tipo=MovimientoInventario.TIPO_ENTRADA_COMPRA,
+            cantidad=cantidad,
+            costo_unitario=costo_unitario,
+            fecha_movimiento=fecha_movimiento,
+            motivo=motivo,
+            referencia=referencia,
+            usuario=usuario,
+        )
+        PrecioInsumo.objects.create(
+            insumo=insumo,
+            proveedor=proveedor,
+            fecha=fecha_local(fecha_movimiento),
+            costo_unitario=movimiento.costo_unitario.quantize(Decimal("0.0001")),
+            cantidad=cantidad,
+            movimiento=movimiento,
+        )
+        return movimiento
 
-    # Registramos el movimiento
-    movimiento = MovimientoInventario.objects.create(
-        insumo=insumo,
-        almacen=almacen,
-        tipo=MovimientoInventario.TIPO_ENTRADA_COMPRA,
-        cantidad=cantidad,
-        costo_unitario=costo_unitario,
-        fecha_movimiento=fecha_movimiento,
-        motivo=motivo,
-        referencia=referencia,
-        usuario=usuario,
-    )
+    movimiento = _modificar_stocks(operacion)
+
+    # Actualizamos el costo_promedio global del insumo (con el stock ya guardado)
+    _actualizar_costo_promedio_insumo(insumo)
 
     # Si se especifican datos de lote/vencimiento, actualizamos/creamos lote
     if numero_lote or fecha_vencimiento:
-        lote, created = LoteInsumo.objects.select_for_update().get_or_create(
+        lote, created = LoteInsumo.objects.get_or_create(
             insumo=insumo,
             almacen=almacen,
             numero_lote=numero_lote or "",
@@ -121,12 +260,16 @@ def registrar_entrada_compra(
                 "activo": True,
             },
         )
-        lote.cantidad_actual = (lote.cantidad_actual or Decimal("0")) + cantidad
+        # Suma atómica en BD, sin bloquear el lote durante el servicio.
         # Para el MVP dejamos costo_unitario como el último costo registrado
-        lote.costo_unitario = costo_unitario
-        lote.save()
+        LoteInsumo.objects.filter(pk=lote.pk).update(
+            cantidad_actual=Coalesce(F("cantidad_actual"), Decimal("0")) + cantidad,
+            costo_unitario=costo_unitario,
+            updated_at=timezone.now(),
+        )
     return movimiento
 
+
 def obtener_lotes_por_vencer(*, dias: int = 7, almacen: Almacen | None = None):
     """
     Retorna lotes activos cuya fecha de vencimiento esté entre hoy y hoy+días.
@@ -248,56 +391,55 @@ def registrar_ajuste_inventario(
         }:
             raise MovimientoInventarioError("Tipo de ajuste inválido.")
 
-    # Obtenemos el stock actual (o lo creamos si no existe y el ajuste es positivo)
-    try:
-        stock = StockInsumo.objects.select_for_update().get(
-            insumo=insumo,
-            almacen=almacen,
-        )
-    except StockInsumo.DoesNotExist:
-        if cantidad < 0:
-            # No hay stock y quieren ajustar en negativo
+    def operacion(sesion: _SesionStock) -> MovimientoInventario:
+        # Obtenemos el stock actual (o lo creamos si no existe y el ajuste es positivo)
+        if cantidad > 0:
+            stock = sesion.obtener_o_crear(
+                insumo=insumo,
+                almacen=almacen,
+                defaults={
+                    "cantidad_actual": Decimal("0"),
+                    "costo_promedio": insumo.costo_promedio or Decimal("0"),
+                },
+            )
+        else:
+            stock = sesion.obtener(insumo=insumo, almacen=almacen)
+            if stock is None:
+                # No hay stock y quieren ajustar en negativo
+                raise MovimientoInventarioError(
+                    "No existe stock para este insumo en este almacén; "
+                    "no se puede registrar un ajuste negativo."
+                )
+
+        cantidad_actual = stock.cantidad_actual or Decimal("0")
+        costo_unitario_actual = stock.costo_promedio or Decimal("0")
+
+        # Nuevo stock luego del ajuste
+        nueva_cantidad = cantidad_actual + cantidad
+        if nueva_cantidad < 0:
             raise MovimientoInventarioError(
-                "No existe stock para este insumo en este almacén; "
-                "no se puede registrar un ajuste negativo."
+                "El ajuste resultaría en stock negativo, operación no permitida."
             )
-        # Ajuste positivo sin stock previo → creamos registro
-        stock = StockInsumo.objects.create(
-            insumo=insumo,
-            almacen=almacen,
-            cantidad_actual=Decimal("0"),
-            costo_promedio=insumo.costo_promedio or Decimal("0"),
-        )
 
-    cantidad_actual = stock.cantidad_actual or Decimal("0")
-    costo_unitario_actual = stock.costo_promedio or Decimal("0")
+        # Actualizamos la cantidad, pero NO tocamos costo_promedio
+        stock.cantidad_actual = nueva_cantidad
+        sesion.guardar(stock, ["cantidad_actual"])
 
-    # Nuevo stock luego del ajuste
-    nueva_cantidad = cantidad_actual + cantidad
-    if nueva_cantidad < 0:
-        raise MovimientoInventarioError(
-            "El ajuste resultaría en stock negativo, operación no permitida."
+        # Registramos el movimiento.
+        # Usamos el costo_unitario_actual solo para referencia contable.
+        return MovimientoInventario.objects.create(
+            insumo=insumo,
+            almacen=almacen,
+            tipo=tipo,
+            cantidad=cantidad,
+            costo_unitario=costo_unitario_actual if costo_unitario_actual != 0 else None,
+            fecha_movimiento=fecha_movimiento,
+            motivo=motivo.strip(),
+            referencia=referencia,
+            usuario=usuario,
         )
 
-    # Actualizamos la cantidad, pero NO tocamos costo_promedio
-    stock.cantidad_actual = nueva_cantidad
-    stock.save(update_fields=["cantidad_actual", "updated_at"])
-
-    # Registramos el movimiento.
-    # Usamos el costo_unitario_actual solo para referencia contable.
-    movimiento = MovimientoInventario.objects.create(
-        insumo=insumo,
-        almacen=almacen,
-        tipo=tipo,
-        cantidad=cantidad,
-        costo_unitario=costo_unitario_actual if costo_unitario_actual != 0 else None,
-        fecha_movimiento=fecha_movimiento,
-        motivo=motivo.strip(),
-        referencia=referencia,
-        usuario=usuario,
-    )
-
-    return movimiento
+    return _modificar_stocks(operacion)
 
 def _actualizar_costo_promedio_insumo(insumo: Insumo) -> None:
     """
@@ -392,83 +534,83 @@ def registrar_traspaso(
     if fecha_movimiento is None:
         fecha_movimiento = timezone.now()
 
-    # --- Stock origen ---
-    try:
-        stock_origen = StockInsumo.objects.select_for_update().get(
-            insumo=insumo,
-            almacen=almacen_origen,
-        )
-    except StockInsumo.DoesNotExist:
-        raise MovimientoInventarioError(
-            "No existe stock para este insumo en el almacén de origen."
-        )
+    def operacion(sesion: _SesionStock):
+        # --- Stock origen ---
+        stock_origen = sesion.obtener(insumo=insumo, almacen=almacen_origen)
+        if stock_origen is None:
+            raise MovimientoInventarioError(
+                "No existe stock para este insumo en el almacén de origen."
+            )
+
+        cantidad_origen = stock_origen.cantidad_actual or Decimal("0")
+        if cantidad_origen < cantidad:
+            raise MovimientoInventarioError(
+                "No hay suficiente stock en el almacén de origen para el traspaso."
+            )
+
+        costo_origen = stock_origen.costo_promedio or Decimal("0")
+
+        # Nuevo stock en origen
+        stock_origen.cantidad_actual = cantidad_origen - cantidad
+        sesion.guardar(stock_origen, ["cantidad_actual"])
 
-    cantidad_origen = stock_origen.cantidad_actual or Decimal("0")
-    if cantidad_origen < cantidad:
-        raise MovimientoInventarioError(
-            "No hay suficiente stock en el almacén de origen para el traspaso."
+        # --- Stock destino ---
+        stock_destino = sesion.obtener_o_crear(
+            insumo=insumo,
+            almacen=almacen_destino,
+            defaults={
+                "cantidad_actual": Decimal("0"),
+                "costo_promedio": costo_origen,
+            },
         )
 
-    costo_origen = stock_origen.costo_promedio or Decimal("0")
+        cantidad_destino_ant = stock_destino.cantidad_actual or Decimal("0")
+        costo_destino_ant = stock_destino.costo_promedio or Decimal("0")
 
-    # Nuevo stock en origen
-    stock_origen.cantidad_actual = cantidad_origen - cantidad
-    stock_origen.save(update_fields=["cantidad_actual", "updated_at"])
+        nueva_cantidad_destino = cantidad_destino_ant + cantidad
 
-    # --- Stock destino ---
-    stock_destino, _created = StockInsumo.objects.select_for_update().get_or_create(
-        insumo=insumo,
-        almacen=almacen_destino,
-        defaults={
-            "cantidad_actual": Decimal("0"),
-            "costo_promedio": costo_origen,
-        },
-    )
+        if cantidad_destino_ant <= 0:
+            nuevo_costo_destino = costo_origen
+        else:
+            valor_ant = cantidad_destino_ant * costo_destino_ant
+            valor_nuevo = cantidad * costo_origen
+            nuevo_costo_destino = (valor_ant + valor_nuevo) / nueva_cantidad_destino
 
-    cantidad_destino_ant = stock_destino.cantidad_actual or Decimal("0")
-    costo_destino_ant = stock_destino.costo_promedio or Decimal("0")
+        stock_destino.cantidad_actual = nueva_cantidad_destino
+        stock_destino.costo_promedio = nuevo_costo_destino.quantize(Decimal("0.0001"))
+        sesion.guardar(stock_destino, ["cantidad_actual", "costo_promedio"])
 
-    nueva_cantidad_destino = cantidad_destino_ant + cantidad
+        # --- Movimientos ---
+        mov_salida = MovimientoInventario.objects.create(
+            insumo=insumo,
+            almacen=almacen_origen,
+            tipo=MovimientoInventario.TIPO_SALIDA_TRASPASO,
+            cantidad=-cantidad,  # salida → negativa
+            costo_unitario=costo_origen,
+            fecha_movimiento=fecha_movimiento,
+            motivo=motivo or "Traspaso a almacén {}".format(almacen_destino.nombre),
+            referencia=referencia,
+            usuario=usuario,
+        )
 
-    if cantidad_destino_ant <= 0:
-        nuevo_costo_destino = costo_origen
-    else:
-        valor_ant = cantidad_destino_ant * costo_destino_ant
-        valor_nuevo = cantidad * costo_origen
-        nuevo_costo_destino = (valor_ant + valor_nuevo) / nueva_cantidad_destino
+        mov_entrada = MovimientoInventario.objects.create(
+            insumo=insumo,
+            almacen=almacen_destino,
+            tipo=MovimientoInventario.TIPO_ENTRADA_TRASPASO,
+            cantidad=cantidad,  # entrada → positiva
+            costo_unitario=costo_origen,
+            fecha_movimiento=fecha_movimiento,
+            motivo=motivo or "Traspaso desde almacén {}".format(almacen_origen.nombre),
+            referencia=referencia,
+            usuario=usuario,
+        )
+        return mov_salida, mov_entrada
 
-    stock_destino.cantidad_actual = nueva_cantidad_destino
-    stock_destino.costo_promedio = nuevo_costo_destino.quantize(Decimal("0.0001"))
-    stock_destino.save(update_fields=["cantidad_actual", "costo_promedio", "updated_at"])
+    mov_salida, mov_entrada = _modificar_stocks(operacion)
 
     # Actualizamos costo_promedio global del insumo (no cambia el valor total, solo distribución)
     _actualizar_costo_promedio_insumo(insumo)
 
-    # --- Movimientos ---
-    mov_salida = MovimientoInventario.objects.create(
-        insumo=insumo,
-        almacen=almacen_origen,
-        tipo=MovimientoInventario.TIPO_SALIDA_TRASPASO,
-        cantidad=-cantidad,  # salida → negativa
-        costo_unitario=costo_origen,
-        fecha_movimiento=fecha_movimiento,
-        motivo=motivo or "Traspaso a almacén {}".format(almacen_destino.nombre),
-        referencia=referencia,
-        usuario=usuario,
-    )
-
-    mov_entrada = MovimientoInventario.objects.create(
-        insumo=insumo,
-        almacen=almacen_destino,
-        tipo=MovimientoInventario.TIPO_ENTRADA_TRASPASO,
-        cantidad=cantidad,  # entrada → positiva
-        costo_unitario=costo_origen,
-        fecha_movimiento=fecha_movimiento,
-        motivo=motivo or "Traspaso desde almacén {}".format(almacen_origen.nombre),
-        referencia=referencia,
-        usuario=usuario,
-    )
-
     return mov_salida, mov_entrada
 
 
@@ -649,6 +791,8 @@ def registrar_consumo_receta(
     - Descuenta stock en StockInsumo.
     - Crea un MovimientoInventario SALIDA_CONSUMO_RECETA por insumo,
       con costo_unitario igual al costo_promedio actual del stock.
+    - Registra un ConsumoReceta que agrupa los movimientos generados
+      (usado para medir la popularidad de cada plato).
 
     NOTA: versión MVP sin manejo por lotes (usa solo StockInsumo).
     """
@@ -681,59 +825,268 @@ def registrar_consumo_receta(
     if not requerimientos:
         raise MovimientoInventarioError("La receta no tiene cantidades válidas para consumo.")
 
-    stocks = {
-        s.insumo_id: s
-        for s in StockInsumo.objects.select_for_update().filter(
+    def operacion(sesion: _SesionStock) -> list[MovimientoInventario]:
+        stocks = {
+            s.insumo_id: s
+            for s in sesion.filtrar(
+                almacen=almacen,
+                insumo_id__in=requerimientos.keys(),
+            )
+        }
+
+        # Validar stock
+        for insumo_id, cantidad_req in requerimientos.items():
+            stock = stocks.get(insumo_id)
+            cantidad_actual = stock.cantidad_actual if stock else Decimal("0")
+            if cantidad_actual < cantidad_req:
+                insumo = RecetaInsumo.objects.get(plato=plato, insumo_id=insumo_id).insumo
+                raise MovimientoInventarioError(
+                    f"No hay stock suficiente de '{insumo.nombre}' "
+                    f"en el almacén para consumir la receta. "
+                    f"Requerido {cantidad_req}, disponible {cantidad_actual}."
+                )
+
+        # 2) Aplicar salidas y crear movimientos
+        movimientos: list[MovimientoInventario] = []
+        motivo_base = motivo or f"Consumo receta plato '{plato.nombre}'"
+        referencia_base = referencia or f"CONSUMO-{plato.id}-{fecha_movimiento.date().isoformat()}"
+
+        consumo = ConsumoReceta.objects.create(
+            plato=plato,
             almacen=almacen,
-            insumo_id__in=requerimientos.keys(),
+            cantidad_platos=cantidad_platos,
+            fecha_movimiento=fecha_movimiento,
+            referencia=referencia_base,
+            usuario=usuario,
         )
-    }
-
-    # Validar stock
-    for insumo_id, cantidad_req in requerimientos.items():
-        stock = stocks.get(insumo_id)
-        cantidad_actual = stock.cantidad_actual if stock else Decimal("0")
-        if cantidad_actual < cantidad_req:
-            insumo = RecetaInsumo.objects.get(plato=plato, insumo_id=insumo_id).insumo
-            raise MovimientoInventarioError(
-                f"No hay stock suficiente de '{insumo.nombre}' "
-                f"en el almacén para consumir la receta. "
-                f"Requerido {cantidad_req}, disponible {cantidad_actual}."
+
+        for idx, linea in enumerate(receta, start=1):
+            insumo = linea.insumo
+            cantidad_req = requerimientos.get(insumo.id)
+            if not cantidad_req:
+                continue
+
+            stock = stocks[insumo.id]
+            costo_unitario = stock.costo_promedio or Decimal("0")
+
+            # Actualizar stock
+            stock.cantidad_actual = (stock.cantidad_actual - cantidad_req).quantize(Decimal("0.0001"))
+            sesion.guardar(stock, ["cantidad_actual"])
+
+            # Crear movimiento
+            mov = MovimientoInventario.objects.create(
+                insumo=insumo,
+                almacen=almacen,
+                tipo=MovimientoInventario.TIPO_SALIDA_CONSUMO_RECETA,
+                cantidad=-cantidad_req,  # salida → negativa
+                costo_unitario=costo_unitario,
+                fecha_movimiento=fecha_movimiento,
+                motivo=f"{motivo_base} (L{idx})",
+                referencia=f"{referencia_base}-L{idx}",
+                usuario=usuario,
+                consumo=consumo,
             )
+            movimientos.append(mov)
 
-    # 2) Aplicar salidas y crear movimientos
-    movimientos: list[MovimientoInventario] = []
-    motivo_base = motivo or f"Consumo receta plato '{plato.nombre}'"
-    referencia_base = referencia or f"CONSUMO-{plato.id}-{fecha_movimiento.date().isoformat()}"
+        return movimientos
 
-    for idx, linea in enumerate(receta, start=1):
-        insumo = linea.insumo
-        cantidad_req = requerimientos.get(insumo.id)
-        if not cantidad_req:
-            continue
+    return _modificar_stocks(operacion)
 
-        stock = stocks[insumo.id]
-        costo_unitario = stock.costo_promedio or Decimal("0")
 
-        # Actualizar stock
-        stock.cantidad_actual = (stock.cantidad_actual - cantidad_req).quantize(Decimal("0.0001"))
-        stock.save(update_fields=["cantidad_actual", "updated_at"])
+VENTA_APLICADA = "aplicada"
+VENTA_DUPLICADA = "duplicada"
+VENTA_RECHAZADA = "rechazada"
 
-        # Crear movimiento
-        mov = MovimientoInventario.objects.create(
-            insumo=insumo,
-            almacen=almacen,
-            tipo=MovimientoInventario.TIPO_SALIDA_CONSUMO_RECETA,
-            cantidad=-cantidad_req,  # salida → negativa
-            costo_unitario=costo_unitario,
-            fecha_movimiento=fecha_movimiento,
-            motivo=f"{motivo_base} (L{idx})",
-            referencia=f"{referencia_base}-L{idx}",
-            usuario=usuario,
+
+@dataclass
+class VentaOffline:
+    """Venta registrada por un terminal sin conexión, identificada por `evento_id`."""
+
+    evento_id: str
+    plato_id: int
+    almacen_id: int
+    cantidad_platos: Decimal
+    fecha_movimiento: datetime
+    referencia: str = ""
+
+
+@dataclass
+class ResultadoVentaOffline:
+    evento_id: str
+    estado: str
+    consumo_id: int | None = None
+    error: str = ""
+
+
+@transaction.atomic
+def registrar_consumos_lote(
+    *,
+    ventas: list[VentaOffline],
+    usuario=None,
+) -> list[ResultadoVentaOffline]:
+    """
+    Aplica un lote de ventas offline como registrar_consumo_receta, pero en
+    bloque: un ConsumoReceta con `evento_id` por venta y sus movimientos
+    SALIDA_CONSUMO_RECETA, con un número fijo de consultas para todo el
+    lote (recetas, stocks, eventos ya aplicados, dos bulk_create y un
+    guardado por stock tocado).
+
+    Devuelve un resultado por venta, en el mismo orden:
+    - VENTA_APLICADA: se registró ahora (consumo_id).
+    - VENTA_DUPLICADA: el evento_id ya estaba aplicado (reintento del
+      terminal) o repetido dentro del lote; no se vuelve a descontar.
+    - VENTA_RECHAZADA: plato/almacén inexistente, plato inactivo o sin
+      receta, o stock insuficiente (error). Las demás ventas se aplican igual.
+
+    Las ventas se aplican en el orden recibido, así que una venta puede
+    quedar sin stock por las anteriores del mismo lote.
+    """
+    resultados = [ResultadoVentaOffline(evento_id=v.evento_id, estado="") for v in ventas]
+    pendientes: dict[str, int] = {}
+    for i, venta in enumerate(ventas):
+        if venta.evento_id in pendientes:
+            resultados[i].estado = VENTA_DUPLICADA
+        else:
+            pendientes[venta.evento_id] = i
+    if not pendientes:
+        return resultados
+
+    platos = Plato.objects.in_bulk({ventas[i].plato_id for i in pendientes.values()})
+    almacenes = set(
+        Almacen.objects.filter(id__in={ventas[i].almacen_id for i in pendientes.values()})
+        .values_list("id", flat=True)
+    )
+    recetas: dict[int, list[RecetaInsumo]] = {}
+    for linea in (
+        RecetaInsumo.objects.filter(plato_id__in=platos, cantidad__gt=0)
+        .select_related("insumo")
+        .order_by("plato_id", "id")
+    ):
+        recetas.setdefault(linea.plato_id, []).append(linea)
+
+    def rechazar(i: int, error: str) -> None:
+        resultados[i].estado = VENTA_RECHAZADA
+        resultados[i].error = error
+
+    def operacion(sesion: _SesionStock) -> list[ResultadoVentaOffline]:
+        for evento_id, i in pendientes.items():  # limpio si es un reintento optimista
+            resultados[i] = ResultadoVentaOffline(evento_id=evento_id, estado="")
+
+        # Con los stocks ya leídos (y bloqueados en modo pesimista): un
+        # reintento concurrente del mismo lote espera y acá ve lo aplicado.
+        stocks = {
+            (s.insumo_id, s.almacen_id): s
+            for s in sesion.filtrar(
+                almacen_id__in=almacenes,
+                insumo_id__in={l.insumo_id for lineas in recetas.values() for l in lineas},
+            )
+        }
+        aplicados = dict(
+            ConsumoReceta.objects.filter(evento_id__in=pendientes.keys()).values_list(
+                "evento_id", "id"
+            )
         )
-        movimientos.append(mov)
 
-    return movimientos
+        consumos: list[tuple[int, ConsumoReceta, list[MovimientoInventario]]] = []
+        modificados: dict[int, StockInsumo] = {}
+        for evento_id, i in pendientes.items():
+            venta = ventas[i]
+            if evento_id in aplicados:
+                resultados[i].estado = VENTA_DUPLICADA
+                resultados[i].consumo_id = aplicados[evento_id]
+                continue
+            plato = platos.get(venta.plato_id)
+            if plato is None:
+                rechazar(i, f"No existe el plato {venta.plato_id}.")
+                continue
+            if venta.almacen_id not in almacenes:
+                rechazar(i, f"No existe el almacén {venta.almacen_id}.")
+                continue
+            if not plato.activo:
+                rechazar(i, "No se puede consumir receta de un plato inactivo.")
+                continue
+            if venta.cantidad_platos <= 0:
+                rechazar(i, "La cantidad de platos debe ser > 0.")
+                continue
+
+            requerimientos = [
+                (
+                    linea,
+                    (linea.cantidad * venta.cantidad_platos).quantize(Decimal("0.0001")),
+                )
+                for linea in recetas.get(plato.id, [])
+            ]
+            requerimientos = [(linea, cantidad) for linea, cantidad in requerimientos if cantidad > 0]
+            if not requerimientos:
+                rechazar(i, "El plato no tiene receta definida.")
+                continue
+
+            faltante = None
+            for linea, cantidad in requerimientos:
+                stock = stocks.get((linea.insumo_id, venta.almacen_id))
+                disponible = stock.cantidad_actual if stock else Decimal("0")
+                if disponible < cantidad:
+                    faltante = (
+                        f"No hay stock suficiente de '{linea.insumo.nombre}' "
+                        f"en el almacén para consumir la receta. "
+                        f"Requerido {cantidad}, disponible {disponible}."
+                    )
+                    break
+            if faltante:
+                rechazar(i, faltante)
+                continue
+
+            referencia_base = (
+                venta.referencia
+                or f"CONSUMO-{plato.id}-{venta.fecha_movimiento.date().isoformat()}"
+            )
+            consumo = ConsumoReceta(
+                plato=plato,
+                almacen_id=venta.almacen_id,
+                cantidad_platos=venta.cantidad_platos,
+                fecha_movimiento=venta.fecha_movimiento,
+                referencia=referencia_base,
+                usuario=usuario,
+                evento_id=evento_id,
+            )
+            movimientos = []
+            for idx, (linea, cantidad) in enumerate(requerimientos, start=1):
+                stock = stocks[(linea.insumo_id, venta.almacen_id)]
+                costo_unitario = stock.costo_promedio or Decimal("0")
+                stock.cantidad_actual = (stock.cantidad_actual - cantidad).quantize(Decimal("0.0001"))
+                modificados[stock.pk] = stock
+                movimientos.append(
+                    MovimientoInventario(
+                        insumo=linea.insumo,
+                        almacen_id=venta.almacen_id,
+                        tipo=MovimientoInventario.TIPO_SALIDA_CONSUMO_RECETA,
+                        cantidad=-cantidad,
+                        costo_unitario=costo_unitario,
+                        # bulk_create no pasa por MovimientoInventario.save()
+                        costo_total=(-cantidad * costo_unitario).quantize(Decimal("0.0001")),
+                        fecha_movimiento=venta.fecha_movimiento,
+                        motivo=f"Consumo receta plato '{plato.nombre}' (L{idx})",
+                        referencia=f"{referencia_base}-L{idx}",
+                        usuario=usuario,
+                    )
+                )
+            consumos.append((i, consumo, movimientos))
+
+        ConsumoReceta.objects.bulk_create([consumo for _, consumo, _ in consumos])
+        for i, consumo, movimientos in consumos:
+            resultados[i].estado = VENTA_APLICADA
+            resultados[i].consumo_id = consumo.pk
+            for mov in movimientos:
+                mov.consumo = consumo
+        MovimientoInventario.objects.bulk_create(
+            [mov for _, _, movimientos in consumos for mov in movimientos]
+        )
+        for stock in modificados.values():
+            sesion.guardar(stock, ["cantidad_actual"])
+        return resultados
+
+    return _modificar_stocks(operacion)
+
 
 @transaction.atomic
 def registrar_merma(
@@ -763,43 +1116,40 @@ def registrar_merma(
     if fecha_movimiento is None:
         fecha_movimiento = timezone.now()
 
-    try:
-        stock = StockInsumo.objects.select_for_update().get(
-            insumo=insumo,
-            almacen=almacen,
-        )
-    except StockInsumo.DoesNotExist:
-        raise MovimientoInventarioError(
-            "No existe stock para este insumo en el almacén para registrar merma."
-        )
+    def operacion(sesion: _SesionStock) -> MovimientoInventario:
+        stock = sesion.obtener(insumo=insumo, almacen=almacen)
+        if stock is None:
+            raise MovimientoInventarioError(
+                "No existe stock para este insumo en el almacén para registrar merma."
+            )
 
-    cantidad_actual = stock.cantidad_actual or Decimal("0")
-    nueva_cantidad = cantidad_actual + cantidad  # cantidad es negativa
+        cantidad_actual = stock.cantidad_actual or Decimal("0")
+        nueva_cantidad = cantidad_actual + cantidad  # cantidad es negativa
 
-    if nueva_cantidad < 0:
-        raise MovimientoInventarioError(
-            f"No se puede registrar merma. Stock insuficiente. "
-            f"Actual: {cantidad_actual}, merma: {cantidad}."
-        )
+        if nueva_cantidad < 0:
+            raise MovimientoInventarioError(
+                f"No se puede registrar merma. Stock insuficiente. "
+                f"Actual: {cantidad_actual}, merma: {cantidad}."
+            )
 
-    stock.cantidad_actual = nueva_cantidad
-    stock.save(update_fields=["cantidad_actual", "updated_at"])
+        stock.cantidad_actual = nueva_cantidad
+        sesion.guardar(stock, ["cantidad_actual"])
 
-    costo_unitario = stock.costo_promedio or Decimal("0")
+        costo_unitario = stock.costo_promedio or Decimal("0")
 
-    movimiento = MovimientoInventario.objects.create(
-        insumo=insumo,
-        almacen=almacen,
-        tipo=MovimientoInventario.TIPO_SALIDA_MERMA,
-        cantidad=cantidad,  # negativa
-        costo_unitario=costo_unitario,
-        fecha_movimiento=fecha_movimiento,
-        motivo=motivo,
-        referencia=referencia,
-        usuario=usuario,
-    )
+        return MovimientoInventario.objects.create(
+            insumo=insumo,
+            almacen=almacen,
+            tipo=MovimientoInventario.TIPO_SALIDA_MERMA,
+            cantidad=cantidad,  # negativa
+            costo_unitario=costo_unitario,
+            fecha_movimiento=fecha_movimiento,
+            motivo=motivo,
+            referencia=referencia,
+            usuario=usuario,
+        )
 
-    return movimiento
+    return _modificar_stocks(operacion)
 
 
 
@@ -0,0 +1,266 @@
+# inventory/services/menu.py
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Round
+
+from inventory.models import Almacen, ConsumoReceta, Plato
+
+
+CLASIFICACION_ESTRELLA = "estrella"
+CLASIFICACION_CABALLO = "caballo"
+CLASIFICACION_ENIGMA = "enigma"
+CLASIFICACION_PERRO = "perro"
+
+CLASIFICACIONES = [
+    (CLASIFICACION_ESTRELLA, "Estrella (popular y rentable)"),
+    (CLASIFICACION_CABALLO, "Caballo de batalla (popular, poco rentable)"),
+    (CLASIFICACION_ENIGMA, "Enigma (poco popular, rentable)"),
+    (CLASIFICACION_PERRO, "Perro (poco popular, poco rentable)"),
+]
+
+# Regla de Kasavana & Smith: un plato es popular si su participación en las
+# ventas supera el 70% de la participación "justa" (1 / cantidad de platos).
+FACTOR_POPULARIDAD = Decimal("0.70")
+
+# Campos por los que se puede ordenar (nombre público -> anotación/campo).
+ORDENAMIENTOS_INDICADORES = {
+    "nombre": "nombre",
+    "precio_venta": "precio_venta",
+    "costo_receta": "costo_receta",
+    "food_cost_porcentaje": "food_cost_pct",
+    "margen_bruto": "margen_bruto_monto",
+    "margen_bruto_porcentaje": "margen_bruto_pct",
+}
+ORDENAMIENTOS_INGENIERIA_MENU = {
+    **ORDENAMIENTOS_INDICADORES,
+    "popularidad": "popularidad",
+    "contribucion_total": "contribucion_total",
+    "clasificacion": "clasificacion",
+}
+
+_PORCENTAJE = DecimalField(max_digits=12, decimal_places=2)
+_MONTO = DecimalField(max_digits=18, decimal_places=4)
+_CANTIDAD = DecimalField(max_digits=14, decimal_places=3)
+# Literal decimal para que SQLite no haga división entera.
+_CIEN = Value(Decimal("100.0"), output_field=_MONTO)
+
+
+def anotar_indicadores_platos(qs: QuerySet | None = None) -> QuerySet:
+    """
+    Anota en BD los indicadores de rentabilidad de cada plato, equivalentes
+    a las propiedades del modelo pero sin evaluarlas fila a fila:
+
+    - margen_bruto_monto = precio_venta - costo_receta
+    - food_cost_pct      = costo_receta / precio_venta * 100 (2 decimales)
+    - margen_bruto_pct   = margen_bruto / precio_venta * 100 (2 decimales)
+
+    Los porcentajes quedan en NULL si el plato no tiene precio_venta > 0.
+    """
+    if qs is None:
+        qs = Plato.objects.all()
+
+    con_precio = Q(precio_venta__gt=0)
+    margen = ExpressionWrapper(
+        F("precio_venta") - F("costo_receta"),
+        output_field=_MONTO,
+    )
+
+    return qs.annotate(
+        margen_bruto_monto=margen,
+        food_cost_pct=Case(
+            When(
+                con_precio,
+                then=Round(F("costo_receta") * _CIEN / F("precio_venta"), 2),
+            ),
+            default=None,
+            output_field=_PORCENTAJE,
+        ),
+        margen_bruto_pct=Case(
+            When(
+                con_precio,
+                then=Round(
+                    (F("precio_venta") - F("costo_receta")) * _CIEN / F("precio_venta"),
+                    2,
+                ),
+            ),
+            default=None,
+            output_field=_PORCENTAJE,
+        ),
+    )
+
+
+# Centinela para mandar los indicadores nulos (platos sin precio) al final.
+_NULO_AL_FINAL = Decimal("999999999")
+_INDICADORES_NULABLES = {"food_cost_pct", "margen_bruto_pct"}
+
+
+def ordenamiento_platos(
+    qs: QuerySet,
+    orden: str | None,
+    permitidos: dict[str, str],
+) -> tuple[QuerySet, tuple[str, ...]]:
+    """
+    Traduce un nombre público de orden ("-campo" para descendente) a la
+    tupla de campos para `order_by`. Devuelve también el queryset, que se
+    anota con `orden_valor` cuando el indicador puede ser nulo para que los
+    nulos queden siempre al final (y la paginación por cursor no reciba
+    posiciones nulas). Si el orden no está permitido se usa el nombre.
+    """
+    campo = permitidos.get((orden or "").lstrip("-"))
+    if campo is None:
+        return qs, ("nombre", "id")
+
+    descendente = orden.startswith("-")
+    if campo in _INDICADORES_NULABLES:
+        centinela = -_NULO_AL_FINAL if descendente else _NULO_AL_FINAL
+        qs = qs.annotate(
+            orden_valor=Coalesce(F(campo), Value(centinela, output_field=_PORCENTAJE))
+        )
+        campo = "orden_valor"
+
+    return qs, (f"-{campo}" if descendente else campo, "id")
+
+
+def ordenar_platos(qs: QuerySet, orden: str | None, permitidos: dict[str, str]) -> QuerySet:
+    """
+    Ordena un queryset de platos según un nombre público (ver
+    ordenamiento_platos).
+    """
+    qs, ordenamiento = ordenamiento_platos(qs, orden, permitidos)
+    return qs.order_by(*ordenamiento)
+
+
+@dataclass
+class ResultadoIngenieriaMenu:
+    platos: QuerySet
+    total_platos: int
+    popularidad_total: Decimal
+    umbral_popularidad: Decimal
+    umbral_margen: Decimal
+    ordenamiento: tuple[str, ...]
+
+
+def calcular_ingenieria_menu(
+    *,
+    fecha_desde: date | None = None,
+    fecha_hasta: date | None = None,
+    almacen: Almacen | None = None,
+    categoria_id: int | None = None,
+    clasificacion: str | None = None,
+    orden: str | None = None,
+    solo_activos: bool = True,
+) -> ResultadoIngenieriaMenu:
+    """
+    Ingeniería de menú (matriz de Kasavana & Smith) calculada en BD.
+
+    - popularidad: porciones consumidas (ConsumoReceta) en el período.
+    - contribucion_total: margen_bruto * popularidad.
+    - Umbral de popularidad: 70% de la participación promedio
+      (popularidad_total / cantidad_platos * 0.70).
+    - Umbral de margen: margen promedio ponderado por popularidad
+      (margen simple promedio si no hay ventas en el período).
+
+    Los umbrales se calculan sobre el menú filtrado por categoría/activos
+    (una consulta agregada); el filtro por clasificación se aplica después.
+    Retorna el queryset anotado (perezoso, una consulta más al evaluarlo).
+    """
+    consumos = ConsumoReceta.objects.filter(plato=OuterRef("pk"))
+    if fecha_desde is not None:
+        consumos = consumos.filter(fecha_movimiento__date__gte=fecha_desde)
+    if fecha_hasta is not None:
+        consumos = consumos.filter(fecha_movimiento__date__lte=fecha_hasta)
+    if almacen is not None:
+        consumos = consumos.filter(almacen=almacen)
+    consumos = (
+        consumos.order_by()
+        .values("plato")
+        .annotate(total=Sum("cantidad_platos"))
+        .values("total")
+    )
+
+    qs = Plato.objects.select_related("categoria")
+    if solo_activos:
+        qs = qs.filter(activo=True)
+    if categoria_id is not None:
+        qs = qs.filter(categoria_id=categoria_id)
+
+    qs = anotar_indicadores_platos(qs).annotate(
+        popularidad=Coalesce(
+            Subquery(consumos, output_field=_CANTIDAD),
+            Value(Decimal("0"), output_field=_CANTIDAD),
+        ),
+    ).annotate(
+        contribucion_total=ExpressionWrapper(
+            F("margen_bruto_monto") * F("popularidad"),
+            output_field=_MONTO,
+        ),
+    )
+
+    agg = qs.aggregate(
+        total_platos=Count("id"),
+        popularidad_total=Sum("popularidad"),
+        contribucion=Sum("contribucion_total"),
+        margen=Sum("margen_bruto_monto"),
+    )
+    total_platos = agg["total_platos"] or 0
+    popularidad_total = Decimal(agg["popularidad_total"] or 0)
+    contribucion = Decimal(agg["contribucion"] or 0)
+    margen = Decimal(agg["margen"] or 0)
+
+    if total_platos and popularidad_total > 0:
+        umbral_popularidad = popularidad_total / total_platos * FACTOR_POPULARIDAD
+        umbral_margen = contribucion / popularidad_total
+    elif total_platos:
+        umbral_popularidad = Decimal("0")
+        umbral_margen = margen / total_platos
+    else:
+        umbral_popularidad = Decimal("0")
+        umbral_margen = Decimal("0")
+
+    umbral_popularidad = umbral_popularidad.quantize(Decimal("0.001"))
+    umbral_margen = umbral_margen.quantize(Decimal("0.0001"))
+
+    popular = Q(popularidad__gt=0, popularidad__gte=umbral_popularidad)
+    rentable = Q(margen_bruto_monto__gte=umbral_margen)
+    qs = qs.annotate(
+        clasificacion=Case(
+            When(popular & rentable, then=Value(CLASIFICACION_ESTRELLA)),
+            When(popular, then=Value(CLASIFICACION_CABALLO)),
+            When(rentable, then=Value(CLASIFICACION_ENIGMA)),
+            default=Value(CLASIFICACION_PERRO),
+            output_field=CharField(),
+        )
+    )
+
+    if clasificacion:
+        qs = qs.filter(clasificacion=clasificacion)
+
+    qs, ordenamiento = ordenamiento_platos(qs, orden, ORDENAMIENTOS_INGENIERIA_MENU)
+    qs = qs.order_by(*ordenamiento)
+
+    return ResultadoIngenieriaMenu(
+        platos=qs,
+        total_platos=total_platos,
+        popularidad_total=popularidad_total,
+        umbral_popularidad=umbral_popularidad,
+        umbral_margen=umbral_margen,
+        ordenamiento=ordenamiento,
+    )
@@ -0,0 +1,156 @@
+# inventory/services/precios.py
+"""
+Historial de precios de compra por insumo (PrecioInsumo).
+
+registrar_entrada_compra agrega una fila por compra; poblar_historial_precios
+carga las compras registradas antes de que existiera la tabla. serie_precios
+agrupa por día, semana o mes (y proveedor) para los gráficos de tendencia,
+leyendo solo el índice (insumo, fecha) de la tabla.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from inventory.models import EntradaCompra, MovimientoInventario, PrecioInsumo
+
+
+PERIODO_DIA = "dia"
+PERIODO_SEMANA = "semana"
+PERIODO_MES = "mes"
+
+PERIODOS = [
+    (PERIODO_DIA, "Diario"),
+    (PERIODO_SEMANA, "Semanal (desde el lunes)"),
+    (PERIODO_MES, "Mensual"),
+]
+
+_TRUNCAR = {
+    PERIODO_DIA: lambda campo: F(campo),
+    PERIODO_SEMANA: TruncWeek,
+    PERIODO_MES: TruncMonth,
+}
+
+
+def fecha_local(momento: datetime | date) -> date:
+    """Día (en la zona horaria del proyecto) de una fecha de movimiento."""
+    if isinstance(momento, datetime):
+        return timezone.localdate(momento) if timezone.is_aware(momento) else momento.date()
+    return momento
+
+
+def serie_precios(
+    *,
+    insumo_id: int,
+    periodo: str = PERIODO_DIA,
+    fecha_desde: date | None = None,
+    fecha_hasta: date | None = None,
+    proveedor_id: int | None = None,
+    por_proveedor: bool = True,
+) -> list[dict]:
+    """
+    Una fila por período (y proveedor, si por_proveedor) con la cantidad
+    de compras, la cantidad comprada, el costo promedio ponderado por
+    cantidad y el mínimo y máximo, ordenadas por período.
+    """
+    qs = PrecioInsumo.objects.filter(insumo_id=insumo_id)
+    if fecha_desde:
+        qs = qs.filter(fecha__gte=fecha_desde)
+    if fecha_hasta:
+        qs = qs.filter(fecha__lte=fecha_hasta)
+    if proveedor_id:
+        qs = qs.filter(proveedor_id=proveedor_id)
+
+    grupos = ["periodo", "proveedor_id", "proveedor__nombre"] if por_proveedor else ["periodo"]
+    filas = (
+        qs.annotate(periodo=_TRUNCAR[periodo]("fecha"))
+        .order_by()
+        .values(*grupos)
+        .annotate(
+            compras=Count("id"),
+            cantidad_total=Sum("cantidad"),
+            valor_total=Sum(
+                ExpressionWrapper(
+                    F("cantidad") * F("costo_unitario"),
+                    output_field=DecimalField(max_digits=28, decimal_places=7),
+                )
+            ),
+            costo_minimo=Min("costo_unitario"),
+            costo_maximo=Max("costo_unitario"),
+        )
+        .order_by(*grupos[:2])
+    )
+
+    resultado = []
+    for fila in filas:
+        valor_total = fila.pop("valor_total") or Decimal("0")
+        cantidad = fila["cantidad_total"] or Decimal("0")
+        fila["costo_promedio"] = (
+            (valor_total / cantidad).quantize(Decimal("0.0001")) if cantidad else None
+        )
+        resultado.append(fila)
+    return resultado
+
+
+def poblar_historial_precios(*, tamano_lote: int = 1000) -> int:
+    """
+    Crea las filas de PrecioInsumo que faltan para las entradas por compra
+    ya registradas, tomando el proveedor de la EntradaCompra que generó el
+    movimiento (si hay). Se puede correr varias veces. Retorna cuántas creó.
+    """
+    proveedor = EntradaCompra.objects.filter(movimiento=OuterRef("pk")).values("proveedor_id")[:1]
+    pendientes = (
+        MovimientoInventario.objects.filter(
+            tipo=MovimientoInventario.TIPO_ENTRADA_COMPRA,
+            precio__isnull=True,
+            costo_unitario__isnull=False,
+        )
+        .annotate(proveedor_compra=Subquery(proveedor))
+        .order_by("pk")
+    )
+
+    creados = 0
+    ultimo = 0
+    while True:
+        lote = list(
+            pendientes.filter(pk__gt=ultimo).values_list(
+                "pk",
+                "insumo_id",
+                "proveedor_compra",
+                "fecha_movimiento",
+                "costo_unitario",
+                "cantidad",
+            )[:tamano_lote]
+        )
+        if not lote:
+            return creados
+        ultimo = lote[-1][0]
+        creados += len(
+            PrecioInsumo.objects.bulk_create(
+                [
+                    PrecioInsumo(
+                        movimiento_id=pk,
+                        insumo_id=insumo_id,
+                        proveedor_id=proveedor_id,
+                        fecha=fecha_local(fecha),
+                        costo_unitario=costo,
+                        cantidad=cantidad,
+                    )
+                    for pk, insumo_id, proveedor_id, fecha, costo, cantidad in lote
+                ],
+                ignore_conflicts=True,
+            )
+        )
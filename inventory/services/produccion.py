@@ -0,0 +1,266 @@
+# inventory/services/produccion.py
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import ROUND_CEILING, Decimal
+from typing import Iterable
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from inventory.models import Almacen, LoteInsumo, RecetaInsumo, StockInsumo
+
+
+@dataclass
+class MatrizPorciones:
+    """
+    Porciones producibles por plato (filas) y almacén (columnas).
+    `limitantes[i][j]` es el insumo que limita al plato i en el almacén j.
+    """
+
+    almacenes: list[tuple[int, str]]
+    platos: list[tuple[int, str]]
+    porciones: list[list[int]]
+    limitantes: list[list[int]]
+
+
+def calcular_porciones_producibles(
+    *,
+    almacen_ids: Iterable[int] | None = None,
+    plato_ids: Iterable[int] | None = None,
+    categoria_id: int | None = None,
+) -> MatrizPorciones:
+    """
+    Cuántas porciones de cada plato activo puede preparar cada almacén
+    activo con el stock actual:
+
+        porciones[plato][almacen] = min(stock[insumo][almacen] // cantidad)
+
+    sobre las líneas de receta con cantidad > 0 (un stock negativo cuenta
+    como 0). Los platos sin líneas válidas no aparecen.
+
+    Tres consultas en total (almacenes, recetas y stocks); el resto es
+    aritmética sobre vectores por insumo, una componente por almacén.
+    """
+    almacenes_qs = Almacen.objects.filter(activo=True).order_by("nombre", "id")
+    if almacen_ids is not None:
+        almacenes_qs = almacenes_qs.filter(id__in=list(almacen_ids))
+    almacenes = list(almacenes_qs.values_list("id", "nombre"))
+    columna = {almacen_id: j for j, (almacen_id, _) in enumerate(almacenes)}
+
+    recetas_qs = RecetaInsumo.objects.filter(plato__activo=True, cantidad__gt=0)
+    if plato_ids is not None:
+        recetas_qs = recetas_qs.filter(plato_id__in=list(plato_ids))
+    if categoria_id is not None:
+        recetas_qs = recetas_qs.filter(plato__categoria_id=categoria_id)
+    lineas = list(
+        recetas_qs.order_by("plato__nombre", "plato_id", "insumo_id").values_list(
+            "plato_id", "plato__nombre", "insumo_id", "cantidad"
+        )
+    )
+
+    # Vector de stock por insumo (una componente por almacén).
+    ceros = [Decimal("0")] * len(almacenes)
+    stocks: dict[int, list[Decimal]] = {}
+    if almacenes and lineas:
+        filas_stock = StockInsumo.objects.filter(
+            almacen_id__in=list(columna),
+            insumo_id__in=recetas_qs.values("insumo_id"),
+        ).values_list("insumo_id", "almacen_id", "cantidad_actual")
+        for insumo_id, almacen_id, cantidad in filas_stock:
+            vector = stocks.setdefault(insumo_id, list(ceros))
+            vector[columna[almacen_id]] = max(cantidad, Decimal("0"))
+
+    platos: list[tuple[int, str]] = []
+    porciones: list[list[int]] = []
+    limitantes: list[list[int]] = []
+    fila = limitante = None
+    for plato_id, nombre, insumo_id, cantidad in lineas:
+        if not platos or platos[-1][0] != plato_id:
+            platos.append((plato_id, nombre))
+            fila = [None] * len(almacenes)
+            limitante = [insumo_id] * len(almacenes)
+            porciones.append(fila)
+            limitantes.append(limitante)
+
+        posibles = [stock // cantidad for stock in stocks.get(insumo_id, ceros)]
+        for j, valor in enumerate(posibles):
+            if fila[j] is None or valor < fila[j]:
+                fila[j] = valor
+                limitante[j] = insumo_id
+
+    porciones = [[int(valor) for valor in fila] for fila in porciones]
+
+    return MatrizPorciones(
+        almacenes=almacenes,
+        platos=platos,
+        porciones=porciones,
+        limitantes=limitantes,
+    )
+
+
+@dataclass
+class LineaPlanProduccion:
+    plato_id: int
+    cantidad: Decimal
+    almacen_id: int
+
+
+@dataclass
+class RequerimientoInsumo:
+    """
+    Requerimiento agregado de un insumo en un almacén para un plan.
+    Cantidades en unidad del insumo salvo `faltante_compra`, que está en
+    unidades de compra enteras (redondeado hacia arriba).
+    """
+
+    insumo_id: int
+    insumo: str
+    almacen_id: int
+    unidad: str
+    requerido: Decimal
+    stock: Decimal
+    vencido: Decimal
+    disponible: Decimal
+    faltante: Decimal
+    unidad_compra: str | None
+    factor_conversion: Decimal | None
+    faltante_compra: Decimal | None
+
+
+@dataclass
+class ResultadoPlanProduccion:
+    fecha: date
+    requerimientos: list[RequerimientoInsumo]
+    platos_sin_receta: list[int]
+
+    @property
+    def faltantes(self) -> list[RequerimientoInsumo]:
+        return [r for r in self.requerimientos if r.faltante > 0]
+
+
+def planificar_produccion(
+    *,
+    lineas: Iterable[LineaPlanProduccion],
+    fecha: date | None = None,
+) -> ResultadoPlanProduccion:
+    """
+    Explota las recetas de un plan de producción (platos x cantidad x
+    almacén) y compara lo requerido por insumo y almacén con lo disponible:
+
+        disponible = stock actual - vencido    (nunca menor a 0)
+
+    Los lotes no se descuentan al consumir (solo suben con las compras), así
+    que su cantidad_actual no dice cuánto queda de cada uno. `vencido`
+    supone consumo por orden de vencimiento: el stock actual está primero
+    en los lotes que vencen en `fecha` o después (o sin fecha), y solo lo
+    que exceda a esos lotes puede seguir en los que vencen antes:
+
+        vencido = min(lotes que vencen antes, max(stock - lotes vigentes, 0))
+ El faltante se informa en unidad del insumo y, si el
+    insumo tiene unidad_compra, en unidades de compra enteras
+    (faltante / factor_conversion, hacia arriba).
+
+    Tres consultas sin importar el tamaño del plan: recetas, stocks y
+    lotes. `fecha` es el día de producción (por defecto, mañana).
+    Los platos sin líneas de receta válidas se devuelven aparte.
+    """
+    if fecha is None:
+        fecha = timezone.localdate() + timedelta(days=1)
+
+    # Porciones pedidas por (plato, almacén); un plato puede repetirse.
+    pedido: dict[tuple[int, int], Decimal] = defaultdict(Decimal)
+    for linea in lineas:
+        pedido[(linea.plato_id, linea.almacen_id)] += linea.cantidad
+    plato_ids = {plato_id for plato_id, _ in pedido}
+    almacen_ids = {almacen_id for _, almacen_id in pedido}
+
+    recetas: dict[int, list[tuple[int, Decimal]]] = defaultdict(list)
+    insumos: dict[int, tuple] = {}
+    filas_receta = RecetaInsumo.objects.filter(
+        plato_id__in=plato_ids, cantidad__gt=0
+    ).values_list(
+        "plato_id",
+        "insumo_id",
+        "cantidad",
+        "insumo__nombre",
+        "insumo__unidad__abreviatura",
+        "insumo__unidad_compra__abreviatura",
+        "insumo__factor_conversion",
+    )
+    for plato_id, insumo_id, cantidad, *datos_insumo in filas_receta:
+        recetas[plato_id].append((insumo_id, cantidad))
+        insumos[insumo_id] = datos_insumo
+
+    requerido: dict[tuple[int, int], Decimal] = defaultdict(Decimal)
+    for (plato_id, almacen_id), porciones in pedido.items():
+        for insumo_id, cantidad in recetas.get(plato_id, ()):
+            requerido[(insumo_id, almacen_id)] += cantidad * porciones
+
+    stocks: dict[tuple[int, int], Decimal] = {}
+    lotes: dict[tuple[int, int], tuple] = {}
+    if requerido:
+        stocks = {
+            (insumo_id, almacen_id): cantidad
+            for insumo_id, almacen_id, cantidad in StockInsumo.objects.filter(
+                insumo_id__in=list(insumos), almacen_id__in=list(almacen_ids)
+            ).values_list("insumo_id", "almacen_id", "cantidad_actual")
+        }
+        # ~vence_antes incluye los lotes sin fecha de vencimiento
+        vence_antes = Q(fecha_vencimiento__lt=fecha)
+        lotes = {
+            (fila["insumo_id"], fila["almacen_id"]): (
+                fila["vencidos"] or Decimal("0"),
+                fila["vigentes"] or Decimal("0"),
+            )
+            for fila in LoteInsumo.objects.filter(
+                insumo_id__in=list(insumos),
+                almacen_id__in=list(almacen_ids),
+                activo=True,
+                cantidad_actual__gt=0,
+            )
+            .order_by()
+            .values("insumo_id", "almacen_id")
+            .annotate(
+                vencidos=Sum("cantidad_actual", filter=vence_antes),
+                vigentes=Sum("cantidad_actual", filter=~vence_antes),
+            )
+        }
+
+    requerimientos = []
+    for (insumo_id, almacen_id), cantidad in requerido.items():
+        nombre, unidad, unidad_compra, factor = insumos[insumo_id]
+        stock = stocks.get((insumo_id, almacen_id), Decimal("0"))
+        en_vencidos, en_vigentes = lotes.get((insumo_id, almacen_id), (Decimal("0"), Decimal("0")))
+        vencido = min(en_vencidos, max(stock - en_vigentes, Decimal("0")))
+        disponible = max(stock - vencido, Decimal("0"))
+        faltante = max(cantidad - disponible, Decimal("0"))
+
+        faltante_compra = None
+        if unidad_compra and factor:
+            faltante_compra = (faltante / factor).to_integral_value(rounding=ROUND_CEILING)
+
+        requerimientos.append(
+            RequerimientoInsumo(
+                insumo_id=insumo_id,
+                insumo=nombre,
+                almacen_id=almacen_id,
+                unidad=unidad,
+                requerido=cantidad,
+                stock=stock,
+                vencido=vencido,
+                disponible=disponible,
+                faltante=faltante,
+                unidad_compra=unidad_compra,
+                factor_conversion=factor,
+                faltante_compra=faltante_compra,
+            )
+        )
+    requerimientos.sort(key=lambda r: (r.almacen_id, r.insumo.lower(), r.insumo_id))
+
+    return ResultadoPlanProduccion(
+        fecha=fecha,
+        requerimientos=requerimientos,
+        platos_sin_receta=sorted(plato_ids - set(recetas)),
+    )
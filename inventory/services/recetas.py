@@ -1,10 +1,18 @@
 # inventory/services/recetas.py
 
-from decimal import Decimal
+import csv
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator
 
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
 from django.utils import timezone
 
-from inventory.models import Plato, RecetaInsumo
+from inventory.models import Insumo, Plato, RecetaInsumo
+from inventory.services.importacion import ErrorFila, ImportacionError
 
 
 def calcular_costo_receta(*, plato: Plato, guardar: bool = False) -> Decimal:
@@ -42,4 +50,234 @@ def calcular_costo_receta(*, plato: Plato, guardar: bool = False) -> Decimal:
         plato.updated_at = timezone.now()
         plato.save(update_fields=["costo_receta", "updated_at"])
 
-    return total
\ No newline at end of file
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Importación / exportación masiva de recetas
+# ---------------------------------------------------------------------------
+
+COLUMNAS_RECETA = ("plato", "insumo", "cantidad")
+
+_CANTIDAD_RECETA = DecimalField(max_digits=12, decimal_places=4)
+
+
+@dataclass
+class ResultadoImportacionRecetas:
+    procesadas: int = 0
+    creadas: int = 0
+    actualizadas: int = 0
+    eliminadas: int = 0
+    sin_cambios: int = 0
+    platos_recosteados: int = 0
+    simulado: bool = False
+    errores: list[ErrorFila] = field(default_factory=list)
+
+    @property
+    def con_errores(self) -> int:
+        return len(self.errores)
+
+
+def recostear_platos(plato_ids: Iterable[int]) -> int:
+    """
+    Recalcula costo_receta de varios platos en un solo UPDATE:
+        costo_receta = SUM(cantidad * insumo.costo_promedio)  (0 si no hay receta)
+    Equivalente a calcular_costo_receta(guardar=True) para cada plato.
+    Retorna la cantidad de platos actualizados.
+    """
+    plato_ids = set(plato_ids)
+    if not plato_ids:
+        return 0
+
+    costo = (
+        RecetaInsumo.objects.filter(plato=OuterRef("pk"))
+        .order_by()
+        .values("plato")
+        .annotate(total=Sum(F("cantidad") * F("insumo__costo_promedio")))
+        .values("total")
+    )
+    return Plato.objects.filter(pk__in=plato_ids).update(
+        costo_receta=Round(
+            Coalesce(
+                Subquery(costo, output_field=_CANTIDAD_RECETA),
+                Value(Decimal("0"), output_field=_CANTIDAD_RECETA),
+            ),
+            4,
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _cantidad_receta(valor, errores: list[str]) -> Decimal | None:
+    """
+    Cantidad > 0 redondeada a los decimales de RecetaInsumo.cantidad. Lo que
+    no cabe en el campo (max_digits) se informa como error de la fila en
+    lugar de fallar al guardar.
+    """
+    texto = str(valor if valor is not None else "").strip()
+    campo = RecetaInsumo._meta.get_field("cantidad")
+    enteros = campo.max_digits - campo.decimal_places
+    try:
+        cantidad = Decimal(texto.replace(",", "."))
+        if cantidad.is_finite() and cantidad > 0 and cantidad.adjusted() < enteros:
+            cantidad = cantidad.quantize(Decimal(1).scaleb(-campo.decimal_places))
+    except InvalidOperation:
+        cantidad = None
+    if cantidad is None or not cantidad.is_finite() or cantidad <= 0:
+        errores.append(f"cantidad: '{texto}' debe ser un número > 0.")
+        return None
+    if cantidad.adjusted() >= enteros:
+        errores.append(f"cantidad: admite como máximo {enteros} dígitos enteros.")
+        return None
+    return cantidad
+
+
+def importar_recetas(
+    filas: Iterable[dict],
+    *,
+    eliminar_faltantes: bool = True,
+    simular: bool = False,
+) -> ResultadoImportacionRecetas:
+    """
+    Importa recetas completas desde filas {plato, insumo, cantidad}
+    (plato e insumo por nombre, sin distinguir mayúsculas).
+
+    Cada plato presente en las filas queda con exactamente esas líneas:
+    se calcula en memoria el diff contra las RecetaInsumo existentes y solo
+    se escriben los cambios (bulk_create / bulk_update / un DELETE). Con
+    eliminar_faltantes=False las líneas que no vienen en el archivo se
+    conservan. Los platos no mencionados no se tocan.
+
+    Un plato con alguna fila inválida se omite completo (para no dejar su
+    receta a medias); las filas inválidas se informan con su número.
+    Al final se recostean en un solo UPDATE los platos modificados.
+    Con simular=True se devuelven los contadores sin escribir nada.
+    """
+    platos = {
+        nombre.strip().lower(): pk
+        for pk, nombre in Plato.objects.values_list("pk", "nombre")
+    }
+    insumos = {
+        nombre.strip().lower(): (pk, activo)
+        for pk, nombre, activo in Insumo.objects.values_list("pk", "nombre", "activo")
+    }
+
+    resultado = ResultadoImportacionRecetas(simulado=simular)
+    deseado: dict[int, dict[int, Decimal]] = defaultdict(dict)
+    platos_con_error: set[int] = set()
+
+    for numero, fila in enumerate(filas, start=2):
+        resultado.procesadas += 1
+        valores = {
+            col: str(fila.get(col) if fila.get(col) is not None else "").strip()
+            for col in COLUMNAS_RECETA
+        }
+        errores = []
+
+        plato_id = platos.get(valores["plato"].lower())
+        if plato_id is None:
+            errores.append(f"plato: '{valores['plato']}' no existe.")
+
+        insumo_id, activo = insumos.get(valores["insumo"].lower(), (None, False))
+        if insumo_id is None:
+            errores.append(f"insumo: '{valores['insumo']}' no existe.")
+        elif not activo:
+            errores.append(f"insumo: '{valores['insumo']}' está inactivo.")
+
+        cantidad = _cantidad_receta(fila.get("cantidad"), errores)
+
+        if plato_id is not None and insumo_id in deseado[plato_id]:
+            errores.append("insumo: repetido en la receta de este plato.")
+
+        if errores:
+            if plato_id is not None:
+                platos_con_error.add(plato_id)
+            resultado.errores.append(
+                ErrorFila(fila=numero, nombre=valores["plato"], errores=errores)
+            )
+            continue
+
+        deseado[plato_id][insumo_id] = cantidad
+
+    for plato_id in platos_con_error:
+        deseado.pop(plato_id, None)
+    if not deseado:
+        return resultado
+
+    ahora = timezone.now()
+    nuevas, modificadas, eliminar = [], [], []
+    existentes = RecetaInsumo.objects.filter(plato_id__in=deseado).values_list(
+        "pk", "plato_id", "insumo_id", "cantidad"
+    )
+    vistos, tocados = set(), set()
+    for pk, plato_id, insumo_id, cantidad_actual in existentes:
+        vistos.add((plato_id, insumo_id))
+        cantidad = deseado[plato_id].get(insumo_id)
+        if cantidad is None:
+            if eliminar_faltantes:
+                eliminar.append(pk)
+                tocados.add(plato_id)
+        elif cantidad != cantidad_actual:
+            modificadas.append(RecetaInsumo(pk=pk, cantidad=cantidad, updated_at=ahora))
+            tocados.add(plato_id)
+        else:
+            resultado.sin_cambios += 1
+
+    for plato_id, lineas in deseado.items():
+        for insumo_id, cantidad in lineas.items():
+            if (plato_id, insumo_id) not in vistos:
+                nuevas.append(
+                    RecetaInsumo(plato_id=plato_id, insumo_id=insumo_id, cantidad=cantidad)
+                )
+                tocados.add(plato_id)
+
+    resultado.creadas = len(nuevas)
+    resultado.actualizadas = len(modificadas)
+    resultado.eliminadas = len(eliminar)
+
+    if simular:
+        resultado.platos_recosteados = len(tocados)
+        return resultado
+
+    with transaction.atomic():
+        if eliminar:
+            RecetaInsumo.objects.filter(pk__in=eliminar).delete()
+        if modificadas:
+            RecetaInsumo.objects.bulk_update(modificadas, ["cantidad", "updated_at"])
+        if nuevas:
+            RecetaInsumo.objects.bulk_create(nuevas)
+        resultado.platos_recosteados = recostear_platos(tocados)
+
+    return resultado
+
+
+def filas_recetas_csv(lineas: Iterable[str]) -> Iterator[dict]:
+    """Filas {plato, insumo, cantidad} desde un CSV con encabezados."""
+    lector = csv.DictReader(lineas)
+    encabezados = [(col or "").strip().lower() for col in (lector.fieldnames or [])]
+    faltantes = [col for col in COLUMNAS_RECETA if col not in encabezados]
+    if faltantes:
+        raise ImportacionError(f"Faltan columnas obligatorias: {', '.join(faltantes)}.")
+    lector.fieldnames = encabezados
+    yield from lector
+
+
+def exportar_recetas(plato_ids: Iterable[int] | None = None) -> Iterator[dict]:
+    """
+    Recetas como filas {plato, insumo, cantidad} (mismo formato que
+    importar_recetas), ordenadas por plato e insumo. Una sola consulta,
+    leída por bloques.
+    """
+    qs = RecetaInsumo.objects.order_by("plato__nombre", "insumo__nombre")
+    if plato_ids is not None:
+        qs = qs.filter(plato_id__in=plato_ids)
+    for plato, insumo, cantidad in qs.values_list(
+        "plato__nombre", "insumo__nombre", "cantidad"
+    ).iterator(chunk_size=2000):
+        yield {"plato": plato, "insumo": insumo, "cantidad": cantidad}
+
+
+def escribir_recetas_csv(filas: Iterable[dict], destino) -> None:
+    escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_RECETA)
+    escritor.writeheader()
+    escritor.writerows(filas)
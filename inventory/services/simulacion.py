@@ -0,0 +1,212 @@
+# inventory/services/simulacion.py
+"""
+Simulación de costos "¿qué pasa si?" sobre todo el menú: con costos
+hipotéticos de algunos insumos (p. ej. carne +12%, aceite −5%) recalcula
+el costo de receta, el food cost y el margen de cada plato activo sin
+escribir en la BD.
+
+La matriz de recetas (plato × insumo, dispersa) se arma una vez y queda en
+memoria del proceso. Antes de usarla se compara una huella (cantidad y
+último updated_at de platos, recetas e insumos, tres agregados por índice):
+si algo cambió, en este o en otro worker, se reconstruye.
+
+Cada simulación parte del costo actual de todos los platos y le suma solo
+las columnas de los insumos modificados:
+
+    costo_simulado = costo_actual + Σ_insumo cantidad[plato, insumo] × Δcosto[insumo]
+
+es decir, un producto matriz-vector disperso sobre las columnas tocadas.
+"""
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+from django.db.models import Count, Max
+
+from inventory.models import Insumo, Plato, RecetaInsumo
+
+
+_CUATRO = Decimal("0.0001")
+_DOS = Decimal("0.01")
+_CIEN = Decimal("100")
+
+
+@dataclass(frozen=True)
+class MatrizRecetas:
+    # filas: (id, nombre, precio_venta) de los platos activos
+    platos: list[tuple[int, str, Decimal]]
+    # columnas por insumo (formato disperso por columna): [(fila, cantidad), ...]
+    columnas: dict[int, list[tuple[int, Decimal]]]
+    costos_insumo: dict[int, Decimal]
+    # matriz × costos_insumo, una componente por plato
+    costos_plato: list[Decimal]
+
+
+@dataclass(frozen=True)
+class VariacionCosto:
+    """Costo hipotético de un insumo: absoluto o como porcentaje sobre el actual."""
+
+    insumo_id: int
+    costo_promedio: Decimal | None = None
+    variacion_porcentaje: Decimal | None = None
+
+
+@dataclass
+class ImpactoPlato:
+    plato_id: int
+    nombre: str
+    precio_venta: Decimal
+    costo_actual: Decimal
+    costo_simulado: Decimal
+    diferencia: Decimal
+    food_cost_actual: Decimal | None
+    food_cost_simulado: Decimal | None
+    margen_actual: Decimal
+    margen_simulado: Decimal
+
+
+@dataclass
+class ResultadoSimulacion:
+    platos_afectados: int
+    diferencia_total: Decimal
+    impactos: list[ImpactoPlato]
+
+
+def _huella() -> tuple:
+    """Cambia con cualquier alta, baja o modificación de platos, recetas o insumos."""
+    return tuple(
+        valor
+        for modelo in (Plato, RecetaInsumo, Insumo)
+        for valor in modelo.objects.order_by().aggregate(
+            total=Count("id"), ultimo=Max("updated_at")
+        ).values()
+    )
+
+
+def construir_matriz_recetas() -> MatrizRecetas:
+    """Dos consultas: platos activos y líneas de receta con el costo del insumo."""
+    platos = list(
+        Plato.objects.filter(activo=True)
+        .order_by("nombre", "id")
+        .values_list("id", "nombre", "precio_venta")
+    )
+    fila = {plato_id: i for i, (plato_id, _, _) in enumerate(platos)}
+
+    columnas: dict[int, list[tuple[int, Decimal]]] = {}
+    costos_insumo: dict[int, Decimal] = {}
+    costos_plato = [Decimal("0")] * len(platos)
+    for plato_id, insumo_id, cantidad, costo in RecetaInsumo.objects.filter(
+        plato__activo=True, cantidad__gt=0
+    ).values_list("plato_id", "insumo_id", "cantidad", "insumo__costo_promedio"):
+        i = fila[plato_id]
+        columnas.setdefault(insumo_id, []).append((i, cantidad))
+        costos_insumo[insumo_id] = costo or Decimal("0")
+        costos_plato[i] += cantidad * costos_insumo[insumo_id]
+
+    return MatrizRecetas(
+        platos=platos,
+        columnas=columnas,
+        costos_insumo=costos_insumo,
+        costos_plato=costos_plato,
+    )
+
+
+class CacheMatrizRecetas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._huella = None
+        self._matriz: MatrizRecetas | None = None
+        self.construcciones = 0
+
+    def obtener(self) -> MatrizRecetas:
+        huella = _huella()
+        with self._lock:
+            if self._matriz is not None and self._huella == huella:
+                return self._matriz
+        matriz = construir_matriz_recetas()
+        with self._lock:
+            self._huella, self._matriz = huella, matriz
+            self.construcciones += 1
+        return matriz
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._huella = self._matriz = None
+            self.construcciones = 0
+
+
+cache_matriz_recetas = CacheMatrizRecetas()
+
+
+def _food_cost(costo: Decimal, precio: Decimal) -> Decimal | None:
+    if not precio or precio <= 0:
+        return None
+    return (costo / precio * _CIEN).quantize(_DOS)
+
+
+def simular_costos(
+    variaciones: Iterable[VariacionCosto],
+    *,
+    solo_afectados: bool = True,
+    limite: int | None = None,
+) -> ResultadoSimulacion:
+    """
+    Costo, food cost y margen de cada plato activo con los costos
+    hipotéticos de `variaciones`, ordenados por mayor aumento de costo.
+
+    Los insumos que no están en ninguna receta activa no tienen efecto. Con
+    solo_afectados=False se listan también los platos sin cambios. Cada
+    variación parte del costo actual: se espera una sola por insumo.
+    """
+    matriz = cache_matriz_recetas.obtener()
+
+    costos = list(matriz.costos_plato)
+    afectados: set[int] = set()
+    for variacion in variaciones:
+        columna = matriz.columnas.get(variacion.insumo_id)
+        if not columna:
+            continue
+        actual = matriz.costos_insumo[variacion.insumo_id]
+        if variacion.costo_promedio is not None:
+            nuevo = variacion.costo_promedio
+        else:
+            nuevo = actual * (1 + variacion.variacion_porcentaje / _CIEN)
+        delta = nuevo - actual
+        if not delta:
+            continue
+        for i, cantidad in columna:
+            costos[i] += cantidad * delta
+            afectados.add(i)
+
+    filas = afectados if solo_afectados else range(len(matriz.platos))
+    impactos = []
+    diferencia_total = Decimal("0")
+    for i in filas:
+        plato_id, nombre, precio = matriz.platos[i]
+        costo_actual = matriz.costos_plato[i].quantize(_CUATRO)
+        costo_simulado = costos[i].quantize(_CUATRO)
+        diferencia = costo_simulado - costo_actual
+        diferencia_total += diferencia
+        impactos.append(
+            ImpactoPlato(
+                plato_id=plato_id,
+                nombre=nombre,
+                precio_venta=precio,
+                costo_actual=costo_actual,
+                costo_simulado=costo_simulado,
+                diferencia=diferencia,
+                food_cost_actual=_food_cost(costo_actual, precio),
+                food_cost_simulado=_food_cost(costo_simulado, precio),
+                margen_actual=precio - costo_actual,
+                margen_simulado=precio - costo_simulado,
+            )
+        )
+    impactos.sort(key=lambda impacto: (-impacto.diferencia, impacto.nombre))
+
+    return ResultadoSimulacion(
+        platos_afectados=len(afectados),
+        diferencia_total=diferencia_total,
+        impactos=impactos[:limite] if limite else impactos,
+    )
@@ -0,0 +1,249 @@
+# inventory/services/sincronizacion.py
+"""
+Feed de cambios para la sincronización incremental de clientes (POS,
+tablets): dado un cursor devuelve las filas de insumos, stocks, platos y
+recetas modificadas desde entonces y las eliminadas (RegistroEliminado).
+
+El cursor guarda, por fuente, la posición (updated_at, id) hasta la que ya
+se entregó. Cada fuente se recorre por el índice (updated_at, id) con
+keyset, así que un cliente que vuelve tras unos minutos lee unas pocas
+filas. Para no perder transacciones que confirman tarde (updated_at se
+fija antes del COMMIT), la posición nunca pasa de `ahora - MARGEN`: las
+filas de los últimos segundos se vuelven a enviar en la siguiente
+consulta y el cliente las aplica de forma idempotente (upsert por id).
+
+Configuración: settings.INVENTARIO_SINCRONIZACION (LIMITE, MARGEN en
+segundos, RETENCION_DIAS de las lápidas, MAX_LOTE_VENTAS para la subida de
+ventas offline, ver services.inventory.registrar_consumos_lote).
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from inventory.models import Insumo, Plato, RecetaInsumo, RegistroEliminado, StockInsumo
+
+
+CONFIGURACION_SINCRONIZACION = {
+    "LIMITE": 1000,
+    "MARGEN": 5,
+    "RETENCION_DIAS": 30,
+    # Ventas offline por POST /api/sincronizacion/ventas/
+    "MAX_LOTE_VENTAS": 5000,
+}
+
+
+def configuracion_sincronizacion() -> dict:
+    return {
+        **CONFIGURACION_SINCRONIZACION,
+        **getattr(settings, "INVENTARIO_SINCRONIZACION", {}),
+    }
+
+
+@dataclass(frozen=True)
+class FuenteSincronizacion:
+    modelo: type[models.Model]
+    # (nombre público, ruta ORM) — las mismas columnas del formato columnar
+    columnas: tuple[tuple[str, str], ...]
+
+
+FUENTES_SINCRONIZACION = {
+    "insumos": FuenteSincronizacion(
+        Insumo,
+        (
+            ("id", "id"),
+            ("nombre", "nombre"),
+            ("unidad", "unidad_id"),
+            ("unidad_compra", "unidad_compra_id"),
+            ("factor_conversion", "factor_conversion"),
+            ("proveedor_principal", "proveedor_principal_id"),
+            ("categoria", "categoria_id"),
+            ("activo", "activo"),
+            ("stock_minimo", "stock_minimo"),
+            ("stock_maximo", "stock_maximo"),
+            ("costo_promedio", "costo_promedio"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "stocks_insumo": FuenteSincronizacion(
+        StockInsumo,
+        (
+            ("id", "id"),
+            ("insumo", "insumo_id"),
+            ("almacen", "almacen_id"),
+            ("cantidad_actual", "cantidad_actual"),
+            ("costo_promedio", "costo_promedio"),
+            ("version", "version"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "platos": FuenteSincronizacion(
+        Plato,
+        (
+            ("id", "id"),
+            ("nombre", "nombre"),
+            ("categoria", "categoria_id"),
+            ("activo", "activo"),
+            ("precio_venta", "precio_venta"),
+            ("costo_receta", "costo_receta"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "recetas_insumo": FuenteSincronizacion(
+        RecetaInsumo,
+        (
+            ("id", "id"),
+            ("plato", "plato_id"),
+            ("insumo", "insumo_id"),
+            ("cantidad", "cantidad"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+}
+
+# Modelo -> nombre de la fuente (para registrar las eliminaciones)
+MODELOS_SINCRONIZABLES = {
+    fuente.modelo: nombre for nombre, fuente in FUENTES_SINCRONIZACION.items()
+}
+
+_ELIMINADOS = "eliminados"
+
+Posicion = tuple[datetime, int]
+
+
+class CursorInvalidoError(ValueError):
+    pass
+
+
+class CursorVencidoError(Exception):
+    """El cursor es anterior a la retención de lápidas: hay que resincronizar."""
+
+
+def codificar_cursor(posiciones: dict[str, Posicion]) -> str:
+    datos = {
+        nombre: [momento.isoformat(), pk] for nombre, (momento, pk) in posiciones.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode()
+
+
+def decodificar_cursor(cursor: str) -> dict[str, Posicion]:
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {
+            nombre: (datetime.fromisoformat(momento), int(pk))
+            for nombre, (momento, pk) in datos.items()
+        }
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise CursorInvalidoError("Cursor de sincronización inválido.") from exc
+
+
+@dataclass
+class ResultadoCambios:
+    cursor: str
+    hay_mas: bool
+    # fuente -> {"columns": [...], "rows": [[...], ...]}
+    cambios: dict[str, dict] = field(default_factory=dict)
+    # fuente -> ids eliminados
+    eliminados: dict[str, list[int]] = field(default_factory=dict)
+
+
+def _despues_de(campo_fecha: str, posicion: Posicion | None) -> Q:
+    if posicion is None:
+        return Q()
+    momento, pk = posicion
+    return Q(**{f"{campo_fecha}__gt": momento}) | Q(**{campo_fecha: momento, "pk__gt": pk})
+
+
+def obtener_cambios(
+    cursor: str | None = None,
+    *,
+    limite: int | None = None,
+    ahora: datetime | None = None,
+) -> ResultadoCambios:
+    """
+    Cambios desde `cursor` (None = sincronización completa, sin
+    eliminaciones). A lo sumo `limite` filas por fuente; si alguna fuente
+    tenía más, `hay_mas` es True y el cliente debe volver a pedir con el
+    cursor nuevo hasta que sea False.
+
+    Lanza CursorInvalidoError si el cursor no se puede leer y
+    CursorVencidoError si es más viejo que la retención de lápidas.
+    """
+    config = configuracion_sincronizacion()
+    limite = limite or config["LIMITE"]
+    ahora = ahora or timezone.now()
+    tope: Posicion = (ahora - timedelta(seconds=config["MARGEN"]), 0)
+
+    posiciones = decodificar_cursor(cursor) if cursor else {}
+    if cursor:
+        vencimiento = ahora - timedelta(days=config["RETENCION_DIAS"])
+        eliminados_desde = posiciones.get(_ELIMINADOS)
+        if eliminados_desde is None or eliminados_desde[0] < vencimiento:
+            raise CursorVencidoError(
+                "El cursor es anterior a la retención de eliminaciones; sincronice desde cero."
+            )
+
+    nuevas: dict[str, Posicion] = {}
+    resultado = ResultadoCambios(cursor="", hay_mas=False)
+
+    for nombre, fuente in FUENTES_SINCRONIZACION.items():
+        rutas = [ruta for _, ruta in fuente.columnas]
+        filas = list(
+            fuente.modelo.objects.filter(_despues_de("updated_at", posiciones.get(nombre)))
+            .order_by("updated_at", "pk")
+            .values_list(*rutas, "updated_at", "pk")[: limite + 1]
+        )
+        if len(filas) > limite:
+            filas = filas[:limite]
+            nuevas[nombre] = (filas[-1][-2], filas[-1][-1])
+            resultado.hay_mas = True
+        else:
+            nuevas[nombre] = tope
+        n = len(rutas)
+        resultado.cambios[nombre] = {
+            "columns": [publico for publico, _ in fuente.columnas],
+            "rows": [fila[:n] for fila in filas],
+        }
+
+    if cursor:
+        lapidas = list(
+            RegistroEliminado.objects.filter(
+                _despues_de("eliminado_en", posiciones[_ELIMINADOS])
+            )
+            .order_by("eliminado_en", "pk")
+            .values_list("modelo", "objeto_id", "eliminado_en", "pk")[: limite + 1]
+        )
+        if len(lapidas) > limite:
+            lapidas = lapidas[:limite]
+            nuevas[_ELIMINADOS] = (lapidas[-1][2], lapidas[-1][3])
+            resultado.hay_mas = True
+        else:
+            nuevas[_ELIMINADOS] = tope
+        for modelo, objeto_id, _, _ in lapidas:
+            resultado.eliminados.setdefault(modelo, []).append(objeto_id)
+    else:
+        # Un cliente nuevo no tiene nada que borrar.
+        nuevas[_ELIMINADOS] = tope
+
+    resultado.cursor = codificar_cursor(nuevas)
+    return resultado
+
+
+def registrar_eliminacion(instance: models.Model) -> None:
+    nombre = MODELOS_SINCRONIZABLES.get(type(instance))
+    if nombre is not None:
+        RegistroEliminado.objects.create(modelo=nombre, objeto_id=instance.pk)
+
+
+def purgar_registros_eliminados(*, ahora: datetime | None = None) -> int:
+    """Borra las lápidas más viejas que la retención. Retorna cuántas."""
+    config = configuracion_sincronizacion()
+    limite = (ahora or timezone.now()) - timedelta(days=config["RETENCION_DIAS"])
+    borrados, _ = RegistroEliminado.objects.filter(eliminado_en__lt=limite).delete()
+    return borrados
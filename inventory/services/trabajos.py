@@ -0,0 +1,214 @@
+# inventory/services/trabajos.py
+
+import logging
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from inventory.models import Trabajo
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrabajoError(Exception):
+    """Error definitivo de una tarea: el trabajo falla sin reintentos."""
+    pass
+
+
+CONFIGURACION_TRABAJOS = {
+    # Ejecutar las tareas en el momento en que se encolan (sin worker).
+    "SINCRONICO": False,
+    "MAX_INTENTOS": 3,
+    # Espera antes del primer reintento, en segundos; se duplica en cada uno.
+    "RETARDO_REINTENTO": 30,
+    # Un trabajo en proceso sin actualizaciones por más de esto (segundos)
+    # se considera colgado (worker caído) y se vuelve a encolar.
+    "TIEMPO_MAXIMO": 15 * 60,
+}
+
+TAREAS: dict[str, Callable] = {}
+
+
+def configuracion_trabajos() -> dict:
+    return {**CONFIGURACION_TRABAJOS, **getattr(settings, "INVENTARIO_TRABAJOS", {})}
+
+
+def tarea(nombre: str):
+    """
+    Registra una función como tarea encolable. La función recibe el
+    Trabajo (para reportar_progreso) y los parámetros como kwargs, y
+    devuelve el resultado (serializable a JSON).
+    """
+    def registrar(funcion):
+        TAREAS[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def encolar(
+    tipo: str,
+    parametros: dict | None = None,
+    *,
+    clave_idempotencia: str = "",
+    usuario=None,
+    max_intentos: int | None = None,
+) -> Trabajo:
+    """
+    Crea un trabajo pendiente y lo devuelve.
+
+    - Si ya existe un trabajo del mismo tipo con la misma
+      `clave_idempotencia`, devuelve ese (no se encola de nuevo). Uno
+      fallido no cuenta: se le quita la clave (queda en el historial) y se
+      encola otro, para poder reintentar tras corregir los datos.
+    - Con INVENTARIO_TRABAJOS["SINCRONICO"] la tarea se ejecuta aquí mismo
+      y el trabajo vuelve ya terminado.
+    """
+    if tipo not in TAREAS:
+        raise ValueError(f"Tarea desconocida: {tipo}.")
+
+    config = configuracion_trabajos()
+    if clave_idempotencia:
+        existente = Trabajo.objects.filter(
+            tipo=tipo, clave_idempotencia=clave_idempotencia
+        ).first()
+        if existente is not None and existente.estado != Trabajo.ESTADO_FALLIDO:
+            return existente
+        if existente is not None:
+            Trabajo.objects.filter(pk=existente.pk, estado=Trabajo.ESTADO_FALLIDO).update(
+                clave_idempotencia="", updated_at=timezone.now()
+            )
+
+    try:
+        with transaction.atomic():
+            trabajo = Trabajo.objects.create(
+                tipo=tipo,
+                parametros=parametros or {},
+                clave_idempotencia=clave_idempotencia,
+                usuario=usuario if getattr(usuario, "is_authenticated", False) else None,
+                max_intentos=max_intentos or config["MAX_INTENTOS"],
+            )
+    except IntegrityError:
+        # otra petición con la misma clave ganó la carrera
+        return Trabajo.objects.get(tipo=tipo, clave_idempotencia=clave_idempotencia)
+
+    if config["SINCRONICO"]:
+        trabajo.estado = Trabajo.ESTADO_EN_PROCESO
+        trabajo.intentos = 1
+        trabajo.iniciado_en = timezone.now()
+        ejecutar_trabajo(trabajo)
+
+    return trabajo
+
+
+def tomar_trabajo() -> Trabajo | None:
+    """
+    Reserva el próximo trabajo disponible para este worker.
+
+    La reserva es un UPDATE condicionado al estado pendiente: si otro
+    proceso tomó el mismo trabajo el UPDATE afecta 0 filas y se prueba con
+    el siguiente. Funciona igual en SQLite y en PostgreSQL, sin bloqueos.
+    """
+    ahora = timezone.now()
+    candidatos = list(
+        Trabajo.objects.filter(
+            estado=Trabajo.ESTADO_PENDIENTE, disponible_desde__lte=ahora
+        )
+        .order_by("disponible_desde", "id")
+        .values_list("pk", flat=True)[:10]
+    )
+    for pk in candidatos:
+        tomado = Trabajo.objects.filter(pk=pk, estado=Trabajo.ESTADO_PENDIENTE).update(
+            estado=Trabajo.ESTADO_EN_PROCESO,
+            intentos=F("intentos") + 1,
+            iniciado_en=ahora,
+            updated_at=ahora,
+        )
+        if tomado:
+            return Trabajo.objects.get(pk=pk)
+    return None
+
+
+def ejecutar_trabajo(trabajo: Trabajo) -> Trabajo:
+    """
+    Ejecuta la tarea de un trabajo ya reservado y guarda el resultado.
+
+    Si la tarea falla con un error transitorio y quedan intentos, el
+    trabajo vuelve a pendiente con espera exponencial; con TrabajoError
+    (o sin intentos) queda fallido.
+    """
+    config = configuracion_trabajos()
+    funcion = TAREAS.get(trabajo.tipo)
+    try:
+        if funcion is None:
+            raise TrabajoError(f"Tarea desconocida: {trabajo.tipo}.")
+        if transaction.get_connection().in_atomic_block:
+            # modo sincrónico dentro de otra transacción: si la tarea falla
+            # se revierte solo lo suyo y el trabajo se puede guardar igual
+            with transaction.atomic():
+                resultado = funcion(trabajo, **trabajo.parametros)
+        else:
+            resultado = funcion(trabajo, **trabajo.parametros)
+    except Exception as exc:
+        if isinstance(exc, TrabajoError):
+            logger.warning("Falló el trabajo %s: %s", trabajo, exc)
+            trabajo.error = str(exc)
+        else:
+            logger.exception("Falló el trabajo %s", trabajo)
+            trabajo.error = f"{type(exc).__name__}: {exc}"
+        ahora = timezone.now()
+        if not isinstance(exc, TrabajoError) and trabajo.intentos < trabajo.max_intentos:
+            espera = config["RETARDO_REINTENTO"] * 2 ** (trabajo.intentos - 1)
+            trabajo.estado = Trabajo.ESTADO_PENDIENTE
+            trabajo.disponible_desde = ahora + timedelta(seconds=espera)
+        else:
+            trabajo.estado = Trabajo.ESTADO_FALLIDO
+            trabajo.finalizado_en = ahora
+    else:
+        trabajo.estado = Trabajo.ESTADO_COMPLETADO
+        trabajo.progreso = 100
+        trabajo.resultado = resultado
+        trabajo.error = ""
+        trabajo.finalizado_en = timezone.now()
+
+    trabajo.save()
+    return trabajo
+
+
+def recuperar_trabajos_colgados() -> int:
+    """
+    Vuelve a encolar los trabajos en proceso sin latido reciente (worker
+    caído a mitad de camino). Los que ya agotaron sus intentos fallan.
+    """
+    config = configuracion_trabajos()
+    limite = timezone.now() - timedelta(seconds=config["TIEMPO_MAXIMO"])
+    colgados = Trabajo.objects.filter(
+        estado=Trabajo.ESTADO_EN_PROCESO, updated_at__lt=limite
+    )
+    ahora = timezone.now()
+    fallidos = colgados.filter(intentos__gte=F("max_intentos")).update(
+        estado=Trabajo.ESTADO_FALLIDO,
+        error="Tiempo máximo de ejecución superado.",
+        finalizado_en=ahora,
+        updated_at=ahora,
+    )
+    reencolados = colgados.update(
+        estado=Trabajo.ESTADO_PENDIENTE, disponible_desde=ahora, updated_at=ahora
+    )
+    return fallidos + reencolados
+
+
+def procesar_pendientes(limite: int | None = None) -> int:
+    """Ejecuta trabajos disponibles hasta vaciar la cola (o `limite`)."""
+    procesados = 0
+    while limite is None or procesados < limite:
+        trabajo = tomar_trabajo()
+        if trabajo is None:
+            break
+        ejecutar_trabajo(trabajo)
+        procesados += 1
+    return procesados
@@ -0,0 +1,103 @@
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from inventory.cache_stock import invalidar_stocks_al_confirmar
+from inventory.catalogos import CATALOGOS, invalidar_catalogo_al_confirmar
+from inventory.eventos_stock import publicar_stocks_al_confirmar
+from inventory.models import StockInsumo
+from inventory.services.busqueda import (
+    DEPENDENCIAS_BUSQUEDA,
+    INDICES_BUSQUEDA,
+    campos_busqueda,
+    campos_dependientes_busqueda,
+    dependientes_busqueda,
+    indexar,
+    texto_dependiente_busqueda,
+)
+from inventory.services.sincronizacion import MODELOS_SINCRONIZABLES, registrar_eliminacion
+
+# Los receptores de varios modelos se conectan modelo por modelo al final
+# (nunca sin sender): un post_delete/pre_delete global haría que Django
+# deje de borrar en bloque (fast delete) en todos los modelos.
+
+
+def invalidar_catalogo_modificado(sender, **kwargs):
+    """Cualquier alta/cambio/baja en un catálogo invalida su versión en caché."""
+    invalidar_catalogo_al_confirmar(sender)
+
+
+@receiver(post_save, sender=StockInsumo)
+@receiver(post_delete, sender=StockInsumo)
+def invalidar_stock_modificado(sender, instance, **kwargs):
+    """Guardados directos del stock (API, admin) salen del caché de lecturas."""
+    invalidar_stocks_al_confirmar([(instance.insumo_id, instance.almacen_id)])
+
+
+@receiver(post_save, sender=StockInsumo)
+def publicar_stock_modificado(sender, instance, raw=False, **kwargs):
+    """Anuncia el cambio a las pantallas conectadas por SSE (ver inventory.eventos_stock)."""
+    if not raw:
+        publicar_stocks_al_confirmar([instance])
+
+
+def recordar_texto_busqueda(sender, instance, **kwargs):
+    # para saber al guardar si cambió el texto que usan otros índices
+    instance._texto_busqueda = texto_dependiente_busqueda(instance)
+
+
+def actualizar_indice_busqueda(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """
+    Reindexa la fila guardada y las filas de otros índices que usan su texto,
+    solo si el guardado pudo cambiar ese texto: un save(update_fields=...)
+    sin campos indexados no toca el índice, y los dependientes solo se
+    reindexan si cambió el texto que usan (una fila nueva no tiene).
+    """
+    if raw:
+        return
+    if update_fields is not None:
+        update_fields = {sender._meta.get_field(campo).name for campo in update_fields}
+    if sender in INDICES_BUSQUEDA and (
+        update_fields is None or update_fields & campos_busqueda(sender)
+    ):
+        indexar(sender, [instance.pk])
+    if sender in DEPENDENCIAS_BUSQUEDA and not created:
+        texto = texto_dependiente_busqueda(instance)
+        if texto != getattr(instance, "_texto_busqueda", None) and (
+            update_fields is None or update_fields & campos_dependientes_busqueda(sender)
+        ):
+            for modelo, pks in dependientes_busqueda(instance):
+                indexar(modelo, pks)
+        instance._texto_busqueda = texto
+
+
+def recordar_dependientes_busqueda(sender, instance, **kwargs):
+    # después del DELETE los SET_NULL ya no permiten encontrarlos
+    instance._dependientes_busqueda = dependientes_busqueda(instance)
+
+
+def quitar_del_indice_busqueda(sender, instance, **kwargs):
+    if sender in INDICES_BUSQUEDA:
+        indexar(sender, [instance.pk])
+    for modelo, pks in getattr(instance, "_dependientes_busqueda", ()):
+        indexar(modelo, pks)
+
+
+def registrar_eliminacion_sincronizable(sender, instance, **kwargs):
+    """Lápida para el feed de cambios (también en borrados en cascada)."""
+    registrar_eliminacion(instance)
+
+
+for _modelo in CATALOGOS:
+    post_save.connect(invalidar_catalogo_modificado, sender=_modelo)
+    post_delete.connect(invalidar_catalogo_modificado, sender=_modelo)
+
+for _modelo in {*INDICES_BUSQUEDA, *DEPENDENCIAS_BUSQUEDA}:
+    post_save.connect(actualizar_indice_busqueda, sender=_modelo)
+    post_delete.connect(quitar_del_indice_busqueda, sender=_modelo)
+
+for _modelo in DEPENDENCIAS_BUSQUEDA:
+    post_init.connect(recordar_texto_busqueda, sender=_modelo)
+    pre_delete.connect(recordar_dependientes_busqueda, sender=_modelo)
+
+for _modelo in MODELOS_SINCRONIZABLES:
+    post_delete.connect(registrar_eliminacion_sincronizable, sender=_modelo)
@@ -0,0 +1,144 @@
+"""
+Tareas que se ejecutan en segundo plano (ver inventory.services.trabajos).
+
+Cada tarea recibe el Trabajo y sus parámetros (JSON) y devuelve un
+resultado serializable; los errores que no tiene sentido reintentar se
+informan con TrabajoError.
+"""
+
+import csv
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import DataError
+
+from inventory.models import Almacen, EntradaCompra, Plato
+from inventory.serializers import ResultadoConteoSerializer, ResultadoImportacionSerializer
+from inventory.services.importacion import ImportacionError, importar_insumos_csv
+from inventory.services.inventory import MovimientoInventarioError, aplicar_ajustes_conteo
+from inventory.services.recetas import recostear_platos
+from inventory.services.trabajos import TrabajoError, tarea
+
+
+BLOQUE_RECOSTEO = 500
+
+# Errores de una importación que dependen solo del contenido del archivo
+ERRORES_DE_DATOS = (
+    ImportacionError,
+    UnicodeDecodeError,
+    csv.Error,
+    ArithmeticError,
+    ValueError,
+    DataError,
+)
+
+
+def _usuario(usuario_id):
+    if usuario_id is None:
+        return None
+    return get_user_model().objects.filter(pk=usuario_id).first()
+
+
+@tarea("procesar_entrada_compra")
+def procesar_entrada_compra(trabajo, *, entrada_id: int, usuario_id: int | None = None):
+    try:
+        entrada = EntradaCompra.objects.select_related("insumo", "almacen").get(pk=entrada_id)
+    except EntradaCompra.DoesNotExist:
+        raise TrabajoError(f"La entrada de compra {entrada_id} no existe.")
+
+    try:
+        movimiento = entrada.procesar(usuario=_usuario(usuario_id))
+    except MovimientoInventarioError as exc:
+        raise TrabajoError(str(exc))
+    return {"entrada": entrada.pk, "movimiento": movimiento.pk if movimiento else None}
+
+
+@tarea("recostear_platos")
+def recostear(trabajo, *, plato_ids: list[int] | None = None):
+    """Recalcula costo_receta por bloques, informando el avance."""
+    qs = Plato.objects.order_by("pk")
+    if plato_ids is not None:
+        qs = qs.filter(pk__in=plato_ids)
+    ids = list(qs.values_list("pk", flat=True))
+
+    actualizados = 0
+    for inicio in range(0, len(ids), BLOQUE_RECOSTEO):
+        actualizados += recostear_platos(ids[inicio:inicio + BLOQUE_RECOSTEO])
+        hechos = min(inicio + BLOQUE_RECOSTEO, len(ids))
+        trabajo.reportar_progreso(hechos * 100 // len(ids), f"{hechos} de {len(ids)} platos")
+    return {"platos": actualizados}
+
+
+@tarea("importar_insumos")
+def importar_insumos(trabajo, *, archivo: str):
+    """Importa el CSV guardado en default_storage y luego lo borra."""
+    try:
+        tamano = default_storage.size(archivo) or 1
+        with default_storage.open(archivo, "rb") as binario:
+            lineas = io.TextIOWrapper(binario, encoding="utf-8-sig", newline="")
+            # avance según los bytes ya leídos del archivo (el lector va
+            # un bloque por delante, de ahí el tope en 99)
+            resultado = importar_insumos_csv(
+                lineas,
+                progreso=lambda r: trabajo.reportar_progreso(
+                    min(binario.tell() * 100 // tamano, 99),
+                    f"{r.procesadas} filas procesadas",
+                ),
+            )
+    except FileNotFoundError:
+        raise TrabajoError(f"No se encontró el archivo {archivo}.")
+    except ERRORES_DE_DATOS as exc:
+        # el mismo archivo falla igual en cada intento: no se reintenta
+        default_storage.delete(archivo)
+        raise TrabajoError(str(exc) or type(exc).__name__)
+
+    default_storage.delete(archivo)
+    return ResultadoImportacionSerializer(resultado).data
+
+
+@tarea("aplicar_conteo")
+def aplicar_conteo(
+    trabajo,
+    *,
+    almacen_id: int,
+    conteos: list[dict],
+    usuario_id: int | None = None,
+    tolerancia_unidades: str | None = None,
+    tolerancia_porcentaje: str | None = None,
+    aplicar_solo_fuera_tolerancia: bool = True,
+):
+    try:
+        almacen = Almacen.objects.get(pk=almacen_id)
+    except Almacen.DoesNotExist:
+        raise TrabajoError(f"El almacén {almacen_id} no existe.")
+
+    try:
+        resultados, movimientos = aplicar_ajustes_conteo(
+            almacen=almacen,
+            conteos=conteos,
+            usuario=_usuario(usuario_id),
+            tolerancia_unidades=None if tolerancia_unidades is None else Decimal(tolerancia_unidades),
+            tolerancia_porcentaje=None if tolerancia_porcentaje is None else Decimal(tolerancia_porcentaje),
+            referencia=f"CONTEO-{almacen.id}",
+            aplicar_solo_fuera_tolerancia=aplicar_solo_fuera_tolerancia,
+        )
+    except MovimientoInventarioError as exc:
+        raise TrabajoError(str(exc))
+
+    return {
+        "almacen": almacen.id,
+        "resultados": [ResultadoConteoSerializer.from_resultado(r).data for r in resultados],
+        "movimientos_generados": [
+            {
+                "id": mov.id,
+                "insumo_id": mov.insumo_id,
+                "almacen_id": mov.almacen_id,
+                "tipo": mov.tipo,
+                "cantidad": str(mov.cantidad),
+                "fecha_movimiento": mov.fecha_movimiento,
+            }
+            for mov in movimientos
+        ],
+    }
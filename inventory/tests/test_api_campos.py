@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    Insumo,
+    Almacen,
+    StockInsumo,
+    Plato,
+    RecetaInsumo,
+)
+
+User = get_user_model()
+
+
+class CamposDinamicosAPITests(APITestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.proveedor = Proveedor.objects.create(nombre="Proveedor Test")
+        self.insumo = Insumo.objects.create(
+            nombre="Harina",
+            unidad=self.unidad,
+            proveedor_principal=self.proveedor,
+            stock_minimo=Decimal("5"),
+        )
+        self.almacen = Almacen.objects.create(nombre="Bodega")
+        StockInsumo.objects.create(
+            insumo=self.insumo,
+            almacen=self.almacen,
+            cantidad_actual=Decimal("3"),
+            costo_promedio=Decimal("2"),
+        )
+        self.plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("100"))
+        RecetaInsumo.objects.create(plato=self.plato, insumo=self.insumo, cantidad=Decimal("1"))
+        self.stocks_url = reverse("stock-insumo-list")
+
+    def test_sin_parametros_mantiene_representacion_completa(self):
+        response = self.client.get(self.stocks_url)
+        fila = response.data["results"][0]
+
+        self.assertEqual(fila["insumo_detalle"]["unidad_detalle"]["abreviatura"], "g")
+        self.assertEqual(fila["almacen_detalle"]["nombre"], "Bodega")
+
+    def test_fields_devuelve_solo_lo_pedido_sin_joins(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.stocks_url, {"fields": "id,insumo,cantidad_actual"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        fila = response.data["results"][0]
+        self.assertEqual(set(fila), {"id", "insumo", "cantidad_actual"})
+
+    def test_expand_incluye_anidado_con_subcampos(self):
+        response = self.client.get(
+            self.stocks_url,
+            {"fields": "id,cantidad_actual,insumo_detalle.nombre", "expand": "almacen_detalle"},
+        )
+        fila = response.data["results"][0]
+
+        self.assertEqual(set(fila), {"id", "cantidad_actual", "insumo_detalle", "almacen_detalle"})
+        self.assertEqual(fila["insumo_detalle"], {"nombre": "Harina"})
+        self.assertIn("ubicacion", fila["almacen_detalle"])
+
+    def test_expand_sin_fields_omite_anidados_no_pedidos(self):
+        response = self.client.get(reverse("receta-insumo-list"), {"expand": "insumo_detalle"})
+        fila = response.data["results"][0]
+
+        self.assertNotIn("plato_detalle", fila)
+        self.assertIn("insumo_detalle", fila)
+        self.assertNotIn("unidad_detalle", fila["insumo_detalle"])
+        self.assertEqual(fila["cantidad"], "1.0000")
+
+    def test_campos_calculados_unen_solo_su_dependencia(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.stocks_url, {"fields": "id,nivel_alerta"}
+            )
+        self.assertEqual(response.data["results"][0]["nivel_alerta"], "bajo_minimo")
+
+    def test_escritura_ignora_la_seleccion(self):
+        user = User.objects.create_user(username="pos", password="pos12345")
+        self.client.force_authenticate(user=user)
+        response = self.client.post(
+            reverse("insumo-list") + "?fields=id",
+            {"nombre": "Sal", "unidad": self.unidad.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["nombre"], "Sal")
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import UnidadMedida, Insumo
+
+
+class ConditionalGetAPITests(APITestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.insumo = Insumo.objects.create(nombre="Harina", unidad=self.unidad)
+        self.list_url = reverse("insumo-list")
+        self.detail_url = reverse("insumo-detail", args=[self.insumo.id])
+
+    def test_listado_sin_cambios_responde_304_sin_serializar(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_listado_cambia_etag_al_modificar_o_borrar(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.insumo.stock_minimo = Decimal("3")
+        self.insumo.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        sal = Insumo.objects.create(nombre="Sal", unidad=self.unidad)
+        etag = self.client.get(self.list_url)["ETag"]
+        sal.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_listado_cambia_etag_al_modificar_relacion_anidada(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.unidad.abreviatura = "gr"
+        self.unidad.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depende_de_la_seleccion_de_campos(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(
+            self.list_url, {"fields": "id"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detalle_con_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            self.detail_url,
+            HTTP_IF_MODIFIED_SINCE=http_date(self.insumo.updated_at.timestamp() + 1),
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
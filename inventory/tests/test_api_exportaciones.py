@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    Insumo,
+    Almacen,
+    StockInsumo,
+    MovimientoInventario,
+    EntradaCompra,
+)
+
+
+class ExportacionesAPITests(APITestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.sal = Insumo.objects.create(nombre="Sal", unidad=unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        self.cocina = Almacen.objects.create(nombre="Cocina")
+        StockInsumo.objects.create(
+            insumo=self.harina, almacen=self.bodega, cantidad_actual=Decimal("10"),
+            costo_promedio=Decimal("2"),
+        )
+        StockInsumo.objects.create(
+            insumo=self.sal, almacen=self.cocina, cantidad_actual=Decimal("1"),
+            costo_promedio=Decimal("0.5"),
+        )
+        for dia, insumo, almacen in [
+            (1, self.harina, self.bodega),
+            (15, self.sal, self.cocina),
+            (31, self.harina, self.cocina),
+        ]:
+            MovimientoInventario.objects.create(
+                insumo=insumo,
+                almacen=almacen,
+                tipo=MovimientoInventario.TIPO_ENTRADA_COMPRA,
+                cantidad=Decimal("5"),
+                costo_unitario=Decimal("2"),
+                fecha_movimiento=timezone.make_aware(datetime(2025, 1, dia, 23, 30)),
+            )
+        EntradaCompra.objects.create(
+            proveedor=Proveedor.objects.create(nombre="Molino Sur"),
+            almacen=self.bodega,
+            insumo=self.harina,
+            fecha_documento=date(2025, 1, 10),
+            numero_documento="F-1",
+            cantidad=Decimal("5"),
+            costo_unitario=Decimal("2"),
+        )
+
+    def _descargar(self, nombre, **params):
+        response = self.client.get(reverse("exportacion-detail", args=[nombre]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b"".join(response.streaming_content).decode()
+
+    def test_stocks_csv(self):
+        filas = list(csv.DictReader(io.StringIO(self._descargar("stocks"))))
+
+        self.assertEqual([f["insumo"] for f in filas], ["Harina", "Sal"])
+        self.assertEqual(filas[0]["cantidad_actual"], "10.000")
+        self.assertEqual(filas[0]["unidad"], "g")
+
+    def test_movimientos_filtrados_por_fecha_inclusiva_y_almacen(self):
+        contenido = self._descargar(
+            "movimientos",
+            formato="jsonl",
+            fecha_desde="2025-01-15",
+            fecha_hasta="2025-01-31",
+            almacen=self.cocina.id,
+        )
+        filas = [json.loads(linea) for linea in contenido.splitlines()]
+
+        self.assertEqual([f["insumo"] for f in filas], ["Sal", "Harina"])
+        self.assertEqual(filas[0]["costo_total"], "10.0000")
+
+    def test_compras_por_insumo(self):
+        filas = list(csv.DictReader(io.StringIO(
+            self._descargar("compras", insumo=self.harina.id)
+        )))
+        self.assertEqual(len(filas), 1)
+        self.assertEqual(filas[0]["proveedor"], "Molino Sur")
+        self.assertEqual(self._descargar("compras", insumo=self.sal.id).count("\n"), 1)
+
+    def test_parametros_invalidos_y_exportacion_desconocida(self):
+        url = reverse("exportacion-detail", args=["movimientos"])
+        response = self.client.get(url, {"fecha_desde": "2025-02-01", "fecha_hasta": "2025-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("exportacion-detail", args=["usuarios"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse("exportacion-list"))
+        self.assertIn("fecha_movimiento", response.data["movimientos"]["columnas"])
@@ -30,9 +30,9 @@ class UnidadMedidaAPITests(APITestCase):
     def test_list_unidades_medida(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
+        self.assertGreaterEqual(len(response.data["results"]), 1)
         # Chequeo simple del contenido
-        nombres = [u["nombre"] for u in response.data]
+        nombres = [u["nombre"] for u in response.data["results"]]
         self.assertIn("Gramo", nombres)
 
     def test_create_unidad_medida_requires_authentication(self):
@@ -93,8 +93,8 @@ class InsumoAPITests(APITestCase):
     def test_list_insumos(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
-        nombres = [i["nombre"] for i in response.data]
+        self.assertGreaterEqual(len(response.data["results"]), 1)
+        nombres = [i["nombre"] for i in response.data["results"]]
         self.assertIn("Harina", nombres)
 
     def test_create_insumo_requires_authentication(self):
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    CategoriaInsumo,
+    Insumo,
+    Almacen,
+    StockInsumo,
+    Plato,
+    CategoriaPlato,
+    RecetaInsumo,
+)
+
+# Contrato de consultas por listado: constante, sin importar el tamaño de página.
+# (1 agregado para ETag/Last-Modified + 1 para la página; los catálogos
+# anidados salen del caché compartido, que se calienta con la primera request)
+CONSULTAS_POR_LISTADO = {
+    "unidad-medida-list": 2,
+    "proveedor-list": 2,
+    "categoria-insumo-list": 2,
+    "insumo-list": 2,
+    "almacen-list": 2,
+    "stock-insumo-list": 2,
+    "plato-list": 2,
+    "receta-insumo-list": 2,
+}
+
+FILAS = 30
+
+
+class PaginacionCursorAPITests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # como datos ya confirmados: corren las invalidaciones on_commit de los catálogos
+        with cls.captureOnCommitCallbacks(execute=True):
+            categoria_plato = CategoriaPlato.objects.create(nombre="Principal")
+            for i in range(FILAS):
+                unidad = UnidadMedida.objects.create(
+                    nombre=f"Unidad {i:02d}",
+                    abreviatura=f"u{i}",
+                    factor_base=Decimal("1"),
+                )
+                proveedor = Proveedor.objects.create(nombre=f"Proveedor {i:02d}")
+                categoria = CategoriaInsumo.objects.create(nombre=f"Categoría {i:02d}")
+                almacen = Almacen.objects.create(nombre=f"Almacén {i:02d}")
+                insumo = Insumo.objects.create(
+                    nombre=f"Insumo {i:02d}",
+                    unidad=unidad,
+                    categoria=categoria,
+                    proveedor_principal=proveedor,
+                )
+                StockInsumo.objects.create(
+                    insumo=insumo,
+                    almacen=almacen,
+                    cantidad_actual=Decimal("10"),
+                    costo_promedio=Decimal("2"),
+                )
+                plato = Plato.objects.create(
+                    nombre=f"Plato {i:02d}",
+                    precio_venta=Decimal("1000"),
+                    categoria=categoria_plato,
+                )
+                RecetaInsumo.objects.create(plato=plato, insumo=insumo, cantidad=Decimal("1"))
+
+    def _consultas(self, url_name, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(url_name), {"page_size": page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(ctx.captured_queries)
+
+    def test_contrato_de_consultas_constante(self):
+        for url_name, esperado in CONSULTAS_POR_LISTADO.items():
+            with self.subTest(endpoint=url_name):
+                self.client.get(reverse(url_name), {"page_size": FILAS})
+                self.assertEqual(self._consultas(url_name, 2), esperado)
+                self.assertEqual(self._consultas(url_name, FILAS), esperado)
+
+    def test_recorre_todas_las_paginas_por_cursor(self):
+        url = reverse("insumo-list")
+        nombres = []
+        response = self.client.get(url, {"page_size": 7})
+        while True:
+            nombres.extend(i["nombre"] for i in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(nombres, [f"Insumo {i:02d}" for i in range(FILAS)])
+
+    def test_cursor_con_orden_por_indicador_nulo(self):
+        Plato.objects.create(nombre="Sin precio", precio_venta=Decimal("0"))
+        url = reverse("plato-list")
+        vistos = []
+        response = self.client.get(url, {"page_size": 8, "ordering": "food_cost_porcentaje"})
+        while True:
+            vistos.extend(p["nombre"] for p in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(vistos), FILAS + 1)
+        self.assertEqual(vistos[-1], "Sin precio")
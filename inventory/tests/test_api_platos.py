@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import Plato, CategoriaPlato
+
+
+class PlatoAPITests(APITestCase):
+    def setUp(self):
+        self.list_url = reverse("plato-list")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.categoria = CategoriaPlato.objects.create(nombre="Principal")
+        # food cost: 20% / 50% / 80%
+        Plato.objects.create(
+            nombre="Ensalada",
+            precio_venta=Decimal("1000.00"),
+            costo_receta=Decimal("200.0000"),
+            categoria=self.categoria,
+        )
+        Plato.objects.create(
+            nombre="Cazuela",
+            precio_venta=Decimal("1000.00"),
+            costo_receta=Decimal("500.0000"),
+            categoria=self.categoria,
+        )
+        Plato.objects.create(
+            nombre="Bife",
+            precio_venta=Decimal("1000.00"),
+            costo_receta=Decimal("800.0000"),
+        )
+
+    def _nombres(self, response):
+        return [p["nombre"] for p in response.data["results"]]
+
+    def test_list_platos_con_indicadores_y_categoria(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ensalada = next(p for p in response.data["results"] if p["nombre"] == "Ensalada")
+        self.assertEqual(ensalada["food_cost_porcentaje"], "20.00")
+        self.assertEqual(ensalada["margen_bruto"], "800.0000")
+        self.assertEqual(ensalada["margen_bruto_porcentaje"], "80.00")
+        self.assertEqual(ensalada["categoria_detalle"]["nombre"], "Principal")
+
+    def test_ordering_por_food_cost(self):
+        response = self.client.get(self.list_url, {"ordering": "-food_cost_porcentaje"})
+        self.assertEqual(self._nombres(response), ["Bife", "Cazuela", "Ensalada"])
+
+    def test_filtro_por_umbral_de_margen(self):
+        response = self.client.get(self.list_url, {"margen_bruto_porcentaje_min": "50"})
+        self.assertEqual(self._nombres(response), ["Cazuela", "Ensalada"])
+
+        response = self.client.get(self.list_url, {"food_cost_porcentaje_max": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_consultas_constantes(self):
+        for i in range(20):
+            Plato.objects.create(
+                nombre=f"Plato {i}",
+                precio_venta=Decimal("100.00"),
+                categoria=self.categoria,
+            )
+        self.client.get(self.list_url)  # calienta el caché de catálogos
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url)
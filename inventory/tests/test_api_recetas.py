@@ -1,4 +1,9 @@
+import csv
+import io
 from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -56,3 +61,58 @@ class RecetasAPITests(APITestCase):
         self.assertEqual(response.data["id"], self.plato.id)
         self.assertEqual(len(response.data["receta"]), 1)
         self.assertEqual(response.data["receta"][0]["insumo"], self.insumo.id)
+
+
+class ImportacionExportacionRecetasAPITests(APITestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(
+            nombre="Harina", unidad=unidad, costo_promedio=Decimal("0.0100")
+        )
+        Insumo.objects.create(nombre="Sal", unidad=unidad, costo_promedio=Decimal("0.0010"))
+        self.plato = Plato.objects.create(nombre="Pan casero", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=self.plato, insumo=self.harina, cantidad=Decimal("500"))
+        self.user = get_user_model().objects.create_user(username="chef", password="chef12345")
+
+    def test_exportar_csv_y_json(self):
+        response = self.client.get(reverse("receta-insumo-exportar"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        filas = list(csv.DictReader(io.StringIO(response.content.decode())))
+        self.assertEqual(filas, [{"plato": "Pan casero", "insumo": "Harina", "cantidad": "500.0000"}])
+
+        response = self.client.get(
+            reverse("receta-insumo-exportar"), {"formato": "json", "plato": self.plato.id}
+        )
+        self.assertEqual(response.data[0]["insumo"], "Harina")
+
+    def test_importar_json(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("receta-insumo-importar"),
+            {"lineas": [
+                {"plato": "Pan casero", "insumo": "Harina", "cantidad": "400"},
+                {"plato": "Pan casero", "insumo": "Sal", "cantidad": "5"},
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["creadas"], response.data["actualizadas"]), (1, 1))
+        self.plato.refresh_from_db()
+        self.assertEqual(self.plato.costo_receta, Decimal("4.0050"))
+
+    def test_importar_csv(self):
+        self.client.force_authenticate(user=self.user)
+        archivo = SimpleUploadedFile(
+            "recetas.csv", b"plato,insumo,cantidad\nPan casero,Sal,5\n", "text/csv"
+        )
+        response = self.client.post(
+            reverse("receta-insumo-importar"), {"archivo": archivo, "simular": "true"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["simulado"])
+        self.assertEqual((response.data["creadas"], response.data["eliminadas"]), (1, 1))
+        self.assertEqual(RecetaInsumo.objects.get().insumo, self.harina)
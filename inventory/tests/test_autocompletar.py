@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from inventory.catalogos import ALIAS_CACHE
+from inventory.models import UnidadMedida, Insumo, Plato, RecetaInsumo
+from inventory.services.busqueda import autocompletar_insumos
+from inventory.utils import normalizar_texto
+from web.forms import RecetaInsumoFormSet
+
+
+class AutocompletarInsumosTests(TestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gramo = UnidadMedida.objects.create(
+                nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+            )
+        for nombre in ["Ají de color", "Ajo", "Aceite", "Harina", "Ajonjolí"]:
+            Insumo.objects.create(nombre=nombre, unidad=self.gramo)
+        Insumo.objects.create(nombre="Ajo chilote", unidad=self.gramo, activo=False)
+
+    def test_normalizar_texto(self):
+        self.assertEqual(normalizar_texto("  Ají   de COLOR "), "aji de color")
+        self.assertEqual(Insumo.objects.get(nombre="Ajonjolí").nombre_normalizado, "ajonjoli")
+
+    def test_prefijo_sin_tildes_ni_mayusculas(self):
+        nombres = [r["nombre"] for r in autocompletar_insumos("AJ")]
+        self.assertEqual(nombres, ["Ají de color", "Ajo", "Ajonjolí"])
+
+        nombres = [r["nombre"] for r in autocompletar_insumos("aji")]
+        self.assertEqual(nombres, ["Ají de color"])
+
+    def test_limite_inactivos_y_unidad(self):
+        resultados = autocompletar_insumos("ajo", solo_activos=False, limite=2)
+        self.assertEqual([r["nombre"] for r in resultados], ["Ajo", "Ajo chilote"])
+        self.assertEqual(resultados[0]["unidad"], "g")
+
+    def test_renombrar_actualiza_normalizado(self):
+        ajo = Insumo.objects.get(nombre="Ajo")
+        ajo.nombre = "Éneldo"
+        ajo.save(update_fields=["nombre"])
+        self.assertEqual(autocompletar_insumos("ene")[0]["id"], ajo.id)
+
+    def test_endpoint(self):
+        self.client.get(reverse("insumo-autocompletar"), {"q": "a"})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("insumo-autocompletar"), {"q": "har"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {"id": Insumo.objects.get(nombre="Harina").id, "nombre": "Harina", "unidad": "g"}
+        ])
+
+        response = self.client.get(reverse("insumo-autocompletar"), {"limite": 500})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecetaFormSetTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.insumos = [
+            Insumo.objects.create(nombre=f"Insumo {i:03d}", unidad=unidad) for i in range(200)
+        ]
+        self.plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("100"))
+        for insumo in self.insumos[:2]:
+            RecetaInsumo.objects.create(plato=self.plato, insumo=insumo, cantidad=Decimal("1"))
+
+    def test_render_solo_opciones_seleccionadas_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            html = "".join(form.as_p() for form in RecetaInsumoFormSet(instance=self.plato))
+
+        self.assertIn("Insumo 000", html)
+        self.assertIn("Insumo 001", html)
+        self.assertNotIn("Insumo 150", html)
+        self.assertIn(f'data-autocomplete-url="{reverse("insumo-autocompletar")}"', html)
+
+    def test_post_valida_con_cache_compartido(self):
+        lineas = RecetaInsumo.objects.filter(plato=self.plato).order_by("id")
+        data = {
+            "receta_insumos-TOTAL_FORMS": "4",
+            "receta_insumos-INITIAL_FORMS": "2",
+            "receta_insumos-MIN_NUM_FORMS": "0",
+            "receta_insumos-MAX_NUM_FORMS": "1000",
+        }
+        for i, linea in enumerate(lineas):
+            data[f"receta_insumos-{i}-id"] = str(linea.id)
+            data[f"receta_insumos-{i}-insumo"] = str(linea.insumo_id)
+            data[f"receta_insumos-{i}-cantidad"] = "2"
+        data["receta_insumos-2-insumo"] = str(self.insumos[150].id)
+        data["receta_insumos-2-cantidad"] = "3"
+        data["receta_insumos-3-insumo"] = "999999"
+        data["receta_insumos-3-cantidad"] = "1"
+
+        formset = RecetaInsumoFormSet(data, instance=self.plato)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertFalse(formset.is_valid())
+
+        # el campo insumo no consulta por formulario: una carga compartida
+        # de lo enviado y otra por el ID inexistente (el resto son las
+        # validaciones del modelo: FK y unique_together)
+        cargas_insumo = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('SELECT "inventory_insumo"."id", "inventory_insumo"."created_at"')
+        ]
+        self.assertEqual(len(cargas_insumo), 2)
+        self.assertIn("insumo", formset.forms[3].errors)
+        self.assertEqual(formset.forms[2].cleaned_data["insumo"], self.insumos[150])
@@ -0,0 +1,121 @@
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    CategoriaInsumo,
+    Proveedor,
+    Insumo,
+    Almacen,
+    EntradaCompra,
+    Plato,
+)
+from inventory.services import busqueda
+from inventory.services.busqueda import aplicar_busqueda, consulta_fts, indice_disponible
+
+
+class IndiceBusquedaTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.lacteos = CategoriaInsumo.objects.create(nombre="Lácteos")
+        self.proveedor = Proveedor.objects.create(nombre="Distribuidora Ñuble")
+        self.crema = Insumo.objects.create(
+            nombre="Crema ácida", unidad=unidad, categoria=self.lacteos
+        )
+        self.harina = Insumo.objects.create(
+            nombre="Harina de trigo", unidad=unidad, proveedor_principal=self.proveedor
+        )
+        self.compra = EntradaCompra.objects.create(
+            proveedor=self.proveedor,
+            almacen=Almacen.objects.create(nombre="Bodega"),
+            insumo=self.harina,
+            fecha_documento=date(2025, 1, 10),
+            numero_documento="F-00123",
+            cantidad=Decimal("5"),
+            costo_unitario=Decimal("2"),
+        )
+        Plato.objects.create(nombre="Pastel de choclo", precio_venta=Decimal("100"))
+
+    def _buscar(self, modelo, texto):
+        return set(aplicar_busqueda(modelo.objects.all(), texto).values_list("pk", flat=True))
+
+    def test_indice_disponible_en_sqlite(self):
+        self.assertTrue(indice_disponible(Insumo))
+        self.assertEqual(consulta_fts("Harína  trigo"), '"harina"* "trigo"*')
+
+    def test_prefijos_sin_tildes_y_campos_relacionados(self):
+        self.assertEqual(self._buscar(Insumo, "acida"), {self.crema.pk})
+        self.assertEqual(self._buscar(Insumo, "LACT"), {self.crema.pk})
+        self.assertEqual(self._buscar(Insumo, "nuble har"), {self.harina.pk})
+        self.assertEqual(self._buscar(Insumo, "har lact"), set())
+        self.assertEqual(self._buscar(Plato, "choc"), set(Plato.objects.values_list("pk", flat=True)))
+        self.assertEqual(self._buscar(EntradaCompra, "00123"), {self.compra.pk})
+
+    def test_senales_mantienen_el_indice(self):
+        self.proveedor.nombre = "Molino del Sur"
+        self.proveedor.save()
+        self.assertEqual(self._buscar(Insumo, "molino"), {self.harina.pk})
+        self.assertEqual(self._buscar(EntradaCompra, "molino"), {self.compra.pk})
+
+        self.lacteos.delete()
+        self.assertEqual(self._buscar(Insumo, "lacteos"), set())
+
+        self.harina.nombre = "Sémola"
+        self.harina.save()
+        self.assertEqual(self._buscar(EntradaCompra, "semola"), {self.compra.pk})
+
+    def test_guardados_sin_texto_no_reindexan(self):
+        with mock.patch("inventory.signals.indexar", wraps=busqueda.indexar) as indexar:
+            self.harina.costo_promedio = Decimal("3")
+            self.harina.save(update_fields=["costo_promedio", "updated_at"])
+            self.assertEqual(indexar.call_count, 0)
+
+            # sin update_fields se reindexa la fila, pero no sus compras si el nombre no cambió
+            Insumo.objects.get(pk=self.harina.pk).save()
+            self.assertEqual([c.args[0] for c in indexar.call_args_list], [Insumo])
+
+            indexar.reset_mock()
+            self.proveedor.save(update_fields=["nombre"])
+            self.assertEqual(indexar.call_count, 0)
+
+            self.harina.nombre = "Sémola"
+            self.harina.save(update_fields=["nombre"])
+            self.assertEqual([c.args[0] for c in indexar.call_args_list], [Insumo, EntradaCompra])
+        self.assertEqual(self._buscar(EntradaCompra, "semola"), {self.compra.pk})
+
+    def test_respaldo_icontains_sin_indice(self):
+        with mock.patch.object(busqueda, "indice_disponible", return_value=False):
+            self.assertEqual(self._buscar(Insumo, "lác"), {self.crema.pk})
+
+    def test_reindexar_comando(self):
+        Insumo.objects.filter(pk=self.crema.pk).update(nombre="Yogur natural")
+        self.assertEqual(self._buscar(Insumo, "yogur"), set())
+
+        call_command("reindexar_busqueda", stdout=io.StringIO())
+        self.assertEqual(self._buscar(Insumo, "yogur"), {self.crema.pk})
+
+
+class BusquedaAPITests(APITestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        Insumo.objects.create(nombre="Azúcar flor", unidad=unidad)
+        Insumo.objects.create(nombre="Sal de mar", unidad=unidad)
+
+    def test_search_en_listado(self):
+        response = self.client.get(reverse("insumo-list"), {"search": "azucar"})
+        self.assertEqual([i["nombre"] for i in response.data["results"]], ["Azúcar flor"])
+
+    def test_busqueda_web(self):
+        response = self.client.get(reverse("web:insumos_list"), {"q": "mar"})
+        self.assertEqual([i.nombre for i in response.context["insumos"]], ["Sal de mar"])
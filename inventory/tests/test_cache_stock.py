@@ -0,0 +1,180 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.cache_stock import cache_stock
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    StockInsumo,
+    Plato,
+    RecetaInsumo,
+)
+from inventory.services.inventory import (
+    registrar_ajuste_inventario,
+    registrar_entrada_compra,
+    registrar_traspaso,
+)
+
+
+class CacheStockTests(TestCase):
+    def setUp(self):
+        cache_stock.limpiar()
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.sal = Insumo.objects.create(nombre="Sal", unidad=unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        self.cocina = Almacen.objects.create(nombre="Cocina")
+        StockInsumo.objects.create(
+            insumo=self.harina,
+            almacen=self.bodega,
+            cantidad_actual=Decimal("100"),
+            costo_promedio=Decimal("2"),
+        )
+
+    def test_lecturas_repetidas_no_consultan_la_bd(self):
+        claves = [(self.harina.id, self.bodega.id), (self.sal.id, self.bodega.id)]
+        with self.assertNumQueries(1):
+            primera = cache_stock.obtener_varios(claves)
+        with self.assertNumQueries(0):
+            segunda = cache_stock.obtener_varios(claves)
+
+        self.assertEqual(primera, segunda)
+        self.assertEqual(segunda[claves[0]].cantidad, Decimal("100"))
+        # sin fila de stock → 0, y también queda en caché
+        self.assertEqual(segunda[claves[1]].cantidad, Decimal("0"))
+        estadisticas = cache_stock.estadisticas()
+        self.assertEqual((estadisticas["aciertos"], estadisticas["fallos"]), (2, 2))
+
+    def test_servicios_invalidan_solo_lo_que_tocan(self):
+        cache_stock.obtener_varios(
+            [(self.harina.id, self.bodega.id), (self.sal.id, self.bodega.id)]
+        )
+
+        registrar_traspaso(
+            insumo=self.harina,
+            almacen_origen=self.bodega,
+            almacen_destino=self.cocina,
+            cantidad=Decimal("30"),
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cache_stock.obtener(self.sal.id, self.bodega.id).cantidad, 0)
+        self.assertEqual(cache_stock.obtener(self.harina.id, self.bodega.id).cantidad, Decimal("70"))
+        self.assertEqual(cache_stock.obtener(self.harina.id, self.cocina.id).cantidad, Decimal("30"))
+
+    @override_settings(INVENTARIO_CONCURRENCIA={"MODO": "optimista", "REINTENTOS": 3})
+    def test_invalida_en_modo_optimista(self):
+        self.assertEqual(cache_stock.obtener(self.harina.id, self.bodega.id).cantidad, Decimal("100"))
+        registrar_ajuste_inventario(
+            insumo=self.harina, almacen=self.bodega, cantidad=Decimal("-10"), motivo="Conteo"
+        )
+        self.assertEqual(cache_stock.obtener(self.harina.id, self.bodega.id).cantidad, Decimal("90"))
+
+    def test_invalida_al_confirmar(self):
+        cache_stock.obtener(self.sal.id, self.bodega.id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            registrar_entrada_compra(
+                insumo=self.sal,
+                almacen=self.bodega,
+                cantidad=Decimal("5"),
+                costo_unitario=Decimal("1"),
+            )
+        self.assertTrue(callbacks)
+        self.assertEqual(cache_stock.obtener(self.sal.id, self.bodega.id).cantidad, Decimal("5"))
+
+    def test_lectura_adelantada_por_una_invalidacion_no_se_guarda(self):
+        clave = (self.harina.id, self.bodega.id)
+        leer = cache_stock._leer
+
+        def leer_y_escribir(claves):
+            leidos = leer(claves)
+            # otro hilo escribe e invalida mientras esta lectura está en curso
+            StockInsumo.objects.filter(insumo=self.harina).update(cantidad_actual=Decimal("70"))
+            cache_stock.invalidar([clave])
+            return leidos
+
+        with mock.patch.object(cache_stock, "_leer", side_effect=leer_y_escribir):
+            self.assertEqual(cache_stock.obtener(*clave).cantidad, Decimal("100"))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(cache_stock.obtener(*clave).cantidad, Decimal("70"))
+        with self.assertNumQueries(0):
+            cache_stock.obtener(*clave)
+
+    @override_settings(INVENTARIO_CACHE_STOCK={"MAX_ENTRADAS": 2, "TTL": 30})
+    def test_lru_acotado(self):
+        otro = Almacen.objects.create(nombre="Barra")
+        cache_stock.obtener(self.harina.id, self.bodega.id)
+        cache_stock.obtener(self.harina.id, self.cocina.id)
+        cache_stock.obtener(self.harina.id, self.bodega.id)  # la más reciente
+        cache_stock.obtener(self.harina.id, otro.id)
+
+        self.assertEqual(cache_stock.estadisticas()["entradas"], 2)
+        with self.assertNumQueries(0):
+            cache_stock.obtener(self.harina.id, self.bodega.id)
+        with self.assertNumQueries(1):
+            cache_stock.obtener(self.harina.id, self.cocina.id)
+
+    @override_settings(INVENTARIO_CACHE_STOCK={"MAX_ENTRADAS": 10, "TTL": 0})
+    def test_ttl(self):
+        cache_stock.obtener(self.harina.id, self.bodega.id)
+        with self.assertNumQueries(1):
+            cache_stock.obtener(self.harina.id, self.bodega.id)
+
+
+class DisponibilidadAPITests(APITestCase):
+    def setUp(self):
+        cache_stock.limpiar()
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.levadura = Insumo.objects.create(nombre="Levadura", unidad=unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        StockInsumo.objects.create(
+            insumo=self.harina, almacen=self.bodega, cantidad_actual=Decimal("1000")
+        )
+        StockInsumo.objects.create(
+            insumo=self.levadura, almacen=self.bodega, cantidad_actual=Decimal("25")
+        )
+        self.plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=self.plato, insumo=self.harina, cantidad=Decimal("100"))
+        RecetaInsumo.objects.create(plato=self.plato, insumo=self.levadura, cantidad=Decimal("10"))
+
+    def test_disponibilidad_de_stocks(self):
+        url = reverse("stock-insumo-disponibilidad")
+        params = {"almacen": self.bodega.id, "insumos": f"{self.harina.id},{self.levadura.id}"}
+        self.client.get(url, params)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(fila["insumo"], fila["cantidad"]) for fila in response.data],
+            [(self.harina.id, "1000.000"), (self.levadura.id, "25.000")],
+        )
+
+        estadisticas = self.client.get(reverse("stock-insumo-estadisticas-cache")).data
+        self.assertEqual(estadisticas["aciertos"], 2)
+        self.assertEqual(estadisticas["fallos"], 2)
+
+    def test_disponibilidad_requiere_insumos(self):
+        response = self.client.get(
+            reverse("stock-insumo-disponibilidad"), {"almacen": self.bodega.id}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_porciones_de_un_plato(self):
+        response = self.client.get(
+            reverse("plato-disponibilidad", args=[self.plato.id]), {"almacen": self.bodega.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["porciones"], 2)
+        self.assertEqual(response.data["insumo_limitante"], self.levadura.id)
@@ -0,0 +1,149 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.catalogos import (
+    ALIAS_CACHE,
+    catalogo_por_nombre,
+    obtener_catalogo,
+    obtener_del_catalogo,
+)
+from inventory.models import UnidadMedida, Proveedor, Insumo, Almacen
+from web.forms import InsumoForm
+
+
+class CatalogosCacheTests(TestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        # como datos ya confirmados: sus invalidaciones on_commit se ejecutan
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gramo = UnidadMedida.objects.create(
+                nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+            )
+            self.litro = UnidadMedida.objects.create(
+                nombre="Litro", abreviatura="l", factor_base=Decimal("1")
+            )
+
+    def test_segunda_lectura_no_consulta_la_bd(self):
+        obtener_catalogo(UnidadMedida)
+        with self.assertNumQueries(0):
+            unidades = obtener_catalogo(UnidadMedida)
+        self.assertEqual(list(unidades), [self.gramo.id, self.litro.id])
+
+    def test_guardar_invalida_el_catalogo(self):
+        obtener_catalogo(UnidadMedida)
+        self.gramo.nombre = "Gramos"
+        self.gramo.save()
+
+        self.assertEqual(obtener_del_catalogo(UnidadMedida, self.gramo.id).nombre, "Gramos")
+
+    def test_borrar_invalida_el_catalogo(self):
+        obtener_catalogo(UnidadMedida)
+        self.litro.delete()
+
+        self.assertIsNone(obtener_del_catalogo(UnidadMedida, self.litro.id))
+        self.assertEqual(list(catalogo_por_nombre(UnidadMedida)), ["gramo"])
+
+    def test_invalidacion_es_por_catalogo(self):
+        obtener_catalogo(UnidadMedida)
+        Proveedor.objects.create(nombre="Proveedor Test")
+        with self.assertNumQueries(0):
+            obtener_catalogo(UnidadMedida)
+
+    def test_rollback_no_deja_filas_en_el_cache(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Proveedor.objects.create(nombre="Fantasma")
+            # dentro de la transacción se ve, pero no se guarda en el caché
+            self.assertEqual(list(catalogo_por_nombre(Proveedor)), ["fantasma"])
+            raise RuntimeError
+
+        self.assertEqual(obtener_catalogo(Proveedor), {})
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_catalogo(Proveedor), {})
+
+
+class CatalogoChoiceFieldTests(TestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gramo = UnidadMedida.objects.create(
+                nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+            )
+            Proveedor.objects.create(nombre="Proveedor Test")
+
+    def test_render_del_formulario_usa_el_cache(self):
+        InsumoForm().as_p()
+        with self.assertNumQueries(0):
+            html = InsumoForm().as_p()
+        self.assertIn("Proveedor Test", html)
+
+    def test_valida_contra_el_catalogo(self):
+        form = InsumoForm(data={
+            "nombre": "Harina",
+            "unidad": self.gramo.id,
+            "activo": "on",
+            "stock_minimo": "0",
+            "factor_conversion": "1",
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().unidad, self.gramo)
+
+        form = InsumoForm(data={"nombre": "Sal", "unidad": 9999, "factor_conversion": "1"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("unidad", form.errors)
+
+
+class CatalogosAnidadosAPITests(APITestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unidad = UnidadMedida.objects.create(
+                nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+            )
+            self.almacen = Almacen.objects.create(nombre="Bodega")
+        Insumo.objects.create(nombre="Harina", unidad=self.unidad)
+
+    def test_anidados_de_catalogo_sin_join(self):
+        url = reverse("insumo-list")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+
+        pagina = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("inventory_unidadmedida", pagina)
+        self.assertEqual(response.data["results"][0]["unidad_detalle"]["abreviatura"], "g")
+
+    def test_cambio_en_catalogo_se_refleja_en_la_api(self):
+        url = reverse("insumo-list")
+        self.client.get(url)
+        self.unidad.abreviatura = "gr"
+        self.unidad.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["unidad_detalle"]["abreviatura"], "gr")
+
+    def test_cada_catalogo_se_lee_una_vez_por_listado(self):
+        proveedores = Proveedor.objects.bulk_create(
+            [Proveedor(nombre=f"Proveedor {i}") for i in range(20)]
+        )
+        Insumo.objects.bulk_create(
+            [
+                Insumo(nombre=f"Insumo {i}", unidad=self.unidad, proveedor_principal=proveedor)
+                for i, proveedor in enumerate(proveedores)
+            ]
+        )
+        url = reverse("insumo-list")
+        self.client.get(url)
+
+        cache = caches[ALIAS_CACHE]
+        with mock.patch.object(cache, "get", wraps=cache.get) as lecturas:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 21)
+        # versión + datos de unidades y proveedores (sin categorías: todas nulas)
+        self.assertEqual(lecturas.call_count, 4)
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    StockInsumo,
+    Plato,
+)
+
+COLUMNAR = "application/vnd.inventario.columnar+json"
+
+
+class FormatoColumnarTests(APITestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(
+            nombre="Harina", unidad=unidad, factor_conversion=Decimal("25000")
+        )
+        self.sal = Insumo.objects.create(nombre="Sal", unidad=unidad)
+        almacen = Almacen.objects.create(nombre="Bodega")
+        self.stocks = [
+            StockInsumo.objects.create(
+                insumo=insumo,
+                almacen=almacen,
+                cantidad_actual=Decimal(cantidad),
+                costo_promedio=Decimal("2.5"),
+            )
+            for insumo, cantidad in [(self.harina, "12.5"), (self.sal, "3")]
+        ]
+
+    def test_listado_de_stock(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("stock-insumo-list"), HTTP_ACCEPT=COLUMNAR)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], COLUMNAR)
+        datos = response.json()
+        self.assertEqual(
+            datos["columns"],
+            ["id", "insumo", "almacen", "cantidad_actual", "costo_promedio", "version", "updated_at"],
+        )
+        primera = dict(zip(datos["columns"], datos["rows"][0]))
+        self.assertEqual(primera["insumo"], self.harina.id)
+        # mismos strings que la representación normal
+        normal = self.client.get(reverse("stock-insumo-list")).json()["results"][0]
+        for campo in ("id", "cantidad_actual", "costo_promedio", "version"):
+            self.assertEqual(primera[campo], normal[campo])
+        self.assertIsNone(datos["next"])
+
+    def test_fields_y_paginacion(self):
+        url = reverse("insumo-list")
+        response = self.client.get(
+            url, {"format": "columnar", "fields": "id,factor_conversion", "page_size": 1}
+        )
+        datos = response.json()
+        self.assertEqual(datos["columns"], ["id", "factor_conversion"])
+        self.assertEqual(datos["rows"], [[self.harina.id, "25000.0000"]])
+
+        siguiente = self.client.get(datos["next"]).json()
+        self.assertEqual(siguiente["rows"], [[self.sal.id, None]])
+        self.assertIsNone(siguiente["next"])
+
+    def test_orden_por_indicador(self):
+        Plato.objects.create(nombre="Caro", precio_venta=Decimal("100"), costo_receta=Decimal("60"))
+        Plato.objects.create(nombre="Barato", precio_venta=Decimal("100"), costo_receta=Decimal("20"))
+        response = self.client.get(
+            reverse("plato-list"),
+            {"ordering": "food_cost_porcentaje", "fields": "nombre", "page_size": 1},
+            HTTP_ACCEPT=COLUMNAR,
+        )
+        datos = response.json()
+        self.assertEqual(datos["rows"], [["Barato"]])
+        self.assertEqual(self.client.get(datos["next"], HTTP_ACCEPT=COLUMNAR).json()["rows"], [["Caro"]])
+
+    def test_solo_en_listados(self):
+        response = self.client.get(
+            reverse("stock-insumo-detail", args=[self.stocks[0].id]), HTTP_ACCEPT=COLUMNAR
+        )
+        self.assertEqual(response.status_code, 406)
@@ -0,0 +1,151 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from inventory.catalogos import ALIAS_CACHE as CACHE_CATALOGOS
+from inventory.models import UnidadMedida, Proveedor, Almacen, Insumo, EntradaCompra
+from inventory.services.compras import (
+    ALIAS_CACHE,
+    AGRUPAR_INSUMO,
+    AGRUPAR_PERIODO,
+    AGRUPAR_PROVEEDOR,
+    PERIODO_ANIO,
+    analizar_compras,
+)
+
+
+class DatosComprasMixin:
+    def crear_datos(self):
+        caches[ALIAS_CACHE].clear()
+        caches[CACHE_CATALOGOS].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            unidad = UnidadMedida.objects.create(
+                nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+            )
+            self.almacen = Almacen.objects.create(nombre="Bodega")
+            self.tomate = Insumo.objects.create(nombre="Tomate", unidad=unidad, costo_promedio=Decimal("2"))
+            self.papa = Insumo.objects.create(nombre="Papa", unidad=unidad, costo_promedio=Decimal("1"))
+            self.feria = Proveedor.objects.create(nombre="Feria")
+            self.vega = Proveedor.objects.create(nombre="Vega")
+
+    def comprar(self, fecha, proveedor, insumo, cantidad, costo):
+        return EntradaCompra.objects.create(
+            proveedor=proveedor,
+            almacen=self.almacen,
+            insumo=insumo,
+            fecha_documento=fecha,
+            cantidad=Decimal(cantidad),
+            costo_unitario=Decimal(costo),
+        )
+
+
+class AnalisisComprasTests(DatosComprasMixin, TestCase):
+    def setUp(self):
+        self.crear_datos()
+        self.comprar(date(2025, 1, 10), self.feria, self.tomate, "10", "2")
+        self.comprar(date(2025, 1, 20), self.feria, self.tomate, "30", "3")
+        self.comprar(date(2025, 2, 5), self.vega, self.tomate, "10", "1.5")
+        self.comprar(date(2025, 2, 6), self.vega, self.papa, "100", "1.1")
+
+    def analizar(self, **kwargs):
+        return analizar_compras(desde=date(2025, 1, 1), hasta=date(2025, 12, 1), **kwargs)
+
+    def test_gasto_y_variacion(self):
+        analisis = self.analizar(agrupar=(AGRUPAR_PROVEEDOR, AGRUPAR_INSUMO))
+
+        self.assertEqual(analisis.compras, 4)
+        self.assertEqual(analisis.gasto_total, Decimal("235"))
+        self.assertEqual(
+            [(f["proveedor_nombre"], f["insumo_nombre"], f["gasto_total"]) for f in analisis.filas],
+            [("Feria", "Tomate", Decimal("110")), ("Vega", "Papa", Decimal("110")), ("Vega", "Tomate", Decimal("15"))],
+        )
+        feria_tomate, papa, _ = analisis.filas
+        # (10 × 2 + 30 × 3) / 40 = 2.75 contra 2 de costo actual
+        self.assertEqual(feria_tomate["costo_promedio"], Decimal("2.7500"))
+        self.assertEqual((feria_tomate["costo_minimo"], feria_tomate["costo_maximo"]), (2, 3))
+        self.assertEqual(feria_tomate["variacion_porcentaje"], Decimal("37.50"))
+        self.assertEqual(papa["variacion_porcentaje"], Decimal("10.00"))
+
+        meses = self.analizar(agrupar=(AGRUPAR_PERIODO,), insumo_id=self.tomate.id)
+        self.assertEqual(
+            [(f["periodo"], f["compras"], f["costo_actual"]) for f in meses.filas],
+            [(date(2025, 1, 1), 2, None), (date(2025, 2, 1), 1, None)],
+        )
+        anual = self.analizar(agrupar=(AGRUPAR_PERIODO, AGRUPAR_PROVEEDOR), periodo=PERIODO_ANIO)
+        self.assertEqual(
+            [(f["periodo"], f["proveedor_nombre"], f["compras"]) for f in anual.filas],
+            [(date(2025, 1, 1), "Vega", 2), (date(2025, 1, 1), "Feria", 2)],
+        )
+
+    def test_meses_cerrados_en_cache(self):
+        self.analizar(proveedor_id=self.vega.id)
+        # solo la huella de los meses; el resto sale del caché
+        with self.assertNumQueries(1):
+            analisis = self.analizar(proveedor_id=self.vega.id)
+        self.assertEqual(analisis.gasto_total, Decimal("125"))
+        # otra agrupación u otros filtros tienen su propia entrada
+        with self.assertNumQueries(4):
+            self.analizar(agrupar=(AGRUPAR_INSUMO,), proveedor_id=self.vega.id)
+
+        entrada = EntradaCompra.objects.get(fecha_documento=date(2025, 2, 5))
+        entrada.costo_unitario = Decimal("2.5")
+        entrada.save()
+        with self.assertNumQueries(2):
+            analisis = self.analizar(proveedor_id=self.vega.id)
+        self.assertEqual(analisis.gasto_total, Decimal("135"))
+
+        EntradaCompra.objects.filter(fecha_documento__month=1).delete()
+        self.assertEqual(self.analizar().compras, 2)
+
+    def test_mes_en_curso_no_se_guarda(self):
+        hoy = timezone.localdate()
+        self.comprar(hoy, self.feria, self.papa, "1", "1")
+        analizar_compras()
+        with self.assertNumQueries(2):
+            analisis = analizar_compras()
+        self.assertEqual(analisis.hasta, hoy.replace(day=1))
+        self.assertEqual(analisis.compras, 1)
+
+
+class AnalisisComprasAPITests(DatosComprasMixin, APITestCase):
+    def test_endpoint(self):
+        self.crear_datos()
+        self.comprar(date(2025, 3, 3), self.feria, self.tomate, "10", "2.2")
+        url = reverse("proveedor-analisis")
+
+        response = self.client.get(
+            url, {"desde": "2025-01", "hasta": "2025-12", "agrupar": "proveedor,insumo"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "desde": "2025-01-01",
+            "hasta": "2025-12-01",
+            "compras": 1,
+            "gasto_total": "22.0000",
+            "filas": [
+                {
+                    "periodo": None,
+                    "proveedor": self.feria.id,
+                    "proveedor_nombre": "Feria",
+                    "insumo": self.tomate.id,
+                    "insumo_nombre": "Tomate",
+                    "compras": 1,
+                    "cantidad_total": "10.000",
+                    "gasto_total": "22.0000",
+                    "costo_promedio": "2.2000",
+                    "costo_minimo": "2.2000",
+                    "costo_maximo": "2.2000",
+                    "costo_actual": "2.0000",
+                    "variacion_porcentaje": "10.00",
+                }
+            ],
+        })
+        self.assertEqual(self.client.get(url, {"agrupar": "almacen"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"desde": "2025-06", "hasta": "2025-01"}).status_code, 400
+        )
@@ -0,0 +1,138 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    StockInsumo,
+    MovimientoInventario,
+    Plato,
+    RecetaInsumo,
+)
+from inventory.services import inventory
+from inventory.services.inventory import (
+    ConflictoConcurrenciaError,
+    registrar_ajuste_inventario,
+    registrar_consumo_receta,
+    registrar_entrada_compra,
+    registrar_merma,
+    registrar_traspaso,
+)
+
+OPTIMISTA = {"MODO": "optimista", "REINTENTOS": 3}
+
+
+class ConcurrenciaStockTests(TestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.insumo = Insumo.objects.create(nombre="Harina", unidad=self.unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        self.cocina = Almacen.objects.create(nombre="Cocina")
+        self.stock = StockInsumo.objects.create(
+            insumo=self.insumo,
+            almacen=self.bodega,
+            cantidad_actual=Decimal("100"),
+            costo_promedio=Decimal("2"),
+        )
+
+    def _cambio_concurrente(self, veces: int):
+        """
+        Simula otra transacción que modifica el stock justo después de las
+        primeras `veces` lecturas. (En el test corre en la misma conexión,
+        así que el savepoint descartado también revierte el cambio.)
+        """
+        original = inventory._SesionStock.obtener
+        self.lecturas = 0
+
+        def obtener(sesion, **filtros):
+            stock = original(sesion, **filtros)
+            self.lecturas += 1
+            if self.lecturas <= veces:
+                StockInsumo.objects.filter(pk=self.stock.pk).update(
+                    cantidad_actual=Decimal("50"), version=F("version") + 1
+                )
+            return stock
+
+        return mock.patch.object(inventory._SesionStock, "obtener", obtener)
+
+    def test_modo_pesimista_incrementa_version(self):
+        registrar_merma(
+            insumo=self.insumo, almacen=self.bodega, cantidad=Decimal("-5"), motivo="Rotura"
+        )
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.cantidad_actual, Decimal("95"))
+        self.assertEqual(self.stock.version, 1)
+
+    @override_settings(INVENTARIO_CONCURRENCIA=OPTIMISTA)
+    def test_modo_optimista_sin_conflicto(self):
+        registrar_entrada_compra(
+            insumo=self.insumo,
+            almacen=self.bodega,
+            cantidad=Decimal("100"),
+            costo_unitario=Decimal("4"),
+        )
+        registrar_traspaso(
+            insumo=self.insumo,
+            almacen_origen=self.bodega,
+            almacen_destino=self.cocina,
+            cantidad=Decimal("20"),
+        )
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.cantidad_actual, Decimal("180"))
+        self.assertEqual(self.stock.costo_promedio, Decimal("3"))
+        self.assertEqual(self.stock.version, 2)
+        destino = StockInsumo.objects.get(insumo=self.insumo, almacen=self.cocina)
+        self.assertEqual(destino.cantidad_actual, Decimal("20"))
+        self.insumo.refresh_from_db()
+        self.assertEqual(self.insumo.costo_promedio, Decimal("3"))
+
+    @override_settings(INVENTARIO_CONCURRENCIA=OPTIMISTA)
+    def test_reintenta_si_cambio_la_version(self):
+        with self._cambio_concurrente(veces=1):
+            registrar_ajuste_inventario(
+                insumo=self.insumo,
+                almacen=self.bodega,
+                cantidad=Decimal("-10"),
+                motivo="Conteo",
+            )
+
+        # el primer intento detectó el cambio y se releyó el stock
+        self.assertEqual(self.lecturas, 2)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.cantidad_actual, Decimal("90"))
+        self.assertEqual(self.stock.version, 1)
+        # el movimiento del intento descartado se revirtió
+        self.assertEqual(MovimientoInventario.objects.count(), 1)
+
+    @override_settings(INVENTARIO_CONCURRENCIA=OPTIMISTA)
+    def test_agota_reintentos(self):
+        with self._cambio_concurrente(veces=10):
+            with self.assertRaises(ConflictoConcurrenciaError):
+                registrar_merma(
+                    insumo=self.insumo,
+                    almacen=self.bodega,
+                    cantidad=Decimal("-1"),
+                    motivo="Rotura",
+                )
+        self.assertFalse(MovimientoInventario.objects.exists())
+
+    @override_settings(INVENTARIO_CONCURRENCIA=OPTIMISTA)
+    def test_consumo_receta_optimista(self):
+        plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=plato, insumo=self.insumo, cantidad=Decimal("30"))
+
+        movimientos = registrar_consumo_receta(
+            plato=plato, almacen=self.bodega, cantidad_platos=Decimal("2")
+        )
+
+        self.assertEqual(len(movimientos), 1)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.cantidad_actual, Decimal("40"))
+        self.assertEqual(self.stock.version, 1)
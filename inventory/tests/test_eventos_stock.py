@@ -0,0 +1,202 @@
+import asyncio
+import json
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.eventos_stock import EventoStock, flujo_eventos_stock, hub_eventos_stock
+from inventory.models import UnidadMedida, Almacen, Insumo, StockInsumo
+from inventory.services.inventory import registrar_ajuste_inventario
+
+
+def eventos_sse(texto):
+    """[(tipo, datos)] de un fragmento text/event-stream."""
+    eventos = []
+    for bloque in texto.strip().split("\n\n"):
+        campos = dict(linea.split(": ", 1) for linea in bloque.splitlines() if ": " in linea)
+        if "event" in campos:
+            eventos.append((campos["event"], json.loads(campos["data"])))
+    return eventos
+
+
+class HubEventosStockTests(TestCase):
+    def setUp(self):
+        hub_eventos_stock.limpiar()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad, stock_minimo=Decimal("50"))
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        self.cocina = Almacen.objects.create(nombre="Cocina")
+        StockInsumo.objects.create(
+            insumo=self.harina, almacen=self.bodega, cantidad_actual=Decimal("60")
+        )
+
+    def suscribir(self, almacen):
+        async def suscribir():
+            return hub_eventos_stock.suscribir(almacen.id)
+
+        return self.loop.run_until_complete(suscribir())
+
+    def recibidos(self, suscripcion):
+        eventos = []
+        while (evento := self.loop.run_until_complete(suscripcion.siguiente(0.01))) is not None:
+            eventos.append((evento.tipo, evento.datos))
+        return eventos
+
+    def ajustar(self, cantidad):
+        registrar_ajuste_inventario(
+            insumo=self.harina, almacen=self.bodega, cantidad=Decimal(cantidad), motivo="Conteo"
+        )
+
+    def test_publica_al_confirmar_con_alerta(self):
+        suscripcion = self.suscribir(self.bodega)
+        otra = self.suscribir(self.cocina)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.ajustar("-5")
+        self.assertEqual(self.recibidos(suscripcion), [])  # aún sin commit
+
+        for callback in callbacks:
+            callback()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajustar("-10")
+
+        eventos = self.recibidos(suscripcion)
+        self.assertEqual([tipo for tipo, _ in eventos], ["stock", "stock", "alerta"])
+        self.assertEqual(eventos[0][1]["cantidad_actual"], "55.000")
+        self.assertEqual(eventos[1][1]["nivel_alerta"], "bajo_minimo")
+        self.assertEqual(eventos[2][1], {
+            "insumo": self.harina.id,
+            "almacen": self.bodega.id,
+            "nivel_alerta": "bajo_minimo",
+            "anterior": "ok",
+        })
+        self.assertEqual(self.recibidos(otra), [])
+
+    def test_sin_suscriptores_no_hace_nada(self):
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(5):
+            self.ajustar("5")
+        # solo las invalidaciones del caché de stock (servicio y señal)
+        self.assertEqual(len(callbacks), 2)
+
+    def test_rollback_no_se_anuncia(self):
+        suscripcion = self.suscribir(self.bodega)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.ajustar("5")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.recibidos(suscripcion), [])
+
+    @override_settings(INVENTARIO_CONCURRENCIA={"MODO": "optimista"})
+    def test_modo_optimista(self):
+        suscripcion = self.suscribir(self.bodega)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajustar("5")
+        eventos = self.recibidos(suscripcion)
+        self.assertEqual(len(eventos), 1)
+        self.assertEqual(eventos[0][1]["cantidad_actual"], "65.000")
+
+    def test_sondeo_publica_cambios_de_otros_procesos(self):
+        suscripcion = self.suscribir(self.bodega)
+        # el primer sondeo relee los últimos MARGEN_SONDEO segundos
+        hub_eventos_stock.sondear()
+        self.assertEqual(len(self.recibidos(suscripcion)), 1)
+
+        # como lo escribe run_worker: otro proceso, sin on_commit en este
+        StockInsumo.objects.filter(insumo=self.harina, almacen=self.bodega).update(
+            cantidad_actual=Decimal("40"), version=F("version") + 1, updated_at=timezone.now()
+        )
+        with self.assertNumQueries(1):
+            hub_eventos_stock.sondear()
+        eventos = self.recibidos(suscripcion)
+        self.assertEqual([tipo for tipo, _ in eventos], ["stock", "alerta"])
+        self.assertEqual(eventos[0][1]["cantidad_actual"], "40.000")
+
+        # la misma versión, por on_commit o por otro sondeo, no se repite
+        hub_eventos_stock.sondear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajustar("5")
+        hub_eventos_stock.sondear()
+        eventos = self.recibidos(suscripcion)
+        self.assertEqual([datos["cantidad_actual"] for _, datos in eventos], ["45.000"])
+
+    def test_sondeo_sin_suscriptores_no_consulta(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(hub_eventos_stock.sondear(), 0)
+
+    @override_settings(INVENTARIO_EVENTOS_STOCK={"MAX_COLA": 2, "PING": 15})
+    def test_cola_llena(self):
+        suscripcion = self.suscribir(self.bodega)
+        hub_eventos_stock.publicar(
+            [EventoStock("prueba", self.bodega.id, {"n": n}) for n in range(3)]
+        )
+        self.assertEqual(len(self.recibidos(suscripcion)), 2)
+        self.assertTrue(suscripcion.desbordada)
+
+
+class EventosSSETests(TestCase):
+    def setUp(self):
+        hub_eventos_stock.limpiar()
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        StockInsumo.objects.create(
+            insumo=self.harina, almacen=self.bodega, cantidad_actual=Decimal("12.5")
+        )
+        self.url = reverse("almacen-eventos", args=[self.bodega.id])
+
+    async def test_stream(self):
+        response = await AsyncClient().get(self.url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        contenido = aiter(response.streaming_content)
+
+        self.assertEqual(await anext(contenido), b"retry: 15000\n\n")
+        [(tipo, foto)] = eventos_sse((await anext(contenido)).decode())
+        self.assertEqual(tipo, "foto")
+        self.assertEqual(foto[0]["cantidad_actual"], "12.500")
+        self.assertTrue(hub_eventos_stock.escuchando(self.bodega.id))
+
+        hub_eventos_stock.publicar([EventoStock("prueba", self.bodega.id, {"n": 1})])
+        self.assertEqual(eventos_sse((await anext(contenido)).decode()), [("prueba", {"n": 1})])
+
+    @override_settings(INVENTARIO_EVENTOS_STOCK={"MAX_COLA": 10, "PING": 15, "INTERVALO_SONDEO": 0.01, "MARGEN_SONDEO": 10})
+    async def test_stream_recibe_cambios_por_sondeo(self):
+        contenido = aiter(flujo_eventos_stock(self.bodega.id))
+        await anext(contenido)
+        await anext(contenido)  # foto
+
+        await StockInsumo.objects.filter(almacen=self.bodega).aupdate(
+            cantidad_actual=Decimal("3"), version=F("version") + 1, updated_at=timezone.now()
+        )
+        # un sondeo previo al UPDATE puede reenviar la versión de la foto
+        while True:
+            [(tipo, datos)] = eventos_sse(await asyncio.wait_for(anext(contenido), 5))
+            if datos["version"] > 0:
+                break
+        self.assertEqual((tipo, datos["cantidad_actual"]), ("stock", "3.000"))
+        await contenido.aclose()
+
+    async def test_al_cerrar_se_desuscribe(self):
+        flujo = flujo_eventos_stock(self.bodega.id)
+        await anext(flujo)
+        self.assertTrue(hub_eventos_stock.escuchando(self.bodega.id))
+        await flujo.aclose()
+        self.assertFalse(hub_eventos_stock.escuchando(self.bodega.id))
+
+    def test_requiere_asgi(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 501)
+        self.assertTrue(response.content.startswith(b"event: error\n"))
@@ -0,0 +1,151 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    Almacen,
+    Insumo,
+    EntradaCompra,
+    PrecioInsumo,
+)
+from inventory.services.inventory import registrar_entrada_compra
+from inventory.services.precios import PERIODO_MES, PERIODO_SEMANA, serie_precios
+
+
+def momento(dia: date) -> datetime:
+    return timezone.make_aware(datetime(dia.year, dia.month, dia.day, 10))
+
+
+class HistorialPreciosTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.tomate = Insumo.objects.create(nombre="Tomate", unidad=unidad)
+        self.almacen = Almacen.objects.create(nombre="Bodega")
+        self.feria = Proveedor.objects.create(nombre="Feria")
+        self.vega = Proveedor.objects.create(nombre="Vega")
+
+    def comprar(self, dia, cantidad, costo, proveedor=None):
+        return registrar_entrada_compra(
+            insumo=self.tomate,
+            almacen=self.almacen,
+            cantidad=Decimal(cantidad),
+            costo_unitario=Decimal(costo),
+            fecha_movimiento=momento(dia),
+            proveedor=proveedor,
+        )
+
+    def test_la_compra_registra_el_precio(self):
+        movimiento = self.comprar(date(2025, 3, 4), "10", "1.5", proveedor=self.feria)
+
+        precio = PrecioInsumo.objects.get()
+        self.assertEqual(precio.movimiento, movimiento)
+        self.assertEqual(precio.proveedor, self.feria)
+        self.assertEqual(precio.fecha, date(2025, 3, 4))
+        self.assertEqual(precio.costo_unitario, Decimal("1.5"))
+
+        entrada = EntradaCompra.objects.create(
+            proveedor=self.vega,
+            almacen=self.almacen,
+            insumo=self.tomate,
+            fecha_documento=date(2025, 3, 5),
+            cantidad=Decimal("5"),
+            costo_unitario=Decimal("2"),
+        )
+        entrada.procesar()
+        self.assertEqual(PrecioInsumo.objects.get(movimiento=entrada.movimiento).proveedor, self.vega)
+
+    def test_series_por_semana_y_mes(self):
+        self.comprar(date(2025, 3, 3), "10", "1", proveedor=self.feria)  # lunes
+        self.comprar(date(2025, 3, 7), "30", "2", proveedor=self.feria)
+        self.comprar(date(2025, 3, 10), "10", "3", proveedor=self.feria)
+        self.comprar(date(2025, 3, 12), "10", "4", proveedor=self.vega)
+        self.comprar(date(2025, 4, 1), "10", "5", proveedor=self.vega)
+
+        semanas = serie_precios(insumo_id=self.tomate.id, periodo=PERIODO_SEMANA, proveedor_id=self.feria.id)
+        self.assertEqual([s["periodo"] for s in semanas], [date(2025, 3, 3), date(2025, 3, 10)])
+        self.assertEqual(semanas[0]["compras"], 2)
+        # (10 × 1 + 30 × 2) / 40
+        self.assertEqual(semanas[0]["costo_promedio"], Decimal("1.7500"))
+        self.assertEqual((semanas[0]["costo_minimo"], semanas[0]["costo_maximo"]), (1, 2))
+
+        meses = serie_precios(
+            insumo_id=self.tomate.id, periodo=PERIODO_MES, fecha_hasta=date(2025, 3, 31)
+        )
+        self.assertEqual(
+            [(m["proveedor__nombre"], m["compras"]) for m in meses], [("Feria", 3), ("Vega", 1)]
+        )
+        total = serie_precios(insumo_id=self.tomate.id, periodo=PERIODO_MES, por_proveedor=False)
+        self.assertEqual([m["compras"] for m in total], [4, 1])
+
+    def test_poblar_historial(self):
+        self.comprar(date(2025, 3, 3), "10", "1")
+        entrada = EntradaCompra.objects.create(
+            proveedor=self.vega,
+            almacen=self.almacen,
+            insumo=self.tomate,
+            fecha_documento=date(2025, 3, 5),
+            cantidad=Decimal("5"),
+            costo_unitario=Decimal("2"),
+        )
+        entrada.procesar()
+        PrecioInsumo.objects.all().delete()
+
+        salida = io.StringIO()
+        call_command("poblar_historial_precios", "--lote", "1", stdout=salida)
+        self.assertIn("2 precios", salida.getvalue())
+        self.assertEqual(
+            set(PrecioInsumo.objects.values_list("proveedor_id", "costo_unitario")),
+            {(None, Decimal("1")), (self.vega.id, Decimal("2"))},
+        )
+
+        call_command("poblar_historial_precios", stdout=salida)
+        self.assertEqual(PrecioInsumo.objects.count(), 2)
+
+
+class HistorialPreciosAPITests(APITestCase):
+    def test_endpoint(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        tomate = Insumo.objects.create(nombre="Tomate", unidad=unidad)
+        almacen = Almacen.objects.create(nombre="Bodega")
+        feria = Proveedor.objects.create(nombre="Feria")
+        for dia, costo in [(3, "1"), (4, "3")]:
+            registrar_entrada_compra(
+                insumo=tomate,
+                almacen=almacen,
+                cantidad=Decimal("10"),
+                costo_unitario=Decimal(costo),
+                fecha_movimiento=momento(date(2025, 3, dia)),
+                proveedor=feria,
+            )
+        url = reverse("insumo-precios", args=[tomate.id])
+
+        response = self.client.get(url, {"periodo": "semana"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "periodo": "2025-03-03",
+                    "proveedor": feria.id,
+                    "proveedor_nombre": "Feria",
+                    "compras": 2,
+                    "cantidad_total": "20.000",
+                    "costo_promedio": "2.0000",
+                    "costo_minimo": "1.0000",
+                    "costo_maximo": "3.0000",
+                }
+            ],
+        )
+        self.assertEqual(self.client.get(url, {"periodo": "anio"}).status_code, 400)
@@ -0,0 +1,230 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    StockInsumo,
+    LoteInsumo,
+    Plato,
+    RecetaInsumo,
+)
+from inventory.services.produccion import (
+    LineaPlanProduccion,
+    calcular_porciones_producibles,
+    planificar_produccion,
+)
+
+
+class PorcionesBase:
+    def crear_datos(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.levadura = Insumo.objects.create(nombre="Levadura", unidad=unidad)
+        self.bodega = Almacen.objects.create(nombre="Bodega")
+        self.cocina = Almacen.objects.create(nombre="Cocina")
+        Almacen.objects.create(nombre="Cerrado", activo=False)
+
+        for insumo, almacen, cantidad in [
+            (self.harina, self.bodega, "1000"),
+            (self.levadura, self.bodega, "25"),
+            (self.harina, self.cocina, "250"),
+            (self.levadura, self.cocina, "-3"),
+        ]:
+            StockInsumo.objects.create(
+                insumo=insumo, almacen=almacen, cantidad_actual=Decimal(cantidad)
+            )
+
+        self.pan = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.harina, cantidad=Decimal("100"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.levadura, cantidad=Decimal("10"))
+        self.masa = Plato.objects.create(nombre="Masa madre", precio_venta=Decimal("500"))
+        RecetaInsumo.objects.create(plato=self.masa, insumo=self.harina, cantidad=Decimal("80"))
+        inactivo = Plato.objects.create(nombre="Viejo", precio_venta=Decimal("1"), activo=False)
+        RecetaInsumo.objects.create(plato=inactivo, insumo=self.harina, cantidad=Decimal("1"))
+
+
+class PorcionesProduciblesTests(PorcionesBase, TestCase):
+    def setUp(self):
+        self.crear_datos()
+
+    def test_matriz_en_tres_consultas(self):
+        with self.assertNumQueries(3):
+            matriz = calcular_porciones_producibles()
+
+        self.assertEqual(
+            matriz.almacenes, [(self.bodega.id, "Bodega"), (self.cocina.id, "Cocina")]
+        )
+        self.assertEqual(
+            matriz.platos, [(self.masa.id, "Masa madre"), (self.pan.id, "Pan")]
+        )
+        # masa: 1000 // 80, 250 // 80 ; pan: min(10, 2), min(2, 0 por stock negativo)
+        self.assertEqual(matriz.porciones, [[12, 3], [2, 0]])
+        self.assertEqual(
+            matriz.limitantes,
+            [[self.harina.id, self.harina.id], [self.levadura.id, self.levadura.id]],
+        )
+
+    def test_insumo_sin_fila_de_stock_cuenta_como_cero(self):
+        almacen = Almacen.objects.create(nombre="Barra")
+        matriz = calcular_porciones_producibles(almacen_ids=[almacen.id])
+        self.assertEqual(matriz.porciones, [[0], [0]])
+
+
+class PorcionesProduciblesAPITests(PorcionesBase, APITestCase):
+    def setUp(self):
+        self.crear_datos()
+
+    def test_endpoint(self):
+        response = self.client.get(
+            reverse("plato-porciones-producibles"), {"almacenes": str(self.bodega.id)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["almacenes"], [{"id": self.bodega.id, "nombre": "Bodega"}])
+        self.assertEqual(
+            response.data["platos"][1],
+            {
+                "id": self.pan.id,
+                "nombre": "Pan",
+                "porciones": [2],
+                "insumos_limitantes": [self.levadura.id],
+            },
+        )
+
+    def test_almacenes_invalidos(self):
+        response = self.client.get(reverse("plato-porciones-producibles"), {"almacenes": "a,b"})
+        self.assertEqual(response.status_code, 400)
+
+
+class PlanProduccionTests(PorcionesBase, TestCase):
+    def setUp(self):
+        self.crear_datos()
+        saco = UnidadMedida.objects.create(
+            nombre="Saco", abreviatura="saco", factor_base=Decimal("1")
+        )
+        Insumo.objects.filter(pk=self.harina.pk).update(
+            unidad_compra=saco, factor_conversion=Decimal("25000")
+        )
+        # 200 g de harina de la bodega vencen antes del día del plan
+        LoteInsumo.objects.create(
+            insumo=self.harina,
+            almacen=self.bodega,
+            numero_lote="A1",
+            fecha_vencimiento=date(2025, 1, 5),
+            cantidad_actual=Decimal("200"),
+        )
+        LoteInsumo.objects.create(
+            insumo=self.harina,
+            almacen=self.bodega,
+            numero_lote="A2",
+            fecha_vencimiento=date(2025, 2, 1),
+            cantidad_actual=Decimal("500"),
+        )
+
+    def test_requerimientos_y_faltantes(self):
+        lineas = [
+            LineaPlanProduccion(plato_id=self.pan.id, cantidad=Decimal("5"), almacen_id=self.bodega.id),
+            LineaPlanProduccion(plato_id=self.masa.id, cantidad=Decimal("10"), almacen_id=self.bodega.id),
+            LineaPlanProduccion(plato_id=self.pan.id, cantidad=Decimal("1"), almacen_id=self.bodega.id),
+            LineaPlanProduccion(plato_id=9999, cantidad=Decimal("1"), almacen_id=self.bodega.id),
+        ]
+        with self.assertNumQueries(3):
+            resultado = planificar_produccion(lineas=lineas, fecha=date(2025, 1, 10))
+
+        harina, levadura = resultado.requerimientos
+        # 6 panes x 100 + 10 masas x 80
+        self.assertEqual(harina.requerido, Decimal("1400"))
+        self.assertEqual(harina.vencido, Decimal("200"))
+        self.assertEqual(harina.disponible, Decimal("800"))
+        self.assertEqual(harina.faltante, Decimal("600"))
+        self.assertEqual(harina.unidad_compra, "saco")
+        self.assertEqual(harina.faltante_compra, Decimal("1"))
+
+        self.assertEqual(levadura.requerido, Decimal("60"))
+        self.assertEqual(levadura.faltante, Decimal("35"))
+        self.assertIsNone(levadura.faltante_compra)
+
+        self.assertEqual(len(resultado.faltantes), 2)
+        self.assertEqual(resultado.platos_sin_receta, [9999])
+
+    def test_lotes_ya_consumidos_no_cuentan_como_vencidos(self):
+        def harina_bodega(stock):
+            StockInsumo.objects.filter(insumo=self.harina, almacen=self.bodega).update(
+                cantidad_actual=Decimal(stock)
+            )
+            (harina,) = planificar_produccion(
+                lineas=[
+                    LineaPlanProduccion(plato_id=self.masa.id, cantidad=Decimal("5"), almacen_id=self.bodega.id)
+                ],
+                fecha=date(2025, 1, 10),
+            ).requerimientos
+            return harina.vencido, harina.disponible
+
+        # el lote vigente de 500 cubre todo el stock: el vencido ya se consumió
+        self.assertEqual(harina_bodega("500"), (Decimal("0"), Decimal("500")))
+        # solo lo que excede a los lotes vigentes puede seguir en el vencido
+        self.assertEqual(harina_bodega("600"), (Decimal("100"), Decimal("500")))
+        # un lote sin fecha de vencimiento es vigente
+        LoteInsumo.objects.create(
+            insumo=self.harina, almacen=self.bodega, numero_lote="B", cantidad_actual=Decimal("100")
+        )
+        self.assertEqual(harina_bodega("600"), (Decimal("0"), Decimal("600")))
+
+    def test_sin_faltantes(self):
+        resultado = planificar_produccion(
+            lineas=[
+                LineaPlanProduccion(plato_id=self.masa.id, cantidad=Decimal("2"), almacen_id=self.cocina.id)
+            ],
+            fecha=date(2025, 1, 10),
+        )
+        (harina,) = resultado.requerimientos
+        self.assertEqual(harina.disponible, Decimal("250"))
+        self.assertEqual(harina.faltante, Decimal("0"))
+        self.assertEqual(harina.faltante_compra, Decimal("0"))
+        self.assertEqual(resultado.faltantes, [])
+
+
+class PlanProduccionAPITests(PorcionesBase, APITestCase):
+    def setUp(self):
+        self.crear_datos()
+        usuario = get_user_model().objects.create_user(username="chef", password="chef12345")
+        self.client.force_authenticate(user=usuario)
+
+    def test_endpoint(self):
+        response = self.client.post(
+            reverse("plato-planificar-produccion"),
+            {
+                "almacen": self.bodega.id,
+                "fecha": "2025-01-10",
+                "lineas": [
+                    {"plato": self.pan.id, "cantidad": "3"},
+                    {"plato": self.pan.id, "cantidad": "4", "almacen": self.cocina.id},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["fecha"], "2025-01-10")
+        self.assertEqual(response.data["faltantes"], 3)
+        cocina_harina = [
+            r for r in response.data["requerimientos"]
+            if r["almacen"] == self.cocina.id and r["insumo"] == self.harina.id
+        ][0]
+        self.assertEqual(cocina_harina["requerido"], "400.000")
+        self.assertEqual(cocina_harina["faltante"], "150.000")
+
+    def test_requiere_almacen(self):
+        response = self.client.post(
+            reverse("plato-planificar-produccion"),
+            {"lineas": [{"plato": self.pan.id, "cantidad": "3"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
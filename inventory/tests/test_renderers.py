@@ -0,0 +1,109 @@
+import io
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from inventory import renderers
+from inventory.models import Almacen, Insumo, StockInsumo, UnidadMedida
+from inventory.renderers import ORJSONParser, ORJSONRenderer
+from inventory.serializers import DecimalRapidoField
+
+
+class DecimalRapidoFieldTests(SimpleTestCase):
+    def test_misma_salida_que_drf(self):
+        valores = [
+            Decimal("1.500"),
+            Decimal("-0.000"),
+            Decimal("12345678.123"),
+            Decimal("1.5"),
+            Decimal("0.0004"),
+            Decimal("1E+2"),
+            2.25,
+            "3",
+            None,
+        ]
+        for kwargs in [
+            {"max_digits": 14, "decimal_places": 3},
+            {"max_digits": 12, "decimal_places": 0},
+            {"max_digits": 18, "decimal_places": 8},
+            {"max_digits": 14, "decimal_places": 3, "coerce_to_string": False},
+            {"max_digits": 14, "decimal_places": 3, "normalize_output": True},
+        ]:
+            drf = serializers.DecimalField(**kwargs)
+            rapido = DecimalRapidoField(**kwargs)
+            for valor in valores:
+                with self.subTest(valor=valor, **kwargs):
+                    self.assertEqual(rapido.to_representation(valor), drf.to_representation(valor))
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    datos = {
+        "texto": "ñandú \u2028 fin",
+        "decimal": Decimal("1.250"),
+        "fecha": date(2025, 1, 10),
+        "momento": datetime(2025, 1, 10, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "lista": [1, 2.5, None, True],
+        1: "clave entera",
+    }
+
+    def test_misma_salida_que_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.datos), JSONRenderer().render(self.datos))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indentado_usa_drf(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.datos, "application/json; indent=4"),
+            JSONRenderer().render(self.datos, "application/json; indent=4"),
+        )
+
+    def test_sin_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(
+                ORJSONRenderer().render(self.datos), JSONRenderer().render(self.datos)
+            )
+            self.assertEqual(ORJSONParser().parse(io.BytesIO(b'{"a": 1}')), {"a": 1})
+
+    def test_parser(self):
+        parser = ORJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO('{"nombre": "Ñoqui", "cantidad": 1.5}'.encode())),
+            {"nombre": "Ñoqui", "cantidad": 1.5},
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b"{no es json"))
+
+
+class ORJSONAPITests(APITestCase):
+    def test_listado_de_stock(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        insumo = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        almacen = Almacen.objects.create(nombre="Bodega")
+        StockInsumo.objects.create(
+            insumo=insumo, almacen=almacen, cantidad_actual=Decimal("12.5"), costo_promedio=Decimal("3")
+        )
+
+        response = self.client.get(reverse("stock-insumo-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        fila = response.json()["results"][0]
+        self.assertEqual(fila["cantidad_actual"], "12.500")
+        self.assertEqual(fila["costo_promedio"], "3.0000")
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class BenchmarkJSONTests(TestCase):
+    def test_comando(self):
+        salida = io.StringIO()
+        call_command("benchmark_json", "--filas", "20", "--repeticiones", "1", stdout=salida)
+        self.assertIn("Salida idéntica", salida.getvalue())
+        self.assertFalse(StockInsumo.objects.exists())
@@ -0,0 +1,159 @@
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.catalogos import ALIAS_CACHE
+from inventory.models import UnidadMedida, CategoriaInsumo, Proveedor, Insumo
+from inventory.services.importacion import ImportacionError, importar_insumos_csv
+
+User = get_user_model()
+
+ENCABEZADO = "nombre,unidad,unidad_compra,categoria,proveedor,activo,stock_minimo,stock_maximo,factor_conversion\n"
+
+
+class ImportacionInsumosTests(TestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        self.gramo = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.saco = UnidadMedida.objects.create(
+            nombre="Saco", abreviatura="saco", factor_base=Decimal("25000")
+        )
+        self.abarrotes = CategoriaInsumo.objects.create(nombre="Abarrotes")
+        self.proveedor = Proveedor.objects.create(nombre="Molino Sur")
+
+    def _importar(self, filas, **kwargs):
+        return importar_insumos_csv(io.StringIO(ENCABEZADO + filas), **kwargs)
+
+    def test_crea_insumos_resolviendo_referencias_por_nombre(self):
+        resultado = self._importar(
+            "Harina,g,Saco,abarrotes,MOLINO SUR,si,1000,50000,25000\n"
+            "Sal,Gramo,,,,no,,,\n"
+        )
+
+        self.assertEqual((resultado.procesadas, resultado.importadas), (2, 2))
+        self.assertEqual(resultado.errores, [])
+        harina = Insumo.objects.get(nombre="Harina")
+        self.assertEqual(harina.unidad, self.gramo)
+        self.assertEqual(harina.unidad_compra, self.saco)
+        self.assertEqual(harina.categoria, self.abarrotes)
+        self.assertEqual(harina.proveedor_principal, self.proveedor)
+        self.assertEqual(harina.factor_conversion, Decimal("25000"))
+        self.assertFalse(Insumo.objects.get(nombre="Sal").activo)
+
+    def test_upsert_por_nombre_conserva_costo_promedio(self):
+        existente = Insumo.objects.create(
+            nombre="Harina", unidad=self.gramo, costo_promedio=Decimal("1.5")
+        )
+
+        self._importar("Harina,g,,Abarrotes,,si,200,,\n")
+
+        existente.refresh_from_db()
+        self.assertEqual(Insumo.objects.count(), 1)
+        self.assertEqual(existente.stock_minimo, Decimal("200"))
+        self.assertEqual(existente.categoria, self.abarrotes)
+        self.assertEqual(existente.costo_promedio, Decimal("1.5"))
+
+    def test_informa_errores_por_fila_e_importa_el_resto(self):
+        resultado = self._importar(
+            "Harina,g,,,,si,,,\n"
+            "Azúcar,tonelada,,,,si,,,\n"
+            ",g,,,,si,abc,,\n"
+            "Aceite,g,Saco,,,si,,,\n"
+        )
+
+        self.assertEqual(resultado.importadas, 1)
+        self.assertEqual([e.fila for e in resultado.errores], [3, 4, 5])
+        self.assertIn("unidad: 'tonelada' no existe.", resultado.errores[0].errores)
+        self.assertEqual(len(resultado.errores[1].errores), 2)
+        self.assertIn("factor_conversion", resultado.errores[2].errores[0])
+        self.assertEqual(list(Insumo.objects.values_list("nombre", flat=True)), ["Harina"])
+
+    def test_lotes_y_nombres_repetidos(self):
+        filas = "".join(f"Insumo {i},g,,,,si,{i},,\n" for i in range(25))
+        filas += "Insumo 3,g,,,,si,99,,\n"
+
+        resultado = self._importar(filas, tamano_lote=10)
+
+        self.assertEqual(resultado.procesadas, 26)
+        self.assertEqual(Insumo.objects.count(), 25)
+        self.assertEqual(Insumo.objects.get(nombre="Insumo 3").stock_minimo, Decimal("99"))
+
+    def test_numeros_fuera_de_rango_son_errores_de_fila(self):
+        resultado = self._importar(
+            "Harina,g,,,,si,nan,,\n"
+            "Sal,g,,,,si,1e20,,\n"
+            "Azúcar,g,,,,si,,Infinity,\n"
+            "Aceite,g,Saco,,,si,0.0005,,1e-9\n"
+            "Arroz,g,,,,si,1.23456,,\n"
+        )
+
+        self.assertEqual([e.fila for e in resultado.errores], [2, 3, 4, 5])
+        self.assertIn("stock_minimo: 'nan' no es un número válido.", resultado.errores[0].errores)
+        self.assertIn("stock_minimo: admite como máximo 9 dígitos enteros.", resultado.errores[1].errores)
+        self.assertIn("factor_conversion: es obligatorio si hay unidad_compra.", resultado.errores[3].errores)
+        self.assertEqual(resultado.importadas, 1)
+        self.assertEqual(Insumo.objects.get().stock_minimo, Decimal("1.235"))
+
+    def test_faltan_columnas_obligatorias(self):
+        with self.assertRaises(ImportacionError):
+            importar_insumos_csv(io.StringIO("nombre,categoria\nHarina,Abarrotes\n"))
+
+    def test_comando_importar_insumos(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write(ENCABEZADO + "Harina,g,,,,si,,,\nSal,kg,,,,si,,,\n")
+        self.addCleanup(os.remove, f.name)
+        salida, errores = io.StringIO(), io.StringIO()
+
+        call_command("importar_insumos", f.name, stdout=salida, stderr=errores)
+
+        self.assertIn("1 insumos importados de 2 filas", salida.getvalue())
+        self.assertIn("Fila 3 (Sal)", errores.getvalue())
+
+
+class ImportacionInsumosAPITests(APITestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.url = reverse("insumo-importar")
+        self.user = User.objects.create_user(username="carga", password="carga12345")
+
+    def _archivo(self, contenido: str):
+        return SimpleUploadedFile("insumos.csv", contenido.encode("utf-8-sig"), "text/csv")
+
+    def test_requiere_autenticacion(self):
+        response = self.client.post(self.url, {"archivo": self._archivo(ENCABEZADO)})
+        self.assertIn(
+            response.status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+
+    def test_importa_y_devuelve_errores(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.url,
+            {"archivo": self._archivo(ENCABEZADO + "Harina,g,,,,si,,,\nSal,,,,,si,,,\n")},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["importadas"], 1)
+        self.assertEqual(response.data["con_errores"], 1)
+        self.assertEqual(response.data["errores"][0]["fila"], 3)
+
+    def test_encabezados_invalidos(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {"archivo": self._archivo("a,b\n1,2\n")})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
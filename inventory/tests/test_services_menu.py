@@ -0,0 +1,228 @@
+import importlib
+from decimal import Decimal
+
+from django.apps import apps
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    Plato,
+    RecetaInsumo,
+    ConsumoReceta,
+)
+from inventory.services.inventory import registrar_entrada_compra, registrar_consumo_receta
+from inventory.services.menu import (
+    anotar_indicadores_platos,
+    calcular_ingenieria_menu,
+    CLASIFICACION_ESTRELLA,
+    CLASIFICACION_CABALLO,
+    CLASIFICACION_ENIGMA,
+    CLASIFICACION_PERRO,
+)
+
+
+def _crear_consumo(plato, almacen, cantidad):
+    return ConsumoReceta.objects.create(
+        plato=plato,
+        almacen=almacen,
+        cantidad_platos=Decimal(cantidad),
+        fecha_movimiento=timezone.now(),
+    )
+
+
+class IndicadoresPlatoAnotadosTests(TestCase):
+    def test_anotaciones_coinciden_con_propiedades(self):
+        plato = Plato.objects.create(
+            nombre="Lomo",
+            precio_venta=Decimal("1000.00"),
+            costo_receta=Decimal("333.3333"),
+        )
+        anotado = anotar_indicadores_platos().get(pk=plato.pk)
+
+        self.assertEqual(anotado.food_cost_pct, plato.food_cost_porcentaje)
+        self.assertEqual(anotado.margen_bruto_monto, plato.margen_bruto)
+        self.assertEqual(anotado.margen_bruto_pct, plato.margen_bruto_porcentaje)
+
+    def test_sin_precio_los_porcentajes_son_nulos(self):
+        Plato.objects.create(nombre="Cortesía", precio_venta=Decimal("0"))
+        anotado = anotar_indicadores_platos().get(nombre="Cortesía")
+
+        self.assertIsNone(anotado.food_cost_pct)
+        self.assertIsNone(anotado.margen_bruto_pct)
+
+
+class IngenieriaMenuTests(TestCase):
+    def setUp(self):
+        self.almacen = Almacen.objects.create(nombre="Cocina")
+        # margen 700 / 200 / 800 / 100
+        self.estrella = Plato.objects.create(
+            nombre="Estrella", precio_venta=Decimal("1000"), costo_receta=Decimal("300")
+        )
+        self.caballo = Plato.objects.create(
+            nombre="Caballo", precio_venta=Decimal("500"), costo_receta=Decimal("300")
+        )
+        self.enigma = Plato.objects.create(
+            nombre="Enigma", precio_venta=Decimal("1200"), costo_receta=Decimal("400")
+        )
+        self.perro = Plato.objects.create(
+            nombre="Perro", precio_venta=Decimal("400"), costo_receta=Decimal("300")
+        )
+        _crear_consumo(self.estrella, self.almacen, "50")
+        _crear_consumo(self.caballo, self.almacen, "30")
+        _crear_consumo(self.caballo, self.almacen, "30")
+        _crear_consumo(self.enigma, self.almacen, "5")
+        _crear_consumo(self.perro, self.almacen, "5")
+
+    def test_clasifica_los_cuatro_cuadrantes(self):
+        resultado = calcular_ingenieria_menu()
+        clasificaciones = {p.nombre: p.clasificacion for p in resultado.platos}
+
+        self.assertEqual(resultado.popularidad_total, Decimal("120"))
+        self.assertEqual(clasificaciones["Estrella"], CLASIFICACION_ESTRELLA)
+        self.assertEqual(clasificaciones["Caballo"], CLASIFICACION_CABALLO)
+        self.assertEqual(clasificaciones["Enigma"], CLASIFICACION_ENIGMA)
+        self.assertEqual(clasificaciones["Perro"], CLASIFICACION_PERRO)
+
+    def test_filtra_y_ordena_en_bd(self):
+        resultado = calcular_ingenieria_menu(orden="-popularidad")
+        self.assertEqual(
+            [p.nombre for p in resultado.platos],
+            ["Caballo", "Estrella", "Enigma", "Perro"],
+        )
+
+        resultado = calcular_ingenieria_menu(clasificacion=CLASIFICACION_PERRO)
+        self.assertEqual([p.nombre for p in resultado.platos], ["Perro"])
+
+    def test_consultas_acotadas(self):
+        for i in range(30):
+            Plato.objects.create(nombre=f"Extra {i}", precio_venta=Decimal("100"))
+
+        with self.assertNumQueries(2):
+            resultado = calcular_ingenieria_menu()
+            list(resultado.platos)
+
+    def test_consumo_receta_registra_popularidad(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        insumo = Insumo.objects.create(nombre="Arroz", unidad=unidad)
+        registrar_entrada_compra(
+            insumo=insumo,
+            almacen=self.almacen,
+            cantidad=Decimal("1000"),
+            costo_unitario=Decimal("1"),
+        )
+        RecetaInsumo.objects.create(plato=self.perro, insumo=insumo, cantidad=Decimal("100"))
+
+        movimientos = registrar_consumo_receta(
+            plato=self.perro,
+            almacen=self.almacen,
+            cantidad_platos=Decimal("3"),
+        )
+
+        consumo = movimientos[0].consumo
+        self.assertEqual(consumo.plato, self.perro)
+        self.assertEqual(consumo.cantidad_platos, Decimal("3"))
+
+        resultado = calcular_ingenieria_menu(orden="nombre")
+        perro = next(p for p in resultado.platos if p.pk == self.perro.pk)
+        self.assertEqual(perro.popularidad, Decimal("8"))
+
+
+class ConsumosHistoricosTests(TestCase):
+    """Migración 0019: consumos a partir de movimientos anteriores a 0009."""
+
+    def test_reconstruye_consumos_desde_movimientos(self):
+        migracion = importlib.import_module("inventory.migrations.0019_consumos_historicos")
+        almacen = Almacen.objects.create(nombre="Cocina")
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        arroz = Insumo.objects.create(nombre="Arroz", unidad=unidad)
+        pollo = Insumo.objects.create(nombre="Pollo", unidad=unidad)
+        for insumo in (arroz, pollo):
+            registrar_entrada_compra(
+                insumo=insumo, almacen=almacen, cantidad=Decimal("5000"), costo_unitario=Decimal("1")
+            )
+        cazuela = Plato.objects.create(nombre="Cazuela", precio_venta=Decimal("900"))
+        RecetaInsumo.objects.create(plato=cazuela, insumo=arroz, cantidad=Decimal("100"))
+        RecetaInsumo.objects.create(plato=cazuela, insumo=pollo, cantidad=Decimal("250"))
+        registrar_consumo_receta(plato=cazuela, almacen=almacen, cantidad_platos=Decimal("4"))
+        registrar_consumo_receta(
+            plato=cazuela, almacen=almacen, cantidad_platos=Decimal("2"), referencia="MESA-7"
+        )
+        # como antes de 0009: movimientos sin consumo
+        ConsumoReceta.objects.all().delete()
+
+        migracion.poblar_consumos(apps, None)
+
+        consumos = ConsumoReceta.objects.order_by("fecha_movimiento")
+        self.assertEqual(
+            [(c.plato_id, c.cantidad_platos, c.movimientos.count()) for c in consumos],
+            [(cazuela.id, Decimal("4"), 2), (cazuela.id, Decimal("2"), 2)],
+        )
+        self.assertEqual(consumos[1].referencia, "MESA-7")
+        self.assertEqual(calcular_ingenieria_menu().platos[0].popularidad, Decimal("6"))
+
+        # se puede correr de nuevo sin duplicar
+        migracion.poblar_consumos(apps, None)
+        self.assertEqual(ConsumoReceta.objects.count(), 2)
+
+
+class IngenieriaMenuWebTests(TestCase):
+    def test_fecha_invalida_se_informa_y_se_ignora(self):
+        plato = Plato.objects.create(nombre="Pastel", precio_venta=Decimal("800"))
+        _crear_consumo(plato, Almacen.objects.create(nombre="Cocina"), "10")
+
+        response = self.client.get(
+            reverse("web:platos_ingenieria_menu"),
+            {"fecha_desde": "2024-02-30", "clasificacion": ""},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("fecha_desde", response.context["filtros"].errors)
+        self.assertContains(response, "Se ignoraron filtros inválidos")
+        self.assertEqual([p.nombre for p in response.context["platos"]], ["Pastel"])
+
+    def test_orden_conserva_los_filtros(self):
+        response = self.client.get(
+            reverse("web:platos_ingenieria_menu"),
+            {"fecha_desde": "2024-02-01", "clasificacion": CLASIFICACION_ESTRELLA, "page": "1"},
+        )
+
+        self.assertContains(
+            response,
+            f'href="?fecha_desde=2024-02-01&amp;clasificacion={CLASIFICACION_ESTRELLA}&amp;ordering=nombre"',
+        )
+
+    def test_clasificacion_desconocida_se_ignora(self):
+        response = self.client.get(reverse("web:platos_ingenieria_menu"), {"clasificacion": "unicornio"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("clasificacion", response.context["filtros"].errors)
+
+
+class IngenieriaMenuAPITests(APITestCase):
+    def test_endpoint_ingenieria_menu(self):
+        almacen = Almacen.objects.create(nombre="Cocina")
+        plato = Plato.objects.create(
+            nombre="Pastel", precio_venta=Decimal("800"), costo_receta=Decimal("200")
+        )
+        _crear_consumo(plato, almacen, "10")
+
+        response = self.client.get(
+            reverse("plato-ingenieria-menu"), {"ordering": "-margen_bruto"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["resumen"]["total_platos"], 1)
+        fila = response.data["results"][0]
+        self.assertEqual(fila["food_cost_porcentaje"], "25.00")
+        self.assertEqual(fila["margen_bruto_porcentaje"], "75.00")
+        self.assertEqual(fila["clasificacion"], CLASIFICACION_ESTRELLA)
@@ -5,6 +5,11 @@ from django.utils import timezone
 
 from inventory.models import UnidadMedida, Insumo, Plato, RecetaInsumo
 from inventory.services.inventory import calcular_costo_receta
+from inventory.services.recetas import (
+    exportar_recetas,
+    importar_recetas,
+    recostear_platos,
+)
 
 
 class CalculoCostoRecetaTests(TestCase):
@@ -107,3 +112,114 @@ class IndicadoresPlatoTests(TestCase):
         # margen bruto % ≈ (4998 / 5000) * 100 ≈ 99.96%
         self.assertEqual(self.plato.margen_bruto_porcentaje, Decimal("99.96"))
 
+
+class ImportacionRecetasTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(
+            nombre="Harina", unidad=unidad, costo_promedio=Decimal("0.0100")
+        )
+        self.levadura = Insumo.objects.create(
+            nombre="Levadura", unidad=unidad, costo_promedio=Decimal("0.0500")
+        )
+        self.sal = Insumo.objects.create(
+            nombre="Sal", unidad=unidad, costo_promedio=Decimal("0.0010")
+        )
+        self.pan = Plato.objects.create(nombre="Pan casero", precio_venta=Decimal("1000"))
+        self.pizza = Plato.objects.create(nombre="Pizza", precio_venta=Decimal("5000"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.harina, cantidad=Decimal("500"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.sal, cantidad=Decimal("5"))
+        RecetaInsumo.objects.create(plato=self.pizza, insumo=self.harina, cantidad=Decimal("300"))
+
+    def test_aplica_solo_el_diff_y_recostea(self):
+        resultado = importar_recetas([
+            {"plato": "pan casero", "insumo": "Harina", "cantidad": "500"},
+            {"plato": "Pan casero", "insumo": "Levadura", "cantidad": "10"},
+        ])
+
+        self.assertEqual(
+            (resultado.creadas, resultado.actualizadas, resultado.eliminadas, resultado.sin_cambios),
+            (1, 0, 1, 1),
+        )
+        self.assertEqual(resultado.platos_recosteados, 1)
+        self.assertEqual(
+            set(self.pan.receta_insumos.values_list("insumo__nombre", flat=True)),
+            {"Harina", "Levadura"},
+        )
+        self.pan.refresh_from_db()
+        self.assertEqual(self.pan.costo_receta, Decimal("5.5000"))
+        # la pizza no venía en el archivo
+        self.assertEqual(self.pizza.receta_insumos.count(), 1)
+
+    def test_actualiza_cantidades_y_conserva_faltantes(self):
+        resultado = importar_recetas(
+            [{"plato": "Pan casero", "insumo": "Harina", "cantidad": "600,5"}],
+            eliminar_faltantes=False,
+        )
+
+        self.assertEqual((resultado.actualizadas, resultado.eliminadas), (1, 0))
+        linea = RecetaInsumo.objects.get(plato=self.pan, insumo=self.harina)
+        self.assertEqual(linea.cantidad, Decimal("600.5000"))
+        self.assertEqual(self.pan.receta_insumos.count(), 2)
+
+    def test_plato_con_errores_no_se_modifica(self):
+        resultado = importar_recetas([
+            {"plato": "Pan casero", "insumo": "Levadura", "cantidad": "10"},
+            {"plato": "Pan casero", "insumo": "Azúcar", "cantidad": "10"},
+            {"plato": "Pizza", "insumo": "Sal", "cantidad": "0"},
+            {"plato": "Pizza", "insumo": "Sal", "cantidad": "2"},
+            {"plato": "Pizza", "insumo": "Sal", "cantidad": "3"},
+        ])
+
+        self.assertEqual([e.fila for e in resultado.errores], [3, 4, 6])
+        self.assertEqual(resultado.creadas, 0)
+        self.assertEqual(RecetaInsumo.objects.count(), 3)
+
+    def test_cantidades_fuera_de_rango_son_errores_de_fila(self):
+        resultado = importar_recetas([
+            {"plato": "Pan casero", "insumo": "Harina", "cantidad": "1e30"},
+            {"plato": "Pan casero", "insumo": "Sal", "cantidad": "NaN"},
+            {"plato": "Pizza", "insumo": "Harina", "cantidad": "1e10"},
+            {"plato": "Pizza", "insumo": "Sal", "cantidad": "99999999.99999"},
+        ])
+
+        self.assertEqual(
+            [e.errores for e in resultado.errores],
+            [
+                ["cantidad: admite como máximo 8 dígitos enteros."],
+                ["cantidad: 'NaN' debe ser un número > 0."],
+                ["cantidad: admite como máximo 8 dígitos enteros."],
+                ["cantidad: admite como máximo 8 dígitos enteros."],
+            ],
+        )
+        self.assertEqual(RecetaInsumo.objects.count(), 3)
+
+    def test_simular_no_escribe(self):
+        resultado = importar_recetas(
+            [{"plato": "Pizza", "insumo": "Sal", "cantidad": "2"}],
+            simular=True,
+        )
+
+        self.assertTrue(resultado.simulado)
+        self.assertEqual((resultado.creadas, resultado.eliminadas), (1, 1))
+        self.assertEqual(self.pizza.receta_insumos.get().insumo, self.harina)
+
+    def test_recostear_platos_equivale_a_calcular_costo(self):
+        recostear_platos([self.pan.id, self.pizza.id])
+
+        for plato in (self.pan, self.pizza):
+            plato.refresh_from_db()
+            self.assertEqual(plato.costo_receta, calcular_costo_receta(plato=plato, guardar=False))
+
+    def test_exportar_es_reimportable_sin_cambios(self):
+        filas = list(exportar_recetas())
+        self.assertEqual(
+            [(f["plato"], f["insumo"]) for f in filas],
+            [("Pan casero", "Harina"), ("Pan casero", "Sal"), ("Pizza", "Harina")],
+        )
+
+        resultado = importar_recetas(filas)
+        self.assertEqual(resultado.sin_cambios, 3)
+        self.assertEqual(resultado.platos_recosteados, 0)
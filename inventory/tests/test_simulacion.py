@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from inventory.models import UnidadMedida, Insumo, Plato, RecetaInsumo
+from inventory.services.simulacion import (
+    VariacionCosto,
+    cache_matriz_recetas,
+    simular_costos,
+)
+
+
+class SimulacionCostosTests(TestCase):
+    def setUp(self):
+        cache_matriz_recetas.limpiar()
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.carne = Insumo.objects.create(nombre="Carne", unidad=unidad, costo_promedio=Decimal("10"))
+        self.aceite = Insumo.objects.create(nombre="Aceite", unidad=unidad, costo_promedio=Decimal("2"))
+        self.sal = Insumo.objects.create(nombre="Sal", unidad=unidad, costo_promedio=Decimal("0.5"))
+        self.lomo = Plato.objects.create(nombre="Lomo", precio_venta=Decimal("5000"))
+        self.papas = Plato.objects.create(nombre="Papas fritas", precio_venta=Decimal("2000"))
+        self.ensalada = Plato.objects.create(nombre="Ensalada", precio_venta=Decimal("1500"))
+        for plato, insumo, cantidad in [
+            (self.lomo, self.carne, "250"),
+            (self.lomo, self.aceite, "20"),
+            (self.papas, self.aceite, "100"),
+            (self.ensalada, self.sal, "2"),
+        ]:
+            RecetaInsumo.objects.create(plato=plato, insumo=insumo, cantidad=Decimal(cantidad))
+
+    def test_impactos_ordenados(self):
+        resultado = simular_costos(
+            [
+                VariacionCosto(self.carne.id, variacion_porcentaje=Decimal("12")),
+                VariacionCosto(self.aceite.id, variacion_porcentaje=Decimal("-5")),
+            ]
+        )
+
+        self.assertEqual(resultado.platos_afectados, 2)
+        lomo, papas = resultado.impactos
+        self.assertEqual(lomo.nombre, "Lomo")
+        # 250 × 1.2 − 20 × 0.1
+        self.assertEqual(lomo.costo_actual, Decimal("2540.0000"))
+        self.assertEqual(lomo.diferencia, Decimal("298.0000"))
+        self.assertEqual(lomo.food_cost_actual, Decimal("50.80"))
+        self.assertEqual(lomo.food_cost_simulado, Decimal("56.76"))
+        self.assertEqual(lomo.margen_simulado, Decimal("2162.0000"))
+        self.assertEqual(papas.diferencia, Decimal("-10.0000"))
+        self.assertEqual(resultado.diferencia_total, Decimal("288.0000"))
+
+        todos = simular_costos(
+            [VariacionCosto(self.sal.id, costo_promedio=Decimal("0.5"))], solo_afectados=False
+        )
+        self.assertEqual(todos.platos_afectados, 0)
+        self.assertEqual(len(todos.impactos), 3)
+
+    def test_matriz_en_cache_hasta_que_cambie_algo(self):
+        variaciones = [VariacionCosto(self.carne.id, costo_promedio=Decimal("11"))]
+        simular_costos(variaciones)
+        with self.assertNumQueries(3):
+            simular_costos(variaciones)
+        self.assertEqual(cache_matriz_recetas.construcciones, 1)
+
+        self.carne.costo_promedio = Decimal("20")
+        self.carne.save()
+        resultado = simular_costos(variaciones)
+        self.assertEqual(cache_matriz_recetas.construcciones, 2)
+        self.assertEqual(resultado.impactos[0].diferencia, Decimal("-2250.0000"))
+
+        RecetaInsumo.objects.filter(plato=self.papas).delete()
+        self.assertEqual(
+            len(simular_costos([VariacionCosto(self.aceite.id, costo_promedio=Decimal("3"))]).impactos),
+            1,
+        )
+
+
+class SimulacionCostosAPITests(APITestCase):
+    def test_endpoint(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        carne = Insumo.objects.create(nombre="Carne", unidad=unidad, costo_promedio=Decimal("10"))
+        lomo = Plato.objects.create(nombre="Lomo", precio_venta=Decimal("5000"))
+        RecetaInsumo.objects.create(plato=lomo, insumo=carne, cantidad=Decimal("250"))
+        self.client.force_authenticate(get_user_model().objects.create_user("compras", password="x"))
+        url = reverse("plato-simular-costos")
+
+        response = self.client.post(
+            url, {"variaciones": [{"insumo": carne.id, "variacion_porcentaje": 12}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        impacto = response.json()["impactos"][0]
+        self.assertEqual(impacto["plato"], lomo.id)
+        self.assertEqual(impacto["costo_simulado"], "2800.0000")
+        self.assertEqual(impacto["food_cost_simulado"], "56.00")
+
+        response = self.client.post(
+            url,
+            {"variaciones": [{"insumo": carne.id, "variacion_porcentaje": 1, "costo_promedio": 2}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url,
+            {
+                "variaciones": [
+                    {"insumo": carne.id, "variacion_porcentaje": 10},
+                    {"insumo": carne.id, "variacion_porcentaje": 10},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Insumos repetidos", str(response.data["variaciones"]))
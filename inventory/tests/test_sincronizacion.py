@@ -0,0 +1,282 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models.signals import post_delete, pre_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from inventory.models import (
+    UnidadMedida,
+    Almacen,
+    Insumo,
+    StockInsumo,
+    Plato,
+    RecetaInsumo,
+    RegistroEliminado,
+    ConsumoReceta,
+    MovimientoInventario,
+)
+from inventory.services.inventory import (
+    VENTA_APLICADA,
+    VENTA_DUPLICADA,
+    VENTA_RECHAZADA,
+    VentaOffline,
+    registrar_ajuste_inventario,
+    registrar_consumos_lote,
+)
+from inventory.services.sincronizacion import (
+    CursorInvalidoError,
+    CursorVencidoError,
+    codificar_cursor,
+    obtener_cambios,
+    purgar_registros_eliminados,
+)
+
+SIN_MARGEN = {"LIMITE": 1000, "MARGEN": 0, "RETENCION_DIAS": 30}
+
+
+def ids(resultado, fuente):
+    return [fila[0] for fila in resultado.cambios[fuente]["rows"]]
+
+
+@override_settings(INVENTARIO_SINCRONIZACION=SIN_MARGEN)
+class FeedCambiosTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.sal = Insumo.objects.create(nombre="Sal", unidad=unidad)
+        self.almacen = Almacen.objects.create(nombre="Bodega")
+        self.stock = StockInsumo.objects.create(
+            insumo=self.harina, almacen=self.almacen, cantidad_actual=Decimal("10")
+        )
+        self.plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        self.receta = RecetaInsumo.objects.create(
+            plato=self.plato, insumo=self.harina, cantidad=Decimal("100")
+        )
+
+    def test_sincronizacion_completa_y_luego_incremental(self):
+        completa = obtener_cambios()
+        self.assertFalse(completa.hay_mas)
+        self.assertEqual(ids(completa, "insumos"), [self.harina.id, self.sal.id])
+        self.assertEqual(ids(completa, "recetas_insumo"), [self.receta.id])
+        self.assertEqual(completa.eliminados, {})
+
+        registrar_ajuste_inventario(
+            insumo=self.harina, almacen=self.almacen, cantidad=Decimal("5"), motivo="Conteo"
+        )
+        with self.assertNumQueries(5):
+            cambios = obtener_cambios(completa.cursor)
+
+        self.assertEqual(ids(cambios, "stocks_insumo"), [self.stock.id])
+        fila = dict(zip(cambios.cambios["stocks_insumo"]["columns"], cambios.cambios["stocks_insumo"]["rows"][0]))
+        self.assertEqual(fila["cantidad_actual"], Decimal("15"))
+        # ajustar el stock también recalcula el costo promedio del insumo
+        self.assertEqual(ids(cambios, "platos"), [])
+        self.assertEqual(ids(cambios, "recetas_insumo"), [])
+
+        # nada nuevo: no se reenvía nada
+        self.assertEqual(ids(obtener_cambios(cambios.cursor), "stocks_insumo"), [])
+
+    def test_eliminaciones_en_cascada(self):
+        cursor = obtener_cambios().cursor
+        plato_id, receta_id = self.plato.id, self.receta.id
+        self.plato.delete()
+
+        cambios = obtener_cambios(cursor)
+        self.assertEqual(cambios.eliminados, {"platos": [plato_id], "recetas_insumo": [receta_id]})
+        self.assertEqual(RegistroEliminado.objects.count(), 2)
+        self.assertEqual(obtener_cambios(cambios.cursor).eliminados, {})
+
+    def test_paginas_sin_perder_ni_repetir_filas(self):
+        Insumo.objects.filter(pk=self.sal.pk).update(updated_at=self.harina.updated_at)
+        vistos = []
+        resultado = obtener_cambios(limite=1)
+        while True:
+            vistos.extend(ids(resultado, "insumos"))
+            if not resultado.hay_mas:
+                break
+            resultado = obtener_cambios(resultado.cursor, limite=1)
+        self.assertEqual(vistos, [self.harina.id, self.sal.id])
+
+    @override_settings(INVENTARIO_SINCRONIZACION={**SIN_MARGEN, "MARGEN": 60})
+    def test_margen_reenvia_lo_reciente(self):
+        primera = obtener_cambios()
+        segunda = obtener_cambios(primera.cursor)
+        self.assertEqual(ids(segunda, "insumos"), [self.harina.id, self.sal.id])
+
+    def test_cursor_invalido_o_vencido(self):
+        with self.assertRaises(CursorInvalidoError):
+            obtener_cambios("no-es-un-cursor")
+
+        viejo = timezone.now() - timedelta(days=31)
+        with self.assertRaises(CursorVencidoError):
+            obtener_cambios(codificar_cursor({"eliminados": (viejo, 0)}))
+
+    def test_purgar(self):
+        self.sal.delete()
+        RegistroEliminado.objects.update(eliminado_en=timezone.now() - timedelta(days=40))
+        self.plato.delete()
+
+        salida = io.StringIO()
+        call_command("purgar_eliminados", stdout=salida)
+        self.assertIn("1 registros", salida.getvalue())
+        self.assertEqual(RegistroEliminado.objects.count(), 2)
+
+    def test_purgar_borra_en_bloque(self):
+        # sin receptores de borrado para el modelo, Django borra con un solo DELETE
+        RegistroEliminado.objects.bulk_create(
+            RegistroEliminado(modelo="insumos", objeto_id=pk) for pk in range(3)
+        )
+        RegistroEliminado.objects.update(eliminado_en=timezone.now() - timedelta(days=40))
+        with self.assertNumQueries(1):
+            self.assertEqual(purgar_registros_eliminados(), 3)
+        for modelo in (RegistroEliminado, MovimientoInventario):
+            self.assertFalse(pre_delete.has_listeners(modelo) or post_delete.has_listeners(modelo))
+
+
+@override_settings(INVENTARIO_SINCRONIZACION=SIN_MARGEN)
+class SincronizacionAPITests(APITestCase):
+    def test_endpoint(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        insumo = Insumo.objects.create(nombre="Harina", unidad=unidad, stock_minimo=Decimal("2"))
+        url = reverse("sincronizacion-list")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        columnas = datos["cambios"]["insumos"]["columns"]
+        fila = dict(zip(columnas, datos["cambios"]["insumos"]["rows"][0]))
+        self.assertEqual(fila["id"], insumo.id)
+        self.assertEqual(fila["stock_minimo"], "2.000")
+
+        insumo_id = insumo.id
+        insumo.delete()
+        datos = self.client.get(url, {"since": datos["cursor"]}).json()
+        self.assertEqual(datos["eliminados"], {"insumos": [insumo_id]})
+
+    def test_errores_de_cursor(self):
+        url = reverse("sincronizacion-list")
+        self.assertEqual(self.client.get(url, {"since": "???"}).status_code, 400)
+        viejo = codificar_cursor({"eliminados": (timezone.now() - timedelta(days=90), 0)})
+        self.assertEqual(self.client.get(url, {"since": viejo}).status_code, 410)
+
+
+class VentasOfflineTests(TestCase):
+    def setUp(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        self.queso = Insumo.objects.create(nombre="Queso", unidad=unidad)
+        self.almacen = Almacen.objects.create(nombre="Local")
+        for insumo, cantidad in [(self.harina, "1000"), (self.queso, "60")]:
+            StockInsumo.objects.create(
+                insumo=insumo,
+                almacen=self.almacen,
+                cantidad_actual=Decimal(cantidad),
+                costo_promedio=Decimal("0.01"),
+            )
+        self.pan = Plato.objects.create(nombre="Pan de queso", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.harina, cantidad=Decimal("100"))
+        RecetaInsumo.objects.create(plato=self.pan, insumo=self.queso, cantidad=Decimal("20"))
+        self.inactivo = Plato.objects.create(nombre="Viejo", precio_venta=Decimal("1"), activo=False)
+
+    def venta(self, evento_id, cantidad="1", plato=None):
+        return VentaOffline(
+            evento_id=evento_id,
+            plato_id=(plato or self.pan).id,
+            almacen_id=self.almacen.id,
+            cantidad_platos=Decimal(cantidad),
+            fecha_movimiento=timezone.now(),
+        )
+
+    def stock(self, insumo):
+        return StockInsumo.objects.get(insumo=insumo, almacen=self.almacen).cantidad_actual
+
+    def test_lote_con_duplicados_y_rechazos(self):
+        ventas = [
+            self.venta("a", "2"),
+            self.venta("a", "2"),  # repetido en el mismo lote
+            self.venta("b", "2"),  # 40 g de queso: quedan 20
+            self.venta("c", "1", plato=self.inactivo),
+            self.venta("d", "0.5"),
+        ]
+        with self.assertNumQueries(11):
+            resultados = registrar_consumos_lote(ventas=ventas)
+
+        self.assertEqual(
+            [r.estado for r in resultados],
+            [VENTA_APLICADA, VENTA_DUPLICADA, VENTA_RECHAZADA, VENTA_RECHAZADA, VENTA_APLICADA],
+        )
+        self.assertIn("Queso", resultados[2].error)
+        self.assertEqual(self.stock(self.harina), Decimal("750"))
+        self.assertEqual(self.stock(self.queso), Decimal("10"))
+        consumo = ConsumoReceta.objects.get(evento_id="a")
+        self.assertEqual(resultados[0].consumo_id, consumo.id)
+        movimientos = MovimientoInventario.objects.filter(consumo=consumo).order_by("referencia")
+        self.assertEqual([m.cantidad for m in movimientos], [Decimal("-200"), Decimal("-40")])
+        self.assertEqual(movimientos[0].costo_total, Decimal("-2.0000"))
+
+    def test_reenvio_no_descuenta_dos_veces(self):
+        registrar_consumos_lote(ventas=[self.venta("a"), self.venta("b")])
+        resultados = registrar_consumos_lote(ventas=[self.venta("a"), self.venta("b"), self.venta("c")])
+
+        self.assertEqual(
+            [r.estado for r in resultados], [VENTA_DUPLICADA, VENTA_DUPLICADA, VENTA_APLICADA]
+        )
+        self.assertEqual(ConsumoReceta.objects.count(), 3)
+        self.assertEqual(self.stock(self.harina), Decimal("700"))
+
+    @override_settings(INVENTARIO_CONCURRENCIA={"MODO": "optimista"})
+    def test_modo_optimista(self):
+        resultados = registrar_consumos_lote(ventas=[self.venta("a"), self.venta("b")])
+        self.assertEqual([r.estado for r in resultados], [VENTA_APLICADA, VENTA_APLICADA])
+        self.assertEqual(self.stock(self.queso), Decimal("20"))
+        self.assertEqual(StockInsumo.objects.get(insumo=self.queso).version, 1)
+
+
+class VentasOfflineAPITests(APITestCase):
+    def test_subida_de_lote(self):
+        unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        harina = Insumo.objects.create(nombre="Harina", unidad=unidad)
+        almacen = Almacen.objects.create(nombre="Local")
+        StockInsumo.objects.create(insumo=harina, almacen=almacen, cantidad_actual=Decimal("10"))
+        pan = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=pan, insumo=harina, cantidad=Decimal("1"))
+        url = reverse("sincronizacion-ventas")
+        datos = {
+            "ventas": [
+                {
+                    "evento_id": f"ev-{n}",
+                    "plato": pan.id,
+                    "almacen": almacen.id,
+                    "cantidad_platos": "1",
+                    "fecha_movimiento": "2025-01-10T13:05:00Z",
+                }
+                for n in range(3)
+            ]
+        }
+
+        self.assertEqual(self.client.post(url, datos, format="json").status_code, 403)
+        self.client.force_authenticate(get_user_model().objects.create_user("pos", password="x"))
+        response = self.client.post(url, datos, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["estado"] for r in response.json()["resultados"]], ["aplicada"] * 3)
+        self.assertEqual(ConsumoReceta.objects.filter(usuario__username="pos").count(), 3)
+
+        response = self.client.post(url, datos, format="json")
+        self.assertEqual([r["estado"] for r in response.json()["resultados"]], ["duplicada"] * 3)
+
+        datos["ventas"][0]["cantidad_platos"] = "0"
+        self.assertEqual(self.client.post(url, datos, format="json").status_code, 400)
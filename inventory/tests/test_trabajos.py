@@ -0,0 +1,300 @@
+import io
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DataError, OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.catalogos import ALIAS_CACHE
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    Insumo,
+    Almacen,
+    EntradaCompra,
+    Plato,
+    RecetaInsumo,
+    StockInsumo,
+    Trabajo,
+)
+from inventory.services import trabajos
+from inventory.services.trabajos import (
+    TAREAS,
+    encolar,
+    procesar_pendientes,
+    recuperar_trabajos_colgados,
+    tarea,
+    tomar_trabajo,
+)
+
+User = get_user_model()
+
+ASINCRONICO = {"SINCRONICO": False, "MAX_INTENTOS": 3, "RETARDO_REINTENTO": 30}
+
+
+@override_settings(INVENTARIO_TRABAJOS=ASINCRONICO)
+class ColaTrabajosTests(TestCase):
+    def setUp(self):
+        self.llamadas = []
+
+        @tarea("prueba")
+        def prueba(trabajo, *, fallar=0):
+            self.llamadas.append(trabajo.intentos)
+            if len(self.llamadas) <= fallar:
+                raise RuntimeError("falla transitoria")
+            trabajo.reportar_progreso(50, "a medio camino")
+            return {"ok": True}
+
+    def tearDown(self):
+        TAREAS.pop("prueba", None)
+
+    def test_encola_y_ejecuta(self):
+        trabajo = encolar("prueba")
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_PENDIENTE)
+        self.assertEqual(self.llamadas, [])
+
+        self.assertEqual(procesar_pendientes(), 1)
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_COMPLETADO)
+        self.assertEqual(trabajo.resultado, {"ok": True})
+        self.assertEqual(trabajo.progreso, 100)
+        self.assertEqual(trabajo.intentos, 1)
+
+    def test_clave_idempotencia(self):
+        primero = encolar("prueba", clave_idempotencia="abc")
+        segundo = encolar("prueba", clave_idempotencia="abc")
+        self.assertEqual(primero.pk, segundo.pk)
+        self.assertEqual(Trabajo.objects.count(), 1)
+
+        # sin clave, o con otra, se encola de nuevo
+        encolar("prueba")
+        encolar("prueba", clave_idempotencia="xyz")
+        self.assertEqual(Trabajo.objects.count(), 3)
+
+    def test_clave_de_un_trabajo_fallido_se_puede_reintentar(self):
+        fallido = encolar("prueba", {"fallar": 5}, clave_idempotencia="abc", max_intentos=1)
+        procesar_pendientes()
+        fallido.refresh_from_db()
+        self.assertEqual(fallido.estado, Trabajo.ESTADO_FALLIDO)
+
+        nuevo = encolar("prueba", clave_idempotencia="abc")
+        self.assertNotEqual(nuevo.pk, fallido.pk)
+        self.assertEqual(encolar("prueba", clave_idempotencia="abc").pk, nuevo.pk)
+        fallido.refresh_from_db()
+        self.assertEqual((fallido.estado, fallido.clave_idempotencia), (Trabajo.ESTADO_FALLIDO, ""))
+
+    def test_reintenta_con_espera_y_luego_falla(self):
+        trabajo = encolar("prueba", {"fallar": 5}, max_intentos=2)
+
+        procesar_pendientes()
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_PENDIENTE)
+        self.assertIn("falla transitoria", trabajo.error)
+        self.assertGreater(trabajo.disponible_desde, timezone.now())
+        # todavía no está disponible
+        self.assertIsNone(tomar_trabajo())
+
+        Trabajo.objects.filter(pk=trabajo.pk).update(disponible_desde=timezone.now())
+        procesar_pendientes()
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_FALLIDO)
+        self.assertEqual(self.llamadas, [1, 2])
+
+    def test_recupera_trabajos_colgados(self):
+        trabajo = encolar("prueba")
+        self.assertIsNotNone(tomar_trabajo())
+        self.assertIsNone(tomar_trabajo())
+
+        Trabajo.objects.filter(pk=trabajo.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(recuperar_trabajos_colgados(), 1)
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_PENDIENTE)
+
+    def test_run_worker_una_vez(self):
+        encolar("prueba")
+        encolar("prueba")
+        salida = io.StringIO()
+        call_command("run_worker", "--una-vez", stdout=salida)
+        self.assertIn("2 trabajos procesados", salida.getvalue())
+
+    def test_worker_sobrevive_a_errores_de_la_bd(self):
+        from inventory.management.commands import run_worker
+
+        detener = threading.Event()
+        respuestas = iter([OperationalError("database is locked"), None])
+
+        def tomar():
+            respuesta = next(respuestas)
+            if isinstance(respuesta, Exception):
+                raise respuesta
+            detener.set()
+
+        with mock.patch.object(run_worker, "tomar_trabajo", side_effect=tomar), \
+                mock.patch.object(detener, "wait") as esperas, \
+                self.assertLogs(run_worker.logger, "ERROR"):
+            run_worker._bucle(0.5, detener)
+        esperas.assert_any_call(1.0)
+
+    @override_settings(INVENTARIO_TRABAJOS={**ASINCRONICO, "SINCRONICO": True})
+    def test_modo_sincronico(self):
+        trabajo = encolar("prueba")
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_COMPLETADO)
+        self.assertEqual(self.llamadas, [1])
+
+
+@override_settings(INVENTARIO_TRABAJOS=ASINCRONICO)
+class TareasTests(TestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.insumo = Insumo.objects.create(
+            nombre="Harina", unidad=self.unidad, costo_promedio=Decimal("0.0100")
+        )
+        self.almacen = Almacen.objects.create(nombre="Bodega")
+
+    def test_procesar_entrada_compra(self):
+        entrada = EntradaCompra.objects.create(
+            proveedor=Proveedor.objects.create(nombre="Molino"),
+            almacen=self.almacen,
+            insumo=self.insumo,
+            fecha_documento=date(2025, 1, 10),
+            cantidad=Decimal("100"),
+            costo_unitario=Decimal("0.02"),
+        )
+        encolar(
+            "procesar_entrada_compra",
+            {"entrada_id": entrada.pk},
+            clave_idempotencia=f"entrada-compra-{entrada.pk}",
+        )
+        entrada.refresh_from_db()
+        self.assertFalse(entrada.procesada)
+
+        procesar_pendientes()
+        entrada.refresh_from_db()
+        self.assertTrue(entrada.procesada)
+        stock = StockInsumo.objects.get(insumo=self.insumo, almacen=self.almacen)
+        self.assertEqual(stock.cantidad_actual, Decimal("100"))
+
+    def test_procesar_dos_veces_no_duplica_la_entrada(self):
+        entrada = EntradaCompra.objects.create(
+            proveedor=Proveedor.objects.create(nombre="Molino"),
+            almacen=self.almacen,
+            insumo=self.insumo,
+            fecha_documento=date(2025, 1, 10),
+            cantidad=Decimal("100"),
+            costo_unitario=Decimal("0.02"),
+        )
+        # copia leída antes de que otra ejecución procesara la entrada
+        desactualizada = EntradaCompra.objects.get(pk=entrada.pk)
+        movimiento = entrada.procesar()
+
+        self.assertEqual(desactualizada.procesar(), movimiento)
+        self.assertTrue(desactualizada.procesada)
+        stock = StockInsumo.objects.get(insumo=self.insumo, almacen=self.almacen)
+        self.assertEqual(stock.cantidad_actual, Decimal("100"))
+
+    def test_entrada_inexistente_falla_sin_reintentar(self):
+        trabajo = encolar("procesar_entrada_compra", {"entrada_id": 999})
+        procesar_pendientes()
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_FALLIDO)
+        self.assertEqual(trabajo.intentos, 1)
+        self.assertIn("999", trabajo.error)
+
+    def test_recostear_platos(self):
+        plato = Plato.objects.create(nombre="Pan", precio_venta=Decimal("1000"))
+        RecetaInsumo.objects.create(plato=plato, insumo=self.insumo, cantidad=Decimal("500"))
+        trabajo = encolar("recostear_platos")
+        procesar_pendientes()
+
+        trabajo.refresh_from_db()
+        plato.refresh_from_db()
+        self.assertEqual(trabajo.resultado, {"platos": 1})
+        self.assertEqual(plato.costo_receta, Decimal("5.0000"))
+
+
+@override_settings(INVENTARIO_TRABAJOS=ASINCRONICO)
+class TrabajosAPITests(APITestCase):
+    def setUp(self):
+        caches[ALIAS_CACHE].clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.user = User.objects.create_user(username="carga", password="carga12345")
+        self.client.force_authenticate(user=self.user)
+
+    def _importar(self, **headers):
+        archivo = SimpleUploadedFile(
+            "insumos.csv", "nombre,unidad\nHarina,g\nSal,kg\n".encode(), "text/csv"
+        )
+        with self.settings(MEDIA_ROOT=self.media):
+            return self.client.post(reverse("insumo-importar"), {"archivo": archivo}, headers=headers)
+
+    def test_importacion_encolada_y_estado(self):
+        response = self._importar()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["estado"], Trabajo.ESTADO_PENDIENTE)
+        self.assertFalse(Insumo.objects.exists())
+
+        with self.settings(MEDIA_ROOT=self.media):
+            procesar_pendientes()
+
+        estado = self.client.get(response["Location"])
+        self.assertEqual(estado.status_code, status.HTTP_200_OK)
+        self.assertEqual(estado.data["estado"], Trabajo.ESTADO_COMPLETADO)
+        self.assertEqual(estado.data["resultado"]["importadas"], 1)
+        self.assertEqual(estado.data["resultado"]["con_errores"], 1)
+        self.assertTrue(Insumo.objects.filter(nombre="Harina").exists())
+
+    def test_error_de_datos_falla_sin_reintentar(self):
+        response = self._importar()
+        with self.settings(MEDIA_ROOT=self.media), mock.patch(
+            "inventory.tareas.importar_insumos_csv", side_effect=DataError("fuera de rango")
+        ):
+            procesar_pendientes()
+
+        trabajo = Trabajo.objects.get(pk=response.data["id"])
+        self.assertEqual(trabajo.estado, Trabajo.ESTADO_FALLIDO)
+        self.assertEqual(trabajo.intentos, 1)
+        self.assertIn("fuera de rango", trabajo.error)
+
+    def test_idempotency_key(self):
+        primero = self._importar(**{"Idempotency-Key": "carga-1"})
+        segundo = self._importar(**{"Idempotency-Key": "carga-1"})
+        self.assertEqual(primero.data["id"], segundo.data["id"])
+        self.assertEqual(Trabajo.objects.count(), 1)
+
+    def test_recostear_y_listado_por_usuario(self):
+        response = self.client.post(reverse("plato-recostear"), {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        otro = User.objects.create_user(username="otro", password="otro12345")
+        encolar("recostear_platos", usuario=otro)
+
+        listado = self.client.get(reverse("trabajo-list"))
+        self.assertEqual([t["id"] for t in listado.data["results"]], [response.data["id"]])
+
+    def test_requiere_autenticacion(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("trabajo-list"))
+        self.assertIn(
+            response.status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
@@ -0,0 +1,130 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import (
+    UnidadMedida,
+    Proveedor,
+    Insumo,
+    Almacen,
+    EntradaCompra,
+    StockInsumo,
+)
+
+
+class PaginacionKeysetWebTests(TestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            nombre="Gramo", abreviatura="g", es_base=True, factor_base=Decimal("1")
+        )
+        self.proveedor = Proveedor.objects.create(nombre="Proveedor")
+        self.almacen = Almacen.objects.create(nombre="Bodega")
+        self.insumos = [
+            Insumo.objects.create(
+                nombre=f"Insumo {i:02d}", unidad=self.unidad, stock_minimo=Decimal("10")
+            )
+            for i in range(45)
+        ]
+
+    def _recorrer(self, url, nombre_lista, params=None):
+        """Sigue los enlaces "Siguiente" y devuelve las páginas visitadas."""
+        paginas = []
+        response = self.client.get(url, params or {})
+        while True:
+            paginas.append(list(response.context[nombre_lista]))
+            pagina = response.context["page_obj"]
+            if not pagina.has_next:
+                return paginas, response
+            response = self.client.get(url + pagina.url_siguiente)
+
+    def test_recorre_insumos_sin_repetir_ni_saltar(self):
+        paginas, _ = self._recorrer(reverse("web:insumos_list"), "insumos")
+        self.assertEqual([len(p) for p in paginas], [20, 20, 5])
+        nombres = [i.nombre for p in paginas for i in p]
+        self.assertEqual(nombres, [i.nombre for i in self.insumos])
+
+    def test_pagina_anterior(self):
+        url = reverse("web:insumos_list")
+        primera = self.client.get(url)
+        segunda = self.client.get(url + primera.context["page_obj"].url_siguiente)
+        self.assertTrue(segunda.context["page_obj"].has_previous)
+
+        volver = self.client.get(url + segunda.context["page_obj"].url_anterior)
+        self.assertEqual(
+            [i.pk for i in volver.context["insumos"]],
+            [i.pk for i in primera.context["insumos"]],
+        )
+        self.assertFalse(volver.context["page_obj"].has_previous)
+
+    def test_alertas_de_stock_solo_en_la_pagina(self):
+        StockInsumo.objects.create(
+            almacen=self.almacen, insumo=self.insumos[0], cantidad_actual=Decimal("50")
+        )
+        url = reverse("web:insumos_list")
+        self.client.get(url)
+
+        # conteo aproximado + página + stocks de la página
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        insumos = list(response.context["insumos"])
+        self.assertEqual(insumos[0].total_stock, Decimal("50"))
+        self.assertEqual(insumos[0].nivel_alerta_global, "verde")
+        self.assertEqual(insumos[1].nivel_alerta_global, "rojo")
+
+    def test_conserva_filtros_y_cursor_invalido(self):
+        url = reverse("web:insumos_list")
+        response = self.client.get(url, {"q": "insumo"})
+        self.assertIn("q=insumo", response.context["page_obj"].url_siguiente)
+
+        response = self.client.get(url, {"despues": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["insumos"][0].pk, self.insumos[0].pk)
+
+    def test_conteo_aproximado(self):
+        url = reverse("web:insumos_list")
+        self.assertEqual(self.client.get(url).context["page_obj"].conteo, 45)
+
+        from web.views import InsumoListView
+        original = InsumoListView.limite_conteo
+        InsumoListView.limite_conteo = 30
+        try:
+            response = self.client.get(url)
+        finally:
+            InsumoListView.limite_conteo = original
+        self.assertTrue(response.context["page_obj"].conteo_tope)
+        self.assertContains(response, "Más de 30")
+
+    def test_compras_con_fechas_repetidas(self):
+        fechas = [date(2025, 1, 1 + i % 3) for i in range(25)]
+        for i, fecha in enumerate(fechas):
+            EntradaCompra.objects.create(
+                proveedor=self.proveedor,
+                almacen=self.almacen,
+                insumo=self.insumos[0],
+                fecha_documento=fecha,
+                numero_documento=f"F-{i}",
+                cantidad=Decimal("1"),
+                costo_unitario=Decimal("1"),
+            )
+
+        paginas, _ = self._recorrer(reverse("web:compras_list"), "compras")
+        self.assertEqual([len(p) for p in paginas], [20, 5])
+        ids = [c.pk for p in paginas for c in p]
+        esperado = list(
+            EntradaCompra.objects.order_by("-fecha_documento", "-created_at", "-id")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(ids, esperado)
+
+    def test_proveedores_y_platos_renderizan_navegacion(self):
+        for i in range(25):
+            Proveedor.objects.create(nombre=f"Proveedor {i:02d}")
+        paginas, response = self._recorrer(reverse("web:proveedores_list"), "proveedores")
+        self.assertEqual(sum(len(p) for p in paginas), 26)
+        self.assertContains(response, "Anterior")
+
+        response = self.client.get(reverse("web:platos_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["is_paginated"])
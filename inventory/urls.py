@@ -10,6 +10,9 @@ from .views import (
     StockInsumoViewSet,
     PlatoViewSet,
     RecetaInsumoViewSet,
+    ExportacionViewSet,
+    TrabajoViewSet,
+    SincronizacionViewSet,
 )
 
 router = DefaultRouter()
@@ -21,6 +24,9 @@ router.register(r"stocks-insumo", StockInsumoViewSet, basename="stock-insumo")
 router.register(r"platos", PlatoViewSet, basename="plato")
 router.register(r"recetas-insumo", RecetaInsumoViewSet, basename="receta-insumo")
 router.register(r"categorias-insumo", CategoriaInsumoViewSet, basename="categoria-insumo")
+router.register(r"exportaciones", ExportacionViewSet, basename="exportacion")
+router.register(r"trabajos", TrabajoViewSet, basename="trabajo")
+router.register(r"sincronizacion", SincronizacionViewSet, basename="sincronizacion")
 
 
 urlpatterns = [
@@ -0,0 +1,13 @@
+import unicodedata
+
+
+def normalizar_texto(texto: str | None) -> str:
+    """
+    Forma canónica para búsquedas: minúsculas, sin tildes ni diéresis y con
+    los espacios colapsados ("  Ají  Pebre " -> "aji pebre").
+    """
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_marcas = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_marcas.casefold().split())
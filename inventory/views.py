@@ -1,8 +1,24 @@
-from rest_framework import viewsets, permissions
+import hashlib
+import io
+import uuid
+
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
 
+from .cache_stock import cache_stock
+from .eventos_stock import flujo_eventos_stock
+from .catalogos import es_catalogo, modelo_de_ruta, resolver_relacion
 from .models import (
     UnidadMedida,
     Proveedor,
@@ -12,6 +28,7 @@ from .models import (
     StockInsumo,
     Plato,
     RecetaInsumo,
+    Trabajo,
 )
 from .serializers import (
     UnidadMedidaSerializer,
@@ -24,11 +41,99 @@ from .serializers import (
     RecetaInsumoSerializer,
     ConteoInventarioRequestSerializer,
     ResultadoConteoSerializer,
+    AutocompletarParamsSerializer,
+    ImportacionInsumosRequestSerializer,
+    ImportacionRecetasRequestSerializer,
+    ResultadoImportacionRecetasSerializer,
+    ExportacionParamsSerializer,
+    IngenieriaMenuParamsSerializer,
+    IngenieriaMenuPlatoSerializer,
+    PlatoFiltrosSerializer,
+    RecosteoRequestSerializer,
+    DisponibilidadParamsSerializer,
+    PorcionesProduciblesParamsSerializer,
+    PlanProduccionRequestSerializer,
+    ResultadoPlanProduccionSerializer,
+    SimulacionCostosRequestSerializer,
+    ResultadoSimulacionSerializer,
+    TrabajoSerializer,
+    CambiosParamsSerializer,
+    HistorialPreciosParamsSerializer,
+    PuntoPrecioSerializer,
+    AnalisisComprasParamsSerializer,
+    AnalisisComprasSerializer,
+    SincronizacionVentasRequestSerializer,
+    ResultadoVentaOfflineSerializer,
+    seleccion_campos,
 )
+from .renderers import ColumnarRenderer, EventStreamRenderer, FilasJSONRenderer
 from .services.inventory import (
+    ConflictoConcurrenciaError,
+    VentaOffline,
     calcular_costo_receta,
-    aplicar_ajustes_conteo,
+    registrar_consumos_lote,
+)
+from .services.busqueda import aplicar_busqueda, autocompletar_insumos
+from .services.exportacion import (
+    EXPORTACIONES,
+    filas_exportacion,
+    lineas_csv,
+    lineas_jsonl,
+)
+from .services.importacion import ImportacionError
+from .services.produccion import (
+    LineaPlanProduccion,
+    calcular_porciones_producibles,
+    planificar_produccion,
+)
+from .services.precios import serie_precios
+from .services.compras import analizar_compras
+from .services.simulacion import VariacionCosto, simular_costos
+from .services.sincronizacion import (
+    FUENTES_SINCRONIZACION,
+    CursorInvalidoError,
+    CursorVencidoError,
+    obtener_cambios,
 )
+from .services.trabajos import encolar
+from .services.recetas import (
+    escribir_recetas_csv,
+    exportar_recetas,
+    filas_recetas_csv,
+    importar_recetas,
+)
+from .services.menu import (
+    anotar_indicadores_platos,
+    calcular_ingenieria_menu,
+    ordenamiento_platos,
+    ORDENAMIENTOS_INDICADORES,
+)
+
+
+def _clave_idempotencia(request) -> str:
+    return request.headers.get("Idempotency-Key", "").strip()[:100]
+
+
+def respuesta_trabajo(request, trabajo: Trabajo) -> Response:
+    """
+    Respuesta de una acción encolada:
+    - terminado bien (modo sincrónico o clave repetida): 200 con el resultado
+    - fallido: 400 con el error
+    - pendiente/en proceso: 202 con el trabajo y su URL en Location
+    """
+    if trabajo.estado == Trabajo.ESTADO_COMPLETADO:
+        return Response(trabajo.resultado)
+    if trabajo.estado == Trabajo.ESTADO_FALLIDO:
+        return Response(
+            {"detail": trabajo.error, "trabajo": trabajo.id},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    url = reverse("trabajo-detail", args=[trabajo.pk], request=request)
+    return Response(
+        TrabajoSerializer(trabajo).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
 
 
 class IsAuthenticatedOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
@@ -39,47 +144,391 @@ class IsAuthenticatedOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
     pass
 
 
-class UnidadMedidaViewSet(viewsets.ModelViewSet):
+class SeleccionCamposMixin:
+    """
+    Hace select_related solo de las relaciones que el serializer va a
+    usar según ?fields= / ?expand= (ver CamposDinamicosMixin).
+    """
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "relaciones_para"):
+            # los catálogos se resuelven desde su caché, no hace falta el JOIN
+            relaciones = [
+                relacion
+                for relacion in serializer_class.relaciones_para(self.request)
+                if not es_catalogo(modelo_de_ruta(qs.model, relacion))
+            ]
+            if relaciones:
+                qs = qs.select_related(*relaciones)
+        return qs
+
+
+class BusquedaMixin:
+    """
+    ?search=texto sobre el índice de búsqueda del modelo
+    (ver services.busqueda.aplicar_busqueda).
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list":
+            queryset = aplicar_busqueda(queryset, self.request.query_params.get("search"))
+        return queryset
+
+
+class ColumnarMixin:
+    """
+    Formato columnar para el listado (sincronización masiva de POS y
+    terminales de mano):
+
+        Accept: application/vnd.inventario.columnar+json   (o ?format=columnar)
+        → {"next", "previous", "columns": [...], "rows": [[...], ...]}
+
+    Las filas salen directo de .values_list() sobre `columnas_columnar`
+    ((nombre público, ruta ORM), ...), sin instanciar modelos ni pasar por
+    el serializer. Respeta filtros, búsqueda, paginación por cursor y
+    ?fields= (las columnas no pedidas se omiten).
+    """
+
+    columnas_columnar: tuple[tuple[str, str], ...] = ()
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "list" and self.columnas_columnar:
+            renderers.append(ColumnarRenderer())
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, ColumnarRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        columnas = self.columnas_columnar
+        seleccion = seleccion_campos(request)
+        if seleccion is not None and seleccion[0]:
+            columnas = [(nombre, ruta) for nombre, ruta in columnas if nombre in seleccion[0]]
+
+        rutas = [ruta for _, ruta in columnas]
+        # el paginador lee la posición del cursor de la fila (getattr)
+        ordering = self.paginator.get_ordering(request, queryset, self) if self.paginator else ()
+        extra = [campo.lstrip("-") for campo in ordering[:1] if campo.lstrip("-") not in rutas]
+        filas = queryset.values_list(*rutas, *extra, named=True)
+
+        page = self.paginate_queryset(filas)
+        n = len(rutas)
+        datos = {
+            "columns": [nombre for nombre, _ in columnas],
+            "rows": [tuple(fila)[:n] for fila in (filas if page is None else page)],
+        }
+        if page is not None:
+            datos = {
+                "next": self.paginator.get_next_link(),
+                "previous": self.paginator.get_previous_link(),
+                **datos,
+            }
+        return Response(datos)
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified para `list` y `retrieve`.
+
+    En el listado los validadores salen de una sola consulta agregada
+    (Max(updated_at) y Count del queryset filtrado, más Max(updated_at) de
+    cada relación anidada que se va a serializar), de modo que una colección
+    sin cambios responde 304 sin serializar nada. El ETag incluye la URL
+    completa (filtros, cursor, ?fields=/?expand=) y el Accept de la request.
+    """
+
+    def _etag(self, *partes) -> str:
+        base = "|".join(
+            [
+                self.queryset.model._meta.label,
+                self.request.get_full_path(),
+                self.request.META.get("HTTP_ACCEPT", ""),
+                *(str(p) for p in partes),
+            ]
+        )
+        return quote_etag(hashlib.sha1(base.encode()).hexdigest())
+
+    def _relaciones_serializadas(self) -> list[str]:
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "relaciones_para"):
+            return serializer_class.relaciones_para(self.request)
+        return []
+
+    def _responder_condicional(self, request, marcas: list, *partes):
+        marcas = [m for m in marcas if m is not None]
+        ultima = max(marcas) if marcas else None
+        etag = self._etag(*partes, *(m.isoformat() for m in marcas))
+        last_modified = int(ultima.timestamp()) if ultima else None
+
+        no_modificado = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        return no_modificado, etag, last_modified
+
+    def _con_validadores(self, response, etag, last_modified):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        relaciones = self._relaciones_serializadas()
+
+        agregados = {"ultimo": Max("updated_at"), "total": Count("pk")}
+        for i, relacion in enumerate(relaciones):
+            agregados[f"ultimo_{i}"] = Max(f"{relacion}__updated_at")
+        datos = queryset.order_by().aggregate(**agregados)
+
+        marcas = [datos["ultimo"]] + [datos[f"ultimo_{i}"] for i in range(len(relaciones))]
+        no_modificado, etag, last_modified = self._responder_condicional(
+            request, marcas, datos["total"]
+        )
+        if no_modificado is not None:
+            return no_modificado
+        response = super().list(request, *args, **kwargs)
+        return self._con_validadores(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        marcas = [instance.updated_at]
+        catalogos = {}
+        for relacion in self._relaciones_serializadas():
+            relacionado = instance
+            for parte in relacion.split("__"):
+                relacionado = resolver_relacion(relacionado, parte, catalogos) if relacionado else None
+            marcas.append(getattr(relacionado, "updated_at", None))
+
+        no_modificado, etag, last_modified = self._responder_condicional(
+            request, marcas, instance.pk
+        )
+        if no_modificado is not None:
+            return no_modificado
+        serializer = self.get_serializer(instance)
+        return self._con_validadores(Response(serializer.data), etag, last_modified)
+
+
+class UnidadMedidaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = UnidadMedida.objects.all()
     serializer_class = UnidadMedidaSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
 
 
-class ProveedorViewSet(viewsets.ModelViewSet):
+class ProveedorViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Proveedor.objects.all()
     serializer_class = ProveedorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
+
+    @action(detail=False, methods=["get"], url_path="analisis")
+    def analisis(self, request):
+        """
+        Gasto y costos de compra por proveedor, insumo y/o período.
+        GET /api/proveedores/analisis/?desde=2025-01&hasta=2025-12
+            &agrupar=proveedor,insumo&periodo=mes&proveedor=2&insumo=5
+        → {"desde", "hasta", "compras", "gasto_total",
+           "filas": [{"periodo", "proveedor", "insumo", "gasto_total",
+                      "costo_promedio", "variacion_porcentaje", ...}, ...]}
+        """
+        params = AnalisisComprasParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        analisis = analizar_compras(
+            desde=data.get("desde"),
+            hasta=data.get("hasta"),
+            agrupar=data["agrupar"],
+            periodo=data["periodo"],
+            proveedor_id=data.get("proveedor"),
+            insumo_id=data.get("insumo"),
+        )
+        return Response(AnalisisComprasSerializer(analisis).data)
 
 
-class InsumoViewSet(viewsets.ModelViewSet):
-    queryset = Insumo.objects.all().select_related("unidad", "proveedor_principal")
+class InsumoViewSet(ConditionalGetMixin, ColumnarMixin, BusquedaMixin, SeleccionCamposMixin, viewsets.ModelViewSet):
+    queryset = Insumo.objects.all()
     serializer_class = InsumoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
+    columnas_columnar = FUENTES_SINCRONIZACION["insumos"].columnas
+
+    @action(detail=False, methods=["get"], url_path="autocompletar")
+    def autocompletar(self, request):
+        """
+        Búsqueda liviana por prefijo para selects con carga bajo demanda.
+        GET /api/insumos/autocompletar/?q=har&limite=20&solo_activos=true
+        → [{"id", "nombre", "unidad"}, ...]
+        """
+        params = AutocompletarParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return Response(
+            autocompletar_insumos(
+                data["q"], limite=data["limite"], solo_activos=data["solo_activos"]
+            )
+        )
+
+    @action(detail=False, methods=["post"], url_path="importar")
+    def importar(self, request):
+        """
+        Importa/actualiza insumos desde un CSV (upsert por nombre).
+        POST /api/insumos/importar/  (multipart, campo `archivo`)
+
+        El archivo se guarda y la importación se encola (tarea
+        "importar_insumos"): responde 202 con el trabajo, o directamente
+        los contadores y errores por fila si ya terminó.
+        Acepta el encabezado Idempotency-Key.
+        """
+        params = ImportacionInsumosRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        clave = _clave_idempotencia(request)
+        existente = Trabajo.objects.filter(
+            tipo="importar_insumos", clave_idempotencia=clave
+        ).first() if clave else None
+        if existente is not None:
+            return respuesta_trabajo(request, existente)
+
+        archivo = default_storage.save(
+            f"trabajos/insumos-{uuid.uuid4().hex}.csv", params.validated_data["archivo"]
+        )
+        trabajo = encolar(
+            "importar_insumos",
+            {"archivo": archivo},
+            clave_idempotencia=clave,
+            usuario=request.user,
+        )
+        return respuesta_trabajo(request, trabajo)
 
-class CategoriaInsumoViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=["get"], url_path="precios")
+    def precios(self, request, pk=None):
+        """
+        Tendencia del precio de compra (por unidad de consumo) para gráficos.
+        GET /api/insumos/<id>/precios/?periodo=semana&fecha_desde=2025-01-01
+            &fecha_hasta=2025-06-30&proveedor=2&por_proveedor=true
+        → [{"periodo", "proveedor", "proveedor_nombre", "compras",
+            "cantidad_total", "costo_promedio", "costo_minimo", "costo_maximo"}, ...]
+        """
+        insumo = self.get_object()
+        params = HistorialPreciosParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        serie = serie_precios(
+            insumo_id=insumo.id,
+            periodo=data["periodo"],
+            fecha_desde=data.get("fecha_desde"),
+            fecha_hasta=data.get("fecha_hasta"),
+            proveedor_id=data.get("proveedor"),
+            por_proveedor=data["por_proveedor"],
+        )
+        return Response(PuntoPrecioSerializer(serie, many=True).data)
+
+class CategoriaInsumoViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = CategoriaInsumo.objects.all()
     serializer_class = CategoriaInsumoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
 
-class AlmacenViewSet(viewsets.ModelViewSet):
+class AlmacenViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Almacen.objects.all().select_related("responsable")
     serializer_class = AlmacenSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class StockInsumoViewSet(viewsets.ModelViewSet):
-    queryset = (
-        StockInsumo.objects.all()
-        .select_related("insumo", "almacen", "insumo__unidad", "insumo__proveedor_principal")
-    )
+class StockInsumoViewSet(ConditionalGetMixin, ColumnarMixin, SeleccionCamposMixin, viewsets.ModelViewSet):
+    queryset = StockInsumo.objects.all()
     serializer_class = StockInsumoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("id",)
+    columnas_columnar = FUENTES_SINCRONIZACION["stocks_insumo"].columnas
 
+    @action(detail=False, methods=["get"], url_path="disponibilidad")
+    def disponibilidad(self, request):
+        """
+        Cantidad y costo actuales servidos desde el caché de stock del
+        proceso (ver inventory.cache_stock), sin consultar la BD si no hubo
+        cambios.
+        GET /api/stocks-insumo/disponibilidad/?almacen=1&insumos=3,5,8
+        """
+        params = DisponibilidadParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        almacen_id = params.validated_data["almacen"]
+        insumos = params.validated_data.get("insumos")
+        if not insumos:
+            return Response(
+                {"insumos": ["Este campo es requerido."]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        estados = cache_stock.obtener_varios((insumo_id, almacen_id) for insumo_id in insumos)
+        return Response(
+            [
+                {
+                    "insumo": insumo_id,
+                    "almacen": almacen_id,
+                    "cantidad": str(estados[(insumo_id, almacen_id)].cantidad),
+                    "costo_promedio": str(estados[(insumo_id, almacen_id)].costo_promedio),
+                }
+                for insumo_id in insumos
+            ]
+        )
 
-class PlatoViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"], url_path="cache")
+    def estadisticas_cache(self, request):
+        """
+        Aciertos, fallos e invalidaciones del caché de stock de este proceso.
+        GET /api/stocks-insumo/cache/
+        """
+        return Response(cache_stock.estadisticas())
+
+
+class PlatoViewSet(ConditionalGetMixin, ColumnarMixin, BusquedaMixin, SeleccionCamposMixin, viewsets.ModelViewSet):
     queryset = Plato.objects.all()
     serializer_class = PlatoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
+    columnas_columnar = FUENTES_SINCRONIZACION["platos"].columnas
+
+    # ?campo_min= / ?campo_max= -> anotación filtrada en SQL
+    filtros_indicadores = {
+        "food_cost_porcentaje": "food_cost_pct",
+        "margen_bruto": "margen_bruto_monto",
+        "margen_bruto_porcentaje": "margen_bruto_pct",
+    }
+
+    def get_queryset(self):
+        """
+        Los indicadores (food cost %, margen, margen %) vienen anotados desde
+        la BD. En el listado se aceptan ?ordering=<indicador> y filtros por
+        umbral (?margen_bruto_porcentaje_min=30, ?food_cost_porcentaje_max=35).
+        """
+        qs = anotar_indicadores_platos(super().get_queryset())
+        if self.action != "list":
+            return qs
+
+        filtros = PlatoFiltrosSerializer(data=self.request.query_params)
+        filtros.is_valid(raise_exception=True)
+        for nombre, anotacion in self.filtros_indicadores.items():
+            minimo = filtros.validated_data.get(f"{nombre}_min")
+            maximo = filtros.validated_data.get(f"{nombre}_max")
+            if minimo is not None:
+                qs = qs.filter(**{f"{anotacion}__gte": minimo})
+            if maximo is not None:
+                qs = qs.filter(**{f"{anotacion}__lte": maximo})
+
+        qs, self.cursor_ordering = ordenamiento_platos(
+            qs,
+            self.request.query_params.get("ordering"),
+            ORDENAMIENTOS_INDICADORES,
+        )
+        return qs.order_by(*self.cursor_ordering)
 
     @action(detail=True, methods=["get"], url_path="indicadores")
     def indicadores(self, request, pk=None):
@@ -112,16 +561,252 @@ class PlatoViewSet(viewsets.ModelViewSet):
         costo = calcular_costo_receta(plato=plato, guardar=True)
         return Response({"plato": plato.id, "costo_receta": str(costo)})
 
+    @action(detail=True, methods=["get"], url_path="disponibilidad")
+    def disponibilidad(self, request, pk=None):
+        """
+        Porciones que se pueden preparar en un almacén con el stock actual
+        (leído del caché de stock) y el insumo que limita.
+        GET /api/platos/<id>/disponibilidad/?almacen=1
+        """
+        plato = self.get_object()
+        params = DisponibilidadParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        almacen_id = params.validated_data["almacen"]
+
+        lineas = list(
+            RecetaInsumo.objects.filter(plato=plato, cantidad__gt=0)
+            .values_list("insumo_id", "cantidad")
+        )
+        estados = cache_stock.obtener_varios(
+            (insumo_id, almacen_id) for insumo_id, _ in lineas
+        )
+
+        porciones = None
+        limitante = None
+        for insumo_id, cantidad in lineas:
+            posibles = estados[(insumo_id, almacen_id)].cantidad // cantidad
+            if porciones is None or posibles < porciones:
+                porciones, limitante = posibles, insumo_id
+
+        return Response(
+            {
+                "plato": plato.id,
+                "almacen": almacen_id,
+                "porciones": int(max(porciones, 0)) if porciones is not None else 0,
+                "insumo_limitante": limitante,
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="porciones-producibles")
+    def porciones_producibles(self, request):
+        """
+        Matriz plato x almacén con las porciones que se pueden preparar con
+        el stock actual y el insumo que limita cada celda.
+        GET /api/platos/porciones-producibles/?almacenes=1,2&categoria=
+        """
+        params = PorcionesProduciblesParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        matriz = calcular_porciones_producibles(
+            almacen_ids=data.get("almacenes") or None,
+            categoria_id=data.get("categoria"),
+        )
+        return Response(
+            {
+                "almacenes": [
+                    {"id": almacen_id, "nombre": nombre}
+                    for almacen_id, nombre in matriz.almacenes
+                ],
+                "platos": [
+                    {
+                        "id": plato_id,
+                        "nombre": nombre,
+                        "porciones": porciones,
+                        "insumos_limitantes": limitantes,
+                    }
+                    for (plato_id, nombre), porciones, limitantes in zip(
+                        matriz.platos, matriz.porciones, matriz.limitantes
+                    )
+                ],
+            }
+        )
+
+    @action(detail=False, methods=["post"], url_path="planificar-produccion")
+    def planificar_produccion(self, request):
+        """
+        Requerimientos de insumos y faltantes (en unidad de compra) de un
+        plan de producción.
+        POST /api/platos/planificar-produccion/
+            {"almacen": 1, "fecha": "2025-01-10",
+             "lineas": [{"plato": 3, "cantidad": 40}, {"plato": 5, "cantidad": 12, "almacen": 2}]}
+        """
+        params = PlanProduccionRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        resultado = planificar_produccion(
+            lineas=[
+                LineaPlanProduccion(
+                    plato_id=linea["plato"],
+                    cantidad=linea["cantidad"],
+                    almacen_id=linea["almacen"],
+                )
+                for linea in data["lineas"]
+            ],
+            fecha=data.get("fecha"),
+        )
+        return Response(ResultadoPlanProduccionSerializer(resultado).data)
+
+    @action(detail=False, methods=["post"], url_path="simular-costos")
+    def simular_costos(self, request):
+        """
+        Impacto de costos hipotéticos de insumos en el costo, food cost y
+        margen de todos los platos activos. No escribe nada.
+        POST /api/platos/simular-costos/
+            {"variaciones": [{"insumo": 3, "variacion_porcentaje": 12},
+                             {"insumo": 8, "costo_promedio": "0.0042"}],
+             "solo_afectados": true, "limite": 50}
+        """
+        params = SimulacionCostosRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
 
-class RecetaInsumoViewSet(viewsets.ModelViewSet):
-    queryset = RecetaInsumo.objects.all().select_related("plato", "insumo", "insumo__unidad")
+        resultado = simular_costos(
+            [
+                VariacionCosto(
+                    insumo_id=variacion["insumo"],
+                    costo_promedio=variacion.get("costo_promedio"),
+                    variacion_porcentaje=variacion.get("variacion_porcentaje"),
+                )
+                for variacion in data["variaciones"]
+            ],
+            solo_afectados=data["solo_afectados"],
+            limite=data.get("limite"),
+        )
+        return Response(ResultadoSimulacionSerializer(resultado).data)
+
+    @action(detail=False, methods=["post"], url_path="recostear")
+    def recostear(self, request):
+        """
+        Encola el recálculo de costo_receta de todos los platos (o de
+        `plato_ids`) y responde sin esperar.
+        POST /api/platos/recostear/  {"plato_ids": [1, 2]}
+        """
+        params = RecosteoRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        trabajo = encolar(
+            "recostear_platos",
+            {"plato_ids": params.validated_data.get("plato_ids")},
+            clave_idempotencia=_clave_idempotencia(request),
+            usuario=request.user,
+        )
+        return respuesta_trabajo(request, trabajo)
+
+    @action(detail=False, methods=["get"], url_path="ingenieria-menu")
+    def ingenieria_menu(self, request):
+        """
+        Matriz de ingeniería de menú (estrellas, caballos, enigmas, perros)
+        calculada en BD para todo el menú.
+        GET /api/platos/ingenieria-menu/?fecha_desde=&fecha_hasta=&almacen=
+            &categoria=&clasificacion=&ordering=&solo_activos=
+        """
+        params = IngenieriaMenuParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        resultado = calcular_ingenieria_menu(
+            fecha_desde=data.get("fecha_desde"),
+            fecha_hasta=data.get("fecha_hasta"),
+            almacen=data.get("almacen"),
+            categoria_id=data.get("categoria"),
+            clasificacion=data.get("clasificacion"),
+            orden=data.get("ordering"),
+            solo_activos=data.get("solo_activos", True),
+        )
+
+        resumen = {
+            "total_platos": resultado.total_platos,
+            "popularidad_total": str(resultado.popularidad_total),
+            "umbral_popularidad": str(resultado.umbral_popularidad),
+            "umbral_margen": str(resultado.umbral_margen),
+        }
+
+        self.cursor_ordering = resultado.ordenamiento
+        page = self.paginate_queryset(resultado.platos)
+        if page is not None:
+            serializer = IngenieriaMenuPlatoSerializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+            response.data["resumen"] = resumen
+            return response
+
+        serializer = IngenieriaMenuPlatoSerializer(resultado.platos, many=True)
+        return Response({"resumen": resumen, "platos": serializer.data})
+
+
+class RecetaInsumoViewSet(ConditionalGetMixin, ColumnarMixin, SeleccionCamposMixin, viewsets.ModelViewSet):
+    queryset = RecetaInsumo.objects.all()
     serializer_class = RecetaInsumoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("id",)
+    columnas_columnar = FUENTES_SINCRONIZACION["recetas_insumo"].columnas
+
+    @action(detail=False, methods=["get"], url_path="exportar")
+    def exportar(self, request):
+        """
+        Exporta recetas como filas plato,insumo,cantidad.
+        GET /api/recetas-insumo/exportar/?formato=csv|json&plato=<id>&plato=<id>
+        """
+        plato_ids = request.query_params.getlist("plato") or None
+        if plato_ids is not None and not all(p.isdigit() for p in plato_ids):
+            return Response(
+                {"plato": "Debe ser un ID numérico."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        filas = exportar_recetas(plato_ids)
+
+        if request.query_params.get("formato", "csv") == "json":
+            return Response(list(filas))
+
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="recetas.csv"'
+        escribir_recetas_csv(filas, response)
+        return response
+
+    @action(detail=False, methods=["post"], url_path="importar")
+    def importar(self, request):
+        """
+        Importa recetas completas (ver services.recetas.importar_recetas).
+        POST /api/recetas-insumo/importar/
+          multipart: archivo=<csv>   o   JSON: {"lineas": [{plato, insumo, cantidad}, ...]}
+          opcionales: eliminar_faltantes (true), simular (false)
+        """
+        params = ImportacionRecetasRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        try:
+            if "archivo" in data:
+                lineas = io.TextIOWrapper(
+                    data["archivo"].file, encoding="utf-8-sig", newline=""
+                )
+                filas = filas_recetas_csv(lineas)
+            else:
+                filas = data["lineas"]
+            resultado = importar_recetas(
+                filas,
+                eliminar_faltantes=data["eliminar_faltantes"],
+                simular=data["simular"],
+            )
+        except (ImportacionError, UnicodeDecodeError) as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-class AlmacenViewSet(viewsets.ModelViewSet):
+        return Response(ResultadoImportacionRecetasSerializer(resultado).data)
+
+class AlmacenViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Almacen.objects.all()
     serializer_class = AlmacenSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ("nombre", "id")
 
     @action(detail=True, methods=["post"], url_path="conteo/previsualizar")
     def previsualizar_conteo(self, request, pk=None):
@@ -154,48 +839,218 @@ class AlmacenViewSet(viewsets.ModelViewSet):
         """
         Recibe un conteo físico, calcula diferencias y APLICA ajustes donde corresponda.
         POST /api/almacenes/<id>/conteo/aplicar/
+
+        Los ajustes se aplican en segundo plano (tarea "aplicar_conteo"):
+        responde 202 con el trabajo, o el resultado si ya terminó.
+        Acepta el encabezado Idempotency-Key.
         """
         almacen = self.get_object()
         serializer = ConteoInventarioRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         data = serializer.validated_data
-        conteos = data["conteos"]
         tolerancia_unidades = data.get("tolerancia_unidades")
         tolerancia_porcentaje = data.get("tolerancia_porcentaje")
-        aplicar_solo_fuera_tolerancia = data.get("aplicar_solo_fuera_tolerancia", True)
 
-        resultados, movimientos = aplicar_ajustes_conteo(
-            almacen=almacen,
-            conteos=conteos,
-            usuario=request.user if request.user.is_authenticated else None,
-            tolerancia_unidades=tolerancia_unidades,
-            tolerancia_porcentaje=tolerancia_porcentaje,
-            referencia=f"CONTEO-{almacen.id}",
-            aplicar_solo_fuera_tolerancia=aplicar_solo_fuera_tolerancia,
+        trabajo = encolar(
+            "aplicar_conteo",
+            {
+                "almacen_id": almacen.id,
+                "conteos": [
+                    {"insumo_id": c["insumo_id"], "cantidad_contada": str(c["cantidad_contada"])}
+                    for c in data["conteos"]
+                ],
+                "usuario_id": request.user.id if request.user.is_authenticated else None,
+                "tolerancia_unidades": None if tolerancia_unidades is None else str(tolerancia_unidades),
+                "tolerancia_porcentaje": None if tolerancia_porcentaje is None else str(tolerancia_porcentaje),
+                "aplicar_solo_fuera_tolerancia": data.get("aplicar_solo_fuera_tolerancia", True),
+            },
+            clave_idempotencia=_clave_idempotencia(request),
+            usuario=request.user,
         )
+        return respuesta_trabajo(request, trabajo)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="eventos",
+        renderer_classes=[EventStreamRenderer],
+    )
+    def eventos(self, request, pk=None):
+        """
+        Cambios de stock y de nivel de alerta del almacén en vivo
+        (Server-Sent Events) para las pantallas de cocina.
+        GET /api/almacenes/<id>/eventos/   (Accept: text/event-stream)
+
+        Eventos `foto` (todos los stocks al conectarse), `stock` y `alerta`;
+        ver inventory.eventos_stock. Requiere servir con ASGI
+        (p. ej. `uvicorn config.asgi:application`).
+        """
+        almacen = self.get_object()
+        if not isinstance(request._request, ASGIRequest):
+            return Response(
+                {"detail": "El stream de eventos requiere un servidor ASGI."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        response = StreamingHttpResponse(
+            flujo_eventos_stock(almacen.id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # sin buffer en nginx
+        return response
+
+
+class TrabajoViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Estado y avance de los trabajos en segundo plano.
+    GET /api/trabajos/        → trabajos del usuario (todos si es staff)
+    GET /api/trabajos/<id>/   → estado, progreso, resultado o error
+    """
+
+    serializer_class = TrabajoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ("-created_at", "id")
+
+    def get_queryset(self):
+        qs = Trabajo.objects.all()
+        if not self.request.user.is_staff:
+            qs = qs.filter(usuario=self.request.user)
+        return qs
+
+
+class ExportacionViewSet(viewsets.ViewSet):
+    """
+    Exportaciones en streaming (CSV o JSON Lines) para contabilidad.
+
+    GET /api/exportaciones/                → exportaciones disponibles
+    GET /api/exportaciones/<nombre>/       → stocks | movimientos | compras
+        ?formato=csv|jsonl&fecha_desde=&fecha_hasta=&almacen=&insumo=
 
-        resultados_serializados = [
-            ResultadoConteoSerializer.from_resultado(r).data for r in resultados
-        ]
+    Las filas se leen por bloques y se escriben a medida que se envían,
+    así que la memoria del worker no crece con el tamaño del rango.
+    """
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    formatos = {
+        "csv": (lineas_csv, "text/csv; charset=utf-8"),
+        "jsonl": (lineas_jsonl, "application/x-ndjson; charset=utf-8"),
+    }
 
-        movimientos_data = [
+    def list(self, request):
+        return Response(
             {
-                "id": mov.id,
-                "insumo_id": mov.insumo_id,
-                "almacen_id": mov.almacen_id,
-                "tipo": mov.tipo,
-                "cantidad": str(mov.cantidad),
-                "fecha_movimiento": mov.fecha_movimiento,
+                nombre: {
+                    "columnas": exportacion.encabezados,
+                    "filtra_fecha": exportacion.campo_fecha is not None,
+                }
+                for nombre, exportacion in EXPORTACIONES.items()
             }
-            for mov in movimientos
-        ]
+        )
+
+    def retrieve(self, request, pk=None):
+        exportacion = EXPORTACIONES.get(pk)
+        if exportacion is None:
+            return Response(
+                {"detail": f"Exportación desconocida: {pk}."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        params = ExportacionParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        filas = filas_exportacion(
+            pk,
+            fecha_desde=data.get("fecha_desde"),
+            fecha_hasta=data.get("fecha_hasta"),
+            almacen_id=data.get("almacen"),
+            insumo_id=data.get("insumo"),
+        )
+        generar, content_type = self.formatos[data["formato"]]
+        response = StreamingHttpResponse(
+            generar(exportacion.encabezados, filas), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{pk}.{data["formato"]}"'
+        )
+        return response
+
+
+class SincronizacionViewSet(viewsets.ViewSet):
+    """
+    Feed de cambios para sincronización incremental (ver
+    services.sincronizacion).
+
+    GET /api/sincronizacion/?since=<cursor>&limite=1000
+    → {"cursor", "hay_mas",
+       "cambios": {"insumos": {"columns", "rows"}, "stocks_insumo": ..., ...},
+       "eliminados": {"insumos": [ids], ...}}
+
+    Sin `since` devuelve todo (por páginas de `limite` filas por fuente).
+    El cliente guarda `cursor` y repite mientras `hay_mas` sea true.
+    Un cursor más viejo que la retención de eliminaciones responde 410.
+
+    POST /api/sincronizacion/ventas/ sube las ventas hechas sin conexión.
+    """
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [FilasJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request):
+        params = CambiosParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        try:
+            resultado = obtener_cambios(data.get("since"), limite=data.get("limite"))
+        except CursorInvalidoError as exc:
+            return Response({"since": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        except CursorVencidoError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_410_GONE)
 
         return Response(
             {
-                "almacen": almacen.id,
-                "resultados": resultados_serializados,
-                "movimientos_generados": movimientos_data,
+                "cursor": resultado.cursor,
+                "hay_mas": resultado.hay_mas,
+                "cambios": resultado.cambios,
+                "eliminados": resultado.eliminados,
             }
         )
 
+    @action(detail=False, methods=["post"], url_path="ventas")
+    def ventas(self, request):
+        """
+        Subida de ventas hechas sin conexión por un terminal. Cada venta
+        trae un `evento_id` único; las ya aplicadas (reintentos) no se
+        vuelven a descontar, así que el terminal puede reenviar el lote
+        completo si no recibió la respuesta.
+        POST /api/sincronizacion/ventas/
+            {"ventas": [{"evento_id": "9f1c...", "plato": 3, "almacen": 1,
+                         "cantidad_platos": 2, "fecha_movimiento": "2025-01-10T13:05:00Z"}]}
+        → {"resultados": [{"evento_id", "estado": "aplicada" | "duplicada" | "rechazada",
+                           "consumo", "error"}]}
+        """
+        params = SincronizacionVentasRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        try:
+            resultados = registrar_consumos_lote(
+                ventas=[
+                    VentaOffline(
+                        evento_id=venta["evento_id"],
+                        plato_id=venta["plato"],
+                        almacen_id=venta["almacen"],
+                        cantidad_platos=venta["cantidad_platos"],
+                        fecha_movimiento=venta["fecha_movimiento"],
+                        referencia=venta["referencia"],
+                    )
+                    for venta in params.validated_data["ventas"]
+                ],
+                usuario=request.user,
+            )
+        except (ConflictoConcurrenciaError, IntegrityError):
+            # Otro envío del mismo lote o del mismo stock se cruzó: reenviar es seguro.
+            return Response(
+                {"detail": "Conflicto con otra sincronización; reintente el envío."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"resultados": ResultadoVentaOfflineSerializer(resultados, many=True).data})
@@ -1,9 +1,141 @@
 
 from django import forms
+from django.forms.models import BaseInlineFormSet, ModelChoiceIterator
+from django.urls import reverse_lazy
+from django.utils.functional import cached_property
+from inventory.catalogos import obtener_catalogo, obtener_del_catalogo
 from inventory.models import Proveedor, Insumo,EntradaCompra,Plato, RecetaInsumo
+from inventory.services.menu import CLASIFICACIONES
 from django.forms import inlineformset_factory
 
 
+class CatalogoChoiceIterator(ModelChoiceIterator):
+    """Opciones tomadas del caché de catálogos en vez de consultar la BD."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in obtener_catalogo(self.queryset.model).values():
+            yield self.choice(obj)
+
+    def __len__(self):
+        vacio = 1 if self.field.empty_label is not None else 0
+        return len(obtener_catalogo(self.queryset.model)) + vacio
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            obtener_catalogo(self.queryset.model)
+        )
+
+
+class CatalogoChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField para catálogos (unidades, categorías, proveedores,
+    almacenes): renderiza y valida contra el caché compartido, sin
+    consultas por formulario.
+    """
+
+    iterator = CatalogoChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        obj = obtener_del_catalogo(self.queryset.model, value)
+        if obj is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return obj
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    <select> que solo renderiza la opción vacía y la seleccionada; el resto
+    se carga bajo demanda desde `url` (ver static/web/autocomplete.js).
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs={"class": "form-select", **(attrs or {})})
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = str(self.url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        seleccionados = [v for v in value if v not in ("", None)]
+        opciones = [("", self.choices.field.empty_label or "")]
+        opciones += self.choices.field.etiquetas(seleccionados)
+        return [
+            (
+                None,
+                [self.create_option(name, valor, etiqueta, str(valor) in seleccionados, i, attrs=attrs)],
+                i,
+            )
+            for i, (valor, etiqueta) in enumerate(opciones)
+        ]
+
+
+class AutocompleteModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField para tablas grandes (insumos) que no recorre el
+    queryset: renderiza con AutocompleteSelect y resuelve los valores desde
+    `instancias` ({pk: objeto}), un caché que un formset puede compartir
+    entre todos sus formularios. Lo que no esté en el caché se consulta
+    de una vez y se agrega.
+    """
+
+    def __init__(self, queryset, *, url, **kwargs):
+        kwargs.setdefault("widget", AutocompleteSelect(url))
+        super().__init__(queryset, **kwargs)
+        self.instancias = {}
+
+    def __deepcopy__(self, memo):
+        # cada formulario parte con su propio caché (el formset lo reemplaza
+        # por uno compartido)
+        result = super().__deepcopy__(memo)
+        result.instancias = {}
+        return result
+
+    def _cargar(self, pks):
+        faltantes = {str(pk) for pk in pks if str(pk).isdigit()} - self.instancias.keys()
+        if faltantes:
+            for obj in self.queryset.filter(pk__in=faltantes):
+                self.instancias[str(obj.pk)] = obj
+
+    def etiquetas(self, pks) -> list[tuple[str, str]]:
+        self._cargar(pks)
+        return [
+            (str(pk), self.label_from_instance(self.instancias[str(pk)]))
+            for pk in pks
+            if str(pk) in self.instancias
+        ]
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            return value
+        self._cargar([value])
+        obj = self.instancias.get(str(value))
+        if obj is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return obj
+
+
+class InsumoAutocompleteField(AutocompleteModelChoiceField):
+    def __init__(self, queryset=None, **kwargs):
+        kwargs.setdefault("url", reverse_lazy("insumo-autocompletar"))
+        super().__init__(queryset if queryset is not None else Insumo.objects.all(), **kwargs)
+
+
 class ProveedorForm(forms.ModelForm):
     class Meta:
         model = Proveedor
@@ -29,6 +161,12 @@ class InsumoForm(forms.ModelForm):
             "unidad_compra",
             "factor_conversion",
         ]
+        field_classes = {
+            "unidad": CatalogoChoiceField,
+            "categoria": CatalogoChoiceField,
+            "proveedor_principal": CatalogoChoiceField,
+            "unidad_compra": CatalogoChoiceField,
+        }
         widgets = {
             "nombre": forms.TextInput(attrs={"class": "form-control"}),
             "unidad": forms.Select(attrs={"class": "form-select"}),
@@ -54,10 +192,14 @@ class EntradaCompraForm(forms.ModelForm):
             "referencia",
             "observaciones",
         ]
+        field_classes = {
+            "proveedor": CatalogoChoiceField,
+            "almacen": CatalogoChoiceField,
+            "insumo": InsumoAutocompleteField,
+        }
         widgets = {
             "proveedor": forms.Select(attrs={"class": "form-select"}),
             "almacen": forms.Select(attrs={"class": "form-select"}),
-            "insumo": forms.Select(attrs={"class": "form-select"}),
             "fecha_documento": forms.DateInput(
                 attrs={"type": "date", "class": "form-control"}
             ),
@@ -79,6 +221,7 @@ class PlatoForm(forms.ModelForm):
             "categoria",
             "activo",
         ]
+        field_classes = {"categoria": CatalogoChoiceField}
         widgets = {
             "nombre": forms.TextInput(attrs={"class": "form-control"}),
             "descripcion": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
@@ -91,16 +234,70 @@ class RecetaInsumoForm(forms.ModelForm):
     class Meta:
         model = RecetaInsumo
         fields = ["insumo", "cantidad"]
+        field_classes = {"insumo": InsumoAutocompleteField}
         widgets = {
-            "insumo": forms.Select(attrs={"class": "form-select"}),
             "cantidad": forms.NumberInput(attrs={"class": "form-control", "step": "0.001"}),
         }
 
 
+class BaseRecetaInsumoFormSet(BaseInlineFormSet):
+    """
+    Todos los formularios comparten un único caché de insumos: se llena con
+    los insumos de la receta (mismo SELECT del formset, con JOIN) y, en un
+    POST, con una sola consulta por los insumos enviados que falten.
+    """
+
+    def __init__(self, *args, queryset=None, **kwargs):
+        if queryset is None:
+            queryset = RecetaInsumo.objects.select_related("insumo")
+        super().__init__(*args, queryset=queryset, **kwargs)
+
+    @cached_property
+    def _insumos(self) -> dict:
+        insumos = {str(linea.insumo_id): linea.insumo for linea in self.get_queryset()}
+        if self.is_bound:
+            enviados = {
+                valor
+                for clave, valor in self.data.items()
+                if clave.startswith(f"{self.prefix}-") and clave.endswith("-insumo") and valor
+            }
+            faltantes = [pk for pk in enviados - insumos.keys() if pk.isdigit()]
+            if faltantes:
+                insumos.update(
+                    (str(obj.pk), obj) for obj in Insumo.objects.filter(pk__in=faltantes)
+                )
+        return insumos
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        form.fields["insumo"].instancias = self._insumos
+        return form
+
+    @property
+    def empty_form(self):
+        form = super().empty_form
+        form.fields["insumo"].instancias = self._insumos
+        return form
+
+
 RecetaInsumoFormSet = inlineformset_factory(
     Plato,
     RecetaInsumo,
     form=RecetaInsumoForm,
+    formset=BaseRecetaInsumoFormSet,
     extra=3,          
     can_delete=True, 
 )
+
+
+class IngenieriaMenuFiltrosForm(forms.Form):
+    """
+    Filtros (GET) de la ingeniería de menú. Un filtro inválido (p. ej. una
+    fecha inexistente) se informa y se ignora; el resto se aplica igual.
+    """
+
+    fecha_desde = forms.DateField(required=False)
+    fecha_hasta = forms.DateField(required=False)
+    categoria = forms.IntegerField(required=False, min_value=1)
+    clasificacion = forms.ChoiceField(required=False, choices=[("", "Todas"), *CLASIFICACIONES])
+    ordering = forms.CharField(required=False)
@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class PaginaKeyset:
+    """Página de resultados para los templates (reemplaza a page_obj)."""
+
+    def __init__(
+        self,
+        object_list,
+        *,
+        has_next: bool,
+        has_previous: bool,
+        url_siguiente: str = "",
+        url_anterior: str = "",
+        conteo: int = 0,
+        conteo_tope: bool = False,
+    ):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.url_siguiente = url_siguiente
+        self.url_anterior = url_anterior
+        self.conteo = conteo
+        self.conteo_tope = conteo_tope
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginacionMixin:
+    """
+    Paginación por keyset ("seek") para ListView.
+
+    En lugar de OFFSET (que recorre todas las filas anteriores) cada página
+    se pide con el cursor de la última fila vista:
+        ?despues=<cursor>  → WHERE (orden) > (valores del cursor)
+        ?antes=<cursor>    → lo mismo en sentido inverso
+    así que la página 500 cuesta lo mismo que la primera. `orden_keyset`
+    debe terminar en un campo único (normalmente "id" o "-id").
+
+    En vez de COUNT(*) se cuenta hasta `limite_conteo` filas
+    (SELECT COUNT(*) FROM (... LIMIT n)); sobre eso se muestra "más de n".
+
+    `procesar_pagina(objetos)` permite calcular datos extra solo para las
+    filas de la página.
+    """
+
+    paginate_by = 20
+    orden_keyset: tuple[str, ...] = ("id",)
+    limite_conteo = 1000
+
+    def _campos_keyset(self):
+        return [(campo.lstrip("-"), campo.startswith("-")) for campo in self.orden_keyset]
+
+    def _codificar_cursor(self, obj) -> str:
+        valores = [
+            obj._meta.get_field(nombre).value_to_string(obj)
+            for nombre, _ in self._campos_keyset()
+        ]
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+    def _decodificar_cursor(self, modelo, cursor: str):
+        try:
+            relleno = "=" * (-len(cursor) % 4)
+            valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            campos = self._campos_keyset()
+            if not isinstance(valores, list) or len(valores) != len(campos):
+                return None
+            return [
+                modelo._meta.get_field(nombre).to_python(valor)
+                for (nombre, _), valor in zip(campos, valores)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+
+    def _filtro_keyset(self, valores, adelante: bool) -> Q:
+        campos = self._campos_keyset()
+        condiciones = []
+        for i, (nombre, descendente) in enumerate(campos):
+            menor = descendente == adelante
+            condicion = Q(**{f"{nombre}__{'lt' if menor else 'gt'}": valores[i]})
+            for j in range(i):
+                condicion &= Q(**{campos[j][0]: valores[j]})
+            condiciones.append(condicion)
+        return reduce(or_, condiciones)
+
+    def _url_pagina(self, parametro: str, cursor: str) -> str:
+        params = self.request.GET.copy()
+        for clave in ("despues", "antes", "page"):
+            params.pop(clave, None)
+        params[parametro] = cursor
+        return f"?{params.urlencode()}"
+
+    def procesar_pagina(self, objetos: list) -> None:
+        pass
+
+    def paginate_queryset(self, queryset, page_size):
+        modelo = queryset.model
+        despues = self._decodificar_cursor(modelo, self.request.GET.get("despues", ""))
+        antes = None
+        if despues is None:
+            antes = self._decodificar_cursor(modelo, self.request.GET.get("antes", ""))
+
+        conteo = queryset.order_by()[: self.limite_conteo + 1].count()
+
+        if antes is not None:
+            inverso = [c[1:] if c.startswith("-") else f"-{c}" for c in self.orden_keyset]
+            filas = list(
+                queryset.filter(self._filtro_keyset(antes, adelante=False))
+                .order_by(*inverso)[: page_size + 1]
+            )
+            has_previous = len(filas) > page_size
+            objetos = filas[:page_size][::-1]
+            has_next = True
+        else:
+            qs = queryset.order_by(*self.orden_keyset)
+            if despues is not None:
+                qs = qs.filter(self._filtro_keyset(despues, adelante=True))
+            filas = list(qs[: page_size + 1])
+            has_next = len(filas) > page_size
+            objetos = filas[:page_size]
+            has_previous = despues is not None
+
+        self.procesar_pagina(objetos)
+
+        pagina = PaginaKeyset(
+            objetos,
+            has_next=has_next and bool(objetos),
+            has_previous=has_previous and bool(objetos),
+            url_siguiente=self._url_pagina("despues", self._codificar_cursor(objetos[-1])) if objetos else "",
+            url_anterior=self._url_pagina("antes", self._codificar_cursor(objetos[0])) if objetos else "",
+            conteo=min(conteo, self.limite_conteo),
+            conteo_tope=conteo > self.limite_conteo,
+        )
+        return None, pagina, objetos, pagina.has_other_pages()
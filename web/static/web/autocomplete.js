@@ -0,0 +1,61 @@
+// Carga bajo demanda de opciones para <select data-autocomplete-url="...">.
+// El select se renderiza solo con la opción seleccionada; al escribir en el
+// campo de búsqueda se piden hasta 20 coincidencias por prefijo a la API.
+(function () {
+  "use strict";
+
+  function activar(select) {
+    var url = select.dataset.autocompleteUrl;
+    var buscador = document.createElement("input");
+    buscador.type = "search";
+    buscador.className = "form-control form-control-sm mb-1";
+    buscador.placeholder = "Buscar…";
+    buscador.autocomplete = "off";
+    select.parentNode.insertBefore(buscador, select);
+
+    var temporizador = null;
+    var ultimaConsulta = null;
+
+    function cargar(texto) {
+      var consulta = url + "?q=" + encodeURIComponent(texto);
+      ultimaConsulta = consulta;
+      fetch(consulta, { headers: { Accept: "application/json" } })
+        .then(function (r) { return r.ok ? r.json() : []; })
+        .then(function (resultados) {
+          if (consulta !== ultimaConsulta) {
+            return;
+          }
+          var actual = select.value;
+          var seleccionada = select.selectedOptions[0];
+          var etiquetaActual = seleccionada ? seleccionada.textContent : "";
+          while (select.options.length > 1) {
+            select.remove(1);
+          }
+          var incluida = false;
+          resultados.forEach(function (item) {
+            var texto = item.unidad ? item.nombre + " (" + item.unidad + ")" : item.nombre;
+            var opcion = new Option(texto, item.id, false, String(item.id) === actual);
+            incluida = incluida || String(item.id) === actual;
+            select.add(opcion);
+          });
+          if (actual && !incluida) {
+            select.add(new Option(etiquetaActual, actual, true, true), 1);
+          }
+        });
+    }
+
+    buscador.addEventListener("input", function () {
+      clearTimeout(temporizador);
+      temporizador = setTimeout(function () { cargar(buscador.value.trim()); }, 200);
+    });
+    select.addEventListener("focus", function () {
+      if (select.options.length <= 2 && !buscador.value) {
+        cargar("");
+      }
+    }, { once: true });
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select[data-autocomplete-url]").forEach(activar);
+  });
+})();
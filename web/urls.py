@@ -17,6 +17,7 @@ from web.views import (
     EntradaCompraDeleteView,
     PlatoDeleteView,
     plato_receta_edit,
+    IngenieriaMenuView,
 )
 
 app_name = "web"
@@ -50,6 +51,7 @@ urlpatterns = [
 
     path("platos/", PlatoListView.as_view(), name="platos_list"),
     path("platos/nuevo/", PlatoCreateView.as_view(), name="platos_create"),
+    path("platos/ingenieria-menu/", IngenieriaMenuView.as_view(), name="platos_ingenieria_menu"),
     path("platos/<int:pk>/editar/", PlatoUpdateView.as_view(), name="platos_update"),
     path("platos/<int:pk>/recalcular/", plato_recalcular_costo, name="platos_recalcular"),
     path("platos/<int:pk>/receta/", plato_receta_edit, name="platos_receta"),
@@ -2,26 +2,35 @@ from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView,DeleteView
 from decimal import Decimal
-from django.db.models import Q, Sum
-from inventory.models import Proveedor, Insumo, StockInsumo,EntradaCompra,Plato
+from django.db.models import Sum
+from inventory.models import Proveedor, Insumo, StockInsumo,EntradaCompra,Plato, CategoriaPlato
+from inventory.services.busqueda import aplicar_busqueda
 from inventory.services.recetas import calcular_costo_receta
-from web.forms import ProveedorForm, InsumoForm, EntradaCompraForm,PlatoForm, RecetaInsumoFormSet
+from inventory.services.trabajos import encolar
+from inventory.services.menu import (
+    anotar_indicadores_platos,
+    calcular_ingenieria_menu,
+    CLASIFICACIONES,
+)
+from web.paginacion import KeysetPaginacionMixin
+from web.forms import ProveedorForm, InsumoForm, EntradaCompraForm,PlatoForm, RecetaInsumoFormSet, IngenieriaMenuFiltrosForm
 from django.shortcuts import redirect, get_object_or_404
 
 
 
-class ProveedorListView(ListView):
+class ProveedorListView(KeysetPaginacionMixin, ListView):
     model = Proveedor
     template_name = "web/proveedores_list.html"
     context_object_name = "proveedores"
     paginate_by = 20
+    orden_keyset = ("nombre", "id")
 
     def get_queryset(self):
         qs = super().get_queryset()
         q = self.request.GET.get("q")
         if q:
             qs = qs.filter(nombre__icontains=q)
-        return qs.order_by("nombre")
+        return qs.order_by("nombre", "id")
 
 
 class ProveedorCreateView(CreateView):
@@ -39,11 +48,12 @@ class ProveedorUpdateView(UpdateView):
 
 
 
-class InsumoListView(ListView):
+class InsumoListView(KeysetPaginacionMixin, ListView):
     model = Insumo
     template_name = "web/insumos_list.html"
     context_object_name = "insumos"
     paginate_by = 20
+    orden_keyset = ("nombre", "id")
 
     def get_queryset(self):
         qs = (
@@ -52,23 +62,17 @@ class InsumoListView(ListView):
             .select_related("unidad", "categoria", "proveedor_principal")
         )
 
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(
-                Q(nombre__icontains=q)
-                | Q(categoria__nombre__icontains=q)
-                | Q(proveedor_principal__nombre__icontains=q)
-            )
+        qs = aplicar_busqueda(qs, self.request.GET.get("q"))
 
-        qs = qs.order_by("nombre")
+        return qs.order_by("nombre", "id")
 
-        insumo_ids = list(qs.values_list("id", flat=True))
-        if not insumo_ids:
-            return qs
+    def procesar_pagina(self, insumos):
+        """Stock total y nivel de alerta, solo para los insumos de la página."""
+        if not insumos:
+            return
 
-  
         stocks = (
-            StockInsumo.objects.filter(insumo_id__in=insumo_ids)
+            StockInsumo.objects.filter(insumo_id__in=[i.id for i in insumos])
             .values("insumo_id")
             .annotate(total=Sum("cantidad_actual"))
         )
@@ -78,7 +82,7 @@ class InsumoListView(ListView):
 
         UMBRAL_PORCENTAJE = Decimal("0.10")  # 10%
 
-        for insumo in qs:
+        for insumo in insumos:
             cantidad = mapa_stock.get(insumo.id, Decimal("0"))
             insumo.total_stock = cantidad
 
@@ -113,8 +117,6 @@ class InsumoListView(ListView):
 
             insumo.nivel_alerta_global = nivel
 
-        return qs
-
 
 class InsumoCreateView(CreateView):
     model = Insumo
@@ -129,11 +131,12 @@ class InsumoUpdateView(UpdateView):
     template_name = "web/insumos_form.html"
     success_url = reverse_lazy("web:insumos_list")
 
-class EntradaCompraListView(ListView):
+class EntradaCompraListView(KeysetPaginacionMixin, ListView):
     model = EntradaCompra
     template_name = "web/compras_list.html"
     context_object_name = "compras"
     paginate_by = 20
+    orden_keyset = ("-fecha_documento", "-created_at", "-id")
 
     def get_queryset(self):
         qs = (
@@ -141,15 +144,8 @@ class EntradaCompraListView(ListView):
             .get_queryset()
             .select_related("proveedor", "almacen", "insumo")
         )
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(
-                Q(insumo__nombre__icontains=q)
-                | Q(proveedor__nombre__icontains=q)
-                | Q(numero_documento__icontains=q)
-                | Q(referencia__icontains=q)
-            )
-        return qs.order_by("-fecha_documento", "-created_at")
+        qs = aplicar_busqueda(qs, self.request.GET.get("q"))
+        return qs.order_by("-fecha_documento", "-created_at", "-id")
 
 
 class EntradaCompraCreateView(CreateView):
@@ -160,30 +156,61 @@ class EntradaCompraCreateView(CreateView):
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        self.object.procesar(usuario=self.request.user if self.request.user.is_authenticated else None)
+        # la entrada de inventario se genera en segundo plano
+        encolar(
+            "procesar_entrada_compra",
+            {
+                "entrada_id": self.object.pk,
+                "usuario_id": self.request.user.pk if self.request.user.is_authenticated else None,
+            },
+            clave_idempotencia=f"entrada-compra-{self.object.pk}",
+            usuario=self.request.user,
+        )
         return response
 
-class PlatoListView(ListView):
+class PlatoListView(KeysetPaginacionMixin, ListView):
     model = Plato
     template_name = "web/platos_list.html"
     context_object_name = "platos"
     paginate_by = 20
+    orden_keyset = ("nombre", "id")
 
     def get_queryset(self):
         qs = super().get_queryset().select_related("categoria")
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(nombre__icontains=q)
-        return qs.order_by("nombre")
+        qs = aplicar_busqueda(qs, self.request.GET.get("q"))
+        # food cost % y margen % calculados en BD (ver services.menu)
+        return anotar_indicadores_platos(qs).order_by("nombre", "id")
+
+
+class IngenieriaMenuView(ListView):
+    """
+    Matriz de ingeniería de menú: popularidad vs. margen de cada plato,
+    calculada con anotaciones en BD (ver services.menu).
+    """
+    template_name = "web/platos_ingenieria_menu.html"
+    context_object_name = "platos"
+    paginate_by = 50
+
+    def get_queryset(self):
+        self.filtros = IngenieriaMenuFiltrosForm(self.request.GET)
+        self.filtros.is_valid()
+        # solo los filtros válidos (los inválidos quedan en filtros.errors)
+        datos = self.filtros.cleaned_data
+        self.resultado = calcular_ingenieria_menu(
+            fecha_desde=datos.get("fecha_desde"),
+            fecha_hasta=datos.get("fecha_hasta"),
+            categoria_id=datos.get("categoria"),
+            clasificacion=datos.get("clasificacion") or None,
+            orden=datos.get("ordering") or "-contribucion_total",
+        )
+        return self.resultado.platos
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        # agregamos cálculo de porcentaje + margen
-        for plato in ctx["platos"]:
-            try:
-                ctx_obj = plato.food_cost_porcentaje  # propiedad del modelo
-            except:
-                pass
+        ctx["resultado"] = self.resultado
+        ctx["filtros"] = self.filtros
+        ctx["clasificaciones"] = CLASIFICACIONES
+        ctx["categorias"] = CategoriaPlato.objects.all()
         return ctx
 
 